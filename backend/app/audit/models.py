@@ -28,3 +28,4 @@ class AuditVerifyResult(BaseModel):
     valid: bool
     entries_checked: int
     verified_at: str
+    mode: str = "full"
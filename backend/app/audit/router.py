@@ -8,8 +8,9 @@ from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
 from app.audit.models import AuditEntry, AuditVerifyResult
-from app.audit.service import verify_audit_chain
+from app.audit.service import verify_audit_chain_checkpointed
 from app.auth.dependencies import get_current_user
+from app.pagination import decode_cursor, split_page
 
 router = APIRouter(prefix="/api/audit", tags=["audit"])
 
@@ -30,9 +31,17 @@ async def list_audit_entries(
     to_date: str | None = None,
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=50, ge=1, le=100),
+    cursor: str | None = Query(
+        default=None, description="next_cursor of the previous page; replaces page.",
+    ),
+    include_total: bool = Query(default=True, description="Count all matching entries."),
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
 ) -> dict[str, Any]:
-    """List audit log entries with filtering and pagination (admin only)."""
+    """List audit log entries with filtering and pagination (admin only).
+
+    Entries are newest first by id; ``cursor`` continues after the last id
+    of a previous page without an OFFSET scan.
+    """
     _require_admin(current_user)
     db = request.app.state.db_manager.audit_db
 
@@ -59,23 +68,36 @@ async def list_audit_entries(
     where_clause = " AND ".join(conditions) if conditions else "1=1"
 
     # Count total
-    count_cursor = await db.execute(
-        f"SELECT COUNT(*) FROM audit_log WHERE {where_clause}",  # noqa: S608
-        params,
-    )
-    count_row = await count_cursor.fetchone()
-    total: int = count_row[0]
-
-    # Fetch page
+    total: int | None = None
+    if include_total:
+        count_cursor = await db.execute(
+            f"SELECT COUNT(*) FROM audit_log WHERE {where_clause}",  # noqa: S608
+            params,
+        )
+        count_row = await count_cursor.fetchone()
+        total = count_row[0]
+
+    # Fetch page, plus one row to tell whether another follows
     offset = (page - 1) * page_size
-    cursor = await db.execute(
+    page_params: list[object] = [*params]
+    if cursor is not None:
+        try:
+            (after_id,) = decode_cursor(cursor, (int,))
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        where_clause += " AND id < ?"
+        page_params.append(after_id)
+        offset = 0
+    rows_cursor = await db.execute(
         f"SELECT id, timestamp, user_id, username, action, target_type, "  # noqa: S608
         f"target_id, detail, ip_address, session_id, previous_hash, entry_hash "
         f"FROM audit_log WHERE {where_clause} "
         f"ORDER BY id DESC LIMIT ? OFFSET ?",
-        [*params, page_size, offset],
+        [*page_params, page_size + 1, offset],
+    )
+    rows, next_cursor = split_page(
+        await rows_cursor.fetchall(), page_size, key=lambda r: (r[0],),
     )
-    rows = await cursor.fetchall()
 
     items = [
         AuditEntry(
@@ -100,20 +122,31 @@ async def list_audit_entries(
         "total": total,
         "page": page,
         "page_size": page_size,
+        "next_cursor": next_cursor,
     }
 
 
 @router.get("/verify", response_model=AuditVerifyResult)
 async def verify_chain(
     request: Request,
+    full: bool = False,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
 ) -> AuditVerifyResult:
-    """Verify audit chain integrity (admin only)."""
+    """Verify audit chain integrity (admin only).
+
+    By default only entries appended since the last signed checkpoint are
+    rehashed; full=true re-verifies the whole chain from genesis.
+    """
     _require_admin(current_user)
-    db = request.app.state.db_manager.audit_db
-    is_valid, entries_checked = await verify_audit_chain(db)
+    db_manager = request.app.state.db_manager
+    await db_manager.audit_writer.flush()
+    is_valid, entries_checked, mode = await verify_audit_chain_checkpointed(
+        db_manager.audit_db, db_manager.config.audit_checkpoint_key, full=full,
+        writer=db_manager.audit_writer,
+    )
     return AuditVerifyResult(
         valid=is_valid,
         entries_checked=entries_checked,
         verified_at=datetime.now(tz=UTC).isoformat(),
+        mode=mode,
     )
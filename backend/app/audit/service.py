@@ -3,13 +3,19 @@
 from __future__ import annotations
 
 import hashlib
+import hmac
 import json
+import logging
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     import aiosqlite
 
+    from app.audit.writer import AuditWriter
+
+logger = logging.getLogger(__name__)
+
 GENESIS_HASH = hashlib.sha256(b"IRIS_AUDIT_GENESIS").hexdigest()
 
 
@@ -31,8 +37,18 @@ def compute_entry_hash(entry: dict[str, object], previous_hash: str) -> str:
     return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 
-async def write_audit_entry(
-    db: aiosqlite.Connection,
+INSERT_AUDIT_ENTRY_SQL = (
+    "INSERT INTO audit_log "
+    "(id, timestamp, user_id, username, action, target_type, "
+    "target_id, detail, ip_address, session_id, "
+    "previous_hash, entry_hash) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def build_audit_row(
+    entry_id: int,
+    previous_hash: str,
     *,
     user_id: str,
     username: str,
@@ -42,28 +58,13 @@ async def write_audit_entry(
     detail: dict[str, object] | None = None,
     ip_address: str | None = None,
     session_id: str | None = None,
-) -> None:
-    """Write a hash-chained audit log entry."""
-    # 1. Get the previous entry's hash (or genesis hash)
-    cursor = await db.execute(
-        "SELECT entry_hash FROM audit_log ORDER BY id DESC LIMIT 1"
-    )
-    row = await cursor.fetchone()
-    previous_hash = row[0] if row else GENESIS_HASH
-
-    # 2. Get next ID
-    cursor = await db.execute(
-        "SELECT COALESCE(MAX(id), 0) + 1 FROM audit_log"
-    )
-    next_id_row = await cursor.fetchone()
-    next_id: int = next_id_row[0]  # type: ignore[index]
-
-    # 3. Build entry
+) -> tuple[object, ...]:
+    """Build the INSERT parameters for a chained entry; entry_hash is the last item."""
     timestamp = datetime.now(tz=UTC).isoformat()
     detail_json = json.dumps(detail) if detail else None
 
     entry: dict[str, object] = {
-        "id": next_id,
+        "id": entry_id,
         "timestamp": timestamp,
         "user_id": user_id,
         "username": username,
@@ -74,68 +75,230 @@ async def write_audit_entry(
         "ip_address": ip_address,
         "session_id": session_id,
     }
-
-    # 4. Compute hash
     entry_hash = compute_entry_hash(entry, previous_hash)
 
-    # 5. Insert
-    await db.execute(
-        "INSERT INTO audit_log "
-        "(id, timestamp, user_id, username, action, target_type, "
-        "target_id, detail, ip_address, session_id, "
-        "previous_hash, entry_hash) "
-        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-        (
-            next_id, timestamp, user_id, username, action,
-            target_type, target_id, detail_json, ip_address,
-            session_id, previous_hash, entry_hash,
-        ),
+    return (
+        entry_id, timestamp, user_id, username, action,
+        target_type, target_id, detail_json, ip_address,
+        session_id, previous_hash, entry_hash,
     )
-    await db.commit()
+
+
+async def write_audit_entry(
+    db: aiosqlite.Connection,
+    *,
+    user_id: str,
+    username: str,
+    action: str,
+    target_type: str,
+    target_id: str | None = None,
+    detail: dict[str, object] | None = None,
+    ip_address: str | None = None,
+    session_id: str | None = None,
+) -> None:
+    """Write a single hash-chained audit log entry and commit it.
+
+    Request-path auditing goes through ``AuditWriter`` instead, which keeps the
+    chain head in memory and batches commits.
+    """
+    # 1. Take the write lock so no other connection or process can append
+    #    between reading the chain head and inserting after it
+    await db.execute("BEGIN IMMEDIATE")
+
+    try:
+        # 2. Read the chain head: last id and hash (or genesis hash)
+        cursor = await db.execute(
+            "SELECT id, entry_hash FROM audit_log ORDER BY id DESC LIMIT 1"
+        )
+        row = await cursor.fetchone()
+        next_id = row[0] + 1 if row else 1
+        previous_hash = row[1] if row else GENESIS_HASH
+
+        # 3. Build entry and compute hash
+        params = build_audit_row(
+            next_id, previous_hash,
+            user_id=user_id, username=username, action=action,
+            target_type=target_type, target_id=target_id, detail=detail,
+            ip_address=ip_address, session_id=session_id,
+        )
+
+        # 4. Insert
+        await db.execute(INSERT_AUDIT_ENTRY_SQL, params)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+
+_VERIFY_CHUNK_SIZE = 1000
 
 
 async def verify_audit_chain(
     db: aiosqlite.Connection,
+    *,
+    after_id: int = 0,
+    previous_hash: str = GENESIS_HASH,
 ) -> tuple[bool, int]:
-    """Verify the audit log hash chain. Returns (is_valid, entries_checked)."""
+    """Verify the audit log hash chain. Returns (is_valid, entries_checked).
+
+    Verifies entries with id > after_id, expecting the first of them to link to
+    previous_hash; the defaults verify the whole chain from genesis. On failure
+    the second element is the id of the first bad entry instead of a count.
+    """
+    is_valid, checked, _ = await _verify_chain_range(db, after_id, previous_hash)
+    return is_valid, checked
+
+
+async def _verify_chain_range(
+    db: aiosqlite.Connection,
+    after_id: int,
+    previous_hash: str,
+) -> tuple[bool, int, tuple[int, str]]:
+    """Stream and rehash entries after after_id in chunks.
+
+    Returns (is_valid, entries_checked or failing id, (last_id, last_hash)),
+    where the last tuple is the final entry verified.
+    """
     cursor = await db.execute(
         "SELECT id, timestamp, user_id, username, action, target_type, "
         "target_id, detail, ip_address, session_id, "
         "previous_hash, entry_hash "
-        "FROM audit_log ORDER BY id ASC"
+        "FROM audit_log WHERE id > ? ORDER BY id ASC",
+        (after_id,),
+    )
+
+    last_verified = (after_id, previous_hash)
+    checked = 0
+
+    while rows := await cursor.fetchmany(_VERIFY_CHUNK_SIZE):
+        for row in rows:
+            entry: dict[str, object] = {
+                "id": row[0],
+                "timestamp": row[1],
+                "user_id": row[2],
+                "username": row[3],
+                "action": row[4],
+                "target_type": row[5],
+                "target_id": row[6],
+                "detail": row[7],
+                "ip_address": row[8],
+                "session_id": row[9],
+            }
+            row_previous_hash: str = row[10]
+            entry_hash: str = row[11]
+
+            # Check previous_hash matches expected
+            if row_previous_hash != last_verified[1]:
+                await cursor.close()
+                return False, int(row[0]), last_verified
+
+            # Recompute entry_hash
+            computed = compute_entry_hash(entry, row_previous_hash)
+            if computed != entry_hash:
+                await cursor.close()
+                return False, int(row[0]), last_verified
+
+            last_verified = (int(row[0]), entry_hash)
+            checked += 1
+
+    return True, checked, last_verified
+
+
+def sign_checkpoint(
+    key: str, last_entry_id: int, last_entry_hash: str, verified_at: str, mode: str,
+) -> str:
+    """HMAC-SHA256 signature binding a checkpoint to the server secret."""
+    payload = f"{last_entry_id}|{last_entry_hash}|{verified_at}|{mode}"
+    return hmac.new(key.encode("utf-8"), payload.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+async def _latest_trusted_checkpoint(
+    db: aiosqlite.Connection, key: str,
+) -> tuple[int, str] | None:
+    """Return (last_entry_id, last_entry_hash) of the newest checkpoint still trusted.
+
+    A checkpoint is trusted when its signature verifies and the audit row it
+    points at still carries the recorded hash.
+    """
+    cursor = await db.execute(
+        "SELECT c.last_entry_id, c.last_entry_hash, c.verified_at, c.mode, "
+        "c.signature, a.entry_hash "
+        "FROM audit_checkpoints c "
+        "LEFT JOIN audit_log a ON a.id = c.last_entry_id "
+        "ORDER BY c.id DESC LIMIT 1"
+    )
+    row = await cursor.fetchone()
+    if row is None:
+        return None
+    expected = sign_checkpoint(key, row[0], row[1], row[2], row[3])
+    if not hmac.compare_digest(expected, row[4]) or row[5] != row[1]:
+        return None
+    return int(row[0]), str(row[1])
+
+
+async def _record_checkpoint(
+    db: aiosqlite.Connection,
+    key: str,
+    last_verified: tuple[int, str],
+    mode: str,
+) -> None:
+    """Record a signed checkpoint for the last verified entry.
+
+    Skipped if that entry is no longer there, e.g. it belonged to a writer
+    batch that was read before it committed and then rolled back.
+    """
+    last_entry_id, last_entry_hash = last_verified
+    verified_at = datetime.now(tz=UTC).isoformat()
+    await db.execute(
+        "INSERT INTO audit_checkpoints "
+        "(last_entry_id, last_entry_hash, verified_at, mode, signature) "
+        "SELECT ?, ?, ?, ?, ? WHERE EXISTS "
+        "(SELECT 1 FROM audit_log WHERE id = ? AND entry_hash = ?)",
+        (last_entry_id, last_entry_hash, verified_at, mode,
+         sign_checkpoint(key, last_entry_id, last_entry_hash, verified_at, mode),
+         last_entry_id, last_entry_hash),
     )
-    rows = await cursor.fetchall()
-
-    if not rows:
-        return True, 0
-
-    expected_previous = GENESIS_HASH
-
-    for row in rows:
-        entry: dict[str, object] = {
-            "id": row[0],
-            "timestamp": row[1],
-            "user_id": row[2],
-            "username": row[3],
-            "action": row[4],
-            "target_type": row[5],
-            "target_id": row[6],
-            "detail": row[7],
-            "ip_address": row[8],
-            "session_id": row[9],
-        }
-        previous_hash: str = row[10]
-        entry_hash: str = row[11]
-
-        # Check previous_hash matches expected
-        if previous_hash != expected_previous:
-            return False, int(row[0])
-
-        # Recompute entry_hash
-        computed = compute_entry_hash(entry, previous_hash)
-        if computed != entry_hash:
-            return False, int(row[0])
-
-        expected_previous = entry_hash
-
-    return True, len(rows)
+    await db.commit()
+
+
+async def verify_audit_chain_checkpointed(
+    db: aiosqlite.Connection,
+    key: str,
+    *,
+    full: bool = False,
+    writer: AuditWriter | None = None,
+) -> tuple[bool, int, str]:
+    """Verify the chain from the last trusted checkpoint and record a new one.
+
+    With full=True (or when no trusted checkpoint exists) the whole chain is
+    rehashed from genesis. Returns (is_valid, entries_checked, mode), where the
+    first two match verify_audit_chain and mode is "full" or "incremental".
+    No checkpoint is written when verification fails, and none is trusted or
+    written when key is empty. Pass the AuditWriter that appends on db, if
+    any, so the checkpoint is written between its flushes.
+    """
+    if not key:
+        logger.error(
+            "IRIS_AUDIT_CHECKPOINT_KEY is not set; verifying the full audit chain "
+            "without signed checkpoints"
+        )
+        full = True
+    checkpoint = None if full else await _latest_trusted_checkpoint(db, key)
+    if checkpoint is None:
+        checkpoint = (0, GENESIS_HASH)
+        mode = "full"
+    else:
+        mode = "incremental"
+
+    is_valid, checked, last_verified = await _verify_chain_range(db, *checkpoint)
+    if not is_valid:
+        return False, checked, mode
+
+    if checked and key:
+        if writer is None:
+            await _record_checkpoint(db, key, last_verified, mode)
+        else:
+            await writer.run_exclusive(
+                lambda: _record_checkpoint(db, key, last_verified, mode),
+            )
+    return True, checked, mode
@@ -0,0 +1,181 @@
+"""Batched audit log writer with group commits per SPEC-007-A.
+
+Keeps the hash-chain head (last id and entry hash) in memory so appending an
+entry needs no queries. Entries are chained in submission order and flushed in
+batches, each batch in a single transaction.
+
+In multi-worker mode (``shared=True``) other processes append to the same
+chain, so each batch instead opens with ``BEGIN IMMEDIATE`` and reads the head
+from disk while holding the write lock before chaining its entries.
+
+Durability modes:
+    sync  — the caller waits until its entry's batch is committed (default).
+            Concurrent callers share one commit.
+    async — the caller returns immediately; pending entries are flushed by a
+            background task every ``flush_interval`` seconds and on close().
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from typing import TYPE_CHECKING, Any
+
+from app.audit.service import GENESIS_HASH, INSERT_AUDIT_ENTRY_SQL, build_audit_row
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+AUDIT_DURABILITY_MODES = frozenset({"sync", "async"})
+
+
+class AuditWriter:
+    """Single appender for the audit chain of one audit database connection."""
+
+    def __init__(
+        self,
+        db: aiosqlite.Connection,
+        *,
+        durability: str = "sync",
+        flush_interval: float = 0.05,
+        max_batch_size: int = 500,
+        shared: bool = False,
+    ) -> None:
+        if durability not in AUDIT_DURABILITY_MODES:
+            msg = f"Unknown audit durability mode: {durability!r}"
+            raise ValueError(msg)
+        self._db = db
+        self.durability = durability
+        self._flush_interval = flush_interval
+        self._max_batch_size = max_batch_size
+        self._shared = shared
+        self._head: tuple[int, str] | None = None
+        self._pending: list[tuple[dict[str, Any], asyncio.Future[None] | None]] = []
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+        self._closed = False
+
+    @property
+    def pending_count(self) -> int:
+        """Number of entries queued in memory but not yet committed."""
+        return len(self._pending)
+
+    async def submit(
+        self,
+        *,
+        user_id: str,
+        username: str,
+        action: str,
+        target_type: str,
+        target_id: str | None = None,
+        detail: dict[str, object] | None = None,
+        ip_address: str | None = None,
+        session_id: str | None = None,
+    ) -> None:
+        """Queue an entry to be chained and committed by the next flush."""
+        if self._closed:
+            msg = "Audit writer is closed"
+            raise RuntimeError(msg)
+        entry = {
+            "user_id": user_id, "username": username, "action": action,
+            "target_type": target_type, "target_id": target_id, "detail": detail,
+            "ip_address": ip_address, "session_id": session_id,
+        }
+
+        future: asyncio.Future[None] | None = None
+        if self.durability == "sync":
+            future = asyncio.get_running_loop().create_future()
+        self._pending.append((entry, future))
+        self._ensure_flusher()
+        self._wakeup.set()
+
+        if future is not None:
+            await future
+
+    async def flush(self) -> None:
+        """Commit every pending entry now."""
+        async with self._flush_lock:
+            while self._pending:
+                batch = self._pending[:self._max_batch_size]
+                del self._pending[:self._max_batch_size]
+                try:
+                    await self._append([entry for entry, _ in batch])
+                except Exception as exc:
+                    # The head is re-read from disk on the next flush
+                    logger.exception("Failed to flush %d audit entries", len(batch))
+                    await self._db.rollback()
+                    self._head = None
+                    for _, future in batch:
+                        if future is not None and not future.done():
+                            future.set_exception(exc)
+                    continue
+                for _, future in batch:
+                    if future is not None and not future.done():
+                        future.set_result(None)
+
+    async def run_exclusive(self, write: Callable[[], Awaitable[None]]) -> None:
+        """Run another write on this writer's connection between flushes.
+
+        Its commit then never publishes half of a batch, and a failed batch's
+        rollback never discards it.
+        """
+        async with self._flush_lock:
+            await write()
+
+    async def _append(self, entries: list[dict[str, Any]]) -> None:
+        """Chain entries onto the head and insert them in one transaction."""
+        if self._shared:
+            await self._db.execute("BEGIN IMMEDIATE")
+            head = await self._read_head()
+        else:
+            head = self._head if self._head is not None else await self._read_head()
+
+        last_id, last_hash = head
+        rows = []
+        for entry in entries:
+            last_id += 1
+            params = build_audit_row(last_id, last_hash, **entry)
+            last_hash = str(params[-1])
+            rows.append(params)
+        await self._db.executemany(INSERT_AUDIT_ENTRY_SQL, rows)
+        await self._db.commit()
+        if not self._shared:
+            self._head = (last_id, last_hash)
+
+    async def close(self) -> None:
+        """Flush pending entries and stop the background task."""
+        self._closed = True
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _read_head(self) -> tuple[int, str]:
+        cursor = await self._db.execute(
+            "SELECT id, entry_hash FROM audit_log ORDER BY id DESC LIMIT 1"
+        )
+        row = await cursor.fetchone()
+        if row is None:
+            return 0, GENESIS_HASH
+        return int(row[0]), str(row[1])
+
+    def _ensure_flusher(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self.durability == "async":
+                # Let more entries accumulate so they share one commit
+                await asyncio.sleep(self._flush_interval)
+            await self.flush()
@@ -0,0 +1,60 @@
+"""Process-local cache of user identity and role permissions per SPEC-005-B.
+
+get_current_user and require_permission consult this cache before querying
+``users`` and ``role_permissions``. Entries expire after a TTL, and every
+code path that changes a user's role or active flag, or revokes their
+tokens, invalidates that user's entry so the change applies on the very
+next request. Role permissions are only written by startup seeding, so their
+entries simply expire. A TTL of 0 disables caching.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import NamedTuple
+
+
+class CachedUser(NamedTuple):
+    """The users columns an authenticated request depends on."""
+
+    id: str
+    username: str
+    role: str
+    is_active: bool
+
+
+class IdentityCache:
+    """TTL cache of user rows and role permission sets."""
+
+    def __init__(self, ttl: float = 30.0) -> None:
+        self._ttl = ttl
+        self._users: dict[str, tuple[float, CachedUser]] = {}
+        self._permissions: dict[str, tuple[float, frozenset[str]]] = {}
+
+    def get_user(self, user_id: str) -> CachedUser | None:
+        """Cached user row, or None if absent or expired."""
+        entry = self._users.get(user_id)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def put_user(self, user: CachedUser) -> None:
+        """Cache a user row freshly read from the database."""
+        if self._ttl > 0:
+            self._users[user.id] = (time.monotonic() + self._ttl, user)
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop a user's cached row after a role, status or token change."""
+        self._users.pop(user_id, None)
+
+    def get_permissions(self, role: str) -> frozenset[str] | None:
+        """Cached permission set for a role, or None if absent or expired."""
+        entry = self._permissions.get(role)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def put_permissions(self, role: str, permissions: frozenset[str]) -> None:
+        """Cache a role's permission set freshly read from the database."""
+        if self._ttl > 0:
+            self._permissions[role] = (time.monotonic() + self._ttl, permissions)
@@ -7,14 +7,21 @@ from typing import TYPE_CHECKING, Any
 from fastapi import Depends, HTTPException, Request
 from jose import JWTError
 
+from app.auth.cache import CachedUser
 from app.auth.service import decode_access_token
 
 if TYPE_CHECKING:
+    from app.auth.cache import IdentityCache
     from app.config import AuthConfig
 
 
 async def get_current_user(request: Request) -> dict[str, Any]:
-    """Extract and validate the current user from JWT bearer token."""
+    """Extract and validate the current user from JWT bearer token.
+
+    The resolved user is also stored on ``request.state.current_user`` so
+    AuditMiddleware can attribute the request without decoding the token or
+    querying users a second time.
+    """
     auth_header = request.headers.get("Authorization")
     if not auth_header or not auth_header.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Not authenticated")
@@ -32,22 +39,37 @@ async def get_current_user(request: Request) -> dict[str, Any]:
     if not user_id or not role:
         raise HTTPException(status_code=401, detail="Invalid token claims")
 
-    # Check user is still active in database
-    db = request.app.state.db_manager.main_db
-    cursor = await db.execute(
-        "SELECT id, username, role, is_active FROM users WHERE id = ?",
-        (user_id,),
-    )
-    row = await cursor.fetchone()
-    if row is None or not row[3]:
+    # Check user is still active, from the identity cache when fresh
+    cache: IdentityCache = request.app.state.identity_cache
+    user = cache.get_user(user_id)
+    if user is None:
+        async with request.app.state.db_manager.read_connection() as db:
+            cursor = await db.execute(
+                "SELECT id, username, role, is_active FROM users WHERE id = ?",
+                (user_id,),
+            )
+            row = await cursor.fetchone()
+        if row is not None:
+            user = CachedUser(row[0], row[1], row[2], bool(row[3]))
+            cache.put_user(user)
+    if user is None or not user.is_active:
         raise HTTPException(status_code=401, detail="User not found or inactive")
 
-    return {
-        "id": row[0],
-        "username": row[1],
-        "role": row[2],
+    current_user = {
+        "id": user.id,
+        "username": user.username,
+        "role": user.role,
         "jti": payload.get("jti"),
     }
+    request.state.current_user = current_user
+    return current_user
+
+
+async def get_optional_user(request: Request) -> dict[str, Any] | None:
+    """Resolve the current user like get_current_user, or None when anonymous."""
+    if request.headers.get("Authorization") is None:
+        return None
+    return await get_current_user(request)
 
 
 def require_permission(permission: str) -> Any:
@@ -57,12 +79,16 @@ def require_permission(permission: str) -> Any:
         request: Request,
         current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
     ) -> dict[str, Any]:
-        db = request.app.state.db_manager.main_db
-        cursor = await db.execute(
-            "SELECT permission FROM role_permissions WHERE role_id = ?",
-            (current_user["role"],),
-        )
-        permissions = {row[0] for row in await cursor.fetchall()}
+        cache: IdentityCache = request.app.state.identity_cache
+        permissions = cache.get_permissions(current_user["role"])
+        if permissions is None:
+            async with request.app.state.db_manager.read_connection() as db:
+                cursor = await db.execute(
+                    "SELECT permission FROM role_permissions WHERE role_id = ?",
+                    (current_user["role"],),
+                )
+                permissions = frozenset(row[0] for row in await cursor.fetchall())
+            cache.put_permissions(current_user["role"], permissions)
         if permission not in permissions:
             raise HTTPException(status_code=403, detail="Insufficient permissions")
         return current_user
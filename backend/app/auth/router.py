@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import uuid
 from datetime import UTC, datetime, timedelta
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from argon2.exceptions import VerifyMismatchError
 from fastapi import APIRouter, Depends, HTTPException, Request
@@ -26,8 +26,12 @@ from app.auth.service import (
     rotate_refresh_token,
     validate_password,
 )
+from app.database import get_read_db, get_write_db
 from app.settings.service import get_setting
 
+if TYPE_CHECKING:
+    import aiosqlite
+
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
@@ -43,10 +47,13 @@ async def _get_session_timeout(db: object) -> int | None:
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(body: LoginRequest, request: Request) -> TokenResponse:
+async def login(
+    body: LoginRequest,
+    request: Request,
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
+) -> TokenResponse:
     """Authenticate user and issue tokens per SPEC-005-B login flow."""
     config = request.app.state.config
-    db = request.app.state.db_manager.main_db
     hasher = create_password_hasher(config.auth)
 
     # 1. Look up user
@@ -123,10 +130,13 @@ async def login(body: LoginRequest, request: Request) -> TokenResponse:
 
 
 @router.post("/refresh", response_model=TokenResponse)
-async def refresh(body: RefreshRequest, request: Request) -> TokenResponse:
+async def refresh(
+    body: RefreshRequest,
+    request: Request,
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
+) -> TokenResponse:
     """Rotate refresh token and issue new access token."""
     config = request.app.state.config
-    db = request.app.state.db_manager.main_db
 
     result = await rotate_refresh_token(db, body.refresh_token, config.auth)
     if result is None:
@@ -162,10 +172,12 @@ async def refresh(body: RefreshRequest, request: Request) -> TokenResponse:
 async def logout(
     request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> dict[str, str]:
     """Revoke all refresh tokens for the current user."""
-    db = request.app.state.db_manager.main_db
-    await revoke_user_tokens(db, current_user["id"])
+    await revoke_user_tokens(
+        db, current_user["id"], identity_cache=request.app.state.identity_cache,
+    )
     return {"message": "Logged out"}
 
 
@@ -174,10 +186,10 @@ async def change_password(
     body: ChangePasswordRequest,
     request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> dict[str, str]:
     """Change password per SPEC-005-B change-password flow."""
     config = request.app.state.config
-    db = request.app.state.db_manager.main_db
     hasher = create_password_hasher(config.auth)
 
     # 1. Verify current password
@@ -229,25 +241,31 @@ async def change_password(
     await db.commit()
 
     # 5. Revoke all refresh tokens
-    await revoke_user_tokens(db, current_user["id"])
+    await revoke_user_tokens(
+        db, current_user["id"], identity_cache=request.app.state.identity_cache,
+    )
 
     return {"message": "Password changed"}
 
 
 @router.get("/setup/status")
-async def setup_status(request: Request) -> dict[str, bool]:
+async def setup_status(
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
+) -> dict[str, bool]:
     """Check whether first-run setup is needed."""
-    db = request.app.state.db_manager.main_db
     cursor = await db.execute("SELECT COUNT(*) FROM users")
     row = await cursor.fetchone()
     return {"needs_setup": row[0] == 0}
 
 
 @router.post("/setup")
-async def setup(body: SetupRequest, request: Request) -> dict[str, str]:
+async def setup(
+    body: SetupRequest,
+    request: Request,
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
+) -> dict[str, str]:
     """First-run admin setup — creates initial admin user."""
     config = request.app.state.config
-    db = request.app.state.db_manager.main_db
 
     # Check if any users exist
     cursor = await db.execute("SELECT COUNT(*) FROM users")
@@ -18,6 +18,7 @@ from jose import jwt
 if TYPE_CHECKING:
     import aiosqlite
 
+    from app.auth.cache import IdentityCache
     from app.config import AuthConfig
 
 # Top 20 common passwords (subset of 10k list)
@@ -196,14 +197,19 @@ async def rotate_refresh_token(
 
 
 async def revoke_user_tokens(
-    db: aiosqlite.Connection, user_id: str
+    db: aiosqlite.Connection,
+    user_id: str,
+    *,
+    identity_cache: IdentityCache | None = None,
 ) -> None:
-    """Revoke all refresh tokens for a user."""
+    """Revoke all refresh tokens for a user and drop their cached identity."""
     await db.execute(
         "UPDATE refresh_tokens SET revoked = 1 WHERE user_id = ?",
         (user_id,),
     )
     await db.commit()
+    if identity_cache is not None:
+        identity_cache.invalidate_user(user_id)
 
 
 async def check_password_history(
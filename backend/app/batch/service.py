@@ -7,10 +7,8 @@ import uuid
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
-from app.search.service import index_element as _index_element
-from app.search.service import index_diagram as _index_diagram
-from app.search.service import remove_element_index as _remove_element_index
-from app.search.service import remove_diagram_index as _remove_diagram_index
+from app.diagrams.element_refs import sync_diagram_element_refs
+from app.diagrams.summary import update_diagram_summary
 
 if TYPE_CHECKING:
     import aiosqlite
@@ -64,7 +62,6 @@ async def batch_delete_diagrams(
                 (diagram_id, new_version, ver_row[0], ver_row[1],
                  ver_row[2], now, deleted_by),
             )
-            await _remove_diagram_index(db, diagram_id)
             succeeded += 1
         except Exception as exc:
             failed += 1
@@ -117,6 +114,8 @@ async def batch_clone_diagrams(
                 "VALUES (?, 1, ?, ?, ?, 'create', ?, ?)",
                 (new_id, clone_name, row[4], row[5], now, cloned_by),
             )
+            await sync_diagram_element_refs(db, new_id, row[5])
+            await update_diagram_summary(db, new_id, row[5])
 
             # Copy tags
             tag_cursor = await db.execute(
@@ -130,12 +129,6 @@ async def batch_clone_diagrams(
                     "VALUES (?, ?, ?, ?)",
                     (new_id, tr[0], now, cloned_by),
                 )
-
-            # Index for search
-            await _index_diagram(
-                db, diagram_id=new_id, name=clone_name,
-                diagram_type=row[0], description=row[4],
-            )
             succeeded += 1
         except Exception as exc:
             failed += 1
@@ -281,7 +274,6 @@ async def batch_delete_elements(
                 (element_id, new_version, ver_row[0], ver_row[1],
                  ver_row[2], now, deleted_by),
             )
-            await _remove_element_index(db, element_id)
             succeeded += 1
         except Exception as exc:
             failed += 1
@@ -348,12 +340,6 @@ async def batch_clone_elements(
                     "VALUES (?, ?, ?, ?)",
                     (new_id, tr[0], now, cloned_by),
                 )
-
-            # Index for search
-            await _index_element(
-                db, element_id=new_id, name=clone_name,
-                element_type=row[0], description=row[3],
-            )
             succeeded += 1
         except Exception as exc:
             failed += 1
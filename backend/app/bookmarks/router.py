@@ -3,12 +3,16 @@
 from __future__ import annotations
 
 from datetime import UTC, datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException
 
 from app.auth.dependencies import get_current_user
 from app.bookmarks.models import BookmarkResponse
+from app.database import get_read_db, get_write_db
+
+if TYPE_CHECKING:
+    import aiosqlite
 
 router = APIRouter(tags=["bookmarks"])
 
@@ -18,11 +22,10 @@ router = APIRouter(tags=["bookmarks"])
     response_model=list[BookmarkResponse],
 )
 async def list_bookmarks(
-    request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> list[BookmarkResponse]:
     """List current user's bookmarked diagrams and packages."""
-    db = request.app.state.db_manager.main_db
     cursor = await db.execute(
         "SELECT diagram_id, package_id, created_at FROM bookmarks "
         "WHERE user_id = ? ORDER BY created_at DESC",
@@ -42,11 +45,10 @@ async def list_bookmarks(
 )
 async def bookmark_diagram(
     diagram_id: str,
-    request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> BookmarkResponse:
     """Bookmark a diagram for the current user."""
-    db = request.app.state.db_manager.main_db
     # Check if already bookmarked
     cursor = await db.execute(
         "SELECT created_at FROM bookmarks WHERE user_id = ? AND diagram_id = ?",
@@ -68,11 +70,10 @@ async def bookmark_diagram(
 @router.delete("/api/diagrams/{diagram_id}/bookmark", status_code=204)
 async def unbookmark_diagram(
     diagram_id: str,
-    request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> None:
     """Remove a diagram bookmark for the current user."""
-    db = request.app.state.db_manager.main_db
     cursor = await db.execute(
         "SELECT 1 FROM bookmarks WHERE user_id = ? AND diagram_id = ?",
         (current_user["id"], diagram_id),
@@ -94,11 +95,10 @@ async def unbookmark_diagram(
 )
 async def bookmark_package(
     package_id: str,
-    request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> BookmarkResponse:
     """Bookmark a package for the current user."""
-    db = request.app.state.db_manager.main_db
     cursor = await db.execute(
         "SELECT created_at FROM bookmarks WHERE user_id = ? AND package_id = ?",
         (current_user["id"], package_id),
@@ -119,11 +119,10 @@ async def bookmark_package(
 @router.delete("/api/packages/{package_id}/bookmark", status_code=204)
 async def unbookmark_package(
     package_id: str,
-    request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> None:
     """Remove a package bookmark for the current user."""
-    db = request.app.state.db_manager.main_db
     cursor = await db.execute(
         "SELECT 1 FROM bookmarks WHERE user_id = ? AND package_id = ?",
         (current_user["id"], package_id),
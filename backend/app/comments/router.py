@@ -4,12 +4,16 @@ from __future__ import annotations
 
 import uuid
 from datetime import UTC, datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException
 
 from app.auth.dependencies import get_current_user
 from app.comments.models import CommentCreate, CommentResponse, CommentUpdate
+from app.database import get_read_db, get_write_db
+
+if TYPE_CHECKING:
+    import aiosqlite
 
 router = APIRouter(tags=["comments"])
 
@@ -44,11 +48,10 @@ async def _list_comments(
 )
 async def list_element_comments(
     element_id: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> list[CommentResponse]:
     """List comments on an element."""
-    db = request.app.state.db_manager.main_db
     return await _list_comments(db, "element", element_id)
 
 
@@ -60,11 +63,10 @@ async def list_element_comments(
 async def create_element_comment(
     element_id: str,
     body: CommentCreate,
-    request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> CommentResponse:
     """Add a comment on an element."""
-    db = request.app.state.db_manager.main_db
     comment_id = str(uuid.uuid4())
     now = datetime.now(tz=UTC).isoformat()
     await db.execute(
@@ -87,11 +89,10 @@ async def create_element_comment(
 )
 async def list_diagram_comments(
     diagram_id: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> list[CommentResponse]:
     """List comments on a diagram."""
-    db = request.app.state.db_manager.main_db
     return await _list_comments(db, "diagram", diagram_id)
 
 
@@ -103,11 +104,10 @@ async def list_diagram_comments(
 async def create_diagram_comment(
     diagram_id: str,
     body: CommentCreate,
-    request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> CommentResponse:
     """Add a comment on a diagram."""
-    db = request.app.state.db_manager.main_db
     comment_id = str(uuid.uuid4())
     now = datetime.now(tz=UTC).isoformat()
     await db.execute(
@@ -131,11 +131,10 @@ async def create_diagram_comment(
 async def update_comment(
     comment_id: str,
     body: CommentUpdate,
-    request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> CommentResponse:
     """Update a comment (owner only)."""
-    db = request.app.state.db_manager.main_db
     cursor = await db.execute(
         "SELECT id, target_type, target_id, user_id, content, "
         "created_at, updated_at FROM comments "
@@ -164,11 +163,10 @@ async def update_comment(
 @router.delete("/api/comments/{comment_id}", status_code=204)
 async def delete_comment(
     comment_id: str,
-    request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> None:
     """Soft-delete a comment (owner or admin)."""
-    db = request.app.state.db_manager.main_db
     cursor = await db.execute(
         "SELECT user_id FROM comments WHERE id = ? AND is_deleted = 0",
         (comment_id,),
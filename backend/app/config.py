@@ -5,12 +5,42 @@ from __future__ import annotations
 import os
 from dataclasses import dataclass, field
 
+_DEV_CHECKPOINT_KEY = "dev-checkpoint-key-change-in-production-at-least-32-bytes"
+
+
+def _default_checkpoint_key() -> str:
+    """Return the audit checkpoint signing key, or "" when none is configured.
+
+    Only debug mode falls back to a development key; otherwise checkpoints are
+    neither signed nor trusted until IRIS_AUDIT_CHECKPOINT_KEY is set.
+    """
+    key = os.environ.get("IRIS_AUDIT_CHECKPOINT_KEY", "")
+    if not key and os.environ.get("IRIS_DEBUG", "false").lower() == "true":
+        return _DEV_CHECKPOINT_KEY
+    return key
+
 
 @dataclass(frozen=True)
 class DatabaseConfig:
     """SQLite database configuration."""
 
     data_dir: str = field(default_factory=lambda: os.environ.get("IRIS_DATA_DIR", "data"))
+    read_pool_size: int = field(
+        default_factory=lambda: int(os.environ.get("IRIS_DB_READ_POOL_SIZE", "4"))
+    )
+    audit_durability: str = field(
+        default_factory=lambda: os.environ.get("IRIS_AUDIT_DURABILITY", "sync")
+    )
+    thumbnail_workers: int = field(
+        default_factory=lambda: int(os.environ.get("IRIS_THUMBNAIL_WORKERS", "2"))
+    )
+    thumbnail_debounce: float = field(
+        default_factory=lambda: float(os.environ.get("IRIS_THUMBNAIL_DEBOUNCE", "0.5"))
+    )
+    multi_worker: bool = field(
+        default_factory=lambda: os.environ.get("IRIS_MULTI_WORKER", "false").lower() == "true"
+    )
+    audit_checkpoint_key: str = field(default_factory=_default_checkpoint_key)
 
     @property
     def main_db_path(self) -> str:
@@ -20,6 +50,10 @@ class DatabaseConfig:
     def audit_db_path(self) -> str:
         return os.path.join(self.data_dir, "iris_audit.db")
 
+    @property
+    def coord_db_path(self) -> str:
+        return os.path.join(self.data_dir, "iris_coord.db")
+
 
 @dataclass(frozen=True)
 class AuthConfig:
@@ -42,6 +76,9 @@ class AuthConfig:
     min_password_length: int = 12
     max_password_length: int = 128
     password_history_count: int = 5
+    identity_cache_ttl: float = field(
+        default_factory=lambda: float(os.environ.get("IRIS_IDENTITY_CACHE_TTL", "30"))
+    )
 
 
 @dataclass(frozen=True)
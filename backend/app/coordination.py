@@ -0,0 +1,65 @@
+"""Cross-process coordination for multi-worker deployments.
+
+With ``IRIS_MULTI_WORKER=true`` several worker processes (e.g. ``uvicorn
+--workers N``) share one data directory. State that a single process keeps in
+memory is moved into SQLite and critical sections take the database write
+lock instead of an asyncio lock:
+
+- rate-limit windows live in ``iris_coord.db`` (see SharedRateLimiter);
+- audit chain appends read the chain head inside ``BEGIN IMMEDIATE``;
+- edit locks are acquired inside ``BEGIN IMMEDIATE`` and expired locks are
+  filtered by query rather than deleted on every read;
+- startup migrations and seeding run under ``startup_lock`` so only one worker
+  initializes the databases at a time.
+"""
+
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+import aiosqlite
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+# Startup of one worker (migrations, seeding, audit verification) can take a
+# while on a large database; the others wait this long for it to finish.
+STARTUP_LOCK_TIMEOUT = 600.0
+
+
+async def open_coordination_db(
+    path: str, *, timeout: float = 5.0,
+) -> aiosqlite.Connection:
+    """Open iris_coord.db, creating its tables if needed."""
+    db = await aiosqlite.connect(path, timeout=timeout)
+    await db.execute("PRAGMA journal_mode=WAL")
+    await db.execute("PRAGMA synchronous=NORMAL")
+    await db.execute(
+        "CREATE TABLE IF NOT EXISTS rate_limit_windows ("
+        "  key TEXT PRIMARY KEY,"
+        "  window_start REAL NOT NULL,"
+        "  current INTEGER NOT NULL,"
+        "  previous INTEGER NOT NULL"
+        ")"
+    )
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_rate_limit_windows_start "
+        "ON rate_limit_windows(window_start)"
+    )
+    await db.commit()
+    return db
+
+
+@asynccontextmanager
+async def startup_lock(path: str) -> AsyncIterator[None]:
+    """Hold an exclusive lock on iris_coord.db for the duration of the block."""
+    db = await open_coordination_db(path, timeout=STARTUP_LOCK_TIMEOUT)
+    try:
+        await db.execute("BEGIN EXCLUSIVE")
+        try:
+            yield
+        finally:
+            await db.rollback()
+    finally:
+        await db.close()
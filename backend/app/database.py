@@ -1,16 +1,28 @@
 """SQLite connection management with PRAGMA configuration per SPEC-004-A.
 
 Provides a DatabaseManager that maintains dual connections to iris.db and iris_audit.db
-with all 7 required PRAGMAs applied to each connection.
+with all 7 required PRAGMAs applied to each connection. iris.db additionally gets a
+pool of read-only connections so reads proceed concurrently under WAL while writes
+are queued through the single writer connection.
 """
 
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 import aiosqlite
+from fastapi import Request  # noqa: TC002
+
+from app.audit.writer import AuditWriter
+from app.diagrams.thumbnail_queue import ThumbnailQueue
+from app.import_sparx.jobs import ImportJobManager
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
     from app.config import DatabaseConfig
 
 _AUTO_VACUUM_INCREMENTAL = 2
@@ -32,6 +44,18 @@ async def configure_connection(db: aiosqlite.Connection) -> None:
     await db.execute("PRAGMA journal_size_limit=67108864")
 
 
+async def configure_read_connection(db: aiosqlite.Connection) -> None:
+    """Apply the PRAGMAs relevant to a read-only pooled connection.
+
+    journal_mode and auto_vacuum are database-level settings owned by the writer,
+    so only per-connection PRAGMAs are applied here.
+    """
+    await db.execute("PRAGMA query_only=ON")
+    await db.execute("PRAGMA foreign_keys=ON")
+    await db.execute("PRAGMA busy_timeout=5000")
+    await db.execute("PRAGMA cache_size=-64000")
+
+
 async def get_connection(db_path: str) -> aiosqlite.Connection:
     """Create and configure a database connection."""
     db = await aiosqlite.connect(db_path)
@@ -40,13 +64,30 @@ async def get_connection(db_path: str) -> aiosqlite.Connection:
     return db
 
 
+async def get_read_connection(db_path: str) -> aiosqlite.Connection:
+    """Create a read-only connection (``mode=ro``) to an existing database."""
+    uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+    db = await aiosqlite.connect(uri, uri=True)
+    db.row_factory = aiosqlite.Row
+    await configure_read_connection(db)
+    return db
+
+
 class DatabaseManager:
     """Manages dual database connections for iris.db and iris_audit.db.
 
+    ``main_db`` is the single writer connection for iris.db. Request handlers
+    should obtain connections through ``read_connection()`` (pooled, read-only)
+    or ``write_connection()`` (the writer, serialized through a FIFO queue)
+    rather than using ``main_db`` directly.
+
     Usage:
         manager = DatabaseManager(config.database)
         await manager.connect()
-        # Use manager.main_db and manager.audit_db
+        async with manager.read_connection() as db:
+            ...
+        async with manager.write_connection() as db:
+            ...
         await manager.close()
     """
 
@@ -54,6 +95,13 @@ class DatabaseManager:
         self.config = config
         self._main_db: aiosqlite.Connection | None = None
         self._audit_db: aiosqlite.Connection | None = None
+        self._audit_writer: AuditWriter | None = None
+        self._thumbnail_queue: ThumbnailQueue | None = None
+        self._import_jobs: ImportJobManager | None = None
+        self._readers: list[aiosqlite.Connection] = []
+        self._read_pool: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        # asyncio.Lock wakes waiters in FIFO order, so it doubles as the write queue
+        self._write_lock = asyncio.Lock()
 
     @property
     def main_db(self) -> aiosqlite.Connection:
@@ -71,16 +119,123 @@ class DatabaseManager:
             raise RuntimeError(msg)
         return self._audit_db
 
+    @property
+    def audit_writer(self) -> AuditWriter:
+        """Get the batched audit chain writer bound to the audit database."""
+        if self._audit_writer is None:
+            msg = "Database not connected. Call connect() first."
+            raise RuntimeError(msg)
+        return self._audit_writer
+
+    @property
+    def thumbnail_queue(self) -> ThumbnailQueue:
+        """Get the background thumbnail renderer bound to the main database."""
+        if self._thumbnail_queue is None:
+            msg = "Database not connected. Call connect() first."
+            raise RuntimeError(msg)
+        return self._thumbnail_queue
+
+    @property
+    def import_jobs(self) -> ImportJobManager:
+        """Get the background SparxEA import job runner."""
+        if self._import_jobs is None:
+            msg = "Database not connected. Call connect() first."
+            raise RuntimeError(msg)
+        return self._import_jobs
+
+    @asynccontextmanager
+    async def read_connection(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a read-only connection from the pool for the duration of the block.
+
+        Falls back to the writer connection when the pool is disabled
+        (``read_pool_size=0``).
+        """
+        if not self._readers:
+            yield self.main_db
+            return
+        db = await self._read_pool.get()
+        try:
+            yield db
+        finally:
+            self._read_pool.put_nowait(db)
+
+    @asynccontextmanager
+    async def write_connection(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Hold the writer connection exclusively for the duration of the block.
+
+        Concurrent writers wait in arrival order, so one request's statements and
+        commit never interleave with another's on the shared connection. A
+        transaction the holder leaves open, e.g. by raising after a write, is
+        rolled back before the next writer gets the connection.
+        """
+        async with self._write_lock:
+            db = self.main_db
+            try:
+                yield db
+            finally:
+                if db.in_transaction:
+                    await db.rollback()
+
     async def connect(self) -> None:
-        """Open and configure both database connections."""
+        """Open and configure both database connections and the read pool."""
         self._main_db = await get_connection(self.config.main_db_path)
         self._audit_db = await get_connection(self.config.audit_db_path)
+        self._audit_writer = AuditWriter(
+            self._audit_db,
+            durability=self.config.audit_durability,
+            shared=self.config.multi_worker,
+        )
+        for _ in range(self.config.read_pool_size):
+            reader = await get_read_connection(self.config.main_db_path)
+            self._readers.append(reader)
+            self._read_pool.put_nowait(reader)
+        self._thumbnail_queue = ThumbnailQueue(
+            self,
+            workers=self.config.thumbnail_workers,
+            debounce=self.config.thumbnail_debounce,
+        )
+        self._import_jobs = ImportJobManager(self)
 
     async def close(self) -> None:
-        """Close both database connections."""
+        """Drain pending thumbnails and audit entries and close all database connections."""
+        if self._import_jobs is not None:
+            await self._import_jobs.close()
+            self._import_jobs = None
+        if self._thumbnail_queue is not None:
+            await self._thumbnail_queue.close()
+            self._thumbnail_queue = None
+        if self._audit_writer is not None:
+            await self._audit_writer.close()
+            self._audit_writer = None
+        for reader in self._readers:
+            await reader.close()
+        self._readers = []
+        self._read_pool = asyncio.Queue()
         if self._main_db is not None:
             await self._main_db.close()
             self._main_db = None
         if self._audit_db is not None:
             await self._audit_db.close()
             self._audit_db = None
+
+
+async def get_read_db(request: Request) -> AsyncIterator[aiosqlite.Connection]:
+    """FastAPI dependency yielding a pooled read-only iris.db connection."""
+    async with request.app.state.db_manager.read_connection() as db:
+        yield db
+
+
+def get_thumbnail_queue(request: Request) -> ThumbnailQueue:
+    """FastAPI dependency returning the app's background thumbnail renderer."""
+    return request.app.state.db_manager.thumbnail_queue  # type: ignore[no-any-return]
+
+
+def get_import_jobs(request: Request) -> ImportJobManager:
+    """FastAPI dependency returning the app's background SparxEA import runner."""
+    return request.app.state.db_manager.import_jobs  # type: ignore[no-any-return]
+
+
+async def get_write_db(request: Request) -> AsyncIterator[aiosqlite.Connection]:
+    """FastAPI dependency yielding the queued iris.db writer connection."""
+    async with request.app.state.db_manager.write_connection() as db:
+        yield db
@@ -0,0 +1,36 @@
+"""Element-to-diagram reference index.
+
+diagram_element_refs holds one row per (diagram, element) pair where the
+diagram's current canvas data mentions the element ID as a JSON string value
+or object key. It is rewritten whenever a diagram version with new data is
+written, so element usage lookups use an index instead of scanning and
+matching every canvas blob.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import aiosqlite
+
+# ?1 = diagram_id, ?2 = canvas data JSON
+INSERT_REFS_SQL = (
+    "INSERT OR IGNORE INTO diagram_element_refs (diagram_id, element_id) "
+    "SELECT ?1, e.id FROM elements e WHERE e.id IN ("
+    "SELECT atom FROM json_tree(?2) WHERE type = 'text' "
+    "UNION SELECT key FROM json_tree(?2) WHERE typeof(key) = 'text')"
+)
+
+
+async def sync_diagram_element_refs(
+    db: aiosqlite.Connection,
+    diagram_id: str,
+    data_json: str | None,
+) -> None:
+    """Replace a diagram's element references with those in its new canvas data (no commit)."""
+    await db.execute(
+        "DELETE FROM diagram_element_refs WHERE diagram_id = ?", (diagram_id,),
+    )
+    if data_json:
+        await db.execute(INSERT_REFS_SQL, (diagram_id, data_json))
@@ -81,10 +81,39 @@ class DiagramVersionResponse(BaseModel):
     metadata: dict[str, object] | None = None
 
 
+class DiagramListItem(DiagramResponse):
+    """A diagram in a list; data is None unless explicitly requested."""
+
+    data: dict[str, object] | None = None  # type: ignore[assignment]
+    node_count: int = 0
+    edge_count: int = 0
+    has_content: bool = False
+
+
 class DiagramListResponse(BaseModel):
     """Paginated list of diagrams."""
 
-    items: list[DiagramResponse]
-    total: int
+    items: list[DiagramListItem]
+    total: int | None = None
     page: int
     page_size: int
+    next_cursor: str | None = None
+
+
+class ThumbnailStatusResponse(BaseModel):
+    """Background render status of a diagram's thumbnails."""
+
+    diagram_id: str
+    status: str
+
+
+class ThumbnailJobResponse(BaseModel):
+    """Progress of a thumbnail regeneration job."""
+
+    id: str
+    status: str
+    total: int
+    processed: int
+    failed: int
+    started_at: str
+    finished_at: str | None = None
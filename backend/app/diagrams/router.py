@@ -2,65 +2,103 @@
 
 from __future__ import annotations
 
+from dataclasses import asdict
 from datetime import UTC, datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import Response as FastAPIResponse
 
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_current_user, get_optional_user
+from app.database import get_read_db, get_thumbnail_queue, get_write_db
 from app.diagrams.models import (
     DiagramCreate,
     DiagramHierarchyNode,
+    DiagramListItem,
     DiagramListResponse,
     DiagramResponse,
     DiagramUpdate,
     DiagramVersionResponse,
+    ThumbnailJobResponse,
+    ThumbnailStatusResponse,
 )
 from app.diagrams.service import (
     create_diagram,
     get_diagram,
     get_diagram_ancestors,
     get_diagram_children,
+    get_diagram_etag,
     get_diagram_hierarchy,
     get_diagram_versions,
+    get_diagram_with_etag,
+    get_thumbnail_etag,
     list_diagrams,
     set_diagram_parent,
     soft_delete_diagram,
+    thumbnail_etag,
     update_diagram,
 )
-from app.diagrams.thumbnail import get_thumbnail, regenerate_all_thumbnails
+from app.diagrams.thumbnail import PNG_MAGIC
+
+if TYPE_CHECKING:
+    import aiosqlite
+
+    from app.diagrams.thumbnail_queue import ThumbnailQueue
 
 router = APIRouter(prefix="/api/diagrams", tags=["diagrams"])
 admin_router = APIRouter(prefix="/api/admin", tags=["admin"])
 
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match header covers the given ETag."""
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is None:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
 def _require_admin(current_user: dict[str, Any]) -> None:
     """Raise 403 if not admin."""
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
 
 
-@admin_router.post("/thumbnails/regenerate")
+@admin_router.post(
+    "/thumbnails/regenerate", response_model=ThumbnailJobResponse, status_code=202,
+)
 async def regenerate_thumbnails(
-    request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
-) -> dict[str, int]:
-    """Regenerate PNG thumbnails for all diagrams. Requires admin role."""
+    thumbnails: ThumbnailQueue = Depends(get_thumbnail_queue),  # noqa: B008
+) -> ThumbnailJobResponse:
+    """Start regenerating PNG thumbnails for all diagrams. Requires admin role."""
+    _require_admin(current_user)
+    job = thumbnails.start_regeneration()
+    return ThumbnailJobResponse(**asdict(job))
+
+
+@admin_router.get("/thumbnails/regenerate/{job_id}", response_model=ThumbnailJobResponse)
+async def get_regeneration_job(
+    job_id: str,
+    current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    thumbnails: ThumbnailQueue = Depends(get_thumbnail_queue),  # noqa: B008
+) -> ThumbnailJobResponse:
+    """Get progress of a thumbnail regeneration job. Requires admin role."""
     _require_admin(current_user)
-    db = request.app.state.db_manager.main_db
-    count = await regenerate_all_thumbnails(db)
-    return {"count": count}
+    job = thumbnails.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return ThumbnailJobResponse(**asdict(job))
 
 
 @router.post("", response_model=DiagramResponse, status_code=201)
 async def create(
     body: DiagramCreate,
-    request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
+    thumbnails: ThumbnailQueue = Depends(get_thumbnail_queue),  # noqa: B008
 ) -> DiagramResponse:
     """Create a new diagram."""
-    db = request.app.state.db_manager.main_db
     result = await create_diagram(
         db,
         diagram_type=body.diagram_type,
@@ -72,44 +110,62 @@ async def create(
         set_id=body.set_id,
         notation=body.notation,
         metadata=body.metadata,
+        thumbnails=thumbnails,
     )
     return DiagramResponse(**result)
 
 
 @router.get("/hierarchy", response_model=list[DiagramHierarchyNode])
 async def hierarchy(
-    request: Request,
     root_id: str | None = None,
     set_id: str | None = None,
+    depth: int | None = Query(
+        default=None, ge=0, description="Package levels below root_id to include.",
+    ),
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> list[DiagramHierarchyNode]:
     """Get the diagram hierarchy tree."""
-    db = request.app.state.db_manager.main_db
-    tree = await get_diagram_hierarchy(db, root_id=root_id, set_id=set_id)
+    tree = await get_diagram_hierarchy(
+        db, root_id=root_id, set_id=set_id, depth=depth,
+    )
     return [DiagramHierarchyNode(**node) for node in tree]
 
 
 @router.get("", response_model=DiagramListResponse)
 async def list_all(
-    request: Request,
+    *,
     diagram_type: str | None = None,
     notation: str | None = None,
     set_id: str | None = None,
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=50, ge=1, le=100),
+    include_data: bool = Query(
+        default=False, description="Include each diagram's full canvas data.",
+    ),
+    cursor: str | None = Query(
+        default=None, description="next_cursor of the previous page; replaces page.",
+    ),
+    include_total: bool = Query(default=True, description="Count all matching diagrams."),
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> DiagramListResponse:
-    """List diagrams with optional type/notation/set filter and pagination."""
-    db = request.app.state.db_manager.main_db
-    items, total = await list_diagrams(
-        db, diagram_type=diagram_type, notation=notation,
-        set_id=set_id, page=page, page_size=page_size,
-    )
+    """List diagram summaries with optional type/notation/set filter and pagination."""
+    try:
+        items, total, next_cursor = await list_diagrams(
+            db, diagram_type=diagram_type, notation=notation,
+            set_id=set_id, page=page, page_size=page_size,
+            include_data=include_data,
+            after=cursor, include_total=include_total,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     return DiagramListResponse(
-        items=[DiagramResponse(**item) for item in items],
+        items=[DiagramListItem(**item) for item in items],
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
     )
 
 
@@ -117,13 +173,24 @@ async def list_all(
 async def get_one(
     diagram_id: str,
     request: Request,
+    response: FastAPIResponse,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
-) -> DiagramResponse:
-    """Get a single diagram by ID."""
-    db = request.app.state.db_manager.main_db
-    result = await get_diagram(db, diagram_id)
-    if result is None:
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
+) -> DiagramResponse | FastAPIResponse:
+    """Get a single diagram by ID. Answers 304 when If-None-Match is current."""
+    etag = await get_diagram_etag(db, diagram_id)
+    if etag is None:
         raise HTTPException(status_code=404, detail="Diagram not found")
+    if _etag_matches(request, etag):
+        return FastAPIResponse(status_code=304, headers={"ETag": etag})
+
+    # A write may have landed since the ETag check; label the body with the
+    # ETag of the rows it was actually read from
+    found = await get_diagram_with_etag(db, diagram_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Diagram not found")
+    result, body_etag = found
+    response.headers["ETag"] = body_etag
     return DiagramResponse(**result)
 
 
@@ -132,7 +199,10 @@ async def update(
     diagram_id: str,
     body: DiagramUpdate,
     request: Request,
+    *,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
+    thumbnails: ThumbnailQueue = Depends(get_thumbnail_queue),  # noqa: B008
 ) -> DiagramResponse:
     """Update a diagram with optimistic concurrency."""
     if_match = request.headers.get("If-Match")
@@ -147,7 +217,6 @@ async def update(
             status_code=400, detail="If-Match must be an integer version"
         )
 
-    db = request.app.state.db_manager.main_db
     result = await update_diagram(
         db, diagram_id,
         name=body.name,
@@ -157,6 +226,7 @@ async def update(
         updated_by=current_user["id"],
         expected_version=expected_version,
         metadata=body.metadata,
+        thumbnails=thumbnails,
     )
     if result is None:
         raise HTTPException(status_code=409, detail="Version conflict")
@@ -170,6 +240,7 @@ async def delete(
     diagram_id: str,
     request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> None:
     """Soft-delete a diagram."""
     if_match = request.headers.get("If-Match")
@@ -184,7 +255,6 @@ async def delete(
             status_code=400, detail="If-Match must be an integer version"
         )
 
-    db = request.app.state.db_manager.main_db
     deleted = await soft_delete_diagram(
         db, diagram_id,
         deleted_by=current_user["id"],
@@ -197,22 +267,20 @@ async def delete(
 @router.get("/{diagram_id}/ancestors")
 async def get_diagram_ancestors_route(
     diagram_id: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> list[dict[str, Any]]:
     """Get ancestor chain for breadcrumb navigation (root first)."""
-    db = request.app.state.db_manager.main_db
     return await get_diagram_ancestors(db, diagram_id)
 
 
 @router.get("/{diagram_id}/children")
 async def get_diagram_children_route(
     diagram_id: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> list[dict[str, Any]]:
     """Get direct children of a diagram."""
-    db = request.app.state.db_manager.main_db
     return await get_diagram_children(db, diagram_id)
 
 
@@ -220,11 +288,10 @@ async def get_diagram_children_route(
 async def set_parent(
     diagram_id: str,
     body: dict[str, Any],
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> dict[str, Any]:
     """Set or unset the parent package for a diagram."""
-    db = request.app.state.db_manager.main_db
     parent_id = body.get("parent_package_id")
     result = await set_diagram_parent(
         db, diagram_id, parent_id, updated_by=_current_user["id"],
@@ -244,11 +311,10 @@ async def set_parent(
 )
 async def get_versions(
     diagram_id: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> list[DiagramVersionResponse]:
     """Get all versions of a diagram."""
-    db = request.app.state.db_manager.main_db
     versions = await get_diagram_versions(db, diagram_id)
     if not versions:
         raise HTTPException(status_code=404, detail="Diagram not found")
@@ -260,31 +326,74 @@ async def get_diagram_thumbnail(
     diagram_id: str,
     request: Request,
     theme: str = Query(default="dark"),
+    current_user: dict[str, Any] | None = Depends(get_optional_user),  # noqa: B008
+    thumbnails: ThumbnailQueue = Depends(get_thumbnail_queue),  # noqa: B008
 ) -> FastAPIResponse:
-    """Get the PNG thumbnail for a diagram."""
-    db = request.app.state.db_manager.main_db
-    thumbnail = await get_thumbnail(db, diagram_id, theme=theme)
-    if thumbnail is None:
+    """Get the PNG thumbnail for a diagram, rendering it on first request.
+
+    A missing or stale thumbnail is queued for rendering either way, but only
+    authenticated requests wait for it; anonymous ones (such as <img> tags)
+    get the stored thumbnail, or 404, until the render lands. Answers 304
+    without reading the thumbnail blob when If-None-Match is current.
+    """
+    # Borrowed only for this lookup: fetch() below needs pooled readers itself
+    async with request.app.state.db_manager.read_connection() as db:
+        etag = await get_thumbnail_etag(db, diagram_id, theme)
+    if etag is None:
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
+    if _etag_matches(request, etag):
+        return FastAPIResponse(
+            status_code=304, headers={"Cache-Control": "public, max-age=300", "ETag": etag},
+        )
+
+    result = await thumbnails.fetch_with_version(
+        diagram_id, theme=theme, wait=current_user is not None,
+    )
+    if result is None:
         raise HTTPException(status_code=404, detail="Thumbnail not found")
+    thumbnail, version = result
+    # A failed or skipped render serves an older thumbnail: tag it with the
+    # version it shows, so the next request still asks for the current one
+    cache_headers = {"Cache-Control": "public, max-age=300"}
+    if version is not None:
+        cache_headers["ETag"] = thumbnail_etag(diagram_id, version, theme)
 
     # Detect if it's SVG or PNG by checking magic bytes
-    content_type = "image/png" if thumbnail[:8] == b"\x89PNG\r\n\x1a\n" else "image/svg+xml"
+    content_type = "image/png" if thumbnail[:8] == PNG_MAGIC else "image/svg+xml"
     return FastAPIResponse(
         content=thumbnail,
         media_type=content_type,
-        headers={"Cache-Control": "public, max-age=300"},
+        headers=cache_headers,
     )
 
 
+@router.get("/{diagram_id}/thumbnail/status", response_model=ThumbnailStatusResponse)
+async def get_diagram_thumbnail_status(
+    diagram_id: str,
+    _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
+    thumbnails: ThumbnailQueue = Depends(get_thumbnail_queue),  # noqa: B008
+) -> ThumbnailStatusResponse:
+    """Get the background render status of a diagram's thumbnails."""
+    status = thumbnails.status(diagram_id)
+    if status is None:
+        cursor = await db.execute(
+            "SELECT COUNT(*) FROM diagram_thumbnails WHERE diagram_id = ?",
+            (diagram_id,),
+        )
+        row = await cursor.fetchone()
+        status = "ready" if row and row[0] else "missing"
+    return ThumbnailStatusResponse(diagram_id=diagram_id, status=status)
+
+
 @router.post("/{diagram_id}/tags", status_code=201)
 async def add_tag(
     diagram_id: str,
     body: dict[str, Any],
-    request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> dict[str, str]:
     """Add a tag to a diagram."""
-    db = request.app.state.db_manager.main_db
     tag = body.get("tag", "").strip()
     if not tag or len(tag) > 50:
         raise HTTPException(status_code=400, detail="Tag must be 1-50 characters")
@@ -307,11 +416,10 @@ async def add_tag(
 async def remove_tag(
     diagram_id: str,
     tag: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> dict[str, str]:
     """Remove a tag from a diagram."""
-    db = request.app.state.db_manager.main_db
     await db.execute(
         "DELETE FROM diagram_tags WHERE diagram_id = ? AND tag = ?",
         (diagram_id, tag),
@@ -2,23 +2,48 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import uuid
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
 from app.migrations.m012_sets import DEFAULT_SET_ID
+from app.diagrams.element_refs import sync_diagram_element_refs
+from app.diagrams.summary import update_diagram_summary
+from app.packages.closure import LIVE_PATH_SQL, is_ancestor_or_self
+from app.pagination import decode_cursor, split_page
 from app.diagrams.thumbnail import VALID_THEMES, generate_and_store_thumbnail
 from app.package_relationships.service import create_package_relationship
 from app.relationships.service import create_relationship
 from app.diagrams.notation_detection import detect_notations as _detect_notations
 from app.diagrams.registry_service import get_default_notation, validate_type_notation
-from app.search.service import index_diagram as _index_diagram
-from app.search.service import remove_diagram_index as _remove_diagram_index
 
 if TYPE_CHECKING:
     import aiosqlite
 
+    from app.diagrams.thumbnail_queue import ThumbnailQueue
+
+
+async def _refresh_thumbnails(
+    db: aiosqlite.Connection,
+    diagram_id: str,
+    data: dict[str, object],
+    diagram_type: str,
+    *,
+    diagram_version: int,
+    thumbnails: ThumbnailQueue | None,
+) -> None:
+    """Enqueue a background render, or render inline when no queue is given."""
+    if thumbnails is not None:
+        thumbnails.enqueue(diagram_id, data, diagram_type, diagram_version)
+        return
+    for theme in VALID_THEMES:
+        await generate_and_store_thumbnail(
+            db, diagram_id, data, diagram_type,
+            theme=theme, diagram_version=diagram_version,
+        )
+
 
 async def create_diagram(
     db: aiosqlite.Connection,
@@ -33,6 +58,7 @@ async def create_diagram(
     notation: str | None = None,
     metadata: dict[str, object] | None = None,
     change_summary: str | None = None,
+    thumbnails: ThumbnailQueue | None = None,
 ) -> dict[str, object]:
     """Create a new diagram with initial version."""
     diagram_id = str(uuid.uuid4())
@@ -80,15 +106,13 @@ async def create_diagram(
         "VALUES (?, 1, ?, ?, ?, 'create', ?, ?, ?, ?)",
         (diagram_id, name, description, data_json, change_summary, now, created_by, metadata_json),
     )
-    await db.commit()
-    await _index_diagram(
-        db, diagram_id=diagram_id, name=name,
-        diagram_type=diagram_type, description=description,
-    )
+    await sync_diagram_element_refs(db, diagram_id, data_json)
+    await update_diagram_summary(db, diagram_id, data_json)
     await db.commit()
 
-    for theme in VALID_THEMES:
-        await generate_and_store_thumbnail(db, diagram_id, data, diagram_type, theme=theme)
+    await _refresh_thumbnails(
+        db, diagram_id, data, diagram_type, diagram_version=1, thumbnails=thumbnails,
+    )
 
     return {
         "id": diagram_id,
@@ -114,6 +138,19 @@ async def get_diagram(
     diagram_id: str,
 ) -> dict[str, object] | None:
     """Get a diagram with its current version data."""
+    found = await get_diagram_with_etag(db, diagram_id)
+    return None if found is None else found[0]
+
+
+async def get_diagram_with_etag(
+    db: aiosqlite.Connection,
+    diagram_id: str,
+) -> tuple[dict[str, object], str] | None:
+    """Get a diagram and the ETag of exactly the rows it was built from.
+
+    The ETag equals what get_diagram_etag() returns for the same state, so a
+    client revalidating with it gets a 304 until the diagram changes.
+    """
     cursor = await db.execute(
         "SELECT d.id, d.diagram_type, d.current_version, "
         "dv.name, dv.description, dv.data, "
@@ -147,7 +184,12 @@ async def get_diagram(
     except (json.JSONDecodeError, TypeError):
         detected = []
 
-    return {
+    # Same values, in the same order, as the row get_diagram_etag() hashes
+    etag = _strong_etag(
+        diagram_id, row[2], row[1], row[6], row[7], row[8], row[10], row[11],
+        row[12], row[13], row[15], row[16], "\x1f".join(tags) or None,
+    )
+    diagram = {
         "id": row[0],
         "diagram_type": row[1],
         "current_version": row[2],
@@ -167,6 +209,62 @@ async def get_diagram(
         "detected_notations": detected,
         "metadata": json.loads(row[14]) if row[14] else None,
     }
+    return diagram, etag
+
+
+def _strong_etag(*parts: object) -> str:
+    """Quoted strong ETag from the values a representation is derived from."""
+    digest = hashlib.sha256("\x1f".join(str(p) for p in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+async def get_diagram_etag(
+    db: aiosqlite.Connection,
+    diagram_id: str,
+) -> str | None:
+    """ETag for GET /api/diagrams/{id}, computed without reading dv.data.
+
+    Canvas data, name, description and metadata only change with
+    current_version. Every other field of the response is read from the
+    diagrams row, its creator, its set and diagram_tags.
+    """
+    cursor = await db.execute(
+        "SELECT d.current_version, d.diagram_type, d.created_at, d.created_by, "
+        "d.updated_at, u.username, d.parent_package_id, d.set_id, s.name, "
+        "d.notation, d.detected_notations, "
+        "(SELECT group_concat(tag, char(31)) FROM "
+        "(SELECT tag FROM diagram_tags WHERE diagram_id = d.id ORDER BY tag)) "
+        "FROM diagrams d "
+        "LEFT JOIN users u ON d.created_by = u.id "
+        "LEFT JOIN sets s ON d.set_id = s.id "
+        "WHERE d.id = ? AND d.is_deleted = 0",
+        (diagram_id,),
+    )
+    row = await cursor.fetchone()
+    if row is None:
+        return None
+    return _strong_etag(diagram_id, *row)
+
+
+async def get_thumbnail_etag(
+    db: aiosqlite.Connection,
+    diagram_id: str,
+    theme: str,
+) -> str | None:
+    """ETag for the current thumbnail of a diagram, or None if it is unknown."""
+    cursor = await db.execute(
+        "SELECT current_version FROM diagrams WHERE id = ? AND is_deleted = 0",
+        (diagram_id,),
+    )
+    row = await cursor.fetchone()
+    if row is None:
+        return None
+    return thumbnail_etag(diagram_id, row[0], theme)
+
+
+def thumbnail_etag(diagram_id: str, version: int, theme: str) -> str:
+    """ETag for a thumbnail rendered from (diagram_id, version, theme)."""
+    return _strong_etag(diagram_id, version, theme)
 
 
 async def list_diagrams(
@@ -177,8 +275,18 @@ async def list_diagrams(
     set_id: str | None = None,
     page: int = 1,
     page_size: int = 50,
-) -> tuple[list[dict[str, object]], int]:
-    """List diagrams with pagination."""
+    include_data: bool = False,
+    after: str | None = None,
+    include_total: bool = True,
+) -> tuple[list[dict[str, object]], int | None, str | None]:
+    """List diagrams with pagination.
+
+    Items carry the precomputed node/edge counts and has_content flag; the
+    canvas data itself is only read and decoded when include_data is set.
+    ``after`` continues from an earlier page's next_cursor, ignoring
+    ``page``. Returns (items, total_count, next_cursor); total_count is None
+    unless include_total.
+    """
     where_clauses = ["d.is_deleted = 0"]
     params: list[object] = []
 
@@ -196,29 +304,40 @@ async def list_diagrams(
 
     where_sql = " AND ".join(where_clauses)
 
-    cursor = await db.execute(
-        f"SELECT COUNT(*) FROM diagrams d WHERE {where_sql}",  # noqa: S608
-        params,
-    )
-    count_row = await cursor.fetchone()
-    total: int = count_row[0]  # type: ignore[index]
+    total: int | None = None
+    if include_total:
+        cursor = await db.execute(
+            f"SELECT COUNT(*) FROM diagrams d WHERE {where_sql}",  # noqa: S608
+            params,
+        )
+        count_row = await cursor.fetchone()
+        total = count_row[0]  # type: ignore[index]
 
+    # Fetch page, plus one row to tell whether another follows
     offset = (page - 1) * page_size
+    if after is not None:
+        where_sql += " AND (d.updated_at, d.id) < (?, ?)"
+        params.extend(decode_cursor(after, (str, str)))
+        offset = 0
+    data_column = "dv.data" if include_data else "NULL"
     cursor = await db.execute(
         f"SELECT d.id, d.diagram_type, d.current_version, "  # noqa: S608
-        "dv.name, dv.description, dv.data, "
+        f"dv.name, dv.description, {data_column}, "
         "d.created_at, d.created_by, d.updated_at, d.is_deleted, "
         "d.parent_package_id, d.set_id, s.name, dv.metadata, "
-        "d.notation, d.detected_notations "
+        "d.notation, d.detected_notations, "
+        "d.node_count, d.edge_count, d.has_content "
         "FROM diagrams d "
         "JOIN diagram_versions dv ON d.id = dv.diagram_id "
         "AND d.current_version = dv.version "
         "LEFT JOIN sets s ON d.set_id = s.id "
         f"WHERE {where_sql} "
-        "ORDER BY d.updated_at DESC LIMIT ? OFFSET ?",
-        [*params, page_size, offset],
+        "ORDER BY d.updated_at DESC, d.id DESC LIMIT ? OFFSET ?",
+        [*params, page_size + 1, offset],
+    )
+    rows, next_cursor = split_page(
+        await cursor.fetchall(), page_size, key=lambda r: (r[8], r[0]),
     )
-    rows = await cursor.fetchall()
 
     # Collect diagram IDs for batch tag lookup
     diagram_ids = [r[0] for r in rows]
@@ -235,8 +354,6 @@ async def list_diagrams(
 
     items = []
     for r in rows:
-        detected_raw = r[15 + 0]  # notation is index 14, detected_notations is 15
-        # Actually: indices are 0-15. notation=14, detected_notations=15
         try:
             detected = json.loads(r[15]) if r[15] else []
         except (json.JSONDecodeError, TypeError):
@@ -247,7 +364,7 @@ async def list_diagrams(
             "current_version": r[2],
             "name": r[3],
             "description": r[4],
-            "data": json.loads(r[5]) if r[5] else {},
+            "data": (json.loads(r[5]) if r[5] else {}) if include_data else None,
             "created_at": r[6],
             "created_by": r[7],
             "updated_at": r[8],
@@ -259,8 +376,11 @@ async def list_diagrams(
             "notation": r[14] or "simple",
             "detected_notations": detected,
             "metadata": json.loads(r[13]) if r[13] else None,
+            "node_count": r[16],
+            "edge_count": r[17],
+            "has_content": bool(r[18]),
         })
-    return items, total
+    return items, total, next_cursor
 
 
 async def update_diagram(
@@ -274,6 +394,7 @@ async def update_diagram(
     updated_by: str,
     expected_version: int,
     metadata: dict[str, object] | None = None,
+    thumbnails: ThumbnailQueue | None = None,
 ) -> dict[str, object] | None:
     """Update a diagram with OCC."""
     cursor = await db.execute(
@@ -305,24 +426,20 @@ async def update_diagram(
         (diagram_id, new_version, name, description, data_json,
          change_summary, now, updated_by, metadata_json),
     )
+    await sync_diagram_element_refs(db, diagram_id, data_json)
+    await update_diagram_summary(db, diagram_id, data_json)
     await db.commit()
 
-    # Re-index for search
+    # Generate/update thumbnail for all themes
     type_cursor = await db.execute(
         "SELECT diagram_type FROM diagrams WHERE id = ?", (diagram_id,),
     )
     type_row = await type_cursor.fetchone()
     if type_row:
-        await _index_diagram(
-            db, diagram_id=diagram_id, name=name,
-            diagram_type=type_row[0], description=description,
+        await _refresh_thumbnails(
+            db, diagram_id, data, type_row[0],
+            diagram_version=new_version, thumbnails=thumbnails,
         )
-        await db.commit()
-
-    # Generate/update thumbnail for all themes
-    if type_row:
-        for theme in VALID_THEMES:
-            await generate_and_store_thumbnail(db, diagram_id, data, type_row[0], theme=theme)
 
     # Auto-membership: move canvas elements to this diagram's set
     try:
@@ -473,8 +590,6 @@ async def soft_delete_diagram(
          ver_row[2], now, deleted_by),
     )
     await db.commit()
-    await _remove_diagram_index(db, diagram_id)
-    await db.commit()
     return True
 
 
@@ -486,8 +601,7 @@ async def restore_diagram(
 ) -> bool:
     """Restore a soft-deleted diagram."""
     cursor = await db.execute(
-        "SELECT current_version, diagram_type FROM diagrams "
-        "WHERE id = ? AND is_deleted = 1",
+        "SELECT current_version FROM diagrams WHERE id = ? AND is_deleted = 1",
         (diagram_id,),
     )
     row = await cursor.fetchone()
@@ -495,7 +609,6 @@ async def restore_diagram(
         return False
 
     new_version = row[0] + 1
-    diagram_type = row[1]
     now = datetime.now(tz=UTC).isoformat()
 
     cursor = await db.execute(
@@ -519,13 +632,6 @@ async def restore_diagram(
     )
     await db.commit()
 
-    # Re-index for search
-    await _index_diagram(
-        db, diagram_id=diagram_id, name=ver_row[0],
-        diagram_type=diagram_type, description=ver_row[1],
-    )
-    await db.commit()
-
     return True
 
 
@@ -612,49 +718,33 @@ async def get_diagram_ancestors(
 ) -> list[dict[str, object]]:
     """Get ancestor chain from diagram to root (breadcrumb order: root first).
 
-    Since diagram parents are packages, the ancestor chain walks through the
-    packages table.
+    Since diagram parents are packages, the ancestor chain is read from the
+    package closure table. It stops below the nearest soft-deleted package.
     """
-    ancestors: list[dict[str, object]] = []
-    current = diagram_id
-
-    # First get the parent of the starting diagram
     cursor = await db.execute(
-        "SELECT parent_package_id FROM diagrams WHERE id = ? AND is_deleted = 0",
-        (current,),
+        "SELECT p.id, pv.name, p.parent_package_id "
+        "FROM diagrams d "
+        "JOIN package_closure c ON c.descendant = d.parent_package_id "
+        "JOIN packages p ON p.id = c.ancestor "
+        "JOIN package_versions pv ON p.id = pv.package_id "
+        "AND p.current_version = pv.version "
+        "WHERE d.id = ? AND d.is_deleted = 0 "
+        "AND NOT EXISTS (SELECT 1 FROM package_closure x "
+        "JOIN packages m ON m.id = x.ancestor "
+        "WHERE x.descendant = d.parent_package_id AND x.depth <= c.depth "
+        "AND m.is_deleted = 1) "
+        "ORDER BY c.depth DESC",
+        (diagram_id,),
     )
-    row = await cursor.fetchone()
-    if row is None:
-        return []
-    current = row[0]
-
-    visited: set[str] = set()
-    while current is not None:
-        if current in visited:
-            break
-        visited.add(current)
-        # Query packages table for ancestors (parent chain goes through packages)
-        cursor = await db.execute(
-            "SELECT p.id, pv.name, p.parent_package_id "
-            "FROM packages p "
-            "JOIN package_versions pv ON p.id = pv.package_id "
-            "AND p.current_version = pv.version "
-            "WHERE p.id = ? AND p.is_deleted = 0",
-            (current,),
-        )
-        row = await cursor.fetchone()
-        if row is None:
-            break
-        ancestors.append({
+    return [
+        {
             "id": row[0],
             "name": row[1],
             "type": "package",
             "parent_package_id": row[2],
-        })
-        current = row[2]
-
-    ancestors.reverse()  # root first
-    return ancestors
+        }
+        for row in await cursor.fetchall()
+    ]
 
 
 async def get_diagram_children(
@@ -687,6 +777,7 @@ async def get_diagram_hierarchy(
     db: aiosqlite.Connection,
     root_id: str | None = None,
     set_id: str | None = None,
+    depth: int | None = None,
 ) -> list[dict[str, object]]:
     """Get the diagram hierarchy as a tree.
 
@@ -695,33 +786,63 @@ async def get_diagram_hierarchy(
     (node_type="diagram").  Each diagram's parent_package_id points to a
     package, and packages can nest via their own parent_package_id.
 
-    If root_id is given, returns subtree rooted at that node.
+    If root_id is given, returns subtree rooted at that node; for a package
+    only its live subtree is read, through the closure table, limited to
+    depth levels below it if set.
     If set_id is given, only includes items from that set.
     Otherwise returns all root nodes with their children.
     """
-    params: list[str] = []
+    params: list[object] = []
+    scope_cte = ""
+    pkg_scope = ""
+    diag_scope = ""
+    if root_id is not None and await is_ancestor_or_self(db, root_id, root_id):
+        scope_cte = (
+            "WITH scope(id, depth) AS ("  # noqa: S608
+            "  SELECT c.descendant, c.depth FROM package_closure c "
+            f"  WHERE c.ancestor = ? AND {LIVE_PATH_SQL}"
+            ") "
+        )
+        params.append(root_id)
+        pkg_scope = "JOIN scope ON scope.id = p.id "
+        diag_scope = "JOIN scope ON scope.id = d.parent_package_id "
+        if depth is not None:
+            pkg_scope += "AND scope.depth <= ? "
+            diag_scope += "AND scope.depth < ? "
+
+    pkg_params: list[object] = []
+    diag_params: list[object] = []
+    if pkg_scope and depth is not None:
+        pkg_params.append(depth)
+        diag_params.append(depth)
     pkg_set_filter = ""
     diag_set_filter = ""
     if set_id is not None:
         pkg_set_filter = "AND p.set_id = ? "
         diag_set_filter = "AND d.set_id = ? "
-        params = [set_id, set_id]
+        pkg_params.append(set_id)
+        diag_params.append(set_id)
+    params += [*pkg_params, *diag_params]
 
     # Fetch packages and diagrams in a single UNION query so we can
     # build the full hierarchy in one pass.
     query = (
-        "SELECT t.id, t.name, t.node_type, t.parent_package_id, t.diagram_type, t.data, t.notation "
+        f"{scope_cte}"
+        "SELECT t.id, t.name, t.node_type, t.parent_package_id, t.diagram_type, "
+        "t.has_content, t.notation "
         "FROM ("
         "  SELECT p.id, pv.name, 'package' AS node_type, p.parent_package_id, "
-        "         NULL AS diagram_type, NULL AS data, NULL AS notation "
+        "         NULL AS diagram_type, 0 AS has_content, NULL AS notation "
         "  FROM packages p "
+        f"  {pkg_scope}"
         "  JOIN package_versions pv ON p.id = pv.package_id "
         "       AND p.current_version = pv.version "
         f"  WHERE p.is_deleted = 0 {pkg_set_filter}"
         "  UNION ALL "
         "  SELECT d.id, dv.name, 'diagram' AS node_type, d.parent_package_id, "
-        "         d.diagram_type, dv.data, d.notation "
+        "         d.diagram_type, d.has_content, d.notation "
         "  FROM diagrams d "
+        f"  {diag_scope}"
         "  JOIN diagram_versions dv ON d.id = dv.diagram_id "
         "       AND d.current_version = dv.version "
         f"  WHERE d.is_deleted = 0 {diag_set_filter}"
@@ -734,25 +855,14 @@ async def get_diagram_hierarchy(
     # Build lookup structures
     nodes: dict[str, dict[str, object]] = {}
     for r in rows:
-        node_type = r[2]
-        has_content = False
-        if node_type == "diagram":
-            try:
-                data = json.loads(r[5]) if r[5] else {}
-                if isinstance(data, dict):
-                    has_content = bool(data.get("nodes")) or bool(
-                        data.get("participants")
-                    )
-            except (json.JSONDecodeError, TypeError):
-                pass
         nodes[r[0]] = {
             "id": r[0],
             "name": r[1],
-            "node_type": node_type,
+            "node_type": r[2],
             "diagram_type": r[4],
             "notation": r[6],
             "parent_package_id": r[3],
-            "has_content": has_content,
+            "has_content": bool(r[5]),
             "children": [],
         }
 
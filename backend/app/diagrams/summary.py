@@ -0,0 +1,41 @@
+"""Precomputed canvas summary columns for diagram lists.
+
+diagrams.node_count, edge_count and has_content describe the current canvas
+so list views and the hierarchy can show them without loading and parsing
+every canvas blob. They are rewritten whenever a diagram version with new
+data is written. Sequence diagrams count participants as nodes and messages
+as edges.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import aiosqlite
+
+# ?1 = diagram_id, ?2 = canvas data JSON; malformed JSON counts as empty
+_NODE_COUNT = (
+    "CASE WHEN json_valid(?2) THEN "
+    "coalesce(json_array_length(?2, '$.nodes'), 0) "
+    "+ coalesce(json_array_length(?2, '$.participants'), 0) ELSE 0 END"
+)
+_EDGE_COUNT = (
+    "CASE WHEN json_valid(?2) THEN "
+    "coalesce(json_array_length(?2, '$.edges'), 0) "
+    "+ coalesce(json_array_length(?2, '$.messages'), 0) ELSE 0 END"
+)
+UPDATE_SUMMARY_SQL = (
+    f"UPDATE diagrams SET node_count = {_NODE_COUNT}, "  # noqa: S608
+    f"edge_count = {_EDGE_COUNT}, has_content = ({_NODE_COUNT}) > 0 "
+    "WHERE id = ?1"
+)
+
+
+async def update_diagram_summary(
+    db: aiosqlite.Connection,
+    diagram_id: str,
+    data_json: str | None,
+) -> None:
+    """Recompute a diagram's node/edge counts and has_content flag (no commit)."""
+    await db.execute(UPDATE_SUMMARY_SQL, (diagram_id, data_json or "{}"))
@@ -1,6 +1,7 @@
 """Thumbnail generation for diagram gallery cards."""
 from __future__ import annotations
 
+import hashlib
 import json
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
@@ -37,6 +38,8 @@ THEME_COLORS: dict[str, dict[str, str]] = {
 
 VALID_THEMES = frozenset(THEME_COLORS.keys())
 
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
 
 def generate_svg_from_diagram_data(
     data: dict, diagram_type: str, theme: str = "dark",
@@ -118,38 +121,88 @@ def generate_svg_from_diagram_data(
     return "\n".join(svg_parts)
 
 
-async def generate_and_store_thumbnail(
-    db: aiosqlite.Connection,
-    diagram_id: str,
-    data: dict,
-    diagram_type: str,
-    theme: str = "dark",
-) -> None:
-    """Generate PNG thumbnail and store in database.
+def thumbnail_svg_hash(svg_str: str) -> str:
+    """Content hash of a thumbnail SVG, used to skip re-rendering unchanged diagrams."""
+    return hashlib.sha256(svg_str.encode()).hexdigest()
 
-    Falls back to storing SVG as bytes if cairosvg is not available.
-    """
-    svg_str = generate_svg_from_diagram_data(data, diagram_type, theme=theme)
 
+def render_thumbnail_png(svg_str: str) -> bytes:
+    """Rasterize a thumbnail SVG to PNG.
+
+    Falls back to the SVG bytes if cairosvg is not available. Runs inside
+    worker processes, so it must stay a module-level function.
+    """
     try:
         import cairosvg
 
-        png_bytes = cairosvg.svg2png(
+        return cairosvg.svg2png(  # type: ignore[no-any-return]
             bytestring=svg_str.encode(), output_width=400, output_height=250
         )
     except ImportError:
         # cairosvg not installed -- store SVG bytes as fallback
-        png_bytes = svg_str.encode()
+        return svg_str.encode()
+
+
+async def is_thumbnail_current(
+    db: aiosqlite.Connection, diagram_id: str, theme: str, svg_hash: str,
+) -> bool:
+    """True if the stored thumbnail is a PNG rendered from the same SVG content."""
+    cursor = await db.execute(
+        "SELECT svg_hash, substr(thumbnail, 1, 8) FROM diagram_thumbnails "
+        "WHERE diagram_id = ? AND theme = ?",
+        (diagram_id, theme),
+    )
+    row = await cursor.fetchone()
+    return row is not None and row[0] == svg_hash and bytes(row[1]) == PNG_MAGIC
+
 
+async def store_thumbnails(
+    db: aiosqlite.Connection,
+    diagram_id: str,
+    diagram_version: int | None,
+    rows: list[tuple[str, bytes, str]],
+) -> None:
+    """Store rendered (theme, thumbnail, svg_hash) rows and stamp the diagram version.
+
+    Every theme of the diagram is stamped, including themes skipped because
+    their SVG was unchanged, so all of them are known to match the version.
+    """
     now = datetime.now(tz=UTC).isoformat()
-    await db.execute(
+    await db.executemany(
         "INSERT OR REPLACE INTO diagram_thumbnails "
-        "(diagram_id, theme, thumbnail, updated_at) VALUES (?, ?, ?, ?)",
-        (diagram_id, theme, png_bytes, now),
+        "(diagram_id, theme, thumbnail, svg_hash, diagram_version, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [(diagram_id, *row, diagram_version, now) for row in rows],
+    )
+    await db.execute(
+        "UPDATE diagram_thumbnails SET diagram_version = ? WHERE diagram_id = ?",
+        (diagram_version, diagram_id),
     )
     await db.commit()
 
 
+async def generate_and_store_thumbnail(
+    db: aiosqlite.Connection,
+    diagram_id: str,
+    data: dict,
+    diagram_type: str,
+    *,
+    theme: str = "dark",
+    diagram_version: int | None = None,
+) -> None:
+    """Generate PNG thumbnail inline and store in database.
+
+    Skips rendering when the stored PNG was produced from identical SVG content.
+    Request handlers should enqueue on ThumbnailQueue instead of calling this.
+    """
+    svg_str = generate_svg_from_diagram_data(data, diagram_type, theme=theme)
+    svg_hash = thumbnail_svg_hash(svg_str)
+    rows: list[tuple[str, bytes, str]] = []
+    if not await is_thumbnail_current(db, diagram_id, theme, svg_hash):
+        rows.append((theme, render_thumbnail_png(svg_str), svg_hash))
+    await store_thumbnails(db, diagram_id, diagram_version, rows)
+
+
 async def get_thumbnail(
     db: aiosqlite.Connection, diagram_id: str, theme: str = "dark",
 ) -> bytes | None:
@@ -166,14 +219,13 @@ async def get_thumbnail(
 async def regenerate_all_thumbnails(db: aiosqlite.Connection) -> int:
     """Regenerate PNG thumbnails for all non-deleted diagrams in all themes.
 
-    Called during startup to ensure all diagrams have up-to-date PNG thumbnails,
-    including diagrams created before the thumbnail migration and diagrams with
-    stale SVG-byte thumbnails from when cairosvg was not installed.
+    Renders inline; themes whose stored PNG already matches the SVG are
+    skipped. The admin endpoint runs this as a ThumbnailQueue job instead.
 
     Returns the number of diagrams processed.
     """
     cursor = await db.execute(
-        "SELECT d.id, d.diagram_type, dv.data "
+        "SELECT d.id, d.diagram_type, d.current_version, dv.data "
         "FROM diagrams d "
         "JOIN diagram_versions dv ON d.id = dv.diagram_id "
         "AND d.current_version = dv.version "
@@ -182,12 +234,10 @@ async def regenerate_all_thumbnails(db: aiosqlite.Connection) -> int:
     rows = await cursor.fetchall()
 
     for row in rows:
-        diagram_id = row[0]
-        diagram_type = row[1]
-        data = json.loads(row[2]) if row[2] else {}
+        data = json.loads(row[3]) if row[3] else {}
         for theme in VALID_THEMES:
             await generate_and_store_thumbnail(
-                db, diagram_id, data, diagram_type, theme=theme,
+                db, row[0], data, row[1], theme=theme, diagram_version=row[2],
             )
 
     return len(rows)
@@ -0,0 +1,379 @@
+"""Background thumbnail rendering queue.
+
+Saving a diagram enqueues a render instead of rasterizing three PNGs inline.
+Renders are debounced per diagram so a burst of saves renders only the latest
+content, rasterized in a process pool so cairosvg never blocks the event loop,
+and skipped per theme when the stored PNG came from identical SVG content.
+
+Thumbnails are stamped with the diagram version they show. Startup does not
+wait for renders: a missing or out-of-date thumbnail is rendered on its first
+fetch, and a background sweep started with the app renders every thumbnail
+that is missing, behind current_version or a legacy SVG-byte blob.
+
+Per-diagram status:
+    pending   — waiting for the debounce window to elapse
+    rendering — currently being rasterized
+    ready     — thumbnails stored for the latest enqueued content
+    failed    — the last render raised; the previous thumbnails are kept
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+from app.diagrams.thumbnail import (
+    PNG_MAGIC,
+    VALID_THEMES,
+    generate_svg_from_diagram_data,
+    is_thumbnail_current,
+    render_thumbnail_png,
+    store_thumbnails,
+    thumbnail_svg_hash,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Coroutine
+
+    from app.database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+_CURRENT_DIAGRAMS_SQL = (
+    "SELECT d.id, d.diagram_type, d.current_version, dv.data "
+    "FROM diagrams d "
+    "JOIN diagram_versions dv ON d.id = dv.diagram_id "
+    "AND d.current_version = dv.version "
+    "WHERE d.is_deleted = 0 AND d.id > ? ORDER BY d.id LIMIT ?"
+)
+# Live diagrams lacking a current PNG thumbnail for some theme
+_STALE_DIAGRAMS_SQL = (
+    "SELECT d.id, d.diagram_type, d.current_version, dv.data "
+    "FROM diagrams d "
+    "JOIN diagram_versions dv ON d.id = dv.diagram_id "
+    "AND d.current_version = dv.version "
+    "WHERE d.is_deleted = 0 AND d.id > ? AND ("
+    "  SELECT COUNT(*) FROM diagram_thumbnails t WHERE t.diagram_id = d.id "
+    "  AND t.diagram_version = d.current_version AND substr(t.thumbnail, 1, 8) = ?"
+    ") < ? ORDER BY d.id LIMIT ?"
+)
+
+
+@dataclass
+class RegenerationJob:
+    """Progress of an admin-triggered regeneration of every thumbnail."""
+
+    id: str
+    status: str
+    total: int = 0
+    processed: int = 0
+    failed: int = 0
+    started_at: str = ""
+    finished_at: str | None = None
+
+
+class ThumbnailQueue:
+    """Debounced, deduplicating thumbnail renderer for one database."""
+
+    def __init__(
+        self,
+        db_manager: DatabaseManager,
+        *,
+        workers: int = 2,
+        debounce: float = 0.5,
+        sweep_batch_size: int = 50,
+    ) -> None:
+        self._db_manager = db_manager
+        self._workers = workers
+        self._debounce = debounce
+        self._sweep_batch_size = sweep_batch_size
+        self._executor: Executor | None = None
+        self._pending: dict[str, tuple[dict[str, object], str, int | None]] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        self._status: dict[str, str] = {}
+        self._jobs: dict[str, RegenerationJob] = {}
+        self._background: set[asyncio.Task[None]] = set()
+        self._closed = False
+
+    def enqueue(
+        self,
+        diagram_id: str,
+        data: dict[str, object],
+        diagram_type: str,
+        diagram_version: int | None = None,
+    ) -> None:
+        """Schedule a render of the given diagram content, replacing any pending one."""
+        if self._closed:
+            msg = "Thumbnail queue is closed"
+            raise RuntimeError(msg)
+        self._pending[diagram_id] = (data, diagram_type, diagram_version)
+        self._status[diagram_id] = "pending"
+        timer = self._timers.pop(diagram_id, None)
+        if timer is not None:
+            timer.cancel()
+        self._timers[diagram_id] = asyncio.get_running_loop().call_later(
+            self._debounce, self._start, diagram_id,
+        )
+
+    def status(self, diagram_id: str) -> str | None:
+        """Current render status for a diagram, or None if never enqueued."""
+        return self._status.get(diagram_id)
+
+    async def wait_for(self, diagram_id: str) -> str | None:
+        """Render a pending diagram now, skipping the debounce, and wait for it."""
+        timer = self._timers.pop(diagram_id, None)
+        if timer is not None:
+            timer.cancel()
+            self._start(diagram_id)
+        task = self._tasks.get(diagram_id)
+        if task is not None:
+            await asyncio.shield(task)
+        return self.status(diagram_id)
+
+    async def fetch(
+        self, diagram_id: str, theme: str = "dark", *, wait: bool = True,
+    ) -> bytes | None:
+        """Return a diagram's thumbnail, rendering it first if missing or out of date.
+
+        With wait=False a missing or out-of-date thumbnail is queued for
+        rendering but not waited for: the stored thumbnail, whatever its
+        version, is returned now. Returns None for unknown or deleted diagrams
+        and when there is no thumbnail to fall back on.
+        """
+        result = await self.fetch_with_version(diagram_id, theme, wait=wait)
+        return result[0] if result else None
+
+    async def fetch_with_version(
+        self, diagram_id: str, theme: str = "dark", *, wait: bool = True,
+    ) -> tuple[bytes, int | None] | None:
+        """Like fetch(), but also return the diagram version the thumbnail shows.
+
+        The version is older than current_version when a render failed and an
+        earlier thumbnail is served instead, and None for legacy thumbnails.
+        """
+        await self.wait_for(diagram_id)
+        async with self._db_manager.read_connection() as db:
+            cursor = await db.execute(
+                "SELECT d.current_version, t.diagram_version, t.thumbnail "
+                "FROM diagrams d "
+                "LEFT JOIN diagram_thumbnails t "
+                "ON t.diagram_id = d.id AND t.theme = ? "
+                "WHERE d.id = ? AND d.is_deleted = 0",
+                (theme, diagram_id),
+            )
+            row = await cursor.fetchone()
+            if row is None:
+                return None
+            if row[2] is not None and row[1] == row[0]:
+                return bytes(row[2]), row[1]
+            cursor = await db.execute(
+                "SELECT d.diagram_type, dv.data FROM diagrams d "
+                "JOIN diagram_versions dv ON d.id = dv.diagram_id "
+                "AND d.current_version = dv.version WHERE d.id = ?",
+                (diagram_id,),
+            )
+            current = await cursor.fetchone()
+        # Lazy render on miss: the reader is released before waiting, since the
+        # render itself needs database access. Callers that do not wait leave
+        # an already queued render alone rather than restarting its debounce.
+        if current is not None and not self._closed:
+            if wait or self.status(diagram_id) not in ("pending", "rendering"):
+                data = json.loads(current[1]) if current[1] else {}
+                self.enqueue(diagram_id, data, current[0], row[0])
+            if wait:
+                await self.wait_for(diagram_id)
+        async with self._db_manager.read_connection() as db:
+            cursor = await db.execute(
+                "SELECT thumbnail, diagram_version FROM diagram_thumbnails "
+                "WHERE diagram_id = ? AND theme = ?",
+                (diagram_id, theme),
+            )
+            thumb = await cursor.fetchone()
+        return (bytes(thumb[0]), thumb[1]) if thumb else None
+
+    def start_sweep(self) -> asyncio.Task[None]:
+        """Render missing, out-of-date and legacy SVG-byte thumbnails in the background."""
+        return self._spawn(self._sweep())
+
+    def start_regeneration(self) -> RegenerationJob:
+        """Start re-rendering every diagram's thumbnails as a background job.
+
+        Returns the running job instead if one is already in progress.
+        """
+        for job in self._jobs.values():
+            if job.status == "running":
+                return job
+        job = RegenerationJob(
+            id=str(uuid.uuid4()),
+            status="running",
+            started_at=datetime.now(tz=UTC).isoformat(),
+        )
+        self._jobs[job.id] = job
+        self._spawn(self._regenerate(job))
+        return job
+
+    def get_job(self, job_id: str) -> RegenerationJob | None:
+        """Look up a regeneration job by ID."""
+        return self._jobs.get(job_id)
+
+    async def flush(self) -> None:
+        """Render every pending diagram now and wait for all renders to finish."""
+        for diagram_id in list(self._timers):
+            await self.wait_for(diagram_id)
+        running = list(self._tasks.values())
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Stop background jobs, drain pending renders and shut down the worker pool."""
+        self._closed = True
+        for task in list(self._background):
+            task.cancel()
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        await self.flush()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _spawn(self, coro: Coroutine[object, object, None]) -> asyncio.Task[None]:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    def _start(self, diagram_id: str) -> None:
+        self._timers.pop(diagram_id, None)
+        if diagram_id in self._tasks:
+            # The running render picks the new content up when it finishes
+            return
+        self._tasks[diagram_id] = asyncio.get_running_loop().create_task(
+            self._drain(diagram_id),
+        )
+
+    async def _drain(self, diagram_id: str) -> None:
+        try:
+            while diagram_id in self._pending and diagram_id not in self._timers:
+                data, diagram_type, diagram_version = self._pending.pop(diagram_id)
+                self._status[diagram_id] = "rendering"
+                try:
+                    await self._render(diagram_id, data, diagram_type, diagram_version)
+                    status = "ready"
+                except Exception:
+                    logger.exception("Thumbnail render failed for diagram %s", diagram_id)
+                    status = "failed"
+                if diagram_id not in self._pending:
+                    self._status[diagram_id] = status
+        finally:
+            del self._tasks[diagram_id]
+
+    async def _render(
+        self,
+        diagram_id: str,
+        data: dict[str, object],
+        diagram_type: str,
+        diagram_version: int | None,
+    ) -> None:
+        svgs: list[tuple[str, str, str]] = []
+        # The writer connection is used for the hash check too: a thumbnail GET
+        # waiting on this render may be holding one of the pooled readers.
+        async with self._db_manager.write_connection() as db:
+            for theme in sorted(VALID_THEMES):
+                svg_str = generate_svg_from_diagram_data(data, diagram_type, theme=theme)
+                svg_hash = thumbnail_svg_hash(svg_str)
+                if not await is_thumbnail_current(db, diagram_id, theme, svg_hash):
+                    svgs.append((theme, svg_str, svg_hash))
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        pngs = await asyncio.gather(*(
+            loop.run_in_executor(executor, render_thumbnail_png, svg_str)
+            for _, svg_str, _ in svgs
+        ))
+        rows = [
+            (theme, png, svg_hash)
+            for (theme, _, svg_hash), png in zip(svgs, pngs, strict=True)
+        ]
+        async with self._db_manager.write_connection() as db:
+            await store_thumbnails(db, diagram_id, diagram_version, rows)
+
+    async def _sweep(self) -> None:
+        # Keyset over diagram_id so each batch only holds a reader briefly.
+        # Renders go through the queue one at a time, so a diagram a request
+        # is already rendering is not rendered twice.
+        last_id = ""
+        rendered = 0
+        while not self._closed:
+            async with self._db_manager.read_connection() as db:
+                cursor = await db.execute(
+                    _STALE_DIAGRAMS_SQL,
+                    (last_id, PNG_MAGIC, len(VALID_THEMES), self._sweep_batch_size),
+                )
+                rows = await cursor.fetchall()
+            if not rows:
+                break
+            for diagram_id, diagram_type, version, data in rows:
+                if self._closed:
+                    break
+                self.enqueue(diagram_id, json.loads(data) if data else {}, diagram_type, version)
+                if await self.wait_for(diagram_id) == "ready":
+                    rendered += 1
+            last_id = rows[-1][0]
+        if rendered:
+            logger.info("Rendered missing or out-of-date thumbnails for %d diagrams", rendered)
+
+    async def _regenerate(self, job: RegenerationJob) -> None:
+        try:
+            async with self._db_manager.read_connection() as db:
+                cursor = await db.execute(
+                    "SELECT COUNT(*) FROM diagrams d "
+                    "JOIN diagram_versions dv ON d.id = dv.diagram_id "
+                    "AND d.current_version = dv.version "
+                    "WHERE d.is_deleted = 0"
+                )
+                job.total = (await cursor.fetchone())[0]
+            # Keyset over diagram_id, as in _sweep, so only one batch of
+            # diagram data is held at a time
+            last_id = ""
+            while True:
+                async with self._db_manager.read_connection() as db:
+                    cursor = await db.execute(
+                        _CURRENT_DIAGRAMS_SQL, (last_id, self._sweep_batch_size),
+                    )
+                    rows = await cursor.fetchall()
+                if not rows:
+                    break
+                for diagram_id, diagram_type, version, data in rows:
+                    try:
+                        await self._render(
+                            diagram_id, json.loads(data) if data else {}, diagram_type, version,
+                        )
+                    except Exception:
+                        logger.exception(
+                            "Thumbnail regeneration failed for diagram %s", diagram_id,
+                        )
+                        job.failed += 1
+                    job.processed += 1
+                last_id = rows[-1][0]
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception:
+            logger.exception("Thumbnail regeneration job %s failed", job.id)
+            job.status = "failed"
+        finally:
+            job.finished_at = datetime.now(tz=UTC).isoformat()
+
+    def _get_executor(self) -> Executor | None:
+        # workers=0 renders on the default thread pool instead of processes
+        if self._workers > 0 and self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._workers)
+        return self._executor
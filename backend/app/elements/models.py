@@ -47,9 +47,10 @@ class ElementResponse(BaseModel):
     created_by_username: str = "Unknown"
     updated_at: str
     is_deleted: bool = False
-    tags: list[str] = Field(default_factory=list)
-    relationship_count: int = 0
-    diagram_usage_count: int = 0
+    # None when the list endpoint's include= leaves the enrichment out
+    tags: list[str] | None = None
+    relationship_count: int | None = None
+    diagram_usage_count: int | None = None
     set_id: str | None = None
     set_name: str | None = None
     metadata: dict[str, object] | None = None
@@ -77,6 +78,7 @@ class ElementListResponse(BaseModel):
     """Paginated list of elements."""
 
     items: list[ElementResponse]
-    total: int
+    total: int | None = None
     page: int
     page_size: int
+    next_cursor: str | None = None
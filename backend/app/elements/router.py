@@ -3,11 +3,12 @@
 from __future__ import annotations
 
 from datetime import UTC, datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
 from app.auth.dependencies import get_current_user
+from app.database import get_read_db, get_write_db
 from app.elements.models import (
     ElementCreate,
     ElementListResponse,
@@ -17,6 +18,7 @@ from app.elements.models import (
     ElementVersionResponse,
 )
 from app.elements.service import (
+    LIST_ENRICHMENTS,
     cascade_delete_element,
     create_element,
     get_element,
@@ -28,17 +30,19 @@ from app.elements.service import (
     update_element,
 )
 
+if TYPE_CHECKING:
+    import aiosqlite
+
 router = APIRouter(prefix="/api/elements", tags=["elements"])
 
 
 @router.post("", response_model=ElementResponse, status_code=201)
 async def create(
     body: ElementCreate,
-    request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> ElementResponse:
     """Create a new element."""
-    db = request.app.state.db_manager.main_db
     result = await create_element(
         db,
         element_type=body.element_type,
@@ -55,34 +59,58 @@ async def create(
 
 @router.get("", response_model=ElementListResponse)
 async def list_all(
-    request: Request,
+    *,
     element_type: str | None = None,
     set_id: str | None = None,
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=50, ge=1, le=100),
+    include: str | None = Query(
+        default=None,
+        description=(
+            "Comma-separated enrichments to compute: tags, relationship_count, "
+            "diagram_usage_count. Defaults to all; pass an empty value for none."
+        ),
+    ),
+    cursor: str | None = Query(
+        default=None, description="next_cursor of the previous page; replaces page.",
+    ),
+    include_total: bool = Query(default=True, description="Count all matching elements."),
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> ElementListResponse:
     """List elements with optional type/set filter and pagination."""
-    db = request.app.state.db_manager.main_db
-    items, total = await list_elements(
-        db, element_type=element_type, set_id=set_id, page=page, page_size=page_size,
-    )
+    enrichments = LIST_ENRICHMENTS
+    if include is not None:
+        enrichments = frozenset(part.strip() for part in include.split(",") if part.strip())
+        unknown = enrichments - LIST_ENRICHMENTS
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown include value(s): {', '.join(sorted(unknown))}",
+            )
+    try:
+        items, total, next_cursor = await list_elements(
+            db, element_type=element_type, set_id=set_id, page=page, page_size=page_size,
+            include=enrichments, after=cursor, include_total=include_total,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     return ElementListResponse(
         items=[ElementResponse(**item) for item in items],
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
     )
 
 
 @router.get("/tags/all")
 async def list_all_tags(
-    request: Request,
     set_id: str | None = None,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> list[str]:
     """List all unique tags from elements and diagrams, optionally scoped by set."""
-    db = request.app.state.db_manager.main_db
     if set_id:
         cursor = await db.execute(
             "SELECT DISTINCT tag FROM ("
@@ -111,11 +139,10 @@ async def list_all_tags(
 @router.get("/{element_id}", response_model=ElementResponse)
 async def get_one(
     element_id: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> ElementResponse:
     """Get a single element by ID."""
-    db = request.app.state.db_manager.main_db
     result = await get_element(db, element_id)
     if result is None:
         raise HTTPException(status_code=404, detail="Element not found")
@@ -128,6 +155,7 @@ async def update(
     body: ElementUpdate,
     request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> ElementResponse:
     """Update an element with optimistic concurrency (If-Match header)."""
     if_match = request.headers.get("If-Match")
@@ -142,7 +170,6 @@ async def update(
             status_code=400, detail="If-Match must be an integer version"
         )
 
-    db = request.app.state.db_manager.main_db
     result = await update_element(
         db,
         element_id,
@@ -167,6 +194,7 @@ async def rollback(
     body: ElementRollback,
     request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> ElementResponse:
     """Rollback an element to a previous version."""
     if_match = request.headers.get("If-Match")
@@ -181,7 +209,6 @@ async def rollback(
             status_code=400, detail="If-Match must be an integer version"
         )
 
-    db = request.app.state.db_manager.main_db
     result = await rollback_element(
         db,
         element_id,
@@ -202,6 +229,7 @@ async def delete(
     request: Request,
     cascade: bool = False,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> None:
     """Soft-delete an element. With cascade=true, also removes from all diagram canvases and deletes relationships."""
     if_match = request.headers.get("If-Match")
@@ -216,7 +244,6 @@ async def delete(
             status_code=400, detail="If-Match must be an integer version"
         )
 
-    db = request.app.state.db_manager.main_db
     if cascade:
         deleted = await cascade_delete_element(
             db, element_id, deleted_by=current_user["id"],
@@ -234,11 +261,10 @@ async def delete(
 @router.get("/{element_id}/versions", response_model=list[ElementVersionResponse])
 async def get_versions(
     element_id: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> list[ElementVersionResponse]:
     """Get all versions of an element."""
-    db = request.app.state.db_manager.main_db
     versions = await get_element_versions(db, element_id)
     if not versions:
         raise HTTPException(status_code=404, detail="Element not found")
@@ -252,11 +278,10 @@ async def get_versions(
 async def get_version(
     element_id: str,
     version: int,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> ElementVersionResponse:
     """Get a specific version of an element."""
-    db = request.app.state.db_manager.main_db
     result = await get_element_version(db, element_id, version)
     if result is None:
         raise HTTPException(status_code=404, detail="Version not found")
@@ -266,25 +291,25 @@ async def get_version(
 @router.get("/{element_id}/diagrams")
 async def get_element_diagrams(
     element_id: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> list[dict[str, str]]:
     """Get diagrams that reference this element."""
-    db = request.app.state.db_manager.main_db
 
     # Check element exists
     element = await get_element(db, element_id)
     if element is None:
         raise HTTPException(status_code=404, detail="Element not found")
 
-    # Find diagrams whose latest version data JSON references this element ID.
-    # diagram_versions.data may contain element references in placements or nodes.
+    # Find diagrams whose latest version data references this element ID,
+    # via the diagram_element_refs index maintained on every version write.
     cursor = await db.execute(
-        "SELECT DISTINCT d.id, dv.name, d.diagram_type "
-        "FROM diagrams d "
+        "SELECT d.id, dv.name, d.diagram_type "
+        "FROM diagram_element_refs r "
+        "JOIN diagrams d ON d.id = r.diagram_id "
         "JOIN diagram_versions dv ON d.id = dv.diagram_id AND d.current_version = dv.version "
-        "WHERE d.is_deleted = 0 AND dv.data LIKE ?",
-        (f"%{element_id}%",),
+        "WHERE r.element_id = ? AND d.is_deleted = 0",
+        (element_id,),
     )
     rows = await cursor.fetchall()
     return [
@@ -296,11 +321,10 @@ async def get_element_diagrams(
 @router.get("/{element_id}/stats")
 async def get_element_stats(
     element_id: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> dict[str, int]:
     """Get statistics for an element (relationship count, diagram usage count)."""
-    db = request.app.state.db_manager.main_db
 
     # Check element exists
     element = await get_element(db, element_id)
@@ -318,11 +342,11 @@ async def get_element_stats(
 
     # Count diagrams referencing this element
     diagram_cursor = await db.execute(
-        "SELECT COUNT(DISTINCT d.id) "
-        "FROM diagrams d "
-        "JOIN diagram_versions dv ON d.id = dv.diagram_id AND d.current_version = dv.version "
-        "WHERE d.is_deleted = 0 AND dv.data LIKE ?",
-        (f"%{element_id}%",),
+        "SELECT COUNT(*) "
+        "FROM diagram_element_refs r "
+        "JOIN diagrams d ON d.id = r.diagram_id "
+        "WHERE r.element_id = ? AND d.is_deleted = 0",
+        (element_id,),
     )
     diagram_row = await diagram_cursor.fetchone()
     diagram_usage_count: int = diagram_row[0]
@@ -337,11 +361,10 @@ async def get_element_stats(
 async def add_tag(
     element_id: str,
     body: dict[str, Any],
-    request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> dict[str, str]:
     """Add a tag to an element."""
-    db = request.app.state.db_manager.main_db
     tag = body.get("tag", "").strip()
     if not tag or len(tag) > 50:
         raise HTTPException(status_code=400, detail="Tag must be 1-50 characters")
@@ -364,11 +387,10 @@ async def add_tag(
 async def remove_tag(
     element_id: str,
     tag: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> dict[str, str]:
     """Remove a tag from an element."""
-    db = request.app.state.db_manager.main_db
     await db.execute(
         "DELETE FROM element_tags WHERE element_id = ? AND tag = ?",
         (element_id, tag),
@@ -7,9 +7,10 @@ import uuid
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
+from app.diagrams.element_refs import sync_diagram_element_refs
+from app.diagrams.summary import update_diagram_summary
 from app.migrations.m012_sets import DEFAULT_SET_ID
-from app.search.service import index_element as _index_element
-from app.search.service import remove_element_index as _remove_element_index
+from app.pagination import decode_cursor, split_page
 
 if TYPE_CHECKING:
     import aiosqlite
@@ -47,11 +48,6 @@ async def create_element(
         (element_id, name, description, data_json, change_summary, now, created_by, metadata_json),
     )
     await db.commit()
-    await _index_element(
-        db, element_id=element_id, name=name,
-        element_type=element_type, description=description,
-    )
-    await db.commit()
 
     return {
         "id": element_id,
@@ -64,6 +60,7 @@ async def create_element(
         "created_by": created_by,
         "updated_at": now,
         "is_deleted": False,
+        "tags": [],
         "set_id": effective_set_id,
         "metadata": metadata,
         "notation": notation,
@@ -121,6 +118,62 @@ async def get_element(
     return element
 
 
+LIST_ENRICHMENTS = frozenset({"tags", "relationship_count", "diagram_usage_count"})
+
+
+async def _enrich_elements(
+    db: aiosqlite.Connection,
+    items: list[dict[str, object]],
+    include: frozenset[str],
+) -> None:
+    """Attach tags and counts to a page of elements, one query per enrichment."""
+    if not items:
+        return
+    ids = [str(item["id"]) for item in items]
+    placeholders = ", ".join("?" * len(ids))
+
+    if "tags" in include:
+        tags: dict[str, list[str]] = {element_id: [] for element_id in ids}
+        cursor = await db.execute(
+            "SELECT element_id, tag FROM element_tags "  # noqa: S608
+            f"WHERE element_id IN ({placeholders}) ORDER BY element_id, tag",
+            ids,
+        )
+        for element_id, tag in await cursor.fetchall():
+            tags[element_id].append(tag)
+        for item in items:
+            item["tags"] = tags[str(item["id"])]
+
+    if "relationship_count" in include:
+        # Self-relationships are counted once, as with source = ? OR target = ?
+        cursor = await db.execute(
+            "SELECT element_id, COUNT(*) FROM ("  # noqa: S608
+            "SELECT source_element_id AS element_id FROM relationships "
+            f"WHERE is_deleted = 0 AND source_element_id IN ({placeholders}) "
+            "UNION ALL "
+            "SELECT target_element_id FROM relationships "
+            f"WHERE is_deleted = 0 AND target_element_id IN ({placeholders}) "
+            "AND target_element_id != source_element_id"
+            ") GROUP BY element_id",
+            [*ids, *ids],
+        )
+        rel_counts = dict(await cursor.fetchall())
+        for item in items:
+            item["relationship_count"] = rel_counts.get(item["id"], 0)
+
+    if "diagram_usage_count" in include:
+        cursor = await db.execute(
+            "SELECT r.element_id, COUNT(*) FROM diagram_element_refs r "  # noqa: S608
+            "JOIN diagrams d ON d.id = r.diagram_id "
+            f"WHERE d.is_deleted = 0 AND r.element_id IN ({placeholders}) "
+            "GROUP BY r.element_id",
+            ids,
+        )
+        usage_counts = dict(await cursor.fetchall())
+        for item in items:
+            item["diagram_usage_count"] = usage_counts.get(item["id"], 0)
+
+
 async def list_elements(
     db: aiosqlite.Connection,
     *,
@@ -128,8 +181,17 @@ async def list_elements(
     set_id: str | None = None,
     page: int = 1,
     page_size: int = 50,
-) -> tuple[list[dict[str, object]], int]:
-    """List elements with pagination. Returns (items, total_count)."""
+    include: frozenset[str] = LIST_ENRICHMENTS,
+    after: str | None = None,
+    include_total: bool = True,
+) -> tuple[list[dict[str, object]], int | None, str | None]:
+    """List elements with pagination. Returns (items, total_count, next_cursor).
+
+    ``after`` is a next_cursor from an earlier page; the page then starts
+    after that row and ``page`` is ignored. total_count is None unless
+    include_total. ``include`` selects which of LIST_ENRICHMENTS are
+    computed for the page; skipped ones keep their model defaults.
+    """
     where_clauses = ["e.is_deleted = 0"]
     params: list[object] = []
 
@@ -144,15 +206,21 @@ async def list_elements(
     where_sql = " AND ".join(where_clauses)
 
     # Count
-    cursor = await db.execute(
-        f"SELECT COUNT(*) FROM elements e WHERE {where_sql}",  # noqa: S608
-        params,
-    )
-    count_row = await cursor.fetchone()
-    total: int = count_row[0]  # type: ignore[index]
+    total: int | None = None
+    if include_total:
+        cursor = await db.execute(
+            f"SELECT COUNT(*) FROM elements e WHERE {where_sql}",  # noqa: S608
+            params,
+        )
+        count_row = await cursor.fetchone()
+        total = count_row[0]  # type: ignore[index]
 
-    # Fetch page
+    # Fetch page, plus one row to tell whether another follows
     offset = (page - 1) * page_size
+    if after is not None:
+        where_sql += " AND (e.updated_at, e.id) < (?, ?)"
+        params.extend(decode_cursor(after, (str, str)))
+        offset = 0
     cursor = await db.execute(
         f"SELECT e.id, e.element_type, e.current_version, "  # noqa: S608
         "ev.name, ev.description, ev.data, "
@@ -163,10 +231,12 @@ async def list_elements(
         "AND e.current_version = ev.version "
         "LEFT JOIN sets s ON e.set_id = s.id "
         f"WHERE {where_sql} "
-        "ORDER BY e.updated_at DESC LIMIT ? OFFSET ?",
-        [*params, page_size, offset],
+        "ORDER BY e.updated_at DESC, e.id DESC LIMIT ? OFFSET ?",
+        [*params, page_size + 1, offset],
+    )
+    rows, next_cursor = split_page(
+        await cursor.fetchall(), page_size, key=lambda r: (r[8], r[0]),
     )
-    rows = await cursor.fetchall()
 
     items = [
         {
@@ -188,38 +258,8 @@ async def list_elements(
         for r in rows
     ]
 
-    # Enrich with tags and stats
-    for item in items:
-        element_id = item["id"]
-
-        # Tags
-        tag_cursor = await db.execute(
-            "SELECT tag FROM element_tags WHERE element_id = ? ORDER BY tag",
-            (element_id,),
-        )
-        tag_rows = await tag_cursor.fetchall()
-        item["tags"] = [r[0] for r in tag_rows]
-
-        # Relationship count
-        rel_cursor = await db.execute(
-            "SELECT COUNT(*) FROM relationships "
-            "WHERE (source_element_id = ? OR target_element_id = ?) AND is_deleted = 0",
-            (element_id, element_id),
-        )
-        rel_row = await rel_cursor.fetchone()
-        item["relationship_count"] = rel_row[0] if rel_row else 0
-
-        # Diagram usage count
-        diagram_cursor = await db.execute(
-            "SELECT COUNT(DISTINCT d.id) FROM diagrams d "
-            "JOIN diagram_versions dv ON d.id = dv.diagram_id AND d.current_version = dv.version "
-            "WHERE d.is_deleted = 0 AND dv.data LIKE ?",
-            (f'%{element_id}%',),
-        )
-        diagram_row = await diagram_cursor.fetchone()
-        item["diagram_usage_count"] = diagram_row[0] if diagram_row else 0
-
-    return items, total
+    await _enrich_elements(db, items, include)
+    return items, total, next_cursor
 
 
 async def update_element(
@@ -266,18 +306,6 @@ async def update_element(
     )
     await db.commit()
 
-    # Re-index for search — need element_type from the element row
-    type_cursor = await db.execute(
-        "SELECT element_type FROM elements WHERE id = ?", (element_id,),
-    )
-    type_row = await type_cursor.fetchone()
-    if type_row:
-        await _index_element(
-            db, element_id=element_id, name=name,
-            element_type=type_row[0], description=description,
-        )
-        await db.commit()
-
     return {
         "id": element_id,
         "current_version": new_version,
@@ -336,18 +364,6 @@ async def rollback_element(
     )
     await db.commit()
 
-    # Re-index for search after rollback
-    type_cursor = await db.execute(
-        "SELECT element_type FROM elements WHERE id = ?", (element_id,),
-    )
-    type_row = await type_cursor.fetchone()
-    if type_row:
-        await _index_element(
-            db, element_id=element_id, name=target_row[0],
-            element_type=type_row[0], description=target_row[1],
-        )
-        await db.commit()
-
     return {
         "id": element_id,
         "current_version": new_version,
@@ -402,8 +418,6 @@ async def soft_delete_element(
          ver_row[2], now, deleted_by),
     )
     await db.commit()
-    await _remove_element_index(db, element_id)
-    await db.commit()
     return True
 
 
@@ -415,8 +429,7 @@ async def restore_element(
 ) -> bool:
     """Restore a soft-deleted element."""
     cursor = await db.execute(
-        "SELECT current_version, element_type FROM elements "
-        "WHERE id = ? AND is_deleted = 1",
+        "SELECT current_version FROM elements WHERE id = ? AND is_deleted = 1",
         (element_id,),
     )
     row = await cursor.fetchone()
@@ -424,7 +437,6 @@ async def restore_element(
         return False
 
     new_version = row[0] + 1
-    element_type = row[1]
     now = datetime.now(tz=UTC).isoformat()
 
     cursor = await db.execute(
@@ -448,13 +460,6 @@ async def restore_element(
     )
     await db.commit()
 
-    # Re-index for search
-    await _index_element(
-        db, element_id=element_id, name=ver_row[0],
-        element_type=element_type, description=ver_row[1],
-    )
-    await db.commit()
-
     return True
 
 
@@ -509,10 +514,11 @@ async def cascade_delete_element(
     # 3. Remove element from all diagram canvases
     diagram_cursor = await db.execute(
         "SELECT d.id, d.current_version, dv.name, dv.description, dv.data, dv.metadata "
-        "FROM diagrams d "
+        "FROM diagram_element_refs r "
+        "JOIN diagrams d ON d.id = r.diagram_id "
         "JOIN diagram_versions dv ON d.id = dv.diagram_id AND d.current_version = dv.version "
-        "WHERE d.is_deleted = 0 AND dv.data LIKE ?",
-        (f"%{element_id}%",),
+        "WHERE r.element_id = ? AND d.is_deleted = 0",
+        (element_id,),
     )
     diagram_rows = await diagram_cursor.fetchall()
     for drow in diagram_rows:
@@ -556,6 +562,8 @@ async def cascade_delete_element(
                 (diagram_id, new_diagram_version, d_name, d_desc, data_json,
                  f"Removed deleted element {element_id}", now, deleted_by, d_meta),
             )
+            await sync_diagram_element_refs(db, diagram_id, data_json)
+            await update_diagram_summary(db, diagram_id, data_json)
         except (json.JSONDecodeError, TypeError):
             continue
     await db.commit()
@@ -3,7 +3,10 @@
 from __future__ import annotations
 
 import asyncio
+import codecs
 import logging
+import os
+import re
 import shutil
 import tempfile
 
@@ -50,11 +53,237 @@ async def _run_mdbtools_command(cmd: list[str]) -> str:
     return stdout.decode()
 
 
+# Tables converted at once, each by its own mdb-schema/mdb-export processes
+EXPORT_CONCURRENCY = 4
+# Rows per executemany when loading exported data
+EXPORT_BATCH_SIZE = 1000
+_READ_SIZE = 64 * 1024
+
+_INSERT_PREFIX_RE = re.compile(
+    r'\s*INSERT\s+INTO\s+(?:"(?:[^"]|"")*"|[^\s(]+)\s*\(([^)]*)\)\s*VALUES\s*',
+    re.IGNORECASE,
+)
+_IDENTIFIER_RE = re.compile(r'"((?:[^"]|"")*)"')
+# A double- or single-quoted string with doubled quotes, or a bare token
+_VALUE_RE = re.compile(r'"((?:[^"]|"")*)"|\'((?:[^\']|\'\')*)\'|([^,)"\'\s]*)')
+_SPACE_RE = re.compile(r"[ \t\r\n]*")
+
+
+class _Incomplete(Exception):  # noqa: N818
+    """The buffer ends inside a statement; more input is needed."""
+
+
+def _bare_value(token: str) -> object:
+    if token.upper() == "NULL":
+        return None
+    try:
+        return int(token)
+    except ValueError:
+        pass
+    try:
+        return float(token)
+    except ValueError:
+        return token
+
+
+class InsertStatementParser:
+    """Incremental parser for ``mdb-export -I sqlite`` output.
+
+    feed() takes the next chunk of text and returns the rows of every INSERT
+    statement it completes, as lists of Python values, so memory is bounded
+    by the longest statement rather than the whole table. Strings may span
+    lines and use doubled quotes; NULL becomes None and numbers int/float.
+    ``columns`` holds the column names once the first statement is parsed.
+    """
+
+    def __init__(self) -> None:
+        self.columns: list[str] | None = None
+        self._buffer = ""
+
+    def feed(self, text: str) -> list[list[object]]:
+        """Add text and return the rows of all statements completed so far."""
+        self._buffer += text
+        return self._parse(final=False)
+
+    def close(self) -> list[list[object]]:
+        """Parse what is left at end of input; raises ValueError if malformed."""
+        return self._parse(final=True)
+
+    def _parse(self, *, final: bool) -> list[list[object]]:
+        rows: list[list[object]] = []
+        buf = self._buffer
+        pos = 0
+        while _SPACE_RE.match(buf, pos).end() < len(buf):  # type: ignore[union-attr]
+            try:
+                statement_rows, pos = self._parse_statement(buf, pos)
+            except _Incomplete:
+                if final:
+                    msg = "Truncated mdb-export output"
+                    raise ValueError(msg) from None
+                break
+            rows.extend(statement_rows)
+        self._buffer = buf[pos:]
+        return rows
+
+    def _parse_statement(self, buf: str, pos: int) -> tuple[list[list[object]], int]:
+        prefix = _INSERT_PREFIX_RE.match(buf, pos)
+        if prefix is None:
+            if ";" in buf[pos:]:
+                msg = "Unexpected statement in mdb-export output"
+                raise ValueError(msg)
+            raise _Incomplete
+        if self.columns is None:
+            self.columns = [
+                m.group(1).replace('""', '"')
+                for m in _IDENTIFIER_RE.finditer(prefix.group(1))
+            ]
+        rows: list[list[object]] = []
+        pos = prefix.end()
+        while True:
+            row, pos = self._parse_row(buf, pos)
+            rows.append(row)
+            pos = _SPACE_RE.match(buf, pos).end()  # type: ignore[union-attr]
+            if pos >= len(buf):
+                raise _Incomplete
+            if buf[pos] == ";":
+                return rows, pos + 1
+            if buf[pos] != ",":
+                msg = f"Expected ',' or ';' in mdb-export output at offset {pos}"
+                raise ValueError(msg)
+            pos = _SPACE_RE.match(buf, pos + 1).end()  # type: ignore[union-attr]
+
+    @staticmethod
+    def _parse_row(buf: str, pos: int) -> tuple[list[object], int]:
+        if pos >= len(buf):
+            raise _Incomplete
+        if buf[pos] != "(":
+            msg = f"Expected '(' in mdb-export output at offset {pos}"
+            raise ValueError(msg)
+        row: list[object] = []
+        pos += 1
+        while True:
+            pos = _SPACE_RE.match(buf, pos).end()  # type: ignore[union-attr]
+            if pos >= len(buf):
+                raise _Incomplete
+            value = _VALUE_RE.match(buf, pos)
+            end = value.end()  # type: ignore[union-attr]
+            # An unterminated string, or one that may continue with a doubled quote
+            if end >= len(buf) or buf[end] in "\"'" or (
+                buf[pos] in "\"'" and end == pos
+            ):
+                raise _Incomplete
+            if value.group(1) is not None:  # type: ignore[union-attr]
+                row.append(value.group(1).replace('""', '"'))  # type: ignore[union-attr]
+            elif value.group(2) is not None:  # type: ignore[union-attr]
+                row.append(value.group(2).replace("''", "'"))  # type: ignore[union-attr]
+            else:
+                row.append(_bare_value(value.group(3)))  # type: ignore[union-attr]
+            pos = _SPACE_RE.match(buf, end).end()  # type: ignore[union-attr]
+            if pos >= len(buf):
+                raise _Incomplete
+            if buf[pos] == ")":
+                return row, pos + 1
+            if buf[pos] != ",":
+                msg = f"Expected ',' or ')' in mdb-export output at offset {pos}"
+                raise ValueError(msg)
+            pos += 1
+
+
+async def _export_table(db: aiosqlite.Connection, eap_path: str, table: str) -> int:
+    """Stream one table's mdb-export output into batched parameterized inserts.
+
+    Returns the number of rows loaded. Raises RuntimeError if mdb-export
+    fails and ValueError if its output cannot be parsed.
+    """
+    cmd = ["mdb-export", "-I", "sqlite", eap_path, table]
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stderr = asyncio.ensure_future(proc.stderr.read())  # type: ignore[union-attr]
+    parser = InsertStatementParser()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    insert_sql: str | None = None
+    batch: list[list[object]] = []
+    loaded = 0
+    finished = False
+
+    async def flush() -> None:
+        nonlocal insert_sql, loaded
+        if not batch:
+            return
+        if insert_sql is None:
+            if not parser.columns or len(parser.columns) != len(batch[0]):
+                msg = f"Cannot match mdb-export columns for table {table}"
+                raise ValueError(msg)
+            quoted = ", ".join('"' + c.replace('"', '""') + '"' for c in parser.columns)
+            insert_sql = (
+                f'INSERT INTO "{table}" ({quoted}) '  # noqa: S608
+                f"VALUES ({', '.join('?' * len(parser.columns))})"
+            )
+        await db.executemany(insert_sql, batch)
+        loaded += len(batch)
+        batch.clear()
+
+    try:
+        while chunk := await proc.stdout.read(_READ_SIZE):  # type: ignore[union-attr]
+            batch.extend(parser.feed(decoder.decode(chunk)))
+            if len(batch) >= EXPORT_BATCH_SIZE:
+                await flush()
+        batch.extend(parser.feed(decoder.decode(b"", final=True)))
+        batch.extend(parser.close())
+        await flush()
+        finished = True
+    finally:
+        if not finished and proc.returncode is None:
+            # Stopped early (parse error or cancellation): don't leave it running
+            proc.kill()
+        await proc.wait()
+        error_output = await stderr
+    if proc.returncode != 0:
+        raise RuntimeError(
+            f"mdbtools command failed: {' '.join(cmd)}\n{error_output.decode().strip()}"
+        )
+    return loaded
+
+
+async def _convert_table(
+    db: aiosqlite.Connection,
+    eap_path: str,
+    table: str,
+    limit: asyncio.Semaphore,
+) -> None:
+    async with limit:
+        try:
+            ddl = await _run_mdbtools_command(
+                ["mdb-schema", "-T", table, eap_path, "sqlite"]
+            )
+        except RuntimeError:
+            logger.warning("Table %s not found in EAP file, skipping", table)
+            return
+
+        if not ddl.strip():
+            logger.warning("Empty schema for table %s, skipping", table)
+            return
+
+        # Execute CREATE TABLE
+        await db.executescript(ddl)
+
+        try:
+            await _export_table(db, eap_path, table)
+        except (RuntimeError, ValueError):
+            logger.warning("Failed to export data for table %s, skipping", table)
+            await db.execute(f'DELETE FROM "{table}"')  # noqa: S608
+
+
 async def convert_eap_to_sqlite(eap_path: str) -> str:
     """Convert a .eap (MDB/JET4) file to a temporary SQLite database.
 
     Uses mdbtools CLI to extract schema and data from the MDB file,
-    then loads them into a new SQLite database.
+    then loads them into a new SQLite database. Up to EXPORT_CONCURRENCY
+    tables are exported at once, and each export is parsed as it streams
+    in and loaded in batches of EXPORT_BATCH_SIZE rows.
 
     Returns the path to the temporary SQLite file. Caller must clean up.
 
@@ -74,35 +303,18 @@ async def convert_eap_to_sqlite(eap_path: str) -> str:
     sqlite_path = tmp.name
     tmp.close()
 
-    async with aiosqlite.connect(sqlite_path) as db:
-        for table in REQUIRED_TABLES:
-            try:
-                ddl = await _run_mdbtools_command(
-                    ["mdb-schema", "-T", table, eap_path, "sqlite"]
-                )
-            except RuntimeError:
-                logger.warning("Table %s not found in EAP file, skipping", table)
-                continue
-
-            if not ddl.strip():
-                logger.warning("Empty schema for table %s, skipping", table)
-                continue
-
-            # Execute CREATE TABLE
-            await db.executescript(ddl)
-
-            # Export INSERT statements
-            try:
-                inserts = await _run_mdbtools_command(
-                    ["mdb-export", "-I", "sqlite", eap_path, table]
-                )
-            except RuntimeError:
-                logger.warning("Failed to export data for table %s, skipping", table)
-                continue
-
-            if inserts.strip():
-                await db.executescript(inserts)
-
-        await db.commit()
+    try:
+        async with aiosqlite.connect(sqlite_path) as db:
+            # Throwaway file: no rollback journal or fsyncs needed
+            await db.execute("PRAGMA journal_mode=OFF")
+            await db.execute("PRAGMA synchronous=OFF")
+            limit = asyncio.Semaphore(EXPORT_CONCURRENCY)
+            async with asyncio.TaskGroup() as group:
+                for table in REQUIRED_TABLES:
+                    group.create_task(_convert_table(db, eap_path, table, limit))
+            await db.commit()
+    except BaseException:
+        os.unlink(sqlite_path)
+        raise
 
     return sqlite_path
@@ -0,0 +1,220 @@
+"""Background SparxEA import jobs.
+
+POST /api/import/sparx streams the upload to a temporary file and returns an
+ImportJob straight away. The import runs in a background task, so it is not
+bound by the HTTP request's lifetime: a worker process builds it in a
+staging database (see staging.py), then the job merges that into iris.db in
+one short transaction on the shared writer, queued with request writes
+through DatabaseManager.write_connection(). Jobs run one at a time in
+submission order.
+
+Job status:
+    queued     — waiting for an earlier import to finish
+    running    — converting, staging or merging; ``phase`` says which
+    completed  — ``summary`` holds the ImportSummary counts; set as soon as
+                 the merge commits, after which the job cannot be cancelled
+    failed     — ``error`` holds the reason
+    cancelled  — stopped on request before the merge committed; nothing
+                 was written to iris.db
+
+Jobs live in process memory, like thumbnail regeneration jobs, so with
+several workers a job is visible only from the worker that accepted it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sqlite3
+import tempfile
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+from app.import_sparx.eap_converter import convert_eap_to_sqlite
+from app.import_sparx.staging import merge_staging, stage_in_worker
+
+if TYPE_CHECKING:
+    from app.database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("packages", "elements", "connectors", "diagrams")
+
+# "sync" updates and removes objects recorded for the set; "import" only adds
+MODES = ("import", "sync")
+
+_FINISHED = ("completed", "failed", "cancelled")
+
+
+@dataclass
+class ImportPhaseProgress:
+    """Objects written so far out of those to write in one import phase."""
+
+    total: int = 0
+    processed: int = 0
+
+
+@dataclass
+class ImportJob:
+    """State of one background SparxEA import."""
+
+    id: str
+    status: str
+    filename: str
+    created_by: str
+    set_id: str | None = None
+    mode: str = "import"
+    phase: str | None = None
+    progress: dict[str, ImportPhaseProgress] = field(
+        default_factory=lambda: {phase: ImportPhaseProgress() for phase in PHASES},
+    )
+    summary: dict[str, object] | None = None
+    error: str | None = None
+    created_at: str = ""
+    finished_at: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        """True once the job has completed, failed or been cancelled."""
+        return self.status in _FINISHED
+
+
+class ImportJobManager:
+    """Runs SparxEA imports in the background and tracks their progress."""
+
+    def __init__(self, db_manager: DatabaseManager, *, keep_finished: int = 50) -> None:
+        self._db_manager = db_manager
+        self._keep_finished = keep_finished
+        self._jobs: dict[str, ImportJob] = {}
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        self._slot = asyncio.Lock()
+
+    def submit(
+        self,
+        path: str,
+        *,
+        filename: str,
+        created_by: str,
+        set_id: str | None = None,
+        mode: str = "import",
+    ) -> ImportJob:
+        """Queue an import of an uploaded .qea or .eap file.
+
+        The job takes ownership of ``path`` and deletes it when it finishes.
+        """
+        job = ImportJob(
+            id=str(uuid.uuid4()),
+            status="queued",
+            filename=filename,
+            created_by=created_by,
+            set_id=set_id,
+            mode=mode,
+            created_at=datetime.now(tz=UTC).isoformat(),
+        )
+        self._jobs[job.id] = job
+        files = [path]
+        task = asyncio.get_running_loop().create_task(self._run(job, files))
+        task.add_done_callback(lambda t: self._finish(job, t, files))
+        self._tasks[job.id] = task
+        return job
+
+    def get(self, job_id: str) -> ImportJob | None:
+        """Look up an import job by ID."""
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation of a queued or running job.
+
+        Returns False if the job does not exist or has already finished,
+        including once its merge has committed.
+        """
+        task = self._tasks.get(job_id)
+        job = self._jobs.get(job_id)
+        if task is None or task.done() or job is None or job.finished:
+            return False
+        task.cancel()
+        return True
+
+    async def wait_for(self, job_id: str) -> ImportJob | None:
+        """Wait for a job to finish and return it."""
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+        return self._jobs.get(job_id)
+
+    async def close(self) -> None:
+        """Cancel every unfinished import and wait for them to stop."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job: ImportJob, files: list[str]) -> None:
+        async with self._slot:
+            job.status = "running"
+            path = files[0]
+            try:
+                if path.endswith(".eap"):
+                    job.phase = "converting"
+                    path = await convert_eap_to_sqlite(path)
+                    files.append(path)
+                job.phase = "reading"
+                await self._import(job, path, files)
+            except (ValueError, RuntimeError, sqlite3.DatabaseError) as exc:
+                _fail(job, str(exc))
+            except Exception:
+                logger.exception("Sparx import job %s failed", job.id)
+                _fail(job, "Import failed")
+
+    async def _import(self, job: ImportJob, path: str, files: list[str]) -> None:
+        def on_progress(phase: str, processed: int, total: int) -> None:
+            job.phase = phase
+            job.progress[phase] = ImportPhaseProgress(total=total, processed=processed)
+
+        fd, staging_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        files.append(staging_path)
+        summary = await stage_in_worker(
+            self._db_manager.config.main_db_path, staging_path, path,
+            imported_by=job.created_by, set_id=job.set_id, sync=job.mode == "sync",
+            on_progress=on_progress,
+        )
+
+        def on_commit() -> None:
+            job.summary = asdict(summary)
+            job.status = "completed"
+
+        job.phase = "merging"
+        # Queued behind request writers; they wait only for the merge itself
+        async with self._db_manager.write_connection() as db:
+            await merge_staging(
+                db, staging_path, set_id=job.set_id,
+                thumbnails=self._db_manager.thumbnail_queue, on_commit=on_commit,
+            )
+
+    def _finish(self, job: ImportJob, task: asyncio.Task[None], files: list[str]) -> None:
+        # Runs even when the task was cancelled before it started. A cancel
+        # that lands after the merge committed leaves the job completed.
+        if task.cancelled() and not job.finished:
+            job.status = "cancelled"
+        job.finished_at = datetime.now(tz=UTC).isoformat()
+        self._tasks.pop(job.id, None)
+        for path in files:
+            try:
+                os.unlink(path)
+            except OSError:
+                logger.warning("Could not remove import file %s", path)
+        finished = [j for j in self._jobs.values() if j.finished]
+        for old in finished[:max(len(finished) - self._keep_finished, 0)]:
+            del self._jobs[old.id]
+
+
+def _fail(job: ImportJob, error: str) -> None:
+    # Whatever fails after the merge commits, the import has happened
+    if not job.finished:
+        job.status = "failed"
+        job.error = error
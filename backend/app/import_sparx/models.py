@@ -0,0 +1,58 @@
+"""Pydantic models for SparxEA import jobs."""
+
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+
+class ImportWarningResponse(BaseModel):
+    """A non-fatal issue recorded during an import."""
+
+    category: str
+    message: str
+
+
+class ImportSummaryResponse(BaseModel):
+    """Counts of objects created, skipped, updated and removed by a completed import."""
+
+    packages_created: int
+    packages_skipped: int
+    elements_created: int
+    relationships_created: int
+    diagrams_created: int
+    diagrams_skipped: int
+    elements_skipped: int
+    connectors_skipped: int
+    package_relationships_created: int
+    elements_updated: int = 0
+    relationships_updated: int = 0
+    diagrams_updated: int = 0
+    elements_removed: int = 0
+    relationships_removed: int = 0
+    diagrams_removed: int = 0
+    previous_watermark: str | None = None
+    watermark: str | None = None
+    warnings: list[ImportWarningResponse]
+
+
+class ImportPhaseResponse(BaseModel):
+    """Objects written so far out of those to write in one import phase."""
+
+    total: int
+    processed: int
+
+
+class ImportJobResponse(BaseModel):
+    """State and progress of a background SparxEA import."""
+
+    id: str
+    status: str
+    filename: str
+    set_id: str | None = None
+    mode: str = "import"
+    phase: str | None = None
+    progress: dict[str, ImportPhaseResponse]
+    summary: ImportSummaryResponse | None = None
+    error: str | None = None
+    created_at: str
+    finished_at: str | None = None
@@ -1,13 +1,26 @@
-"""Read SparxEA .qea (SQLite) files into dataclasses."""
+"""Read SparxEA .qea (SQLite) files into dataclasses.
+
+QeaReader streams records over a single connection. Tables that the
+import consumes per owner (diagram objects, attributes, tagged values) are
+yielded already grouped, using SQL ORDER BY rather than regrouping in Python.
+The read_* functions return whole tables as lists for callers that want them.
+"""
 
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import TYPE_CHECKING, Self, TypeVar
 
 import aiosqlite
 
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Callable
+    from types import TracebackType
+
+_T = TypeVar("_T")
+
 
-@dataclass
+@dataclass(slots=True)
 class QeaPackage:
     Package_ID: int
     Name: str | None
@@ -16,7 +29,7 @@ class QeaPackage:
     Notes: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class QeaElement:
     Object_ID: int
     Object_Type: str | None
@@ -42,7 +55,7 @@ class QeaElement:
     BorderWidth: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class QeaConnector:
     Connector_ID: int
     Connector_Type: str | None
@@ -65,7 +78,7 @@ class QeaConnector:
     LineStyle: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class QeaDiagram:
     Diagram_ID: int
     Name: str | None
@@ -75,7 +88,7 @@ class QeaDiagram:
     Notes: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class QeaDiagramObject:
     Diagram_ID: int
     Object_ID: int
@@ -86,14 +99,14 @@ class QeaDiagramObject:
     ObjectStyle: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class QeaTaggedValue:
     Object_ID: int
     Property: str | None
     Value: str | None
 
 
-@dataclass
+@dataclass(slots=True)
 class QeaAttribute:
     Object_ID: int
     Name: str | None
@@ -106,183 +119,280 @@ class QeaAttribute:
     Scope: str | None = None
 
 
-async def read_packages(db_path: str) -> list[QeaPackage]:
-    """Read all packages from a .qea file."""
-    async with aiosqlite.connect(db_path) as db:
-        cursor = await db.execute(
-            "SELECT Package_ID, Name, Parent_ID, ea_guid, Notes FROM t_package"
-        )
-        rows = await cursor.fetchall()
-        return [
-            QeaPackage(
-                Package_ID=row[0],
-                Name=row[1],
-                Parent_ID=row[2] or 0,
-                ea_guid=row[3],
-                Notes=row[4],
-            )
-            for row in rows
-        ]
+def _package(row: aiosqlite.Row) -> QeaPackage:
+    return QeaPackage(
+        Package_ID=row[0],
+        Name=row[1],
+        Parent_ID=row[2] or 0,
+        ea_guid=row[3],
+        Notes=row[4],
+    )
 
 
-async def read_elements(db_path: str) -> list[QeaElement]:
-    """Read all elements from a .qea file."""
-    async with aiosqlite.connect(db_path) as db:
-        cursor = await db.execute(
+def _element(row: aiosqlite.Row) -> QeaElement:
+    return QeaElement(
+        Object_ID=row[0],
+        Object_Type=row[1],
+        Name=row[2],
+        Package_ID=row[3] or 0,
+        Note=row[4],
+        ea_guid=row[5],
+        Status=row[6],
+        Stereotype=row[7],
+        Version=row[8],
+        Scope=row[9],
+        Abstract=row[10],
+        Persistence=row[11],
+        Author=row[12],
+        Complexity=row[13],
+        Phase=row[14],
+        CreatedDate=row[15],
+        ModifiedDate=row[16],
+        GenType=row[17],
+        Backcolor=row[18],
+        Fontcolor=row[19],
+        Bordercolor=row[20],
+        BorderWidth=row[21],
+    )
+
+
+def _connector(row: aiosqlite.Row) -> QeaConnector:
+    return QeaConnector(
+        Connector_ID=row[0],
+        Connector_Type=row[1],
+        Name=row[2],
+        Start_Object_ID=row[3] or 0,
+        End_Object_ID=row[4] or 0,
+        ea_guid=row[5],
+        Notes=row[6],
+        Direction=row[7],
+        SourceCard=row[8],
+        DestCard=row[9],
+        SourceRole=row[10],
+        DestRole=row[11],
+        Stereotype=row[12],
+        RouteStyle=row[13],
+        SourceIsNavigable=str(row[14]) if row[14] is not None else None,
+        DestIsNavigable=str(row[15]) if row[15] is not None else None,
+        LineColor=row[16],
+        IsBold=row[17],
+        LineStyle=row[18],
+    )
+
+
+def _diagram(row: aiosqlite.Row) -> QeaDiagram:
+    return QeaDiagram(
+        Diagram_ID=row[0],
+        Name=row[1],
+        Diagram_Type=row[2],
+        Package_ID=row[3] or 0,
+        ea_guid=row[4],
+        Notes=row[5],
+    )
+
+
+def _diagram_object(row: aiosqlite.Row) -> QeaDiagramObject:
+    return QeaDiagramObject(
+        Diagram_ID=row[0] or 0,
+        Object_ID=row[1] or 0,
+        RectTop=row[2] or 0,
+        RectBottom=row[3] or 0,
+        RectLeft=row[4] or 0,
+        RectRight=row[5] or 0,
+        ObjectStyle=row[6],
+    )
+
+
+def _attribute(row: aiosqlite.Row) -> QeaAttribute:
+    return QeaAttribute(
+        Object_ID=row[0] or 0,
+        Name=row[1],
+        Type=row[2],
+        Notes=row[3],
+        Default=row[4],
+        LowerBound=row[5],
+        UpperBound=row[6],
+        Stereotype=row[7],
+        Scope=row[8],
+    )
+
+
+def _tagged_value(row: aiosqlite.Row) -> QeaTaggedValue:
+    return QeaTaggedValue(
+        Object_ID=row[0] or 0,
+        Property=row[1],
+        Value=row[2],
+    )
+
+
+class QeaReader:
+    """Streams records from a .qea file over a single connection.
+
+    Use as ``async with QeaReader(path) as reader:``. Each method is an async
+    generator; rows are converted as they are fetched, so only the records
+    the caller keeps stay in memory.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self._db_path = db_path
+        self._db: aiosqlite.Connection | None = None
+
+    async def __aenter__(self) -> Self:
+        self._db = await aiosqlite.connect(self._db_path)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    async def _rows(self, sql: str) -> AsyncIterator[aiosqlite.Row]:
+        if self._db is None:
+            msg = "QeaReader is not open"
+            raise RuntimeError(msg)
+        async with self._db.execute(sql) as cursor:
+            async for row in cursor:
+                yield row
+
+    async def _grouped(
+        self, sql: str, build: Callable[[aiosqlite.Row], _T],
+    ) -> AsyncIterator[tuple[int, list[_T]]]:
+        # sql orders by its first column; yield one (key, records) per run
+        key: int | None = None
+        group: list[_T] = []
+        async for row in self._rows(sql):
+            row_key = row[0] or 0
+            if group and row_key != key:
+                yield key, group  # type: ignore[misc]
+                group = []
+            key = row_key
+            group.append(build(row))
+        if group:
+            yield key, group  # type: ignore[misc]
+
+    async def packages(self) -> AsyncIterator[QeaPackage]:
+        """Yield every package."""
+        async for row in self._rows(
+            "SELECT Package_ID, Name, Parent_ID, ea_guid, Notes FROM t_package"
+        ):
+            yield _package(row)
+
+    async def elements(self) -> AsyncIterator[QeaElement]:
+        """Yield every element."""
+        async for row in self._rows(
             "SELECT Object_ID, Object_Type, Name, Package_ID, Note, ea_guid, "
             "Status, Stereotype, Version, Scope, Abstract, Persistence, "
             "Author, Complexity, Phase, CreatedDate, ModifiedDate, GenType, "
             "Backcolor, Fontcolor, Bordercolor, BorderWidth "
             "FROM t_object"
-        )
-        rows = await cursor.fetchall()
-        return [
-            QeaElement(
-                Object_ID=row[0],
-                Object_Type=row[1],
-                Name=row[2],
-                Package_ID=row[3] or 0,
-                Note=row[4],
-                ea_guid=row[5],
-                Status=row[6],
-                Stereotype=row[7],
-                Version=row[8],
-                Scope=row[9],
-                Abstract=row[10],
-                Persistence=row[11],
-                Author=row[12],
-                Complexity=row[13],
-                Phase=row[14],
-                CreatedDate=row[15],
-                ModifiedDate=row[16],
-                GenType=row[17],
-                Backcolor=row[18],
-                Fontcolor=row[19],
-                Bordercolor=row[20],
-                BorderWidth=row[21],
-            )
-            for row in rows
-        ]
-
+        ):
+            yield _element(row)
 
-async def read_connectors(db_path: str) -> list[QeaConnector]:
-    """Read all connectors from a .qea file."""
-    async with aiosqlite.connect(db_path) as db:
-        cursor = await db.execute(
+    async def connectors(self) -> AsyncIterator[QeaConnector]:
+        """Yield every connector."""
+        async for row in self._rows(
             "SELECT Connector_ID, Connector_Type, Name, "
             "Start_Object_ID, End_Object_ID, ea_guid, Notes, "
             "Direction, SourceCard, DestCard, SourceRole, DestRole, "
             "Stereotype, RouteStyle, SourceIsNavigable, DestIsNavigable, "
             "LineColor, IsBold, LineStyle "
             "FROM t_connector"
+        ):
+            yield _connector(row)
+
+    async def diagrams(self) -> AsyncIterator[QeaDiagram]:
+        """Yield every diagram in Diagram_ID order."""
+        async for row in self._rows(
+            "SELECT Diagram_ID, Name, Diagram_Type, Package_ID, ea_guid, Notes "
+            "FROM t_diagram ORDER BY Diagram_ID"
+        ):
+            yield _diagram(row)
+
+    def diagram_objects_by_diagram(
+        self,
+    ) -> AsyncIterator[tuple[int, list[QeaDiagramObject]]]:
+        """Yield (Diagram_ID, placements) per diagram in Diagram_ID order."""
+        return self._grouped(
+            "SELECT Diagram_ID, Object_ID, RectTop, RectBottom, "
+            "RectLeft, RectRight, ObjectStyle FROM t_diagramobjects "
+            "ORDER BY Diagram_ID, rowid",
+            _diagram_object,
         )
-        rows = await cursor.fetchall()
-        return [
-            QeaConnector(
-                Connector_ID=row[0],
-                Connector_Type=row[1],
-                Name=row[2],
-                Start_Object_ID=row[3] or 0,
-                End_Object_ID=row[4] or 0,
-                ea_guid=row[5],
-                Notes=row[6],
-                Direction=row[7],
-                SourceCard=row[8],
-                DestCard=row[9],
-                SourceRole=row[10],
-                DestRole=row[11],
-                Stereotype=row[12],
-                RouteStyle=row[13],
-                SourceIsNavigable=str(row[14]) if row[14] is not None else None,
-                DestIsNavigable=str(row[15]) if row[15] is not None else None,
-                LineColor=row[16],
-                IsBold=row[17],
-                LineStyle=row[18],
-            )
-            for row in rows
-        ]
+
+    def attributes_by_object(self) -> AsyncIterator[tuple[int, list[QeaAttribute]]]:
+        """Yield (Object_ID, attributes in Pos order) per element."""
+        return self._grouped(
+            'SELECT Object_ID, Name, Type, Notes, "Default", '
+            "LowerBound, UpperBound, Stereotype, Scope "
+            "FROM t_attribute ORDER BY Object_ID, Pos",
+            _attribute,
+        )
+
+    def tagged_values_by_object(
+        self,
+    ) -> AsyncIterator[tuple[int, list[QeaTaggedValue]]]:
+        """Yield (Object_ID, tagged values) per element."""
+        return self._grouped(
+            "SELECT Object_ID, Property, Value FROM t_objectproperties "
+            "ORDER BY Object_ID, rowid",
+            _tagged_value,
+        )
+
+
+async def read_packages(db_path: str) -> list[QeaPackage]:
+    """Read all packages from a .qea file."""
+    async with QeaReader(db_path) as reader:
+        return [pkg async for pkg in reader.packages()]
+
+
+async def read_elements(db_path: str) -> list[QeaElement]:
+    """Read all elements from a .qea file."""
+    async with QeaReader(db_path) as reader:
+        return [elem async for elem in reader.elements()]
+
+
+async def read_connectors(db_path: str) -> list[QeaConnector]:
+    """Read all connectors from a .qea file."""
+    async with QeaReader(db_path) as reader:
+        return [conn async for conn in reader.connectors()]
 
 
 async def read_diagrams(db_path: str) -> list[QeaDiagram]:
     """Read all diagrams from a .qea file."""
-    async with aiosqlite.connect(db_path) as db:
-        cursor = await db.execute(
-            "SELECT Diagram_ID, Name, Diagram_Type, Package_ID, ea_guid, Notes "
-            "FROM t_diagram"
-        )
-        rows = await cursor.fetchall()
-        return [
-            QeaDiagram(
-                Diagram_ID=row[0],
-                Name=row[1],
-                Diagram_Type=row[2],
-                Package_ID=row[3] or 0,
-                ea_guid=row[4],
-                Notes=row[5],
-            )
-            for row in rows
-        ]
+    async with QeaReader(db_path) as reader:
+        return [diag async for diag in reader.diagrams()]
 
 
 async def read_diagram_objects(db_path: str) -> list[QeaDiagramObject]:
     """Read all diagram object placements from a .qea file."""
-    async with aiosqlite.connect(db_path) as db:
-        cursor = await db.execute(
-            "SELECT Diagram_ID, Object_ID, RectTop, RectBottom, "
-            "RectLeft, RectRight, ObjectStyle FROM t_diagramobjects"
-        )
-        rows = await cursor.fetchall()
+    async with QeaReader(db_path) as reader:
         return [
-            QeaDiagramObject(
-                Diagram_ID=row[0] or 0,
-                Object_ID=row[1] or 0,
-                RectTop=row[2] or 0,
-                RectBottom=row[3] or 0,
-                RectLeft=row[4] or 0,
-                RectRight=row[5] or 0,
-                ObjectStyle=row[6],
-            )
-            for row in rows
+            dobj
+            async for _, group in reader.diagram_objects_by_diagram()
+            for dobj in group
         ]
 
 
 async def read_attributes(db_path: str) -> list[QeaAttribute]:
     """Read all element attributes from a .qea file."""
-    async with aiosqlite.connect(db_path) as db:
-        cursor = await db.execute(
-            'SELECT Object_ID, Name, Type, Notes, "Default", '
-            "LowerBound, UpperBound, Stereotype, Scope "
-            "FROM t_attribute ORDER BY Pos"
-        )
-        rows = await cursor.fetchall()
+    async with QeaReader(db_path) as reader:
         return [
-            QeaAttribute(
-                Object_ID=row[0] or 0,
-                Name=row[1],
-                Type=row[2],
-                Notes=row[3],
-                Default=row[4],
-                LowerBound=row[5],
-                UpperBound=row[6],
-                Stereotype=row[7],
-                Scope=row[8],
-            )
-            for row in rows
+            attr
+            async for _, group in reader.attributes_by_object()
+            for attr in group
         ]
 
 
 async def read_tagged_values(db_path: str) -> list[QeaTaggedValue]:
     """Read all tagged values from a .qea file."""
-    async with aiosqlite.connect(db_path) as db:
-        cursor = await db.execute(
-            "SELECT Object_ID, Property, Value FROM t_objectproperties"
-        )
-        rows = await cursor.fetchall()
+    async with QeaReader(db_path) as reader:
         return [
-            QeaTaggedValue(
-                Object_ID=row[0] or 0,
-                Property=row[1],
-                Value=row[2],
-            )
-            for row in rows
+            tv
+            async for _, group in reader.tagged_values_by_object()
+            for tv in group
         ]
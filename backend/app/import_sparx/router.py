@@ -4,80 +4,115 @@ from __future__ import annotations
 
 import os
 import tempfile
+from dataclasses import asdict
+from typing import TYPE_CHECKING
 
-from fastapi import APIRouter, Depends, Form, HTTPException, Request, UploadFile
+from fastapi import APIRouter, Depends, Form, HTTPException, UploadFile
 
 from app.auth.dependencies import get_current_user
-from app.import_sparx.eap_converter import convert_eap_to_sqlite
-from app.import_sparx.service import import_sparx_file
+from app.database import get_import_jobs, get_read_db
+from app.import_sparx.eap_converter import is_jet4_file
+from app.import_sparx.jobs import MODES, ImportJobManager
+from app.import_sparx.models import ImportJobResponse
+
+if TYPE_CHECKING:
+    import aiosqlite
+
+    from app.import_sparx.jobs import ImportJob
 
 router = APIRouter(prefix="/api/import", tags=["import"])
 
+# Bytes copied from the upload to disk per read
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _job_response(job: ImportJob) -> ImportJobResponse:
+    return ImportJobResponse(**asdict(job))
+
 
-@router.post("/sparx")
+def _get_visible_job(
+    jobs: ImportJobManager, job_id: str, current_user: dict,
+) -> ImportJob:
+    """Return a job its creator or an admin may see, else raise 404."""
+    job = jobs.get(job_id)
+    if job is None or (
+        job.created_by != current_user["id"] and current_user["role"] != "admin"
+    ):
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+
+@router.post("/sparx", response_model=ImportJobResponse, status_code=202)
 async def import_sparx(
     file: UploadFile,
-    request: Request,
+    *,
     current_user: dict = Depends(get_current_user),  # noqa: B008
     set_id: str | None = Form(default=None),  # noqa: B008
-) -> dict:
-    """Import a SparxEA .qea or .eap file."""
+    mode: str = Form(default="import"),
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
+    jobs: ImportJobManager = Depends(get_import_jobs),  # noqa: B008
+) -> ImportJobResponse:
+    """Upload a SparxEA .qea or .eap file and start importing it in the background.
+
+    mode "sync" re-syncs the set from the file: changed objects get a new
+    version and objects no longer in the file are removed.
+    """
     if not file.filename or not file.filename.endswith((".qea", ".eap")):
         raise HTTPException(
             status_code=400, detail="File must have .qea or .eap extension"
         )
+    if mode not in MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(MODES)}")
+    if mode == "sync" and not set_id:
+        raise HTTPException(status_code=400, detail="Sync requires set_id")
+
+    # Validate set_id if provided
+    if set_id:
+        cursor = await db.execute(
+            "SELECT id FROM sets WHERE id = ? AND is_deleted = 0",
+            (set_id,),
+        )
+        if await cursor.fetchone() is None:
+            raise HTTPException(status_code=400, detail="Invalid set_id")
 
     is_eap = file.filename.endswith(".eap")
     suffix = ".eap" if is_eap else ".qea"
 
-    # Save to temp file
+    # Stream to a temp file so large models are never held in memory
     with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
-        content = await file.read()
-        tmp.write(content)
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            tmp.write(chunk)
         tmp_path = tmp.name
 
-    sqlite_path: str | None = None
-    try:
-        db = request.app.state.db_manager.main_db
-        # Validate set_id if provided
-        if set_id:
-            cursor = await db.execute(
-                "SELECT id FROM sets WHERE id = ? AND is_deleted = 0",
-                (set_id,),
-            )
-            if await cursor.fetchone() is None:
-                raise HTTPException(status_code=400, detail="Invalid set_id")
-
-        # Convert EAP to SQLite if needed
-        if is_eap:
-            try:
-                sqlite_path = await convert_eap_to_sqlite(tmp_path)
-            except ValueError as exc:
-                raise HTTPException(status_code=400, detail=str(exc)) from exc
-            except RuntimeError as exc:
-                raise HTTPException(status_code=500, detail=str(exc)) from exc
-            import_path = sqlite_path
-        else:
-            import_path = tmp_path
-
-        summary = await import_sparx_file(
-            db, import_path, imported_by=current_user["id"], set_id=set_id,
-        )
-        return {
-            "packages_created": summary.packages_created,
-            "packages_skipped": summary.packages_skipped,
-            "elements_created": summary.elements_created,
-            "relationships_created": summary.relationships_created,
-            "diagrams_created": summary.diagrams_created,
-            "diagrams_skipped": summary.diagrams_skipped,
-            "elements_skipped": summary.elements_skipped,
-            "connectors_skipped": summary.connectors_skipped,
-            "package_relationships_created": summary.package_relationships_created,
-            "warnings": [
-                {"category": w.category, "message": w.message} for w in summary.warnings
-            ],
-        }
-    finally:
+    if is_eap and not is_jet4_file(tmp_path):
         os.unlink(tmp_path)
-        if sqlite_path:
-            os.unlink(sqlite_path)
+        raise HTTPException(status_code=400, detail="File is not a JET4 (MDB) file")
+
+    job = jobs.submit(
+        tmp_path, filename=file.filename, created_by=current_user["id"], set_id=set_id,
+        mode=mode,
+    )
+    return _job_response(job)
+
+
+@router.get("/sparx/{job_id}", response_model=ImportJobResponse)
+async def get_import_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),  # noqa: B008
+    jobs: ImportJobManager = Depends(get_import_jobs),  # noqa: B008
+) -> ImportJobResponse:
+    """Get the progress, and once finished the summary, of an import job."""
+    return _job_response(_get_visible_job(jobs, job_id, current_user))
+
+
+@router.post("/sparx/{job_id}/cancel", response_model=ImportJobResponse, status_code=202)
+async def cancel_import_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),  # noqa: B008
+    jobs: ImportJobManager = Depends(get_import_jobs),  # noqa: B008
+) -> ImportJobResponse:
+    """Request cancellation of a queued or running import job."""
+    job = _get_visible_job(jobs, job_id, current_user)
+    if not jobs.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Import job has already finished")
+    return _job_response(job)
@@ -2,33 +2,52 @@
 
 from __future__ import annotations
 
+import json
 import re
 import uuid
-from dataclasses import dataclass, field
+from contextlib import aclosing
+from dataclasses import astuple, dataclass, field
+from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
-from app.diagrams.service import create_diagram
-from app.elements.service import create_element
+from app.diagrams.element_refs import INSERT_REFS_SQL
+from app.diagrams.notation_detection import detect_notations
+from app.diagrams.registry_service import get_default_notation, validate_type_notation
+from app.diagrams.summary import UPDATE_SUMMARY_SQL
 from app.import_sparx.converter import build_edge_visual, build_node_visual, ea_rect_to_position
 from app.import_sparx.mapper import map_connector_type, map_diagram_type, map_object_type
 from app.import_sparx.reader import (
+    QeaAttribute,
+    QeaConnector,
+    QeaDiagram,
+    QeaDiagramObject,
     QeaElement,
     QeaPackage,
-    read_attributes,
-    read_connectors,
-    read_diagram_objects,
-    read_diagrams,
-    read_elements,
-    read_packages,
-    read_tagged_values,
+    QeaReader,
 )
-from app.package_relationships.service import create_package_relationship
-from app.packages.service import create_package
-from app.relationships.service import create_relationship
+from app.import_sparx.sync import (
+    UPSERT_SYNC_OBJECT_SQL,
+    SyncRecord,
+    content_hash,
+    diagram_hash,
+    element_hash,
+    get_watermark,
+    latest_modified,
+    load_sync_records,
+    load_unrecorded_relationships,
+    record_sync_state,
+    relationship_hash,
+    remove_missing,
+)
+from app.migrations.m012_sets import DEFAULT_SET_ID
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     import aiosqlite
 
+    from app.diagrams.thumbnail_queue import ThumbnailQueue
+
 
 @dataclass
 class ImportWarning:
@@ -47,6 +66,14 @@ class ImportSummary:
     elements_skipped: int = 0
     connectors_skipped: int = 0
     package_relationships_created: int = 0
+    elements_updated: int = 0
+    relationships_updated: int = 0
+    diagrams_updated: int = 0
+    elements_removed: int = 0
+    relationships_removed: int = 0
+    diagrams_removed: int = 0
+    previous_watermark: str | None = None
+    watermark: str | None = None
     warnings: list[ImportWarning] = field(default_factory=list)
 
 
@@ -102,514 +129,1058 @@ def _build_element_index(elements: list[QeaElement]) -> dict[int, QeaElement]:
     return {e.Object_ID: e for e in elements}
 
 
+# SparxEA GUID in version metadata; identical to the m032 index expression
+EA_GUID_SQL = (
+    "(CASE WHEN json_valid(metadata) THEN json_extract(metadata, '$.ea_guid') END)"
+)
+
+# (item table, version table, version foreign key) searched for GUIDs
+_GUID_TABLES = (
+    ("packages", "package_versions", "package_id"),
+    ("elements", "element_versions", "element_id"),
+    ("diagrams", "diagram_versions", "diagram_id"),
+)
+
+# One lookup per table. CROSS JOIN fixes the version table as the outer loop,
+# so rows are found through the m032 expression index and then joined to
+# their item by primary key, rather than scanning every item in the set
+_GUID_LOOKUP_SQL = tuple(
+    f"SELECT t.id, {EA_GUID_SQL} FROM {versions} "  # noqa: S608
+    f"CROSS JOIN {table} t ON t.id = {versions}.{fk} "
+    f"AND t.current_version = {versions}.version "
+    f"WHERE {versions}.metadata IS NOT NULL "
+    f"AND {EA_GUID_SQL} IN (SELECT value FROM json_each(?)) "
+    "AND t.set_id = ? AND t.is_deleted = 0"
+    for table, versions, fk in _GUID_TABLES
+)
+
+
 async def _build_guid_index(
-    db: "aiosqlite.Connection",
+    db: aiosqlite.Connection,
     set_id: str | None,
+    guids: set[str],
 ) -> dict[str, str]:
     """Build a GUID -> Iris ID lookup for existing items in a set.
 
-    Scans packages, elements, and diagrams metadata for ea_guid values.
+    Looks up only the given ea_guid values, through the m032 expression
+    indexes on package, element and diagram version metadata.
     Returns a dict mapping ea_guid to the existing Iris item ID.
     """
     guid_index: dict[str, str] = {}
-    if not set_id:
+    if not set_id or not guids:
         return guid_index
 
-    # Packages: ea_guid in metadata JSON via package_versions
-    cursor = await db.execute(
-        "SELECT p.id, pv.metadata FROM packages p "
-        "JOIN package_versions pv ON p.id = pv.package_id AND p.current_version = pv.version "
-        "WHERE p.set_id = ? AND p.is_deleted = 0",
-        (set_id,),
-    )
-    async for row in cursor:
-        if row[1]:
-            import json
-            try:
-                meta = json.loads(row[1])
-                if meta.get("ea_guid"):
-                    guid_index[meta["ea_guid"]] = row[0]
-            except (json.JSONDecodeError, TypeError):
-                pass
-
-    # Elements: ea_guid in metadata JSON via element_versions
-    cursor = await db.execute(
-        "SELECT e.id, ev.metadata FROM elements e "
-        "JOIN element_versions ev ON e.id = ev.element_id AND e.current_version = ev.version "
-        "WHERE e.set_id = ? AND e.is_deleted = 0",
-        (set_id,),
-    )
-    async for row in cursor:
-        if row[1]:
-            import json
-            try:
-                meta = json.loads(row[1])
-                if meta.get("ea_guid"):
-                    guid_index[meta["ea_guid"]] = row[0]
-            except (json.JSONDecodeError, TypeError):
-                pass
-
-    # Diagrams: ea_guid in metadata JSON via diagram_versions
-    cursor = await db.execute(
-        "SELECT d.id, dv.metadata FROM diagrams d "
-        "JOIN diagram_versions dv ON d.id = dv.diagram_id AND d.current_version = dv.version "
-        "WHERE d.set_id = ? AND d.is_deleted = 0",
-        (set_id,),
-    )
-    async for row in cursor:
-        if row[1]:
-            import json
-            try:
-                meta = json.loads(row[1])
-                if meta.get("ea_guid"):
-                    guid_index[meta["ea_guid"]] = row[0]
-            except (json.JSONDecodeError, TypeError):
-                pass
+    wanted = json.dumps(sorted(guids))
+    for sql in _GUID_LOOKUP_SQL:
+        cursor = await db.execute(sql, (wanted, set_id))
+        async for row in cursor:
+            guid_index[row[1]] = row[0]
 
     return guid_index
 
 
-async def import_sparx_file(
+_INSERT_PACKAGE_SQL = (
+    "INSERT INTO packages (id, current_version, "
+    "created_at, created_by, updated_at, parent_package_id, set_id) "
+    "VALUES (?, 1, ?, ?, ?, ?, ?)"
+)
+_INSERT_PACKAGE_VERSION_SQL = (
+    "INSERT INTO package_versions (package_id, version, name, description, "
+    "data, change_type, change_summary, created_at, created_by, metadata) "
+    "VALUES (?, 1, ?, ?, '{}', 'create', ?, ?, ?, ?)"
+)
+_INSERT_ELEMENT_SQL = (
+    "INSERT INTO elements (id, element_type, current_version, "
+    "created_at, created_by, updated_at, set_id, notation) "
+    "VALUES (?, ?, 1, ?, ?, ?, ?, 'simple')"
+)
+_INSERT_ELEMENT_VERSION_SQL = (
+    "INSERT INTO element_versions (element_id, version, name, description, "
+    "data, change_type, change_summary, created_at, created_by, metadata) "
+    "VALUES (?, 1, ?, ?, ?, 'create', ?, ?, ?, ?)"
+)
+_INSERT_RELATIONSHIP_SQL = (
+    "INSERT INTO relationships "
+    "(id, source_element_id, target_element_id, relationship_type, "
+    "current_version, created_at, created_by, updated_at) "
+    "VALUES (?, ?, ?, ?, 1, ?, ?, ?)"
+)
+_INSERT_RELATIONSHIP_VERSION_SQL = (
+    "INSERT INTO relationship_versions "
+    "(relationship_id, version, label, description, data, "
+    "change_type, created_at, created_by) "
+    "VALUES (?, 1, ?, ?, ?, 'create', ?, ?)"
+)
+# Duplicates of an existing (source, target, type) count as created, not skipped
+_INSERT_PACKAGE_RELATIONSHIP_SQL = (
+    "INSERT OR IGNORE INTO package_relationships "
+    "(id, source_package_id, target_package_id, relationship_type, label, description, "
+    "created_by, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_INSERT_DIAGRAM_SQL = (
+    "INSERT INTO diagrams (id, diagram_type, current_version, "
+    "created_at, created_by, updated_at, parent_package_id, set_id, "
+    "notation, detected_notations) "
+    "VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?, ?)"
+)
+_INSERT_DIAGRAM_VERSION_SQL = (
+    "INSERT INTO diagram_versions (diagram_id, version, name, description, "
+    "data, change_type, change_summary, created_at, created_by, metadata) "
+    "VALUES (?, 1, ?, ?, ?, 'create', ?, ?, ?, ?)"
+)
+
+# Sync mode: new versions of recorded objects whose source content changed
+_UPDATE_ELEMENT_SQL = (
+    "UPDATE elements SET element_type = ?, current_version = ?, updated_at = ? "
+    "WHERE id = ?"
+)
+_INSERT_ELEMENT_UPDATE_VERSION_SQL = (
+    "INSERT INTO element_versions (element_id, version, name, description, "
+    "data, change_type, change_summary, created_at, created_by, metadata) "
+    "VALUES (?, ?, ?, ?, ?, 'update', ?, ?, ?, ?)"
+)
+_UPDATE_RELATIONSHIP_SQL = (
+    "UPDATE relationships SET source_element_id = ?, target_element_id = ?, "
+    "relationship_type = ?, current_version = ?, updated_at = ? WHERE id = ?"
+)
+_INSERT_RELATIONSHIP_UPDATE_VERSION_SQL = (
+    "INSERT INTO relationship_versions "
+    "(relationship_id, version, label, description, data, "
+    "change_type, change_summary, created_at, created_by) "
+    "VALUES (?, ?, ?, ?, ?, 'update', ?, ?, ?)"
+)
+_UPDATE_DIAGRAM_SQL = (
+    "UPDATE diagrams SET diagram_type = ?, current_version = ?, updated_at = ?, "
+    "parent_package_id = ?, notation = ?, detected_notations = ? WHERE id = ?"
+)
+_INSERT_DIAGRAM_UPDATE_VERSION_SQL = (
+    "INSERT INTO diagram_versions (diagram_id, version, name, description, "
+    "data, change_type, change_summary, created_at, created_by, metadata) "
+    "VALUES (?, ?, ?, ?, ?, 'update', ?, ?, ?, ?)"
+)
+_DELETE_DIAGRAM_REFS_SQL = "DELETE FROM diagram_element_refs WHERE diagram_id = ?"
+
+# Imported objects committed per transaction
+IMPORT_CHUNK_SIZE = 1000
+
+_Rows = list[tuple[object, ...]]
+
+
+async def _write_chunked(
     db: aiosqlite.Connection,
-    qea_path: str,
-    imported_by: str,
-    set_id: str | None = None,
-) -> ImportSummary:
-    """Import a SparxEA .qea file into Iris."""
-    summary = ImportSummary()
-
-    # 1. Read all data from .qea file
-    packages = await read_packages(qea_path)
-    elements = await read_elements(qea_path)
-    connectors = await read_connectors(qea_path)
-    diagrams = await read_diagrams(qea_path)
-    diagram_objects = await read_diagram_objects(qea_path)
-    attributes = await read_attributes(qea_path)
-    tagged_values = await read_tagged_values(qea_path)
-
-    # Build element index for fast lookups
-    element_index = _build_element_index(elements)
-
-    # Build tagged values lookup by Object_ID
-    tags_by_object: dict[int, list[dict[str, str | None]]] = {}
-    for tv in tagged_values:
-        tags_by_object.setdefault(tv.Object_ID, []).append(
-            {"property": tv.Property, "value": tv.Value}
+    batches: list[tuple[str, _Rows]],
+    on_chunk: Callable[[int], None] | None = None,
+) -> None:
+    """Insert parallel row lists with executemany, one transaction per chunk.
+
+    Row i of every list belongs to the same imported object, so a chunk
+    always commits whole objects (e.g. an element with its version and sync record).
+    on_chunk receives the number of objects written so far after each commit.
+    """
+    total = len(batches[0][1])
+    for start in range(0, total, IMPORT_CHUNK_SIZE):
+        for sql, rows in batches:
+            await db.executemany(sql, rows[start:start + IMPORT_CHUNK_SIZE])
+        await db.commit()
+        if on_chunk is not None:
+            on_chunk(min(start + IMPORT_CHUNK_SIZE, total))
+
+
+@dataclass(slots=True)
+class _DiagramChunk:
+    """Rows for up to IMPORT_CHUNK_SIZE new or changed diagrams, written together."""
+
+    diagrams: _Rows = field(default_factory=list)
+    versions: _Rows = field(default_factory=list)
+    canvases: _Rows = field(default_factory=list)
+    sync: _Rows = field(default_factory=list)
+    updates: _Rows = field(default_factory=list)
+    update_versions: _Rows = field(default_factory=list)
+    update_ids: _Rows = field(default_factory=list)
+    update_canvases: _Rows = field(default_factory=list)
+    update_sync: _Rows = field(default_factory=list)
+    thumbnails: list[tuple[str, dict[str, object], str, int]] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return len(self.diagrams) + len(self.updates)
+
+
+async def _write_diagram_chunk(
+    db: aiosqlite.Connection,
+    chunk: _DiagramChunk,
+    thumbnails: ThumbnailQueue | None,
+) -> None:
+    """Write a chunk of new and changed diagrams, then queue their thumbnails."""
+    await _write_chunked(db, [
+        (_INSERT_DIAGRAM_SQL, chunk.diagrams),
+        (_INSERT_DIAGRAM_VERSION_SQL, chunk.versions),
+        (INSERT_REFS_SQL, chunk.canvases),
+        (UPDATE_SUMMARY_SQL, chunk.canvases),
+        (UPSERT_SYNC_OBJECT_SQL, chunk.sync),
+    ])
+    await _write_chunked(db, [
+        (_UPDATE_DIAGRAM_SQL, chunk.updates),
+        (_INSERT_DIAGRAM_UPDATE_VERSION_SQL, chunk.update_versions),
+        (_DELETE_DIAGRAM_REFS_SQL, chunk.update_ids),
+        (INSERT_REFS_SQL, chunk.update_canvases),
+        (UPDATE_SUMMARY_SQL, chunk.update_canvases),
+        (UPSERT_SYNC_OBJECT_SQL, chunk.update_sync),
+    ])
+    # Thumbnails render in the background (or lazily on first request)
+    if thumbnails is not None:
+        for diagram_id, model_data, diagram_type, version in chunk.thumbnails:
+            thumbnails.enqueue(diagram_id, model_data, diagram_type, version)
+
+
+def _phase_reporter(
+    on_progress: Callable[[str, int, int], None] | None,
+    phase: str,
+    total: int,
+    offset: int = 0,
+) -> Callable[[int], None] | None:
+    """Report the start of a write phase and return its per-chunk callback.
+
+    A non-zero offset continues a phase already started by an earlier batch.
+    """
+    if on_progress is None:
+        return None
+    if not offset:
+        on_progress(phase, offset, total)
+
+    def report(written: int) -> None:
+        on_progress(phase, offset + written, total)
+
+    return report
+
+
+async def _resolve_notation(
+    db: aiosqlite.Connection,
+    diagram_type: str,
+    notation: str,
+    cache: dict[tuple[str, str], str],
+) -> str:
+    """Notation create_diagram would store for a (type, notation) pair, memoized."""
+    key = (diagram_type, notation)
+    if key not in cache:
+        if await validate_type_notation(db, diagram_type, notation):
+            cache[key] = notation
+        else:
+            cache[key] = await get_default_notation(db, diagram_type) or "simple"
+    return cache[key]
+
+
+def _package_metadata(
+    pkg: QeaPackage,
+    pkg_elem: QeaElement | None,
+    tags_by_object: dict[int, list[dict[str, str | None]]],
+) -> dict[str, object] | None:
+    """Metadata for an imported package from its package-type element and tags."""
+    md: dict[str, object] = {}
+    if pkg.ea_guid:
+        md["ea_guid"] = pkg.ea_guid
+    if pkg_elem:
+        for field_name in ("Status", "Stereotype", "Version", "Scope",
+                           "Author", "Complexity", "Phase", "CreatedDate",
+                           "ModifiedDate", "GenType"):
+            val = getattr(pkg_elem, field_name, None)
+            if val:
+                md[field_name.lower()] = val
+        # Include tagged values from the package-type element
+        elem_tvs = tags_by_object.get(pkg_elem.Object_ID, [])
+        if elem_tvs:
+            md["tagged_values"] = elem_tvs
+    return md or None
+
+
+def _element_metadata(  # noqa: PLR0912
+    elem: QeaElement,
+    tags_by_object: dict[int, list[dict[str, str | None]]],
+) -> dict[str, object] | None:
+    """Metadata for an imported element from its EA columns and tags."""
+    em: dict[str, object] = {}
+    if elem.ea_guid:
+        em["ea_guid"] = elem.ea_guid
+    if elem.Status:
+        em["status"] = elem.Status
+    if elem.Stereotype:
+        em["stereotype"] = elem.Stereotype
+    if elem.Version:
+        em["version"] = elem.Version
+    if elem.Scope:
+        em["scope"] = elem.Scope
+    if elem.Abstract == "1":
+        em["abstract"] = True
+    if elem.Persistence:
+        em["persistence"] = elem.Persistence
+    if elem.Author:
+        em["author"] = elem.Author
+    if elem.Complexity and elem.Complexity != "2":
+        em["complexity"] = elem.Complexity
+    if elem.Phase:
+        em["phase"] = elem.Phase
+    if elem.CreatedDate:
+        em["created_date"] = elem.CreatedDate
+    if elem.ModifiedDate:
+        em["modified_date"] = elem.ModifiedDate
+    if elem.GenType:
+        em["gen_type"] = elem.GenType
+    obj_tags = tags_by_object.get(elem.Object_ID)
+    if obj_tags:
+        em["tagged_values"] = obj_tags
+    return em or None
+
+
+_ROUTE_STYLES = {0: "bezier", 1: "step", 2: "step", 3: "step", 4: "step", 5: "step"}
+
+
+def _build_canvas(  # noqa: PLR0912, PLR0915
+    dobjs: list[QeaDiagramObject],
+    connectors: list[QeaConnector],
+    element_map: dict[int, str],
+    element_index: dict[int, QeaElement],
+    attrs_by_object: dict[int, list[QeaAttribute]],
+) -> dict[str, object]:
+    """Build the canvas nodes and edges for an imported diagram."""
+    nodes: list[dict[str, object]] = []
+    edges: list[dict[str, object]] = []
+
+    for dobj in dobjs:
+        element_id = element_map.get(dobj.Object_ID)
+        if not element_id:
+            continue
+
+        pos = ea_rect_to_position(
+            dobj.RectLeft, dobj.RectRight, dobj.RectTop, dobj.RectBottom,
         )
 
-    # Build package-type element lookup (for Status/Stereotype on packages)
-    pkg_type_elements: dict[int, QeaElement] = {}
-    for elem in elements:
-        if elem.Object_Type == "Package":
-            pkg_type_elements[elem.Package_ID] = elem
+        # Find the element to get its type and name
+        elem = element_index.get(dobj.Object_ID)
+        iris_type_str = (
+            map_object_type(elem.Object_Type) if elem and elem.Object_Type else "component"
+        )
 
-    # Build reverse map: element Object_ID -> Package_ID (for Package->Package deps)
-    element_to_package: dict[int, int] = {}
-    for elem in elements:
-        if elem.Object_Type == "Package":
-            element_to_package[elem.Object_ID] = elem.Package_ID
+        node_id = str(uuid.uuid4())
+        # Derive label for notes/boundaries with NULL Name
+        if elem and iris_type_str in ("note", "boundary") and not elem.Name:
+            node_label = derive_note_label(elem.Note, "Unknown")
+        else:
+            node_label = (elem.Name or "Unknown") if elem else "Unknown"
+
+        node_data: dict[str, object] = {
+            "label": node_label,
+            "entityType": iris_type_str or "component",
+            "entityId": element_id,
+        }
+        # Always populate description from element's Note content
+        if elem and elem.Note:
+            node_data["description"] = elem.Note
+        # Store stereotype for theme resolution
+        if elem and elem.Stereotype:
+            node_data["stereotype"] = elem.Stereotype
+
+        # Build visual overrides from EA style data
+        node_visual = build_node_visual(
+            dobj.ObjectStyle,
+            elem.Backcolor if elem else None,
+            elem.Fontcolor if elem else None,
+            elem.Bordercolor if elem else None,
+            elem.BorderWidth if elem else None,
+        )
+        # Include explicit dimensions from EA in visual overrides
+        visual_with_size: dict[str, object] = node_visual or {}
+        visual_with_size["width"] = pos["width"]
+        visual_with_size["height"] = pos["height"]
+        node_data["visual"] = visual_with_size
+
+        # Thread element attributes to canvas node for compartment rendering
+        obj_attrs = attrs_by_object.get(dobj.Object_ID)
+        if obj_attrs:
+            node_data["attributes"] = [
+                {"name": a.Name or "", "type": a.Type or "", "scope": a.Scope}
+                for a in obj_attrs
+            ]
 
-    # Build GUID index for idempotent re-import
-    guid_index = await _build_guid_index(db, set_id)
+        nodes.append({
+            "id": node_id,
+            "type": iris_type_str or "component",
+            "position": {"x": pos["x"], "y": pos["y"]},
+            "data": node_data,
+            "measured": {
+                "width": pos["width"],
+                "height": pos["height"],
+            },
+        })
+
+    # Build edges from connectors that connect nodes on this diagram
+    node_entity_to_node_id: dict[str, str] = {}
+    for n in nodes:
+        data = n.get("data")
+        if isinstance(data, dict):
+            eid = data.get("entityId")
+            if eid:
+                node_entity_to_node_id[eid] = n["id"]  # type: ignore[assignment]
 
-    # 2. Build package hierarchy -> create Iris packages
-    # Map ea_package_id -> iris_package_id
+    for conn in connectors:
+        source_eid = element_map.get(conn.Start_Object_ID)
+        target_eid = element_map.get(conn.End_Object_ID)
+        if not source_eid or not target_eid:
+            continue
+        source_node = node_entity_to_node_id.get(source_eid)
+        target_node = node_entity_to_node_id.get(target_eid)
+        if not source_node or not target_node:
+            continue
+
+        iris_conn_type = (
+            map_connector_type(conn.Connector_Type) if conn.Connector_Type else "association"
+        ) or "association"
+
+        # Build edge metadata
+        edge_data: dict[str, object] = {
+            "relationshipType": iris_conn_type,
+            "label": conn.Name or "",
+        }
+        if conn.SourceCard:
+            edge_data["sourceCardinality"] = conn.SourceCard
+        if conn.DestCard:
+            edge_data["targetCardinality"] = conn.DestCard
+        if conn.SourceRole:
+            edge_data["sourceRole"] = conn.SourceRole
+        if conn.DestRole:
+            edge_data["targetRole"] = conn.DestRole
+        if conn.Stereotype:
+            edge_data["stereotype"] = conn.Stereotype
+        if conn.Direction:
+            edge_data["direction"] = conn.Direction
+        if conn.RouteStyle is not None:
+            edge_data["routingType"] = _ROUTE_STYLES.get(conn.RouteStyle, "bezier")
+
+        # Build edge visual overrides
+        edge_visual = build_edge_visual(
+            conn.LineColor, conn.IsBold, conn.LineStyle,
+        )
+        if edge_visual:
+            edge_data["visual"] = edge_visual
+
+        # Self-loop edge
+        if source_node == target_node:
+            edges.append({
+                "id": str(uuid.uuid4()),
+                "source": source_node,
+                "target": target_node,
+                "type": "self_loop",
+                "sourceHandle": "right",
+                "targetHandle": "top",
+                "data": edge_data,
+            })
+        else:
+            edges.append({
+                "id": str(uuid.uuid4()),
+                "source": source_node,
+                "target": target_node,
+                "type": iris_conn_type,
+                "data": edge_data,
+            })
+
+    return {"nodes": nodes, "edges": edges}
+
+
+@dataclass(slots=True)
+class _ImportRun:
+    """State shared by the phases of one import_sparx_file call."""
+
+    db: aiosqlite.Connection
+    source: aiosqlite.Connection
+    imported_by: str
+    set_id: str
+    sync: bool
+    now: str
+    on_progress: Callable[[str, int, int], None] | None
+    attrs_by_object: dict[int, list[QeaAttribute]]
+    tags_by_object: dict[int, list[dict[str, str | None]]]
+    summary: ImportSummary = field(default_factory=ImportSummary)
+    # ea_guid -> existing Iris ID, for idempotent re-import
+    guid_index: dict[str, str] = field(default_factory=dict)
+    # Sync state: recorded objects by ea_guid, and those matched in this file
+    sync_records: dict[str, SyncRecord] = field(default_factory=dict)
+    unrecorded_relationships: dict[tuple[str, str, str], str] = field(default_factory=dict)
+    seen_guids: set[str] = field(default_factory=set)
+    # Sync records for existing objects matched without one
+    baseline_sync_rows: _Rows = field(default_factory=list)
+
+    def match_record(self, guid: str | None, object_type: str) -> SyncRecord | None:
+        """Recorded object of object_type for guid, marked as seen in this file."""
+        record = self.sync_records.get(guid) if guid else None
+        if record is None or record.object_type != object_type:
+            return None
+        self.seen_guids.add(guid)  # type: ignore[arg-type]
+        return record
+
+    def sync_row(
+        self, guid: str | None, object_type: str, object_id: str, content: str,
+    ) -> tuple[object, ...]:
+        """Row for UPSERT_SYNC_OBJECT_SQL recording an object in this set."""
+        return (self.set_id, guid, object_type, object_id, content)
+
+
+async def _import_packages(
+    run: _ImportRun,
+    packages: list[QeaPackage],
+    pkg_type_elements: dict[int, QeaElement],
+) -> dict[int, str]:
+    """Create Iris packages for the EA package hierarchy.
+
+    Returns a map of ea_package_id -> iris_package_id. Parents precede
+    children, so the closure triggers see each parent before its children.
+    """
     package_map: dict[int, str] = {}
+    package_rows: _Rows = []
+    package_version_rows: _Rows = []
 
     for pkg in _topo_sort_packages(packages):
         # Skip if package already exists (idempotent re-import)
-        if pkg.ea_guid and pkg.ea_guid in guid_index:
-            package_map[pkg.Package_ID] = guid_index[pkg.ea_guid]
-            summary.packages_skipped += 1
+        if pkg.ea_guid and pkg.ea_guid in run.guid_index:
+            package_map[pkg.Package_ID] = run.guid_index[pkg.ea_guid]
+            run.summary.packages_skipped += 1
             continue
 
-        parent_iris_id = package_map.get(pkg.Parent_ID)
-        # Build metadata from package-type element and tagged values
-        pkg_metadata: dict[str, object] | None = None
-        pkg_elem = pkg_type_elements.get(pkg.Package_ID)
-        md: dict[str, object] = {}
-        if pkg.ea_guid:
-            md["ea_guid"] = pkg.ea_guid
-        if pkg_elem:
-            for field in ("Status", "Stereotype", "Version", "Scope",
-                          "Author", "Complexity", "Phase", "CreatedDate",
-                          "ModifiedDate", "GenType"):
-                val = getattr(pkg_elem, field, None)
-                if val:
-                    md[field.lower()] = val
-            # Include tagged values from the package-type element
-            elem_tvs = tags_by_object.get(pkg_elem.Object_ID, [])
-            if elem_tvs:
-                md["tagged_values"] = elem_tvs
-        if md:
-            pkg_metadata = md
-
-        package = await create_package(
-            db,
-            name=pkg.Name or f"Package {pkg.Package_ID}",
-            description=pkg.Notes,
-            created_by=imported_by,
-            parent_package_id=parent_iris_id,
-            set_id=set_id,
-            metadata=pkg_metadata,
-            change_summary=f"Imported from SparxEA ({pkg.Name})",
+        package_id = str(uuid.uuid4())
+        pkg_metadata = _package_metadata(
+            pkg, pkg_type_elements.get(pkg.Package_ID), run.tags_by_object,
+        )
+        package_rows.append((
+            package_id, run.now, run.imported_by, run.now,
+            package_map.get(pkg.Parent_ID), run.set_id,
+        ))
+        package_version_rows.append((
+            package_id, pkg.Name or f"Package {pkg.Package_ID}", pkg.Notes,
+            f"Imported from SparxEA ({pkg.Name})", run.now, run.imported_by,
+            json.dumps(pkg_metadata) if pkg_metadata else None,
+        ))
+        package_map[pkg.Package_ID] = package_id
+        run.summary.packages_created += 1
+
+    await _write_chunked(run.db, [
+        (_INSERT_PACKAGE_SQL, package_rows),
+        (_INSERT_PACKAGE_VERSION_SQL, package_version_rows),
+    ], _phase_reporter(run.on_progress, "packages", len(package_rows)))
+    return package_map
+
+
+def _element_data(attrs: list[QeaAttribute]) -> dict[str, object]:
+    """Version data for an imported element: its class attributes, if any."""
+    if not attrs:
+        return {}
+    return {"attributes": [
+        {
+            "name": a.Name or "",
+            "type": a.Type or "",
+            "notes": a.Notes,
+            "default": a.Default,
+            "lower_bound": a.LowerBound,
+            "upper_bound": a.UpperBound,
+            "stereotype": a.Stereotype,
+            "scope": a.Scope,
+        }
+        for a in attrs
+    ]}
+
+
+def _element_name(elem: QeaElement, iris_type: str) -> str:
+    """Name of an imported element; Notes and Boundaries without one get a label."""
+    if iris_type in ("note", "boundary") and not elem.Name:
+        return derive_note_label(
+            elem.Note,
+            f"{'Note' if iris_type == 'note' else 'Boundary'} {elem.Object_ID}",
         )
-        package_map[pkg.Package_ID] = package["id"]  # type: ignore[assignment]
-        summary.packages_created += 1
+    return elem.Name or f"Element {elem.Object_ID}"
 
-    # 3. Create elements for EA elements
-    # Map ea_object_id -> iris_element_id
-    element_map: dict[int, str] = {}
 
-    # Build attribute lookup by Object_ID
-    attrs_by_object: dict[int, list[object]] = {}
-    for attr in attributes:
-        attrs_by_object.setdefault(attr.Object_ID, []).append(attr)
+async def _import_elements(
+    run: _ImportRun,
+    elements: list[QeaElement],
+) -> tuple[dict[int, str], dict[int, str]]:
+    """Create elements for EA elements; in sync mode, version-bump changed ones.
+
+    Returns maps of ea_object_id -> iris_element_id and ea_object_id -> content hash.
+    """
+    element_map: dict[int, str] = {}
+    element_hashes: dict[int, str] = {}
+    rows: _Rows = []
+    version_rows: _Rows = []
+    sync_rows: _Rows = []
+    update_rows: _Rows = []
+    update_version_rows: _Rows = []
+    update_sync_rows: _Rows = []
 
     for elem in elements:
-        if elem.Object_Type is None:
-            summary.elements_skipped += 1
-            continue
+        content = element_hash(
+            elem,
+            run.attrs_by_object.get(elem.Object_ID, ()),
+            run.tags_by_object.get(elem.Object_ID, ()),
+        )
+        element_hashes[elem.Object_ID] = content
 
-        iris_type = map_object_type(elem.Object_Type)
+        iris_type = map_object_type(elem.Object_Type) if elem.Object_Type is not None else None
         if iris_type is None:
-            summary.elements_skipped += 1
+            run.summary.elements_skipped += 1
             continue
         if iris_type == "_package":
             continue  # Already handled as hierarchy
 
-        element_data: dict[str, object] = {}
-        # Add class attributes if present (rich object format)
-        obj_attrs = attrs_by_object.get(elem.Object_ID, [])
-        if obj_attrs:
-            element_data["attributes"] = [
-                {
-                    "name": a.Name or "",  # type: ignore[union-attr]
-                    "type": a.Type or "",  # type: ignore[union-attr]
-                    "notes": a.Notes,  # type: ignore[union-attr]
-                    "default": a.Default,  # type: ignore[union-attr]
-                    "lower_bound": a.LowerBound,  # type: ignore[union-attr]
-                    "upper_bound": a.UpperBound,  # type: ignore[union-attr]
-                    "stereotype": a.Stereotype,  # type: ignore[union-attr]
-                    "scope": a.Scope,  # type: ignore[union-attr]
-                }
-                for a in obj_attrs
-            ]
+        record = run.match_record(elem.ea_guid, "element")
+        if record is not None:
+            element_map[elem.Object_ID] = record.object_id
+            if record.content_hash == content:
+                run.summary.elements_skipped += 1
+                continue
+        elif elem.ea_guid and elem.ea_guid in run.guid_index:
+            # Skip if element already exists (idempotent re-import)
+            element_map[elem.Object_ID] = run.guid_index[elem.ea_guid]
+            run.summary.elements_skipped += 1
+            if run.sync:
+                run.baseline_sync_rows.append(run.sync_row(
+                    elem.ea_guid, "element", run.guid_index[elem.ea_guid], content,
+                ))
+            continue
 
-        # Skip if element already exists (idempotent re-import)
-        if elem.ea_guid and elem.ea_guid in guid_index:
-            element_map[elem.Object_ID] = guid_index[elem.ea_guid]
-            summary.elements_skipped += 1
+        data_json = json.dumps(_element_data(run.attrs_by_object.get(elem.Object_ID, [])))
+        element_metadata = _element_metadata(elem, run.tags_by_object)
+        metadata_json = json.dumps(element_metadata) if element_metadata else None
+        element_name = _element_name(elem, iris_type)
+
+        if record is not None:
+            version = record.current_version + 1
+            update_rows.append((iris_type, version, run.now, record.object_id))
+            update_version_rows.append((
+                record.object_id, version, element_name, elem.Note, data_json,
+                f"Synced from SparxEA ({elem.Object_Type})", run.now, run.imported_by,
+                metadata_json,
+            ))
+            update_sync_rows.append(run.sync_row(
+                elem.ea_guid, "element", record.object_id, content,
+            ))
+            run.summary.elements_updated += 1
             continue
 
-        # Build element metadata
-        element_metadata: dict[str, object] | None = None
-        em: dict[str, object] = {}
-        if elem.ea_guid:
-            em["ea_guid"] = elem.ea_guid
-        if elem.Status:
-            em["status"] = elem.Status
-        if elem.Stereotype:
-            em["stereotype"] = elem.Stereotype
-        if elem.Version:
-            em["version"] = elem.Version
-        if elem.Scope:
-            em["scope"] = elem.Scope
-        if elem.Abstract == "1":
-            em["abstract"] = True
-        if elem.Persistence:
-            em["persistence"] = elem.Persistence
-        if elem.Author:
-            em["author"] = elem.Author
-        if elem.Complexity and elem.Complexity != "2":
-            em["complexity"] = elem.Complexity
-        if elem.Phase:
-            em["phase"] = elem.Phase
-        if elem.CreatedDate:
-            em["created_date"] = elem.CreatedDate
-        if elem.ModifiedDate:
-            em["modified_date"] = elem.ModifiedDate
-        if elem.GenType:
-            em["gen_type"] = elem.GenType
-        obj_tags = tags_by_object.get(elem.Object_ID)
-        if obj_tags:
-            em["tagged_values"] = obj_tags
-        if em:
-            element_metadata = em
-
-        # Derive meaningful name for Note/Boundary elements with NULL Name
-        if iris_type in ("note", "boundary") and not elem.Name:
-            element_name = derive_note_label(
-                elem.Note,
-                f"{'Note' if iris_type == 'note' else 'Boundary'} {elem.Object_ID}",
-            )
-        else:
-            element_name = elem.Name or f"Element {elem.Object_ID}"
-
-        element = await create_element(
-            db,
-            element_type=iris_type,
-            name=element_name,
-            description=elem.Note,
-            data=element_data,
-            created_by=imported_by,
-            set_id=set_id,
-            metadata=element_metadata,
-            change_summary=f"Imported from SparxEA ({elem.Object_Type})",
-        )
-        element_map[elem.Object_ID] = element["id"]  # type: ignore[assignment]
-        summary.elements_created += 1
+        element_id = str(uuid.uuid4())
+        rows.append((element_id, iris_type, run.now, run.imported_by, run.now, run.set_id))
+        version_rows.append((
+            element_id, element_name, elem.Note, data_json,
+            f"Imported from SparxEA ({elem.Object_Type})", run.now, run.imported_by,
+            metadata_json,
+        ))
+        sync_rows.append(run.sync_row(elem.ea_guid, "element", element_id, content))
+        element_map[elem.Object_ID] = element_id
+        run.summary.elements_created += 1
+
+    total = len(rows) + len(update_rows)
+    await _write_chunked(run.db, [
+        (_INSERT_ELEMENT_SQL, rows),
+        (_INSERT_ELEMENT_VERSION_SQL, version_rows),
+        (UPSERT_SYNC_OBJECT_SQL, sync_rows),
+    ], _phase_reporter(run.on_progress, "elements", total))
+    await _write_chunked(run.db, [
+        (_UPDATE_ELEMENT_SQL, update_rows),
+        (_INSERT_ELEMENT_UPDATE_VERSION_SQL, update_version_rows),
+        (UPSERT_SYNC_OBJECT_SQL, update_sync_rows),
+    ], _phase_reporter(run.on_progress, "elements", total, len(rows)))
+    return element_map, element_hashes
+
+
+def _relationship_data(conn: QeaConnector) -> dict[str, object]:
+    """Version data for an imported relationship from its connector."""
+    rel_data: dict[str, object] = {}
+    if conn.Direction:
+        rel_data["direction"] = conn.Direction
+    if conn.SourceCard:
+        rel_data["sourceCardinality"] = conn.SourceCard
+    if conn.DestCard:
+        rel_data["targetCardinality"] = conn.DestCard
+    if conn.SourceRole:
+        rel_data["sourceRole"] = conn.SourceRole
+    if conn.DestRole:
+        rel_data["targetRole"] = conn.DestRole
+    if conn.Stereotype:
+        rel_data["stereotype"] = conn.Stereotype
+    return rel_data
+
+
+def _package_relationship_row(
+    run: _ImportRun,
+    conn: QeaConnector,
+    iris_type: str,
+    element_to_package: dict[int, int],
+    package_map: dict[int, str],
+) -> tuple[object, ...] | None:
+    """Row for a Package->Package connector, or None if it is not one."""
+    source_pkg = element_to_package.get(conn.Start_Object_ID)
+    target_pkg = element_to_package.get(conn.End_Object_ID)
+    if not source_pkg or not target_pkg:
+        return None
+    source_package = package_map.get(source_pkg)
+    target_package = package_map.get(target_pkg)
+    if not source_package or not target_package:
+        return None
+    return (
+        str(uuid.uuid4()), source_package, target_package,
+        iris_type, conn.Name, conn.Notes, run.imported_by, run.now,
+    )
+
 
-    # 4. Create relationships for connectors
+def _connector_hashes(connectors: list[QeaConnector]) -> dict[int, list[str]]:
+    """Object_ID -> hashes of connectors drawn from it, for diagram hashes."""
+    connector_hashes: dict[int, list[str]] = {}
     for conn in connectors:
-        if conn.Connector_Type is None:
-            summary.connectors_skipped += 1
-            continue
+        conn_content = content_hash(astuple(conn))
+        connector_hashes.setdefault(conn.Start_Object_ID, []).append(conn_content)
+        connector_hashes.setdefault(conn.End_Object_ID, []).append(conn_content)
+    return connector_hashes
+
+
+async def _import_connectors(
+    run: _ImportRun,
+    connectors: list[QeaConnector],
+    element_map: dict[int, str],
+    element_to_package: dict[int, int],
+    package_map: dict[int, str],
+) -> None:
+    """Create relationships for connectors; in sync mode, version-bump changed ones."""
+    rows: _Rows = []
+    version_rows: _Rows = []
+    sync_rows: _Rows = []
+    update_rows: _Rows = []
+    update_version_rows: _Rows = []
+    update_sync_rows: _Rows = []
+    package_relationship_rows: _Rows = []
 
-        iris_type = map_connector_type(conn.Connector_Type)
+    for conn in connectors:
+        iris_type = (
+            map_connector_type(conn.Connector_Type) if conn.Connector_Type is not None else None
+        )
         if iris_type is None:
-            summary.connectors_skipped += 1
+            run.summary.connectors_skipped += 1
             continue
 
         source_id = element_map.get(conn.Start_Object_ID)
         target_id = element_map.get(conn.End_Object_ID)
         if not source_id or not target_id:
             # Check if this is a Package->Package connector (package relationship)
-            source_pkg = element_to_package.get(conn.Start_Object_ID)
-            target_pkg = element_to_package.get(conn.End_Object_ID)
-            if source_pkg and target_pkg:
-                source_package = package_map.get(source_pkg)
-                target_package = package_map.get(target_pkg)
-                if source_package and target_package:
-                    try:
-                        await create_package_relationship(
-                            db,
-                            source_package_id=source_package,
-                            target_package_id=target_package,
-                            relationship_type=iris_type,
-                            label=conn.Name,
-                            description=conn.Notes,
-                            created_by=imported_by,
-                        )
-                        summary.package_relationships_created += 1
-                    except Exception:
-                        # Duplicate -- relationship already exists, not a skip
-                        summary.package_relationships_created += 1
-                    continue
-            summary.connectors_skipped += 1
-            continue
-
-        rel_data: dict[str, object] = {}
-        if conn.Direction:
-            rel_data["direction"] = conn.Direction
-        if conn.SourceCard:
-            rel_data["sourceCardinality"] = conn.SourceCard
-        if conn.DestCard:
-            rel_data["targetCardinality"] = conn.DestCard
-        if conn.SourceRole:
-            rel_data["sourceRole"] = conn.SourceRole
-        if conn.DestRole:
-            rel_data["targetRole"] = conn.DestRole
-        if conn.Stereotype:
-            rel_data["stereotype"] = conn.Stereotype
-
-        await create_relationship(
-            db,
-            source_element_id=source_id,
-            target_element_id=target_id,
-            relationship_type=iris_type,
-            label=conn.Name,
-            description=conn.Notes,
-            data=rel_data,
-            created_by=imported_by,
-        )
-        summary.relationships_created += 1
-
-    # 5. Create diagram models with canvas data
-    # Build diagram_objects lookup
-    diag_objects_by_diagram: dict[int, list[object]] = {}
-    for dobj in diagram_objects:
-        diag_objects_by_diagram.setdefault(dobj.Diagram_ID, []).append(dobj)
-
-    for diag in diagrams:
-        # Skip if diagram already exists (idempotent re-import)
-        if diag.ea_guid and diag.ea_guid in guid_index:
-            summary.diagrams_skipped += 1
+            package_row = _package_relationship_row(
+                run, conn, iris_type, element_to_package, package_map,
+            )
+            if package_row is None:
+                run.summary.connectors_skipped += 1
+            else:
+                package_relationship_rows.append(package_row)
+                run.summary.package_relationships_created += 1
             continue
 
-        diagram_type, diagram_notation = map_diagram_type(diag.Diagram_Type or "")
-        parent_iris_id = package_map.get(diag.Package_ID)
+        content = relationship_hash(conn, source_id, target_id)
+        record = run.match_record(conn.ea_guid, "relationship")
+        if record is not None:
+            if record.content_hash == content:
+                continue
+        else:
+            # Adopt a matching relationship from an import without sync records
+            adopted = run.unrecorded_relationships.pop((source_id, target_id, iris_type), None)
+            if adopted is not None:
+                run.baseline_sync_rows.append(run.sync_row(
+                    conn.ea_guid, "relationship", adopted, content,
+                ))
+                continue
 
-        # Build canvas nodes from diagram objects
-        nodes: list[dict[str, object]] = []
-        edges: list[dict[str, object]] = []
-        dobjs = diag_objects_by_diagram.get(diag.Diagram_ID, [])
+        data_json = json.dumps(_relationship_data(conn))
+        if record is not None:
+            version = record.current_version + 1
+            update_rows.append((
+                source_id, target_id, iris_type, version, run.now, record.object_id,
+            ))
+            update_version_rows.append((
+                record.object_id, version, conn.Name, conn.Notes, data_json,
+                f"Synced from SparxEA ({conn.Connector_Type})", run.now, run.imported_by,
+            ))
+            update_sync_rows.append(run.sync_row(
+                conn.ea_guid, "relationship", record.object_id, content,
+            ))
+            run.summary.relationships_updated += 1
+            continue
 
-        for dobj in dobjs:
-            element_id = element_map.get(dobj.Object_ID)  # type: ignore[union-attr]
-            if not element_id:
+        rel_id = str(uuid.uuid4())
+        rows.append((rel_id, source_id, target_id, iris_type, run.now, run.imported_by, run.now))
+        version_rows.append((
+            rel_id, conn.Name, conn.Notes, data_json, run.now, run.imported_by,
+        ))
+        sync_rows.append(run.sync_row(conn.ea_guid, "relationship", rel_id, content))
+        run.summary.relationships_created += 1
+
+    total = len(rows) + len(update_rows) + len(package_relationship_rows)
+    await _write_chunked(run.db, [
+        (_INSERT_RELATIONSHIP_SQL, rows),
+        (_INSERT_RELATIONSHIP_VERSION_SQL, version_rows),
+        (UPSERT_SYNC_OBJECT_SQL, sync_rows),
+    ], _phase_reporter(run.on_progress, "connectors", total))
+    await _write_chunked(run.db, [
+        (_UPDATE_RELATIONSHIP_SQL, update_rows),
+        (_INSERT_RELATIONSHIP_UPDATE_VERSION_SQL, update_version_rows),
+        (UPSERT_SYNC_OBJECT_SQL, update_sync_rows),
+    ], _phase_reporter(run.on_progress, "connectors", total, len(rows)))
+    await _write_chunked(run.db, [
+        (_INSERT_PACKAGE_RELATIONSHIP_SQL, package_relationship_rows),
+    ], _phase_reporter(
+        run.on_progress, "connectors", total, len(rows) + len(update_rows),
+    ))
+
+
+def _stage_diagram(
+    run: _ImportRun,
+    chunk: _DiagramChunk,
+    diag: QeaDiagram,
+    record: SyncRecord | None,
+    *,
+    content: str,
+    model_data: dict[str, object],
+    diagram_type: str,
+    notation: str,
+    package_id: str | None,
+    set_id: str,
+) -> None:
+    """Add the rows creating, or for a recorded diagram updating, one diagram."""
+    data_json = json.dumps(model_data)
+    detected_json = json.dumps(detect_notations(model_data))
+    name = diag.Name or f"Diagram {diag.Diagram_ID}"
+
+    # Build diagram metadata with ea_guid
+    diag_metadata = {"ea_guid": diag.ea_guid} if diag.ea_guid else None
+    metadata_json = json.dumps(diag_metadata) if diag_metadata else None
+
+    if record is not None:
+        diagram_id = record.object_id
+        version = record.current_version + 1
+        chunk.updates.append((
+            diagram_type, version, run.now, package_id, notation, detected_json, diagram_id,
+        ))
+        chunk.update_versions.append((
+            diagram_id, version, name, diag.Notes, data_json,
+            f"Synced from SparxEA diagram ({diag.Diagram_Type})", run.now,
+            run.imported_by, metadata_json,
+        ))
+        chunk.update_ids.append((diagram_id,))
+        chunk.update_canvases.append((diagram_id, data_json))
+        chunk.update_sync.append(run.sync_row(diag.ea_guid, "diagram", diagram_id, content))
+        run.summary.diagrams_updated += 1
+    else:
+        diagram_id = str(uuid.uuid4())
+        version = 1
+        chunk.diagrams.append((
+            diagram_id, diagram_type, run.now, run.imported_by, run.now,
+            package_id, set_id, notation, detected_json,
+        ))
+        chunk.versions.append((
+            diagram_id, name, diag.Notes, data_json,
+            f"Imported from SparxEA diagram ({diag.Diagram_Type})", run.now,
+            run.imported_by, metadata_json,
+        ))
+        chunk.canvases.append((diagram_id, data_json))
+        chunk.sync.append(run.sync_row(diag.ea_guid, "diagram", diagram_id, content))
+        run.summary.diagrams_created += 1
+    chunk.thumbnails.append((diagram_id, model_data, diagram_type, version))
+
+
+async def _import_diagrams(
+    run: _ImportRun,
+    reader: QeaReader,
+    diagrams: list[QeaDiagram],
+    connectors: list[QeaConnector],
+    *,
+    element_map: dict[int, str],
+    element_hashes: dict[int, str],
+    element_index: dict[int, QeaElement],
+    connector_hashes: dict[int, list[str]],
+    package_map: dict[int, str],
+    thumbnails: ThumbnailQueue | None,
+) -> str:
+    """Create diagram models with canvas data; in sync mode, rebuild changed ones.
+
+    Diagrams are written, and their thumbnails queued, chunk by chunk so
+    finished canvases are not held in memory. Returns the set they went to.
+    """
+    # Same fallback create_diagram applies to an unknown set
+    cursor = await run.source.execute("SELECT 1 FROM sets WHERE id = ?", (run.set_id,))
+    diagram_set_id = run.set_id if await cursor.fetchone() else DEFAULT_SET_ID
+
+    notation_cache: dict[tuple[str, str], str] = {}
+    element_refs = {
+        object_id: (element_map.get(object_id), h)
+        for object_id, h in element_hashes.items()
+    }
+    # Whether a diagram changed is only known once its placements stream
+    # in, so this phase counts diagrams examined rather than written
+    report = _phase_reporter(run.on_progress, "diagrams", len(diagrams))
+    examined = 0
+    chunk = _DiagramChunk()
+
+    # Diagrams and placements both come in Diagram_ID order: merge them
+    async with aclosing(reader.diagram_objects_by_diagram()) as placements:
+        placement = await anext(placements, None)
+        for diag in diagrams:
+            examined += 1
+            while placement is not None and placement[0] < diag.Diagram_ID:
+                placement = await anext(placements, None)
+            dobjs: list[QeaDiagramObject] = []
+            if placement is not None and placement[0] == diag.Diagram_ID:
+                dobjs = placement[1]
+
+            content = diagram_hash(diag, dobjs, element_refs, connector_hashes)
+            record = run.match_record(diag.ea_guid, "diagram")
+            if record is not None and record.content_hash == content:
+                run.summary.diagrams_skipped += 1
+                continue
+            if record is None and diag.ea_guid and diag.ea_guid in run.guid_index:
+                # Skip if diagram already exists (idempotent re-import)
+                run.summary.diagrams_skipped += 1
+                if run.sync:
+                    run.baseline_sync_rows.append(run.sync_row(
+                        diag.ea_guid, "diagram", run.guid_index[diag.ea_guid], content,
+                    ))
                 continue
 
-            pos = ea_rect_to_position(
-                dobj.RectLeft,  # type: ignore[union-attr]
-                dobj.RectRight,  # type: ignore[union-attr]
-                dobj.RectTop,  # type: ignore[union-attr]
-                dobj.RectBottom,  # type: ignore[union-attr]
+            diagram_type, diagram_notation = map_diagram_type(diag.Diagram_Type or "")
+            _stage_diagram(
+                run, chunk, diag, record,
+                content=content,
+                model_data=_build_canvas(
+                    dobjs, connectors, element_map, element_index, run.attrs_by_object,
+                ),
+                diagram_type=diagram_type,
+                notation=await _resolve_notation(
+                    run.source, diagram_type, diagram_notation, notation_cache,
+                ),
+                package_id=package_map.get(diag.Package_ID),
+                set_id=diagram_set_id,
             )
 
-            # Find the element to get its type and name
-            elem = element_index.get(dobj.Object_ID)  # type: ignore[union-attr]
-            iris_type_str = (
-                map_object_type(elem.Object_Type) if elem and elem.Object_Type else "component"
-            )
+            if chunk.size >= IMPORT_CHUNK_SIZE:
+                await _write_diagram_chunk(run.db, chunk, thumbnails)
+                chunk = _DiagramChunk()
+                if report is not None:
+                    report(examined)
 
-            node_id = str(uuid.uuid4())
-            # Derive label for notes/boundaries with NULL Name
-            if elem and iris_type_str in ("note", "boundary") and not elem.Name:
-                node_label = derive_note_label(elem.Note, "Unknown")
-            else:
-                node_label = (elem.Name or "Unknown") if elem else "Unknown"
-
-            node_data: dict[str, object] = {
-                "label": node_label,
-                "entityType": iris_type_str or "component",
-                "entityId": element_id,
-            }
-            # Always populate description from element's Note content
-            if elem and elem.Note:
-                node_data["description"] = elem.Note
-            # Store stereotype for theme resolution
-            if elem and elem.Stereotype:
-                node_data["stereotype"] = elem.Stereotype
-
-            # Build visual overrides from EA style data
-            node_visual = build_node_visual(
-                dobj.ObjectStyle,  # type: ignore[union-attr]
-                elem.Backcolor if elem else None,
-                elem.Fontcolor if elem else None,
-                elem.Bordercolor if elem else None,
-                elem.BorderWidth if elem else None,
-            )
-            # Include explicit dimensions from EA in visual overrides
-            visual_with_size: dict[str, object] = node_visual or {}
-            visual_with_size["width"] = pos["width"]
-            visual_with_size["height"] = pos["height"]
-            node_data["visual"] = visual_with_size
-
-            # Thread element attributes to canvas node for compartment rendering
-            obj_attrs = attrs_by_object.get(dobj.Object_ID)  # type: ignore[union-attr]
-            if obj_attrs:
-                node_data["attributes"] = [
-                    {
-                        "name": a.Name or "",  # type: ignore[union-attr]
-                        "type": a.Type or "",  # type: ignore[union-attr]
-                        "scope": a.Scope,  # type: ignore[union-attr]
-                    }
-                    for a in obj_attrs
-                ]
-
-            nodes.append({
-                "id": node_id,
-                "type": iris_type_str or "component",
-                "position": {"x": pos["x"], "y": pos["y"]},
-                "data": node_data,
-                "measured": {
-                    "width": pos["width"],
-                    "height": pos["height"],
-                },
-            })
+    await _write_diagram_chunk(run.db, chunk, thumbnails)
+    if report is not None and diagrams:
+        report(examined)
+    return diagram_set_id
 
-        # Build edges from connectors that connect nodes on this diagram
-        node_entity_to_node_id: dict[str, str] = {}
-        for n in nodes:
-            data = n.get("data")
-            if isinstance(data, dict):
-                eid = data.get("entityId")
-                if eid:
-                    node_entity_to_node_id[eid] = n["id"]  # type: ignore[assignment]
-
-        for conn in connectors:
-            source_eid = element_map.get(conn.Start_Object_ID)
-            target_eid = element_map.get(conn.End_Object_ID)
-            if not source_eid or not target_eid:
-                continue
-            source_node = node_entity_to_node_id.get(source_eid)
-            target_node = node_entity_to_node_id.get(target_eid)
-            if not source_node or not target_node:
-                continue
 
-            iris_conn_type = (
-                map_connector_type(conn.Connector_Type) if conn.Connector_Type else "association"
-            ) or "association"
-
-            # Build edge metadata
-            route_map = {0: "bezier", 1: "step", 2: "step", 3: "step", 4: "step", 5: "step"}
-            edge_data: dict[str, object] = {
-                "relationshipType": iris_conn_type,
-                "label": conn.Name or "",
-            }
-            if conn.SourceCard:
-                edge_data["sourceCardinality"] = conn.SourceCard
-            if conn.DestCard:
-                edge_data["targetCardinality"] = conn.DestCard
-            if conn.SourceRole:
-                edge_data["sourceRole"] = conn.SourceRole
-            if conn.DestRole:
-                edge_data["targetRole"] = conn.DestRole
-            if conn.Stereotype:
-                edge_data["stereotype"] = conn.Stereotype
-            if conn.Direction:
-                edge_data["direction"] = conn.Direction
-            if conn.RouteStyle is not None:
-                edge_data["routingType"] = route_map.get(conn.RouteStyle, "bezier")
-
-            # Build edge visual overrides
-            edge_visual = build_edge_visual(
-                conn.LineColor, conn.IsBold, conn.LineStyle,
+async def import_sparx_file(
+    db: aiosqlite.Connection,
+    qea_path: str,
+    imported_by: str,
+    set_id: str | None = None,
+    *,
+    thumbnails: ThumbnailQueue | None = None,
+    on_progress: Callable[[str, int, int], None] | None = None,
+    sync: bool = False,
+    source: aiosqlite.Connection | None = None,
+) -> ImportSummary:
+    """Import a SparxEA .qea file into Iris.
+
+    The file is read over one QeaReader connection. Rows for each phase
+    (packages, elements, connectors, diagrams) are written with executemany
+    in IMPORT_CHUNK_SIZE transactions (triggers keep the FTS tables in step);
+    diagrams are built from placements streamed per diagram and written as
+    each chunk fills.
+    on_progress is called as (phase, processed, total) when a phase starts
+    writing and after each committed chunk. Thumbnails for new diagrams are
+    enqueued on the given queue; without one they render on first request.
+
+    Every import records content hashes of what it creates (see sync.py).
+    With sync=True, objects recorded for the set are matched by ea_guid:
+    changed ones get a new version and ones missing from the file are
+    soft-deleted, instead of existing objects being skipped.
+
+    Existing Iris objects are looked up on source, which defaults to db;
+    staging.py passes the live database while db is a staging file.
+    """
+    effective_set_id = set_id or DEFAULT_SET_ID
+    source = source or db
+
+    # 1. Read from the .qea file over one connection. Diagram placements
+    # stream per diagram in step 5; everything else is needed throughout
+    async with QeaReader(qea_path) as reader:
+        packages = [pkg async for pkg in reader.packages()]
+        elements = [elem async for elem in reader.elements()]
+        connectors = [conn async for conn in reader.connectors()]
+        diagrams = [diag async for diag in reader.diagrams()]
+        run = _ImportRun(
+            db=db,
+            source=source,
+            imported_by=imported_by,
+            set_id=effective_set_id,
+            sync=sync,
+            now=datetime.now(tz=UTC).isoformat(),
+            on_progress=on_progress,
+            attrs_by_object={
+                object_id: attrs async for object_id, attrs in reader.attributes_by_object()
+            },
+            tags_by_object={
+                object_id: [{"property": tv.Property, "value": tv.Value} for tv in tvs]
+                async for object_id, tvs in reader.tagged_values_by_object()
+            },
+        )
+        summary = run.summary
+
+        # Package-type elements: by Package_ID (for Status/Stereotype on packages)
+        # and Object_ID -> Package_ID (for Package->Package deps)
+        pkg_type_elements: dict[int, QeaElement] = {}
+        element_to_package: dict[int, int] = {}
+        for elem in elements:
+            if elem.Object_Type == "Package":
+                pkg_type_elements[elem.Package_ID] = elem
+                element_to_package[elem.Object_ID] = elem.Package_ID
+
+        # Build GUID index for idempotent re-import
+        run.guid_index = await _build_guid_index(source, effective_set_id if sync else set_id, {
+            item.ea_guid for item in (*packages, *elements, *diagrams) if item.ea_guid
+        })
+        if sync:
+            run.sync_records = await load_sync_records(source, effective_set_id)
+            run.unrecorded_relationships = await load_unrecorded_relationships(
+                source, effective_set_id, run.sync_records,
             )
-            if edge_visual:
-                edge_data["visual"] = edge_visual
-
-            # Self-loop edge
-            if source_node == target_node:
-                edges.append({
-                    "id": str(uuid.uuid4()),
-                    "source": source_node,
-                    "target": target_node,
-                    "type": "self_loop",
-                    "sourceHandle": "right",
-                    "targetHandle": "top",
-                    "data": edge_data,
-                })
-            else:
-                edges.append({
-                    "id": str(uuid.uuid4()),
-                    "source": source_node,
-                    "target": target_node,
-                    "type": iris_conn_type,
-                    "data": edge_data,
-                })
-
-        model_data: dict[str, object] = {"nodes": nodes, "edges": edges}
-
-        # Build diagram metadata with ea_guid
-        diag_metadata: dict[str, object] | None = None
-        if diag.ea_guid:
-            diag_metadata = {"ea_guid": diag.ea_guid}
-
-        await create_diagram(
-            db,
-            diagram_type=diagram_type,
-            name=diag.Name or f"Diagram {diag.Diagram_ID}",
-            description=diag.Notes,
-            data=model_data,
-            created_by=imported_by,
-            parent_package_id=parent_iris_id,
-            set_id=set_id,
-            notation=diagram_notation,
-            metadata=diag_metadata,
-            change_summary=f"Imported from SparxEA diagram ({diag.Diagram_Type})",
+        summary.previous_watermark = await get_watermark(source, effective_set_id)
+        summary.watermark = latest_modified(elements)
+
+        # 2-5. Write packages, elements, relationships and diagrams in turn
+        package_map = await _import_packages(run, packages, pkg_type_elements)
+        element_map, element_hashes = await _import_elements(run, elements)
+        await _import_connectors(run, connectors, element_map, element_to_package, package_map)
+        diagram_set_id = await _import_diagrams(
+            run, reader, diagrams, connectors,
+            element_map=element_map,
+            element_hashes=element_hashes,
+            element_index=_build_element_index(elements),
+            connector_hashes=_connector_hashes(connectors),
+            package_map=package_map,
+            thumbnails=thumbnails,
         )
-        summary.diagrams_created += 1
 
-    return summary
+        # 6. Sync mode: remove recorded objects that left the file
+        if sync:
+            removed = await remove_missing(
+                db, effective_set_id,
+                {g: r for g, r in run.sync_records.items() if g not in run.seen_guids},
+                deleted_by=imported_by, now=run.now,
+            )
+            summary.elements_removed = removed["element"]
+            summary.relationships_removed = removed["relationship"]
+            summary.diagrams_removed = removed["diagram"]
+
+        await _write_chunked(db, [(UPSERT_SYNC_OBJECT_SQL, run.baseline_sync_rows)])
+        if diagram_set_id == effective_set_id:
+            await record_sync_state(
+                db, effective_set_id, watermark=summary.watermark,
+                synced_by=imported_by, now=run.now,
+            )
+
+        return summary
@@ -0,0 +1,376 @@
+"""Staged SparxEA imports: build in a worker process, merge in one transaction.
+
+Import jobs do not write to iris.db while reading the SparxEA file. A spawned
+worker process runs import_sparx_file against a staging SQLite file whose
+tables copy the schema of the iris.db tables an import writes, with iris.db
+attached read-only as ``live`` for lookups. The job then attaches the
+staging file to its own iris.db connection and merges it with set-based
+INSERT ... SELECT statements in one BEGIN IMMEDIATE transaction, so the
+write lock is held for the merge only.
+
+Sync imports first copy the set's recorded objects, with their current
+versions, into the staging file so updates and soft-deletes apply there;
+copies the import left unchanged are pruned before the merge. The versions
+the changed ones started from are kept in ``sync_base``, and the merge fails
+if any of them changed in Iris meanwhile.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import sqlite3
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import aiosqlite
+
+from app.import_sparx.service import import_sparx_file
+from app.import_sparx.sync import OBJECT_TABLES
+from app.migrations.m012_sets import DEFAULT_SET_ID
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from multiprocessing.connection import Connection
+
+    from app.diagrams.thumbnail_queue import ThumbnailQueue
+    from app.import_sparx.service import ImportSummary
+
+logger = logging.getLogger(__name__)
+
+# iris.db tables an import writes, in merge (foreign key) order
+STAGED_TABLES = (
+    "packages",
+    "package_versions",
+    "elements",
+    "element_versions",
+    "relationships",
+    "relationship_versions",
+    "package_relationships",
+    "diagrams",
+    "diagram_versions",
+    "diagram_element_refs",
+    "sparx_sync_objects",
+    "sparx_sync_state",
+)
+
+# Columns a sync changes on an existing object. Others can be edited in Iris
+# without a new version, so the merge leaves them alone
+_UPSERT_COLUMNS = {
+    "elements": ("element_type", "current_version", "updated_at", "is_deleted"),
+    "relationships": (
+        "source_element_id", "target_element_id", "relationship_type",
+        "current_version", "updated_at", "is_deleted",
+    ),
+    "diagrams": (
+        "diagram_type", "current_version", "updated_at", "parent_package_id",
+        "notation", "detected_notations", "node_count", "edge_count",
+        "has_content", "is_deleted",
+    ),
+}
+
+# import_sparx_file resolves canvas refs against staged elements only; this
+# adds the ones to elements already in iris.db
+_INSERT_LIVE_REFS_SQL = (
+    "INSERT OR IGNORE INTO diagram_element_refs (diagram_id, element_id) "
+    "SELECT d.id, e.id FROM diagrams d "
+    "JOIN diagram_versions v ON v.diagram_id = d.id AND v.version = d.current_version "
+    "JOIN json_tree(v.data) j "
+    "JOIN live.elements e ON e.id IN ("
+    "CASE WHEN j.type = 'text' THEN j.atom END, "
+    "CASE WHEN typeof(j.key) = 'text' THEN j.key END) "
+    "WHERE d.is_deleted = 0"
+)
+
+
+async def _columns(db: aiosqlite.Connection, schema: str, table: str) -> str:
+    cursor = await db.execute(f"PRAGMA {schema}.table_info({table})")
+    return ", ".join(row[1] for row in await cursor.fetchall())
+
+
+async def _create_staging_schema(db: aiosqlite.Connection) -> None:
+    """Copy the staged tables' definitions from the attached live database."""
+    cursor = await db.execute(
+        "SELECT sql FROM live.sqlite_master WHERE type = 'table' "
+        "AND name IN (SELECT value FROM json_each(?))",
+        (json.dumps(STAGED_TABLES),),
+    )
+    for (sql,) in await cursor.fetchall():
+        await db.execute(sql)
+    await db.execute(
+        "CREATE TABLE sync_base (object_id TEXT PRIMARY KEY, "
+        "object_type TEXT NOT NULL, current_version INTEGER NOT NULL)"
+    )
+    await db.commit()
+
+
+async def _seed_sync_objects(db: aiosqlite.Connection, set_id: str) -> None:
+    """Copy the set's live recorded objects and their current versions."""
+    for object_type, (table, versions, fk) in OBJECT_TABLES.items():
+        await db.execute(
+            "INSERT INTO sync_base (object_id, object_type, current_version) "  # noqa: S608
+            f"SELECT t.id, s.object_type, t.current_version "
+            f"FROM live.sparx_sync_objects s JOIN live.{table} t "
+            "ON t.id = s.object_id AND t.is_deleted = 0 "
+            "WHERE s.set_id = ? AND s.object_type = ?",
+            (set_id, object_type),
+        )
+        await db.execute(
+            f"INSERT INTO {table} SELECT t.* FROM live.{table} t "  # noqa: S608
+            "JOIN sync_base b ON b.object_id = t.id WHERE b.object_type = ?",
+            (object_type,),
+        )
+        await db.execute(
+            f"INSERT INTO {versions} SELECT v.* FROM live.{versions} v "  # noqa: S608
+            f"JOIN sync_base b ON b.object_id = v.{fk} "
+            "AND b.current_version = v.version WHERE b.object_type = ?",
+            (object_type,),
+        )
+    await db.commit()
+
+
+async def _prune_unchanged(db: aiosqlite.Connection) -> None:
+    """Drop seeded objects the import left at their live version."""
+    for object_type, (table, versions, fk) in OBJECT_TABLES.items():
+        await db.execute(
+            f"DELETE FROM {versions} WHERE EXISTS (SELECT 1 FROM sync_base b "  # noqa: S608
+            f"WHERE b.object_id = {versions}.{fk} "
+            f"AND b.current_version = {versions}.version)"
+        )
+        await db.execute(
+            f"DELETE FROM {table} WHERE EXISTS (SELECT 1 FROM sync_base b "  # noqa: S608
+            f"WHERE b.object_id = {table}.id "
+            f"AND b.current_version = {table}.current_version)"
+        )
+        await db.execute(
+            "DELETE FROM sync_base WHERE object_type = ? "  # noqa: S608
+            f"AND object_id NOT IN (SELECT id FROM {table})",
+            (object_type,),
+        )
+    await db.commit()
+
+
+async def stage_sparx_import(
+    live_path: str,
+    staging_path: str,
+    qea_path: str,
+    *,
+    imported_by: str,
+    set_id: str | None = None,
+    sync: bool = False,
+    on_progress: Callable[[str, int, int], None] | None = None,
+) -> ImportSummary:
+    """Import a .qea file into a new staging database for merge_staging.
+
+    iris.db at live_path is only read. staging_path must be a new or empty file.
+    """
+    live_uri = f"{Path(live_path).resolve().as_uri()}?mode=ro"
+    db = await aiosqlite.connect(Path(staging_path).resolve().as_uri(), uri=True)
+    live = await aiosqlite.connect(live_uri, uri=True)
+    try:
+        # Throwaway file: nothing to recover if the worker dies
+        await db.execute("PRAGMA journal_mode=OFF")
+        await db.execute("PRAGMA synchronous=OFF")
+        await db.execute("ATTACH DATABASE ? AS live", (live_uri,))
+        await live.execute("PRAGMA query_only=ON")
+        await _create_staging_schema(db)
+        if sync:
+            await _seed_sync_objects(db, set_id or DEFAULT_SET_ID)
+        summary = await import_sparx_file(
+            db, qea_path, imported_by=imported_by, set_id=set_id,
+            on_progress=on_progress, sync=sync, source=live,
+        )
+        await _prune_unchanged(db)
+        await db.execute(_INSERT_LIVE_REFS_SQL)
+        await db.commit()
+        return summary
+    finally:
+        await live.close()
+        await db.close()
+
+
+def _stage_in_process(
+    conn: Connection,
+    live_path: str,
+    staging_path: str,
+    qea_path: str,
+    options: dict[str, object],
+) -> None:
+    """Worker process entry point: stage the import, reporting over conn."""
+    def on_progress(phase: str, processed: int, total: int) -> None:
+        conn.send(("progress", phase, processed, total))
+
+    try:
+        summary = asyncio.run(stage_sparx_import(
+            live_path, staging_path, qea_path, on_progress=on_progress, **options,  # type: ignore[arg-type]
+        ))
+    except (ValueError, RuntimeError, sqlite3.DatabaseError) as exc:
+        conn.send(("failed", str(exc)))
+    except Exception:
+        logger.exception("Staging Sparx import of %s failed", qea_path)
+        conn.send(("failed", "Import failed"))
+    else:
+        conn.send(("staged", summary))
+    finally:
+        conn.close()
+
+
+async def stage_in_worker(
+    live_path: str,
+    staging_path: str,
+    qea_path: str,
+    *,
+    imported_by: str,
+    set_id: str | None = None,
+    sync: bool = False,
+    on_progress: Callable[[str, int, int], None] | None = None,
+) -> ImportSummary:
+    """Run stage_sparx_import in a spawned process and wait for its summary.
+
+    Progress is relayed to on_progress. Cancelling terminates the process.
+    Raises RuntimeError if the import fails or the process dies.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    receiver, sender = ctx.Pipe(duplex=False)
+    options = {"imported_by": imported_by, "set_id": set_id, "sync": sync}
+    process = ctx.Process(
+        target=_stage_in_process,
+        args=(sender, live_path, staging_path, qea_path, options),
+        daemon=True,
+    )
+    process.start()
+    # Only the worker holds the sending end, so recv() raises EOFError once it exits
+    sender.close()
+    try:
+        while True:
+            try:
+                message = await asyncio.to_thread(receiver.recv)
+            except EOFError:
+                msg = "Import worker exited unexpectedly"
+                raise RuntimeError(msg) from None
+            if message[0] == "progress":
+                if on_progress is not None:
+                    on_progress(*message[1:])
+            elif message[0] == "failed":
+                raise RuntimeError(message[1])
+            else:
+                return message[1]  # type: ignore[no-any-return]
+    finally:
+        if process.is_alive():
+            process.terminate()
+        await asyncio.to_thread(process.join)
+        receiver.close()
+
+
+async def _check_sync_base(db: aiosqlite.Connection) -> None:
+    """Fail if an object a sync changed was changed in Iris after staging."""
+    for object_type, (table, _, _) in OBJECT_TABLES.items():
+        cursor = await db.execute(
+            "SELECT COUNT(*) FROM staging.sync_base b "  # noqa: S608
+            f"LEFT JOIN main.{table} t ON t.id = b.object_id "
+            "WHERE b.object_type = ? "
+            "AND (t.id IS NULL OR t.current_version <> b.current_version)",
+            (object_type,),
+        )
+        if (await cursor.fetchone())[0]:
+            msg = "Objects in the set changed while it was syncing; run the sync again"
+            raise ValueError(msg)
+
+
+async def _copy_rows(
+    db: aiosqlite.Connection, table: str, conflict: str = "", *, ordered: bool = False,
+) -> None:
+    """Insert every staged row of a table into iris.db, in staging order if ordered."""
+    columns = await _columns(db, "staging", table)
+    order = " ORDER BY rowid" if ordered else ""
+    await db.execute(
+        f"INSERT {conflict}INTO main.{table} ({columns}) "  # noqa: S608
+        f"SELECT {columns} FROM staging.{table}{order}"
+    )
+
+
+async def _upsert_objects(db: aiosqlite.Connection, table: str) -> None:
+    """Insert new staged objects and apply a sync's changes to existing ones."""
+    columns = await _columns(db, "staging", table)
+    updates = ", ".join(f"{c} = excluded.{c}" for c in _UPSERT_COLUMNS[table])
+    await db.execute(
+        f"INSERT INTO main.{table} ({columns}) "  # noqa: S608
+        f"SELECT {columns} FROM staging.{table} WHERE true "
+        f"ON CONFLICT(id) DO UPDATE SET {updates}"
+    )
+
+
+async def merge_staging(
+    db: aiosqlite.Connection,
+    staging_path: str,
+    *,
+    set_id: str | None = None,
+    thumbnails: ThumbnailQueue | None = None,
+    on_commit: Callable[[], None] | None = None,
+) -> None:
+    """Merge a database built by stage_sparx_import into iris.db.
+
+    Everything is written in one BEGIN IMMEDIATE transaction. Raises
+    ValueError, writing nothing, if objects a sync changed were changed in
+    Iris since they were staged. on_commit is called as soon as it commits,
+    before thumbnails for the merged diagrams are enqueued.
+
+    db should be the writer held through DatabaseManager.write_connection(),
+    so the merge queues with request writes instead of racing them for
+    SQLite's lock.
+    """
+    await db.execute("ATTACH DATABASE ? AS staging", (staging_path,))
+    try:
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            await _check_sync_base(db)
+            # In staging order, so closure triggers see parents first
+            await _copy_rows(db, "packages", ordered=True)
+            await _copy_rows(db, "package_versions")
+            # The FTS triggers index each object as its current version lands
+            for table, versions, _ in OBJECT_TABLES.values():
+                await _upsert_objects(db, table)
+                await _copy_rows(db, versions)
+            await _copy_rows(db, "package_relationships", "OR IGNORE ")
+            await db.execute(
+                "DELETE FROM main.diagram_element_refs WHERE diagram_id IN ("
+                "SELECT id FROM staging.diagrams WHERE is_deleted = 0)"
+            )
+            await _copy_rows(db, "diagram_element_refs", "OR IGNORE ")
+            await db.execute(
+                "DELETE FROM main.sparx_sync_objects WHERE set_id = ? "
+                "AND object_id IN (SELECT object_id FROM staging.sync_base)",
+                (set_id or DEFAULT_SET_ID,),
+            )
+            await db.execute(
+                "INSERT OR REPLACE INTO main.sparx_sync_objects "
+                "SELECT * FROM staging.sparx_sync_objects"
+            )
+            await db.execute(
+                "INSERT INTO main.sparx_sync_state "
+                "SELECT * FROM staging.sparx_sync_state WHERE true "
+                "ON CONFLICT(set_id) DO UPDATE SET "
+                "watermark = COALESCE(excluded.watermark, watermark), "
+                "synced_at = excluded.synced_at, synced_by = excluded.synced_by"
+            )
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            raise
+        if on_commit is not None:
+            on_commit()
+
+        # Thumbnails render in the background (or lazily on first request)
+        if thumbnails is not None:
+            cursor = await db.execute(
+                "SELECT d.id, d.diagram_type, d.current_version, v.data "
+                "FROM staging.diagrams d JOIN staging.diagram_versions v "
+                "ON v.diagram_id = d.id AND v.version = d.current_version "
+                "WHERE d.is_deleted = 0"
+            )
+            async for row in cursor:
+                thumbnails.enqueue(row[0], json.loads(row[3]), row[1], row[2])
+    finally:
+        await db.execute("DETACH DATABASE staging")
@@ -0,0 +1,238 @@
+"""Incremental SparxEA sync state.
+
+Every import records, per set, a hash of each imported element, connector
+and diagram's source content (sparx_sync_objects) and a sync watermark
+(sparx_sync_state). A sync-mode import compares the incoming hashes with
+the recorded ones: unchanged objects are left alone, changed objects get a
+new version, and recorded objects missing from the file are soft-deleted.
+
+Hashes cover the SparxEA records an object is built from, not the Iris
+rows, so they are stable across imports (canvas node IDs are random):
+    element      — its t_object row, attributes and tagged values
+    relationship — its t_connector row and resolved Iris endpoints
+    diagram      — its t_diagram row and placements, plus the Iris ID and
+                   hash of each placed element and of every connector
+                   touching one
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import astuple, dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    import aiosqlite
+
+    from app.import_sparx.reader import (
+        QeaAttribute,
+        QeaConnector,
+        QeaDiagram,
+        QeaDiagramObject,
+        QeaElement,
+    )
+
+# Rows with a NULL ea_guid are skipped, so the statement can sit in a batch
+# parallel to the object's own rows
+UPSERT_SYNC_OBJECT_SQL = (
+    "INSERT OR REPLACE INTO sparx_sync_objects "
+    "(set_id, ea_guid, object_type, object_id, content_hash) "
+    "SELECT ?1, ?2, ?3, ?4, ?5 WHERE ?2 IS NOT NULL"
+)
+DELETE_SYNC_OBJECT_SQL = (
+    "DELETE FROM sparx_sync_objects WHERE set_id = ? AND ea_guid = ?"
+)
+
+# ModifiedDate formats written by SparxEA (.qea) and by mdb-export (.eap)
+_DATE_FORMATS = ("%Y-%m-%d %H:%M:%S", "%m/%d/%y %H:%M:%S", "%Y-%m-%dT%H:%M:%S")
+
+# (Iris table, versions table, version foreign key)
+OBJECT_TABLES = {
+    "element": ("elements", "element_versions", "element_id"),
+    "relationship": ("relationships", "relationship_versions", "relationship_id"),
+    "diagram": ("diagrams", "diagram_versions", "diagram_id"),
+}
+
+
+@dataclass(slots=True)
+class SyncRecord:
+    """A live Iris object previously imported from a SparxEA GUID."""
+
+    object_type: str
+    object_id: str
+    content_hash: str
+    current_version: int
+
+
+def content_hash(*parts: object) -> str:
+    """Stable hash of JSON-serialisable parts."""
+    payload = json.dumps(parts, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def element_hash(
+    elem: QeaElement,
+    attrs: Iterable[QeaAttribute],
+    tags: Iterable[dict[str, str | None]],
+) -> str:
+    """Hash of an element's t_object row, attributes and tagged values."""
+    return content_hash(astuple(elem), [astuple(a) for a in attrs], list(tags))
+
+
+def relationship_hash(conn: QeaConnector, source_id: str, target_id: str) -> str:
+    """Hash of a connector's t_connector row and its Iris endpoints."""
+    return content_hash(astuple(conn), source_id, target_id)
+
+
+def diagram_hash(
+    diag: QeaDiagram,
+    dobjs: list[QeaDiagramObject],
+    element_refs: dict[int, tuple[str | None, str]],
+    connector_hashes: dict[int, list[str]],
+) -> str:
+    """Hash of a diagram, its placements and everything drawn from them.
+
+    element_refs maps Object_ID to (Iris element ID, element hash);
+    connector_hashes maps Object_ID to the hashes of connectors touching it.
+    """
+    touching = sorted({
+        h for dobj in dobjs for h in connector_hashes.get(dobj.Object_ID, ())
+    })
+    return content_hash(
+        astuple(diag),
+        [astuple(dobj) for dobj in dobjs],
+        [element_refs.get(dobj.Object_ID) for dobj in dobjs],
+        touching,
+    )
+
+
+def latest_modified(elements: Iterable[QeaElement]) -> str | None:
+    """Latest element ModifiedDate as an ISO timestamp, if any parse."""
+    latest: datetime | None = None
+    for elem in elements:
+        if not elem.ModifiedDate:
+            continue
+        for fmt in _DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(str(elem.ModifiedDate), fmt)  # noqa: DTZ007
+            except ValueError:
+                continue
+            if latest is None or parsed > latest:
+                latest = parsed
+            break
+    return latest.isoformat() if latest else None
+
+
+async def get_watermark(db: aiosqlite.Connection, set_id: str) -> str | None:
+    """The watermark recorded by the set's last SparxEA import."""
+    cursor = await db.execute(
+        "SELECT watermark FROM sparx_sync_state WHERE set_id = ?", (set_id,),
+    )
+    row = await cursor.fetchone()
+    return row[0] if row else None
+
+
+async def load_sync_records(
+    db: aiosqlite.Connection, set_id: str,
+) -> dict[str, SyncRecord]:
+    """Recorded objects of a set that are still live, keyed by ea_guid."""
+    records: dict[str, SyncRecord] = {}
+    for object_type, (table, _, _) in OBJECT_TABLES.items():
+        cursor = await db.execute(
+            "SELECT s.ea_guid, s.object_id, s.content_hash, t.current_version "  # noqa: S608
+            f"FROM sparx_sync_objects s JOIN {table} t "
+            "ON t.id = s.object_id AND t.is_deleted = 0 "
+            "WHERE s.set_id = ? AND s.object_type = ?",
+            (set_id, object_type),
+        )
+        async for row in cursor:
+            records[row[0]] = SyncRecord(object_type, row[1], row[2], row[3])
+    return records
+
+
+async def load_unrecorded_relationships(
+    db: aiosqlite.Connection,
+    set_id: str,
+    records: dict[str, SyncRecord],
+) -> dict[tuple[str, str, str], str]:
+    """Live relationships from the set's elements that have no sync record.
+
+    Keyed by (source, target, type), so a sync can adopt relationships
+    created by imports that predate sync records instead of duplicating them.
+    """
+    recorded = {r.object_id for r in records.values() if r.object_type == "relationship"}
+    cursor = await db.execute(
+        "SELECT r.id, r.source_element_id, r.target_element_id, r.relationship_type "
+        "FROM relationships r JOIN elements e ON e.id = r.source_element_id "
+        "WHERE e.set_id = ? AND r.is_deleted = 0",
+        (set_id,),
+    )
+    return {
+        (row[1], row[2], row[3]): row[0]
+        async for row in cursor
+        if row[0] not in recorded
+    }
+
+
+async def remove_missing(
+    db: aiosqlite.Connection,
+    set_id: str,
+    missing: dict[str, SyncRecord],
+    *,
+    deleted_by: str,
+    now: str,
+) -> dict[str, int]:
+    """Soft-delete recorded objects that are no longer in the SparxEA file.
+
+    Each gets a 'delete' version copied from its current one, as the
+    soft_delete_* services write, and loses its sync record.
+    Returns the number removed per object type.
+    """
+    removed = dict.fromkeys(OBJECT_TABLES, 0)
+    for guid, record in missing.items():
+        table, versions, fk = OBJECT_TABLES[record.object_type]
+        new_version = record.current_version + 1
+        columns = (
+            "label, description, data" if record.object_type == "relationship"
+            else "name, description, data"
+        )
+        cursor = await db.execute(
+            f"UPDATE {table} SET current_version = ?, updated_at = ?, "  # noqa: S608
+            "is_deleted = 1 WHERE id = ? AND is_deleted = 0",
+            (new_version, now, record.object_id),
+        )
+        if cursor.rowcount:
+            await db.execute(
+                f"INSERT INTO {versions} ({fk}, version, {columns}, "  # noqa: S608
+                f"change_type, created_at, created_by) "
+                f"SELECT {fk}, ?, {columns}, 'delete', ?, ? FROM {versions} "
+                f"WHERE {fk} = ? AND version = ?",
+                (new_version, now, deleted_by, record.object_id, record.current_version),
+            )
+            removed[record.object_type] += 1
+        await db.execute(DELETE_SYNC_OBJECT_SQL, (set_id, guid))
+    await db.commit()
+    return removed
+
+
+async def record_sync_state(
+    db: aiosqlite.Connection,
+    set_id: str,
+    *,
+    watermark: str | None,
+    synced_by: str,
+    now: str,
+) -> None:
+    """Record a completed import of the set and its watermark."""
+    await db.execute(
+        "INSERT INTO sparx_sync_state (set_id, watermark, synced_at, synced_by) "
+        "VALUES (?, ?, ?, ?) ON CONFLICT(set_id) DO UPDATE SET "
+        "watermark = COALESCE(excluded.watermark, watermark), "
+        "synced_at = excluded.synced_at, synced_by = excluded.synced_by",
+        (set_id, watermark, now, synced_by),
+    )
+    await db.commit()
@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.auth.dependencies import get_current_user
+from app.database import get_read_db, get_write_db
 from app.locks.models import (
     LockAcquireRequest,
     LockCheckResponse,
@@ -22,6 +23,9 @@ from app.locks.service import (
     release_lock,
 )
 
+if TYPE_CHECKING:
+    import aiosqlite
+
 router = APIRouter(prefix="/api/locks", tags=["locks"])
 admin_router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -35,11 +39,10 @@ def _require_admin(current_user: dict[str, Any]) -> None:
 @router.post("", response_model=LockResponse, status_code=200)
 async def acquire(
     body: LockAcquireRequest,
-    request: Request,
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
 ) -> LockResponse:
     """Acquire an edit lock. Returns 200 with lock or 409 with holder info."""
-    db = request.app.state.db_manager.main_db
     result = await acquire_lock(
         db,
         target_type=body.target_type,
@@ -60,13 +63,12 @@ async def acquire(
 
 @router.get("/check", response_model=LockCheckResponse)
 async def check(
-    request: Request,
     target_type: str = Query(...),
     target_id: str = Query(...),
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
 ) -> LockCheckResponse:
     """Check if a target is locked."""
-    db = request.app.state.db_manager.main_db
     result = await check_lock(
         db,
         target_type=target_type,
@@ -84,11 +86,10 @@ async def check(
 @router.put("/{lock_id}/heartbeat", response_model=LockResponse)
 async def heartbeat(
     lock_id: str,
-    request: Request,
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
 ) -> LockResponse:
     """Extend a lock's expiry."""
-    db = request.app.state.db_manager.main_db
     result = await heartbeat_lock(db, lock_id, current_user["id"])
     if result is None:
         raise HTTPException(status_code=404, detail="Lock not found or not owned")
@@ -98,11 +99,10 @@ async def heartbeat(
 @router.delete("/{lock_id}", status_code=204)
 async def release(
     lock_id: str,
-    request: Request,
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
 ) -> None:
     """Release an edit lock (owner only)."""
-    db = request.app.state.db_manager.main_db
     released = await release_lock(db, lock_id, current_user["id"])
     if not released:
         raise HTTPException(status_code=404, detail="Lock not found or not owned")
@@ -111,11 +111,10 @@ async def release(
 @router.post("/{lock_id}/release", status_code=204)
 async def release_via_post(
     lock_id: str,
-    request: Request,
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
 ) -> None:
     """Release an edit lock via POST (for sendBeacon compatibility)."""
-    db = request.app.state.db_manager.main_db
     released = await release_lock(db, lock_id, current_user["id"])
     if not released:
         raise HTTPException(status_code=404, detail="Lock not found or not owned")
@@ -123,11 +122,10 @@ async def release_via_post(
 
 @router.get("", response_model=LockListResponse)
 async def list_locks(
-    request: Request,
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
 ) -> LockListResponse:
     """List all active locks."""
-    db = request.app.state.db_manager.main_db
     items = await list_active_locks(db)
     return LockListResponse(
         items=[LockResponse(**item) for item in items],
@@ -138,12 +136,11 @@ async def list_locks(
 @admin_router.delete("/locks/{lock_id}", status_code=204)
 async def admin_force_release(
     lock_id: str,
-    request: Request,
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
 ) -> None:
     """Force-release a lock (admin only)."""
     _require_admin(current_user)
-    db = request.app.state.db_manager.main_db
     released = await force_release_lock(db, lock_id)
     if not released:
         raise HTTPException(status_code=404, detail="Lock not found")
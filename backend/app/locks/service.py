@@ -1,4 +1,10 @@
-"""Edit lock service with lazy expiry cleanup (ADR-080)."""
+"""Edit lock service with lazy expiry cleanup (ADR-080).
+
+Expired locks are ignored by every read and purged when a lock is acquired.
+Acquisition runs in a ``BEGIN IMMEDIATE`` transaction and heartbeat/release
+are single conditional statements, so lock state stays consistent when
+several worker processes share the database.
+"""
 
 from __future__ import annotations
 
@@ -31,10 +37,35 @@ async def acquire_lock(
     username: str,
 ) -> dict:
     """Acquire or refresh a lock. Returns lock dict or conflict info."""
-    await cleanup_expired_locks(db)
+    # Hold the write lock from the expiry purge through the insert so no
+    # other connection or worker can take the same target in between
+    await db.execute("BEGIN IMMEDIATE")
+    try:
+        result = await _acquire_in_transaction(
+            db, target_type=target_type, target_id=target_id,
+            user_id=user_id, username=username,
+        )
+    except Exception:
+        await db.rollback()
+        raise
+    await db.commit()
+    return result
+
 
+async def _acquire_in_transaction(
+    db: aiosqlite.Connection,
+    *,
+    target_type: str,
+    target_id: str,
+    user_id: str,
+    username: str,
+) -> dict:
+    """Body of acquire_lock, run inside its transaction."""
     now = datetime.now(tz=UTC)
     expires_at = now + timedelta(minutes=LOCK_DURATION_MINUTES)
+    await db.execute(
+        "DELETE FROM edit_locks WHERE expires_at < ?", (now.isoformat(),)
+    )
 
     # Check existing lock
     cursor = await db.execute(
@@ -51,7 +82,6 @@ async def acquire_lock(
                 "UPDATE edit_locks SET expires_at = ?, last_heartbeat = ? WHERE id = ?",
                 (expires_at.isoformat(), now.isoformat(), existing[0]),
             )
-            await db.commit()
             return {
                 "lock": {
                     "id": existing[0],
@@ -88,7 +118,6 @@ async def acquire_lock(
         (lock_id, target_type, target_id, user_id, username,
          now.isoformat(), expires_at.isoformat(), now.isoformat()),
     )
-    await db.commit()
     return {
         "lock": {
             "id": lock_id,
@@ -111,13 +140,13 @@ async def check_lock(
     user_id: str,
 ) -> dict:
     """Check whether a target is locked."""
-    await cleanup_expired_locks(db)
-
+    now = datetime.now(tz=UTC).isoformat()
     cursor = await db.execute(
         "SELECT id, target_type, target_id, user_id, username, "
         "acquired_at, expires_at, last_heartbeat "
-        "FROM edit_locks WHERE target_type = ? AND target_id = ?",
-        (target_type, target_id),
+        "FROM edit_locks WHERE target_type = ? AND target_id = ? "
+        "AND expires_at >= ?",
+        (target_type, target_id, now),
     )
     row = await cursor.fetchone()
     if row is None:
@@ -146,22 +175,16 @@ async def heartbeat_lock(
     user_id: str,
 ) -> dict | None:
     """Extend a lock's expiry. Returns updated lock or None."""
-    cursor = await db.execute(
-        "SELECT user_id FROM edit_locks WHERE id = ?", (lock_id,)
-    )
-    row = await cursor.fetchone()
-    if row is None:
-        return None
-    if row[0] != user_id:
-        return None
-
     now = datetime.now(tz=UTC)
     expires_at = now + timedelta(minutes=LOCK_DURATION_MINUTES)
-    await db.execute(
-        "UPDATE edit_locks SET expires_at = ?, last_heartbeat = ? WHERE id = ?",
-        (expires_at.isoformat(), now.isoformat(), lock_id),
+    cursor = await db.execute(
+        "UPDATE edit_locks SET expires_at = ?, last_heartbeat = ? "
+        "WHERE id = ? AND user_id = ?",
+        (expires_at.isoformat(), now.isoformat(), lock_id, user_id),
     )
     await db.commit()
+    if cursor.rowcount == 0:
+        return None
 
     cursor = await db.execute(
         "SELECT id, target_type, target_id, user_id, username, "
@@ -184,17 +207,10 @@ async def release_lock(
 ) -> bool:
     """Release a lock (owner only). Returns True if released."""
     cursor = await db.execute(
-        "SELECT user_id FROM edit_locks WHERE id = ?", (lock_id,)
+        "DELETE FROM edit_locks WHERE id = ? AND user_id = ?", (lock_id, user_id),
     )
-    row = await cursor.fetchone()
-    if row is None:
-        return False
-    if row[0] != user_id:
-        return False
-
-    await db.execute("DELETE FROM edit_locks WHERE id = ?", (lock_id,))
     await db.commit()
-    return True
+    return cursor.rowcount > 0
 
 
 async def force_release_lock(
@@ -202,25 +218,19 @@ async def force_release_lock(
     lock_id: str,
 ) -> bool:
     """Force-release a lock (admin). Returns True if released."""
-    cursor = await db.execute(
-        "SELECT id FROM edit_locks WHERE id = ?", (lock_id,)
-    )
-    if await cursor.fetchone() is None:
-        return False
-
-    await db.execute("DELETE FROM edit_locks WHERE id = ?", (lock_id,))
+    cursor = await db.execute("DELETE FROM edit_locks WHERE id = ?", (lock_id,))
     await db.commit()
-    return True
+    return cursor.rowcount > 0
 
 
 async def list_active_locks(db: aiosqlite.Connection) -> list[dict]:
     """List all non-expired locks."""
-    await cleanup_expired_locks(db)
-
+    now = datetime.now(tz=UTC).isoformat()
     cursor = await db.execute(
         "SELECT id, target_type, target_id, user_id, username, "
         "acquired_at, expires_at, last_heartbeat "
-        "FROM edit_locks ORDER BY acquired_at DESC"
+        "FROM edit_locks WHERE expires_at >= ? ORDER BY acquired_at DESC",
+        (now,),
     )
     rows = await cursor.fetchall()
     return [
@@ -5,10 +5,11 @@ from __future__ import annotations
 from contextlib import asynccontextmanager
 from typing import TYPE_CHECKING
 
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.audit.router import router as audit_router
+from app.auth.cache import IdentityCache
 from app.auth.router import router as auth_router
 from app.batch.router import router as batch_router
 from app.bookmarks.router import router as bookmarks_router
@@ -23,7 +24,12 @@ from app.locks.router import router as locks_router
 from app.elements.router import router as elements_router
 from app.import_sparx.router import router as import_router
 from app.middleware.audit import AuditMiddleware
-from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.rate_limit import (
+    RateLimitMiddleware,
+    SharedRateLimiter,
+    SlidingWindowRateLimiter,
+)
+from app.middleware.security_headers import SecurityHeadersMiddleware
 from app.package_relationships.router import router as package_relationships_router
 from app.packages.router import router as packages_router
 from app.recycle_bin.router import router as recycle_bin_router
@@ -47,7 +53,10 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     db_manager = DatabaseManager(config.database)
     await initialize_databases(db_manager)
     app.state.db_manager = db_manager
+    db_manager.thumbnail_queue.start_sweep()
     yield
+    if isinstance(app.state.rate_limiter, SharedRateLimiter):
+        await app.state.rate_limiter.close()
     await db_manager.close()
 
 
@@ -65,13 +74,24 @@ def create_app(config: AppConfig | None = None) -> FastAPI:
         lifespan=lifespan,
     )
     app.state.config = config
+    # Cache invalidation is per process, so workers sharing a database skip it
+    app.state.identity_cache = IdentityCache(
+        ttl=0 if config.database.multi_worker else config.auth.identity_cache_ttl,
+    )
 
     # Audit middleware per SPEC-007-A (innermost — runs after auth resolves)
     app.add_middleware(AuditMiddleware)
 
     # Rate limiting middleware per SPEC-005-B
+    # The limiter lives on app.state so it can be inspected and closed; in
+    # multi-worker mode its windows are shared through iris_coord.db
+    if config.database.multi_worker:
+        app.state.rate_limiter = SharedRateLimiter(config.database.coord_db_path)
+    else:
+        app.state.rate_limiter = SlidingWindowRateLimiter()
     app.add_middleware(
         RateLimitMiddleware,
+        limiter=app.state.rate_limiter,
         login=config.rate_limit_login,
         refresh=config.rate_limit_refresh,
         general=config.rate_limit_general,
@@ -83,23 +103,13 @@ def create_app(config: AppConfig | None = None) -> FastAPI:
         allow_origins=config.cors_origins,
         allow_credentials=True,
         allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        allow_headers=["Authorization", "Content-Type", "If-Match"],
+        allow_headers=["Authorization", "Content-Type", "If-Match", "If-None-Match"],
+        expose_headers=["ETag"],
         max_age=3600,
     )
 
-    # Security headers middleware per SPEC-004-A
-    @app.middleware("http")
-    async def security_headers_middleware(
-        request: Request, call_next: object
-    ) -> Response:
-        response: Response = await call_next(request)  # type: ignore[misc]
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Strict-Transport-Security"] = (
-            "max-age=31536000; includeSubDomains"
-        )
-        return response
+    # Security headers middleware per SPEC-004-A (outermost)
+    app.add_middleware(SecurityHeadersMiddleware)
 
     # Health check endpoint
     @app.get("/health")
@@ -6,14 +6,10 @@ import logging
 from typing import TYPE_CHECKING
 
 from jose import jwt
-from starlette.middleware.base import BaseHTTPMiddleware
-
-from app.audit.service import write_audit_entry
+from starlette.requests import Request
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
-
-    from fastapi import Request, Response
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
@@ -44,52 +40,80 @@ def _get_client_ip(request: Request) -> str:
 
 
 async def _resolve_username(request: Request, user_id: str) -> str:
-    """Resolve user_id (GUID) to username via the users table."""
+    """Resolve user_id (GUID) to username via the identity cache or users table."""
     if user_id == "anonymous":
         return "anonymous"
+    cached = request.app.state.identity_cache.get_user(user_id)
+    if cached is not None:
+        return cached.username
     try:
-        main_db = request.app.state.db_manager.main_db
-        cursor = await main_db.execute(
-            "SELECT username FROM users WHERE id = ?", (user_id,),
-        )
-        row = await cursor.fetchone()
+        async with request.app.state.db_manager.read_connection() as db:
+            cursor = await db.execute(
+                "SELECT username FROM users WHERE id = ?", (user_id,),
+            )
+            row = await cursor.fetchone()
         return row[0] if row else user_id
     except Exception:
         return user_id
 
 
-class AuditMiddleware(BaseHTTPMiddleware):
-    """Middleware that logs mutating requests to the audit chain."""
+async def _resolve_identity(request: Request) -> tuple[str, str, str | None]:
+    """Return (user_id, username, jti) for the request being audited.
+
+    Routes that authenticated through get_current_user leave the resolved
+    user on request.state; only requests that never reached it (anonymous,
+    rejected or auth-free routes) fall back to decoding the bearer token.
+    """
+    current_user = getattr(request.state, "current_user", None)
+    if current_user is not None:
+        return current_user["id"], current_user["username"], current_user["jti"]
+    claims = _decode_token(request)
+    user_id = claims.get("sub", "anonymous") if claims else "anonymous"
+    jti = claims.get("jti") if claims else None
+    return user_id, await _resolve_username(request, user_id), jti
+
+
+class AuditMiddleware:
+    """Middleware that logs mutating requests to the audit chain.
+
+    Plain ASGI rather than BaseHTTPMiddleware: the entry is written when the
+    response starts, before its headers are forwarded, so the client still
+    sees the response only after the audit append (under sync durability)
+    without the body being re-streamed through a wrapper task.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[..., Response]
-    ) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Intercept mutating requests and write audit entries."""
-        response: Response = await call_next(request)  # type: ignore[misc]
-
-        if request.method not in _AUDITED_METHODS:
-            return response
-
-        action = f"{request.method} {request.url.path}"
-        claims = _decode_token(request)
-        user_id = claims.get("sub", "anonymous") if claims else "anonymous"
-        jti = claims.get("jti") if claims else None
-        ip_address = _get_client_ip(request)
-        username = await _resolve_username(request, user_id)
-
-        try:
-            audit_db = request.app.state.db_manager.audit_db
-            await write_audit_entry(
-                db=audit_db,
-                user_id=user_id,
-                username=username,
-                action=action,
-                target_type="http",
-                target_id=request.url.path,
-                detail={"status_code": response.status_code, "jti": jti},
-                ip_address=ip_address,
-            )
-        except Exception:
-            logger.exception("Failed to write audit entry for %s", action)
+        if scope["type"] != "http" or scope["method"] not in _AUDITED_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_audit(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                await _write_entry(Request(scope), message["status"])
+            await send(message)
+
+        await self.app(scope, receive, send_with_audit)
+
 
-        return response
+async def _write_entry(request: Request, status_code: int) -> None:
+    """Append the audit entry for a completed mutating request."""
+    action = f"{request.method} {request.url.path}"
+    user_id, username, jti = await _resolve_identity(request)
+    ip_address = _get_client_ip(request)
+
+    try:
+        await request.app.state.db_manager.audit_writer.submit(
+            user_id=user_id,
+            username=username,
+            action=action,
+            target_type="http",
+            target_id=request.url.path,
+            detail={"status_code": status_code, "jti": jti},
+            ip_address=ip_address,
+        )
+    except Exception:
+        logger.exception("Failed to write audit entry for %s", action)
@@ -2,46 +2,173 @@
 
 from __future__ import annotations
 
+import asyncio
+import logging
+import sqlite3
 import time
-from collections import defaultdict
 from typing import TYPE_CHECKING
 
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
 
+from app.coordination import open_coordination_db
+
 if TYPE_CHECKING:
     from collections.abc import Callable
 
-    from fastapi import Request, Response
+    import aiosqlite
+    from starlette.types import ASGIApp, Receive, Scope, Send
 
+logger = logging.getLogger(__name__)
 
-class SlidingWindowRateLimiter:
-    """In-memory sliding window rate limiter keyed by (client_ip, category)."""
 
-    def __init__(self) -> None:
-        self._requests: dict[str, list[float]] = defaultdict(list)
+class _WindowCounter:
+    """Request counts for a key's current and previous fixed windows."""
 
-    def is_allowed(self, key: str, limit: int, window: int = 60) -> bool:
-        """Check if the request is allowed under the rate limit."""
-        now = time.monotonic()
-        timestamps = self._requests[key]
+    __slots__ = ("current", "previous", "start")
+
+    def __init__(self, start: float, current: int = 0, previous: int = 0) -> None:
+        self.start = start
+        self.current = current
+        self.previous = previous
 
-        # Remove expired entries
-        cutoff = now - window
-        self._requests[key] = [t for t in timestamps if t > cutoff]
-        timestamps = self._requests[key]
+    def admit(self, now: float, limit: int, window: int) -> bool:
+        """Roll the windows forward to now and count the request if under limit."""
+        if now - self.start >= window:
+            elapsed_windows = int((now - self.start) // window)
+            # Only the window immediately before the current one still overlaps
+            self.previous = self.current if elapsed_windows == 1 else 0
+            self.current = 0
+            self.start += elapsed_windows * window
 
-        if len(timestamps) >= limit:
+        overlap = 1 - (now - self.start) / window
+        if self.previous * overlap + self.current >= limit:
             return False
 
-        timestamps.append(now)
+        self.current += 1
         return True
 
 
-def _get_client_ip(request: Request) -> str:
-    """Extract client IP from request."""
-    if request.client:
-        return request.client.host
+class SlidingWindowRateLimiter:
+    """In-memory sliding window rate limiter keyed by (client_ip, category).
+
+    Uses the sliding window counter approximation: each key keeps only the
+    counts of its current and previous fixed windows, and the previous count
+    is weighted by how much of it still overlaps the sliding window. State
+    and per-call cost are O(1) regardless of the limit. Windows are aligned
+    to each key's first request, so a burst from a new key is counted
+    exactly. Keys idle for a full window carry no count and are evicted by a
+    sweep that runs at most once per sweep_interval seconds.
+    """
+
+    def __init__(
+        self,
+        sweep_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._windows: dict[str, _WindowCounter] = {}
+        self._sweep_interval = sweep_interval
+        self._clock = clock
+        self._next_sweep = clock() + sweep_interval
+        self._evicted = 0
+
+    def is_allowed(self, key: str, limit: int, window: int = 60) -> bool:
+        """Check if the request is allowed under the rate limit."""
+        now = self._clock()
+        if now >= self._next_sweep:
+            self._evict_idle(now, window)
+
+        counter = self._windows.get(key)
+        if counter is None:
+            counter = self._windows[key] = _WindowCounter(now)
+        return counter.admit(now, limit, window)
+
+    async def allow(self, key: str, limit: int, window: int = 60) -> bool:
+        """Awaitable is_allowed, the interface RateLimitMiddleware calls."""
+        return self.is_allowed(key, limit, window)
+
+    def stats(self) -> dict[str, int]:
+        """Number of keys currently tracked and evicted since startup."""
+        return {"tracked_keys": len(self._windows), "evicted_keys": self._evicted}
+
+    def _evict_idle(self, now: float, window: int) -> None:
+        """Drop keys whose current window ended more than a window ago."""
+        cutoff = now - 2 * window
+        idle = [key for key, c in self._windows.items() if c.start <= cutoff]
+        for key in idle:
+            del self._windows[key]
+        self._evicted += len(idle)
+        self._next_sweep = now + self._sweep_interval
+
+
+class SharedRateLimiter:
+    """Sliding window rate limiter shared by worker processes via iris_coord.db.
+
+    Used in multi-worker mode so every worker counts against the same
+    windows. Each check reads and updates the key's row inside one
+    ``BEGIN IMMEDIATE`` transaction, so concurrent workers cannot both admit
+    the last request of a window. Times are wall-clock because monotonic
+    clocks are not comparable across processes.
+    """
+
+    def __init__(self, path: str, sweep_interval: float = 60.0) -> None:
+        self._path = path
+        self._sweep_interval = sweep_interval
+        self._db: aiosqlite.Connection | None = None
+        # One transaction at a time on this process's connection
+        self._lock = asyncio.Lock()
+        self._next_sweep = time.time() + sweep_interval
+
+    async def allow(self, key: str, limit: int, window: int = 60) -> bool:
+        """Check if the request is allowed under the rate limit."""
+        async with self._lock:
+            if self._db is None:
+                self._db = await open_coordination_db(self._path)
+            db = self._db
+            now = time.time()
+            try:
+                await db.execute("BEGIN IMMEDIATE")
+                if now >= self._next_sweep:
+                    await db.execute(
+                        "DELETE FROM rate_limit_windows WHERE window_start <= ?",
+                        (now - 2 * window,),
+                    )
+                    self._next_sweep = now + self._sweep_interval
+                cursor = await db.execute(
+                    "SELECT window_start, current, previous "
+                    "FROM rate_limit_windows WHERE key = ?",
+                    (key,),
+                )
+                row = await cursor.fetchone()
+                counter = _WindowCounter(*row) if row else _WindowCounter(now)
+                allowed = counter.admit(now, limit, window)
+                await db.execute(
+                    "INSERT INTO rate_limit_windows "
+                    "(key, window_start, current, previous) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET window_start = excluded.window_start, "
+                    "current = excluded.current, previous = excluded.previous",
+                    (key, counter.start, counter.current, counter.previous),
+                )
+                await db.commit()
+            except sqlite3.Error:
+                # Fail open: an unavailable coordination database must not
+                # take every request down with it
+                logger.exception("Shared rate limit check failed for %s", key)
+                await db.rollback()
+                return True
+            return allowed
+
+    async def close(self) -> None:
+        """Close the coordination database connection."""
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+
+def _get_client_ip(scope: Scope) -> str:
+    """Extract client IP from the ASGI scope."""
+    client = scope.get("client")
+    if client:
+        return client[0]
     return "unknown"
 
 
@@ -54,32 +181,46 @@ def _get_rate_category(path: str) -> str:
     return "general"
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Sliding window rate limiting middleware."""
+class RateLimitMiddleware:
+    """Sliding window rate limiting middleware.
+
+    Implemented as plain ASGI rather than BaseHTTPMiddleware so allowed
+    requests pass straight through without per-request task and stream
+    wrapping.
+    """
 
-    def __init__(self, app: object, **kwargs: int) -> None:
-        super().__init__(app)  # type: ignore[arg-type]
-        self.limiter = SlidingWindowRateLimiter()
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: SlidingWindowRateLimiter | SharedRateLimiter | None = None,
+        **kwargs: int,
+    ) -> None:
+        self.app = app
+        self.limiter = limiter or SlidingWindowRateLimiter()
         self.limits: dict[str, int] = {
             "login": kwargs.get("login", 10),
             "refresh": kwargs.get("refresh", 30),
             "general": kwargs.get("general", 100),
         }
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[..., Response]
-    ) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Check rate limit before processing request."""
-        client_ip = _get_client_ip(request)
-        category = _get_rate_category(request.url.path)
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        client_ip = _get_client_ip(scope)
+        category = _get_rate_category(scope["path"])
         limit = self.limits[category]
         key = f"{client_ip}:{category}"
 
-        if not self.limiter.is_allowed(key, limit):
-            return JSONResponse(
+        if not await self.limiter.allow(key, limit):
+            response = JSONResponse(
                 status_code=429,
                 content={"detail": "Too many requests"},
                 headers={"Retry-After": "60"},
             )
+            await response(scope, receive, send)
+            return
 
-        return await call_next(request)  # type: ignore[misc]
+        await self.app(scope, receive, send)
@@ -0,0 +1,32 @@
+"""Migration 025: Signed verification checkpoints in the audit database.
+
+Per SPEC-007-A. Each checkpoint records the last audit entry whose chain was
+verified, so startup only rehashes entries appended since. This migration runs
+against iris_audit.db, not iris.db.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import aiosqlite
+
+MIGRATION_ID = "m025_audit_checkpoints"
+
+UP_SQL = """
+CREATE TABLE IF NOT EXISTS audit_checkpoints (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    last_entry_id INTEGER NOT NULL,
+    last_entry_hash TEXT NOT NULL,
+    verified_at TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    signature TEXT NOT NULL
+);
+"""
+
+
+async def up(db: aiosqlite.Connection) -> None:
+    """Run migration up against the audit database."""
+    await db.executescript(UP_SQL)
+    await db.commit()
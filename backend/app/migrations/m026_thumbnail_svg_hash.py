@@ -0,0 +1,19 @@
+"""Migration 026: Record the source SVG content hash for each diagram thumbnail."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import aiosqlite
+
+
+async def up(db: aiosqlite.Connection) -> None:
+    """Add svg_hash column to diagram_thumbnails."""
+    cursor = await db.execute("PRAGMA table_info(diagram_thumbnails)")
+    columns = [row[1] for row in await cursor.fetchall()]
+    if "svg_hash" in columns:
+        return
+
+    await db.execute("ALTER TABLE diagram_thumbnails ADD COLUMN svg_hash TEXT")
+    await db.commit()
@@ -0,0 +1,22 @@
+"""Migration 027: Stamp each diagram thumbnail with the diagram version it shows."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import aiosqlite
+
+
+async def up(db: aiosqlite.Connection) -> None:
+    """Add diagram_version column to diagram_thumbnails.
+
+    Existing rows keep NULL and are re-rendered on their next request.
+    """
+    cursor = await db.execute("PRAGMA table_info(diagram_thumbnails)")
+    columns = [row[1] for row in await cursor.fetchall()]
+    if "diagram_version" in columns:
+        return
+
+    await db.execute("ALTER TABLE diagram_thumbnails ADD COLUMN diagram_version INTEGER")
+    await db.commit()
@@ -0,0 +1,56 @@
+"""Migration 028: Element-to-diagram reference index.
+
+Creates diagram_element_refs and backfills it once from each diagram's
+current version data.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import aiosqlite
+
+
+async def up(db: aiosqlite.Connection) -> None:
+    """Create and backfill diagram_element_refs."""
+    cursor = await db.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name='diagram_element_refs'"
+    )
+    if await cursor.fetchone():
+        return
+
+    await db.execute(
+        "CREATE TABLE diagram_element_refs ("
+        "  diagram_id TEXT NOT NULL REFERENCES diagrams(id) ON DELETE CASCADE,"
+        "  element_id TEXT NOT NULL REFERENCES elements(id) ON DELETE CASCADE,"
+        "  PRIMARY KEY (diagram_id, element_id)"
+        ") WITHOUT ROWID"
+    )
+    await db.execute(
+        "CREATE INDEX idx_diagram_element_refs_element "
+        "ON diagram_element_refs(element_id, diagram_id)"
+    )
+
+    # Backfill from current versions; malformed canvas JSON is skipped
+    await db.execute(
+        "INSERT OR IGNORE INTO diagram_element_refs (diagram_id, element_id) "
+        "SELECT d.id, e.id "
+        "FROM diagrams d "
+        "JOIN diagram_versions dv ON d.id = dv.diagram_id "
+        "AND d.current_version = dv.version, "
+        "json_tree(dv.data) t "
+        "JOIN elements e ON e.id = t.atom "
+        "WHERE json_valid(dv.data) AND t.type = 'text'"
+    )
+    await db.execute(
+        "INSERT OR IGNORE INTO diagram_element_refs (diagram_id, element_id) "
+        "SELECT d.id, e.id "
+        "FROM diagrams d "
+        "JOIN diagram_versions dv ON d.id = dv.diagram_id "
+        "AND d.current_version = dv.version, "
+        "json_tree(dv.data) t "
+        "JOIN elements e ON e.id = t.key "
+        "WHERE json_valid(dv.data) AND typeof(t.key) = 'text'"
+    )
+    await db.commit()
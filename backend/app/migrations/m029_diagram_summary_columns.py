@@ -0,0 +1,44 @@
+"""Migration 029: Precomputed canvas summary columns on diagrams.
+
+Adds node_count, edge_count and has_content and backfills them once from
+each diagram's current version data.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import aiosqlite
+
+
+async def up(db: aiosqlite.Connection) -> None:
+    """Add and backfill diagram summary columns."""
+    cursor = await db.execute("PRAGMA table_info(diagrams)")
+    columns = [row[1] for row in await cursor.fetchall()]
+    if "node_count" in columns:
+        return
+
+    await db.execute(
+        "ALTER TABLE diagrams ADD COLUMN node_count INTEGER NOT NULL DEFAULT 0"
+    )
+    await db.execute(
+        "ALTER TABLE diagrams ADD COLUMN edge_count INTEGER NOT NULL DEFAULT 0"
+    )
+    await db.execute(
+        "ALTER TABLE diagrams ADD COLUMN has_content INTEGER NOT NULL DEFAULT 0"
+    )
+
+    # Backfill from current versions; malformed canvas JSON counts as empty
+    await db.execute(
+        "UPDATE diagrams SET "
+        "node_count = coalesce(json_array_length(dv.data, '$.nodes'), 0) "
+        "+ coalesce(json_array_length(dv.data, '$.participants'), 0), "
+        "edge_count = coalesce(json_array_length(dv.data, '$.edges'), 0) "
+        "+ coalesce(json_array_length(dv.data, '$.messages'), 0) "
+        "FROM diagram_versions dv "
+        "WHERE dv.diagram_id = diagrams.id "
+        "AND dv.version = diagrams.current_version AND json_valid(dv.data)"
+    )
+    await db.execute("UPDATE diagrams SET has_content = node_count > 0")
+    await db.commit()
@@ -0,0 +1,93 @@
+"""Migration 030: Closure table for the package tree.
+
+package_closure holds one row per (ancestor, descendant) pair of packages,
+including each package paired with itself at depth 0. Triggers keep it in
+step with packages.parent_package_id on insert, move and hard delete, so
+ancestor, descendant, subtree and cycle lookups are single indexed queries
+instead of parent-by-parent walks. Soft-deleted packages keep their rows;
+readers filter on packages.is_deleted.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import aiosqlite
+
+# Guards the backfill against parent cycles in legacy data
+_MAX_BACKFILL_DEPTH = 1000
+
+
+async def up(db: aiosqlite.Connection) -> None:
+    """Create, backfill and attach triggers for package_closure."""
+    cursor = await db.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name='package_closure'"
+    )
+    if await cursor.fetchone():
+        return
+
+    await db.execute(
+        "CREATE TABLE package_closure ("
+        "  ancestor TEXT NOT NULL,"
+        "  descendant TEXT NOT NULL,"
+        "  depth INTEGER NOT NULL,"
+        "  PRIMARY KEY (ancestor, descendant)"
+        ") WITHOUT ROWID"
+    )
+    await db.execute(
+        "CREATE INDEX idx_package_closure_descendant "
+        "ON package_closure(descendant, depth)"
+    )
+
+    await db.execute(
+        "INSERT OR IGNORE INTO package_closure (ancestor, descendant, depth) "
+        "WITH RECURSIVE chain(ancestor, descendant, depth) AS ("
+        "  SELECT id, id, 0 FROM packages "
+        "  UNION ALL "
+        "  SELECT p.parent_package_id, c.descendant, c.depth + 1 "
+        "  FROM chain c JOIN packages p ON p.id = c.ancestor "
+        "  WHERE p.parent_package_id IS NOT NULL AND c.depth < ?"
+        ") SELECT ancestor, descendant, depth FROM chain",
+        (_MAX_BACKFILL_DEPTH,),
+    )
+
+    # New package: itself, plus every ancestor of its parent one level further
+    await db.execute(
+        "CREATE TRIGGER package_closure_insert AFTER INSERT ON packages "
+        "BEGIN "
+        "  INSERT INTO package_closure (ancestor, descendant, depth) "
+        "  VALUES (NEW.id, NEW.id, 0); "
+        "  INSERT INTO package_closure (ancestor, descendant, depth) "
+        "  SELECT ancestor, NEW.id, depth + 1 FROM package_closure "
+        "  WHERE descendant = NEW.parent_package_id; "
+        "END"
+    )
+    # Move: detach the subtree from its old ancestors, then attach it below
+    # every ancestor of the new parent
+    await db.execute(
+        "CREATE TRIGGER package_closure_move "
+        "AFTER UPDATE OF parent_package_id ON packages "
+        "WHEN OLD.parent_package_id IS NOT NEW.parent_package_id "
+        "BEGIN "
+        "  DELETE FROM package_closure "
+        "  WHERE descendant IN ("
+        "    SELECT descendant FROM package_closure WHERE ancestor = NEW.id"
+        "  ) AND ancestor IN ("
+        "    SELECT ancestor FROM package_closure "
+        "    WHERE descendant = NEW.id AND depth > 0"
+        "  ); "
+        "  INSERT INTO package_closure (ancestor, descendant, depth) "
+        "  SELECT a.ancestor, d.descendant, a.depth + d.depth + 1 "
+        "  FROM package_closure a, package_closure d "
+        "  WHERE a.descendant = NEW.parent_package_id AND d.ancestor = NEW.id; "
+        "END"
+    )
+    await db.execute(
+        "CREATE TRIGGER package_closure_delete AFTER DELETE ON packages "
+        "BEGIN "
+        "  DELETE FROM package_closure "
+        "  WHERE ancestor = OLD.id OR descendant = OLD.id; "
+        "END"
+    )
+    await db.commit()
@@ -0,0 +1,24 @@
+"""Migration 031: Composite indexes for keyset pagination.
+
+List endpoints page through live (and, for the recycle bin, deleted) rows
+newest first by (updated_at, id); these indexes serve that order directly.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import aiosqlite
+
+_TABLES = ("elements", "diagrams", "relationships", "packages")
+
+
+async def up(db: aiosqlite.Connection) -> None:
+    """Create (is_deleted, updated_at, id) indexes on the paginated tables."""
+    for table in _TABLES:
+        await db.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_keyset "
+            f"ON {table}(is_deleted, updated_at, id)"
+        )
+    await db.commit()
@@ -0,0 +1,33 @@
+"""Migration 032: Expression indexes on the SparxEA GUID in version metadata.
+
+SparxEA imports record each package, element and diagram's ``ea_guid`` in
+its version metadata JSON. Re-imports look existing items up by that GUID;
+these indexes let them fetch just the incoming GUIDs instead of parsing the
+metadata of every version in the set. Metadata that is not valid JSON
+indexes as NULL rather than failing the lookup.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import aiosqlite
+
+_TABLES = ("package_versions", "element_versions", "diagram_versions")
+
+# Must stay identical to EA_GUID_SQL in app/import_sparx/service.py, or the
+# planner will not match lookups to the index
+EA_GUID_EXPR = (
+    "(CASE WHEN json_valid(metadata) THEN json_extract(metadata, '$.ea_guid') END)"
+)
+
+
+async def up(db: aiosqlite.Connection) -> None:
+    """Create partial ea_guid expression indexes on the version tables."""
+    for table in _TABLES:
+        await db.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_ea_guid "
+            f"ON {table}({EA_GUID_EXPR}) WHERE metadata IS NOT NULL"
+        )
+    await db.commit()
@@ -0,0 +1,39 @@
+"""Migration 033: SparxEA sync state.
+
+sparx_sync_state holds one row per set that has received a SparxEA import:
+when it was last synced and the watermark, the latest t_object ModifiedDate
+seen. sparx_sync_objects maps each imported element, connector and diagram
+(by ea_guid) to its Iris object and a hash of its source content, so an
+incremental sync can tell added, changed and removed objects apart.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import aiosqlite
+
+
+async def up(db: aiosqlite.Connection) -> None:
+    """Create the SparxEA sync state tables."""
+    await db.execute(
+        "CREATE TABLE IF NOT EXISTS sparx_sync_state ("
+        "  set_id TEXT PRIMARY KEY REFERENCES sets(id),"
+        "  watermark TEXT,"
+        "  synced_at TEXT NOT NULL,"
+        "  synced_by TEXT REFERENCES users(id)"
+        ")"
+    )
+    await db.execute(
+        "CREATE TABLE IF NOT EXISTS sparx_sync_objects ("
+        "  set_id TEXT NOT NULL REFERENCES sets(id),"
+        "  ea_guid TEXT NOT NULL,"
+        "  object_type TEXT NOT NULL"
+        "    CHECK (object_type IN ('element', 'relationship', 'diagram')),"
+        "  object_id TEXT NOT NULL,"
+        "  content_hash TEXT NOT NULL,"
+        "  PRIMARY KEY (set_id, ea_guid)"
+        ") WITHOUT ROWID"
+    )
+    await db.commit()
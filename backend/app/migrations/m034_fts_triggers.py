@@ -0,0 +1,108 @@
+"""Migration 034: Keep the FTS search tables in step with triggers.
+
+elements_fts and diagrams_fts used to be written by hand from each service
+and rebuilt row by row on every startup. Triggers on the object and version
+tables now index the current version of each live object as it is written:
+
+    insert of an object or version  — index it if it is the current version
+    update of current_version, type
+    or is_deleted                   — re-index, or drop once soft-deleted
+    delete of an object             — drop it
+
+Objects have TEXT ids, and the implicit rowid of their rows may change on
+VACUUM, so FTS rows are keyed by object id instead: search_keys gives each
+element and diagram a stable INTEGER PRIMARY KEY, used as its FTS rowid.
+The triggers find an object's FTS row through that key rather than
+scanning the index. The migration rebuilds both tables once by key.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import aiosqlite
+
+# (object table, versions table, version foreign key, FTS table, type column)
+_INDEXED_TABLES = (
+    ("elements", "element_versions", "element_id", "elements_fts", "element_type"),
+    ("diagrams", "diagram_versions", "diagram_id", "diagrams_fts", "diagram_type"),
+)
+
+
+async def up(db: aiosqlite.Connection) -> None:
+    """Key objects for search, rebuild the FTS tables and attach the triggers."""
+    cursor = await db.execute(
+        "SELECT name FROM sqlite_master WHERE type='trigger' AND name='elements_fts_insert'"
+    )
+    if await cursor.fetchone():
+        return
+
+    await db.execute(
+        "CREATE TABLE IF NOT EXISTS search_keys ("
+        "  id INTEGER PRIMARY KEY,"
+        "  object_id TEXT NOT NULL UNIQUE"
+        ")"
+    )
+    for table, versions, fk, fts, type_column in _INDEXED_TABLES:
+        columns = f"rowid, {fk}, name, {type_column}, description"
+        # FTS rowid of an object, by its id
+        key = "(SELECT id FROM search_keys WHERE object_id = {})"
+        await db.execute(
+            f"INSERT OR IGNORE INTO search_keys (object_id) SELECT id FROM {table}"  # noqa: S608
+        )
+        await db.execute(f"DELETE FROM {fts}")  # noqa: S608
+        await db.execute(
+            f"INSERT INTO {fts} ({columns}) "  # noqa: S608
+            f"SELECT k.id, t.id, v.name, t.{type_column}, COALESCE(v.description, '') "
+            f"FROM {table} t JOIN {versions} v "
+            f"ON v.{fk} = t.id AND v.version = t.current_version "
+            "JOIN search_keys k ON k.object_id = t.id "
+            "WHERE t.is_deleted = 0"
+        )
+        # Objects are usually inserted before their first version, when
+        # this indexes nothing; the version trigger then indexes them
+        await db.execute(
+            f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} "  # noqa: S608
+            "BEGIN "
+            "  INSERT OR IGNORE INTO search_keys (object_id) VALUES (NEW.id); "
+            f"  INSERT INTO {fts} ({columns}) "
+            f"  SELECT {key.format('NEW.id')}, NEW.id, v.name, NEW.{type_column}, "
+            "  COALESCE(v.description, '') "
+            f"  FROM {versions} v WHERE v.{fk} = NEW.id "
+            "  AND v.version = NEW.current_version AND NEW.is_deleted = 0; "
+            "END"
+        )
+        await db.execute(
+            f"CREATE TRIGGER {fts}_version AFTER INSERT ON {versions} "  # noqa: S608
+            "BEGIN "
+            f"  DELETE FROM {fts} WHERE rowid = {key.format(f'NEW.{fk}')} "
+            f"  AND EXISTS (SELECT 1 FROM {table} "
+            f"    WHERE id = NEW.{fk} AND current_version = NEW.version); "
+            f"  INSERT INTO {fts} ({columns}) "
+            f"  SELECT {key.format('t.id')}, t.id, NEW.name, t.{type_column}, "
+            "  COALESCE(NEW.description, '') "
+            f"  FROM {table} t WHERE t.id = NEW.{fk} "
+            "  AND t.current_version = NEW.version AND t.is_deleted = 0; "
+            "END"
+        )
+        await db.execute(
+            f"CREATE TRIGGER {fts}_update "  # noqa: S608
+            f"AFTER UPDATE OF current_version, is_deleted, {type_column} ON {table} "
+            "BEGIN "
+            f"  DELETE FROM {fts} WHERE rowid = {key.format('OLD.id')}; "
+            f"  INSERT INTO {fts} ({columns}) "
+            f"  SELECT {key.format('NEW.id')}, NEW.id, v.name, NEW.{type_column}, "
+            "  COALESCE(v.description, '') "
+            f"  FROM {versions} v WHERE v.{fk} = NEW.id "
+            "  AND v.version = NEW.current_version AND NEW.is_deleted = 0; "
+            "END"
+        )
+        await db.execute(
+            f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} "  # noqa: S608
+            "BEGIN "
+            f"  DELETE FROM {fts} WHERE rowid = {key.format('OLD.id')}; "
+            "  DELETE FROM search_keys WHERE object_id = OLD.id; "
+            "END"
+        )
+    await db.commit()
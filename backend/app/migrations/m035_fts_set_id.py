@@ -0,0 +1,98 @@
+"""Migration 035: Store each object's set_id in the FTS search tables.
+
+Search filtered by set used to join every match back to elements or
+diagrams. elements_fts and diagrams_fts are recreated with set_id as an
+UNINDEXED column, so one statement can rank, filter and count matches of
+both tables from the indexes alone. The m034 triggers are replaced by ones
+that also copy set_id, and re-index an object when it moves between sets;
+FTS rows stay keyed by the object's m034 search_keys id.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import aiosqlite
+
+# (object table, versions table, version foreign key, FTS table, type column)
+_INDEXED_TABLES = (
+    ("elements", "element_versions", "element_id", "elements_fts", "element_type"),
+    ("diagrams", "diagram_versions", "diagram_id", "diagrams_fts", "diagram_type"),
+)
+
+
+async def up(db: aiosqlite.Connection) -> None:
+    """Recreate the FTS tables with set_id, refill them and replace the triggers."""
+    cursor = await db.execute("PRAGMA table_info(elements_fts)")
+    if "set_id" in {row[1] for row in await cursor.fetchall()}:
+        return
+
+    for table, versions, fk, fts, type_column in _INDEXED_TABLES:
+        for suffix in ("insert", "version", "update", "delete"):
+            await db.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        await db.execute(f"DROP TABLE IF EXISTS {fts}")
+        await db.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5("
+            f"  {fk} UNINDEXED, name, {type_column} UNINDEXED, description,"
+            "  set_id UNINDEXED, tokenize='porter unicode61'"
+            ")"
+        )
+
+        columns = f"rowid, {fk}, name, {type_column}, description, set_id"
+        # FTS rowid of an object, by its id
+        key = "(SELECT id FROM search_keys WHERE object_id = {})"
+        await db.execute(
+            f"INSERT INTO {fts} ({columns}) "  # noqa: S608
+            f"SELECT k.id, t.id, v.name, t.{type_column}, "
+            "COALESCE(v.description, ''), t.set_id "
+            f"FROM {table} t JOIN {versions} v "
+            f"ON v.{fk} = t.id AND v.version = t.current_version "
+            "JOIN search_keys k ON k.object_id = t.id "
+            "WHERE t.is_deleted = 0"
+        )
+        await db.execute(
+            f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} "  # noqa: S608
+            "BEGIN "
+            "  INSERT OR IGNORE INTO search_keys (object_id) VALUES (NEW.id); "
+            f"  INSERT INTO {fts} ({columns}) "
+            f"  SELECT {key.format('NEW.id')}, NEW.id, v.name, NEW.{type_column}, "
+            "  COALESCE(v.description, ''), NEW.set_id "
+            f"  FROM {versions} v WHERE v.{fk} = NEW.id "
+            "  AND v.version = NEW.current_version AND NEW.is_deleted = 0; "
+            "END"
+        )
+        await db.execute(
+            f"CREATE TRIGGER {fts}_version AFTER INSERT ON {versions} "  # noqa: S608
+            "BEGIN "
+            f"  DELETE FROM {fts} WHERE rowid = {key.format(f'NEW.{fk}')} "
+            f"  AND EXISTS (SELECT 1 FROM {table} "
+            f"    WHERE id = NEW.{fk} AND current_version = NEW.version); "
+            f"  INSERT INTO {fts} ({columns}) "
+            f"  SELECT {key.format('t.id')}, t.id, NEW.name, t.{type_column}, "
+            "  COALESCE(NEW.description, ''), t.set_id "
+            f"  FROM {table} t WHERE t.id = NEW.{fk} "
+            "  AND t.current_version = NEW.version AND t.is_deleted = 0; "
+            "END"
+        )
+        await db.execute(
+            f"CREATE TRIGGER {fts}_update "  # noqa: S608
+            "AFTER UPDATE OF current_version, is_deleted, set_id, "
+            f"{type_column} ON {table} "
+            "BEGIN "
+            f"  DELETE FROM {fts} WHERE rowid = {key.format('OLD.id')}; "
+            f"  INSERT INTO {fts} ({columns}) "
+            f"  SELECT {key.format('NEW.id')}, NEW.id, v.name, NEW.{type_column}, "
+            "  COALESCE(v.description, ''), NEW.set_id "
+            f"  FROM {versions} v WHERE v.{fk} = NEW.id "
+            "  AND v.version = NEW.current_version AND NEW.is_deleted = 0; "
+            "END"
+        )
+        await db.execute(
+            f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} "  # noqa: S608
+            "BEGIN "
+            f"  DELETE FROM {fts} WHERE rowid = {key.format('OLD.id')}; "
+            "  DELETE FROM search_keys WHERE object_id = OLD.id; "
+            "END"
+        )
+    await db.commit()
@@ -2,16 +2,22 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import TYPE_CHECKING
+
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 
 from app.auth.dependencies import get_current_user
+from app.database import get_read_db, get_write_db
 from app.package_relationships.service import (
     create_package_relationship,
     delete_package_relationship,
     list_package_relationships,
 )
 
+if TYPE_CHECKING:
+    import aiosqlite
+
 router = APIRouter(tags=["package-relationships"])
 
 
@@ -26,11 +32,10 @@ class PackageRelationshipCreate(BaseModel):
 async def create(
     package_id: str,
     body: PackageRelationshipCreate,
-    request: Request,
     current_user: dict = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> dict:
     """Create a relationship from this package to another."""
-    db = request.app.state.db_manager.main_db
 
     # Verify source package exists
     cursor = await db.execute(
@@ -69,11 +74,10 @@ async def create(
 @router.get("/api/packages/{package_id}/relationships")
 async def list_rels(
     package_id: str,
-    request: Request,
     current_user: dict = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> dict:
     """List all relationships for a package (package-to-package and element-to-element)."""
-    db = request.app.state.db_manager.main_db
     package_rels = await list_package_relationships(db, package_id)
     return {
         "package_relationships": package_rels,
@@ -84,11 +88,10 @@ async def list_rels(
 @router.delete("/api/package-relationships/{relationship_id}", status_code=204)
 async def delete(
     relationship_id: str,
-    request: Request,
     current_user: dict = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> None:
     """Delete a package relationship."""
-    db = request.app.state.db_manager.main_db
     deleted = await delete_package_relationship(db, relationship_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Relationship not found")
@@ -0,0 +1,47 @@
+"""Queries over the package_closure table (see migration m030).
+
+A package is "live" below an ancestor when neither it nor any package
+between it and that ancestor is soft-deleted, matching what a walk down
+non-deleted parent links would reach. LIVE_PATH_SQL expresses that for a
+closure row aliased ``c``.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import aiosqlite
+
+LIVE_PATH_SQL = (
+    "NOT EXISTS (SELECT 1 FROM package_closure x "
+    "JOIN packages m ON m.id = x.ancestor "
+    "WHERE x.descendant = c.descendant AND x.depth < c.depth "
+    "AND m.is_deleted = 1)"
+)
+
+
+async def get_live_descendant_ids(
+    db: aiosqlite.Connection,
+    package_id: str,
+) -> list[str]:
+    """IDs of all non-deleted packages reachable below a package, excluding itself."""
+    cursor = await db.execute(
+        "SELECT c.descendant FROM package_closure c "  # noqa: S608
+        f"WHERE c.ancestor = ? AND c.depth > 0 AND {LIVE_PATH_SQL}",
+        (package_id,),
+    )
+    return [row[0] for row in await cursor.fetchall()]
+
+
+async def is_ancestor_or_self(
+    db: aiosqlite.Connection,
+    ancestor_id: str,
+    package_id: str,
+) -> bool:
+    """True if ancestor_id is package_id or one of its ancestors."""
+    cursor = await db.execute(
+        "SELECT 1 FROM package_closure WHERE ancestor = ? AND descendant = ?",
+        (ancestor_id, package_id),
+    )
+    return await cursor.fetchone() is not None
@@ -71,6 +71,7 @@ class PackageListResponse(BaseModel):
     """Paginated list of packages."""
 
     items: list[PackageResponse]
-    total: int
+    total: int | None = None
     page: int
     page_size: int
+    next_cursor: str | None = None
@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
 from app.auth.dependencies import get_current_user
+from app.database import get_read_db, get_write_db
 from app.packages.models import (
     PackageCreate,
     PackageHierarchyNode,
@@ -29,17 +30,19 @@ from app.packages.service import (
     update_package,
 )
 
+if TYPE_CHECKING:
+    import aiosqlite
+
 router = APIRouter(prefix="/api/packages", tags=["packages"])
 
 
 @router.post("", response_model=PackageResponse, status_code=201)
 async def create(
     body: PackageCreate,
-    request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> PackageResponse:
     """Create a new package."""
-    db = request.app.state.db_manager.main_db
     result = await create_package(
         db,
         name=body.name,
@@ -54,46 +57,58 @@ async def create(
 
 @router.get("/hierarchy", response_model=list[PackageHierarchyNode])
 async def hierarchy(
-    request: Request,
     root_id: str | None = None,
     set_id: str | None = None,
+    depth: int | None = Query(
+        default=None, ge=0, description="Levels below root_id to include.",
+    ),
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> list[PackageHierarchyNode]:
     """Get the package hierarchy tree."""
-    db = request.app.state.db_manager.main_db
-    tree = await get_package_hierarchy(db, root_id=root_id, set_id=set_id)
+    tree = await get_package_hierarchy(
+        db, root_id=root_id, set_id=set_id, depth=depth,
+    )
     return [PackageHierarchyNode(**node) for node in tree]
 
 
 @router.get("", response_model=PackageListResponse)
 async def list_all(
-    request: Request,
+    *,
     set_id: str | None = None,
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=50, ge=1, le=100),
+    cursor: str | None = Query(
+        default=None, description="next_cursor of the previous page; replaces page.",
+    ),
+    include_total: bool = Query(default=True, description="Count all matching packages."),
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> PackageListResponse:
     """List packages with optional set filter and pagination."""
-    db = request.app.state.db_manager.main_db
-    items, total = await list_packages(
-        db, set_id=set_id, page=page, page_size=page_size,
-    )
+    try:
+        items, total, next_cursor = await list_packages(
+            db, set_id=set_id, page=page, page_size=page_size,
+            after=cursor, include_total=include_total,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     return PackageListResponse(
         items=[PackageResponse(**item) for item in items],
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
     )
 
 
 @router.get("/{package_id}/descendants/count")
 async def get_descendant_count(
     package_id: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> dict[str, int]:
     """Get counts of descendant packages and diagrams."""
-    db = request.app.state.db_manager.main_db
     result = await get_package(db, package_id)
     if result is None:
         raise HTTPException(status_code=404, detail="Package not found")
@@ -103,11 +118,10 @@ async def get_descendant_count(
 @router.get("/{package_id}", response_model=PackageResponse)
 async def get_one(
     package_id: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> PackageResponse:
     """Get a single package by ID."""
-    db = request.app.state.db_manager.main_db
     result = await get_package(db, package_id)
     if result is None:
         raise HTTPException(status_code=404, detail="Package not found")
@@ -120,6 +134,7 @@ async def update(
     body: PackageUpdate,
     request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> PackageResponse:
     """Update a package with optimistic concurrency."""
     if_match = request.headers.get("If-Match")
@@ -134,7 +149,6 @@ async def update(
             status_code=400, detail="If-Match must be an integer version"
         )
 
-    db = request.app.state.db_manager.main_db
     result = await update_package(
         db, package_id,
         name=body.name,
@@ -156,6 +170,7 @@ async def delete(
     package_id: str,
     request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> None:
     """Soft-delete a package."""
     if_match = request.headers.get("If-Match")
@@ -170,7 +185,6 @@ async def delete(
             status_code=400, detail="If-Match must be an integer version"
         )
 
-    db = request.app.state.db_manager.main_db
     deleted = await cascade_delete_package(
         db, package_id,
         deleted_by=current_user["id"],
@@ -183,22 +197,20 @@ async def delete(
 @router.get("/{package_id}/ancestors")
 async def get_ancestors(
     package_id: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> list[dict[str, Any]]:
     """Get ancestor chain for breadcrumb navigation (root first)."""
-    db = request.app.state.db_manager.main_db
     return await get_package_ancestors(db, package_id)
 
 
 @router.get("/{package_id}/children")
 async def get_children(
     package_id: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> list[dict[str, Any]]:
     """Get direct children of a package."""
-    db = request.app.state.db_manager.main_db
     return await get_package_children(db, package_id)
 
 
@@ -206,11 +218,10 @@ async def get_children(
 async def set_parent(
     package_id: str,
     body: dict[str, Any],
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> dict[str, Any]:
     """Set or unset the parent package."""
-    db = request.app.state.db_manager.main_db
     parent_id = body.get("parent_package_id")
     result = await set_package_parent(
         db, package_id, parent_id, updated_by=_current_user["id"],
@@ -230,11 +241,10 @@ async def set_parent(
 )
 async def get_versions(
     package_id: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> list[PackageVersionResponse]:
     """Get all versions of a package."""
-    db = request.app.state.db_manager.main_db
     versions = await get_package_versions(db, package_id)
     if not versions:
         raise HTTPException(status_code=404, detail="Package not found")
@@ -8,6 +8,12 @@ from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
 from app.migrations.m012_sets import DEFAULT_SET_ID
+from app.packages.closure import (
+    LIVE_PATH_SQL,
+    get_live_descendant_ids,
+    is_ancestor_or_self,
+)
+from app.pagination import decode_cursor, split_page
 
 if TYPE_CHECKING:
     import aiosqlite
@@ -104,8 +110,15 @@ async def list_packages(
     set_id: str | None = None,
     page: int = 1,
     page_size: int = 50,
-) -> tuple[list[dict[str, object]], int]:
-    """List packages with pagination."""
+    after: str | None = None,
+    include_total: bool = True,
+) -> tuple[list[dict[str, object]], int | None, str | None]:
+    """List packages with pagination.
+
+    ``after`` continues from an earlier page's next_cursor, ignoring
+    ``page``. Returns (items, total_count, next_cursor); total_count is None
+    unless include_total.
+    """
     where_clauses = ["p.is_deleted = 0"]
     params: list[object] = []
 
@@ -115,14 +128,21 @@ async def list_packages(
 
     where_sql = " AND ".join(where_clauses)
 
-    cursor = await db.execute(
-        f"SELECT COUNT(*) FROM packages p WHERE {where_sql}",  # noqa: S608
-        params,
-    )
-    count_row = await cursor.fetchone()
-    total: int = count_row[0]  # type: ignore[index]
+    total: int | None = None
+    if include_total:
+        cursor = await db.execute(
+            f"SELECT COUNT(*) FROM packages p WHERE {where_sql}",  # noqa: S608
+            params,
+        )
+        count_row = await cursor.fetchone()
+        total = count_row[0]  # type: ignore[index]
 
+    # Fetch page, plus one row to tell whether another follows
     offset = (page - 1) * page_size
+    if after is not None:
+        where_sql += " AND (p.updated_at, p.id) < (?, ?)"
+        params.extend(decode_cursor(after, (str, str)))
+        offset = 0
     cursor = await db.execute(
         f"SELECT p.id, p.current_version, "  # noqa: S608
         "pv.name, pv.description, "
@@ -133,10 +153,12 @@ async def list_packages(
         "AND p.current_version = pv.version "
         "LEFT JOIN sets s ON p.set_id = s.id "
         f"WHERE {where_sql} "
-        "ORDER BY p.updated_at DESC LIMIT ? OFFSET ?",
-        [*params, page_size, offset],
+        "ORDER BY p.updated_at DESC, p.id DESC LIMIT ? OFFSET ?",
+        [*params, page_size + 1, offset],
+    )
+    rows, next_cursor = split_page(
+        await cursor.fetchall(), page_size, key=lambda r: (r[6], r[0]),
     )
-    rows = await cursor.fetchall()
 
     items = [
         {
@@ -155,7 +177,7 @@ async def list_packages(
         }
         for r in rows
     ]
-    return items, total
+    return items, total, next_cursor
 
 
 async def update_package(
@@ -246,29 +268,10 @@ async def validate_no_cycle(
 ) -> bool:
     """Check that setting proposed_parent_id won't create a cycle.
 
-    Walks up from proposed_parent_id to root. If we encounter package_id,
-    it would create a cycle. Returns True if safe, False if cycle detected.
+    A cycle would form if package_id is proposed_parent_id itself or one of
+    its ancestors. Returns True if safe, False if cycle detected.
     """
-    if package_id == proposed_parent_id:
-        return False
-
-    current = proposed_parent_id
-    visited: set[str] = set()
-    while current is not None:
-        if current == package_id:
-            return False
-        if current in visited:
-            return False  # existing cycle in data -- shouldn't happen
-        visited.add(current)
-        cursor = await db.execute(
-            "SELECT parent_package_id FROM packages WHERE id = ? AND is_deleted = 0",
-            (current,),
-        )
-        row = await cursor.fetchone()
-        if row is None:
-            break
-        current = row[0]
-    return True
+    return not await is_ancestor_or_self(db, package_id, proposed_parent_id)
 
 
 async def set_package_parent(
@@ -311,45 +314,33 @@ async def get_package_ancestors(
     db: aiosqlite.Connection,
     package_id: str,
 ) -> list[dict[str, object]]:
-    """Get ancestor chain from package to root (breadcrumb order: root first)."""
-    ancestors: list[dict[str, object]] = []
-    current = package_id
+    """Get ancestor chain from package to root (breadcrumb order: root first).
 
-    # First get the parent of the starting package
+    The chain stops below the nearest soft-deleted ancestor.
+    """
     cursor = await db.execute(
-        "SELECT parent_package_id FROM packages WHERE id = ? AND is_deleted = 0",
-        (current,),
+        "SELECT p.id, pv.name, p.parent_package_id "
+        "FROM packages s "
+        "JOIN package_closure c ON c.descendant = s.id AND c.depth > 0 "
+        "JOIN packages p ON p.id = c.ancestor "
+        "JOIN package_versions pv ON p.id = pv.package_id "
+        "AND p.current_version = pv.version "
+        "WHERE s.id = ? AND s.is_deleted = 0 "
+        "AND NOT EXISTS (SELECT 1 FROM package_closure x "
+        "JOIN packages m ON m.id = x.ancestor "
+        "WHERE x.descendant = s.id AND x.depth BETWEEN 1 AND c.depth "
+        "AND m.is_deleted = 1) "
+        "ORDER BY c.depth DESC",
+        (package_id,),
     )
-    row = await cursor.fetchone()
-    if row is None:
-        return []
-    current = row[0]
-
-    visited: set[str] = set()
-    while current is not None:
-        if current in visited:
-            break
-        visited.add(current)
-        cursor = await db.execute(
-            "SELECT p.id, pv.name, p.parent_package_id "
-            "FROM packages p "
-            "JOIN package_versions pv ON p.id = pv.package_id "
-            "AND p.current_version = pv.version "
-            "WHERE p.id = ? AND p.is_deleted = 0",
-            (current,),
-        )
-        row = await cursor.fetchone()
-        if row is None:
-            break
-        ancestors.append({
+    return [
+        {
             "id": row[0],
             "name": row[1],
             "parent_package_id": row[2],
-        })
-        current = row[2]
-
-    ancestors.reverse()  # root first
-    return ancestors
+        }
+        for row in await cursor.fetchall()
+    ]
 
 
 async def get_package_children(
@@ -381,22 +372,39 @@ async def get_package_hierarchy(
     db: aiosqlite.Connection,
     root_id: str | None = None,
     set_id: str | None = None,
+    depth: int | None = None,
 ) -> list[dict[str, object]]:
     """Get the package hierarchy as a tree.
 
-    If root_id is given, returns subtree rooted at that package.
+    If root_id is given, returns subtree rooted at that package, fetched
+    through the closure table and limited to depth levels below it if set.
     If set_id is given, only includes packages from that set.
     Otherwise returns all root packages with their children.
     """
-    # Fetch all non-deleted packages (optionally filtered by set)
-    query = (
-        "SELECT p.id, pv.name, p.parent_package_id "
-        "FROM packages p "
-        "JOIN package_versions pv ON p.id = pv.package_id "
-        "AND p.current_version = pv.version "
-        "WHERE p.is_deleted = 0 "
-    )
-    params: list[str] = []
+    params: list[object] = []
+    if root_id is not None:
+        # Only the live subtree of root_id is read
+        query = (
+            "SELECT p.id, pv.name, p.parent_package_id "  # noqa: S608
+            "FROM package_closure c "
+            "JOIN packages p ON p.id = c.descendant "
+            "JOIN package_versions pv ON p.id = pv.package_id "
+            "AND p.current_version = pv.version "
+            f"WHERE c.ancestor = ? AND p.is_deleted = 0 AND {LIVE_PATH_SQL} "
+        )
+        params.append(root_id)
+        if depth is not None:
+            query += "AND c.depth <= ? "
+            params.append(depth)
+    else:
+        # Fetch all non-deleted packages (optionally filtered by set)
+        query = (
+            "SELECT p.id, pv.name, p.parent_package_id "
+            "FROM packages p "
+            "JOIN package_versions pv ON p.id = pv.package_id "
+            "AND p.current_version = pv.version "
+            "WHERE p.is_deleted = 0 "
+        )
     if set_id is not None:
         query += "AND p.set_id = ? "
         params.append(set_id)
@@ -438,19 +446,7 @@ async def count_package_descendants(
     package_id: str,
 ) -> dict[str, int]:
     """Count all descendant packages and diagrams under a package (non-deleted only)."""
-    # Recursive CTE to find all descendant package IDs
-    cursor = await db.execute(
-        "WITH RECURSIVE descendants(id) AS ("
-        "  SELECT id FROM packages "
-        "  WHERE parent_package_id = ? AND is_deleted = 0 "
-        "  UNION ALL "
-        "  SELECT p.id FROM packages p "
-        "  JOIN descendants d ON p.parent_package_id = d.id "
-        "  WHERE p.is_deleted = 0"
-        ") SELECT id FROM descendants",
-        (package_id,),
-    )
-    child_package_ids = [row[0] for row in await cursor.fetchall()]
+    child_package_ids = await get_live_descendant_ids(db, package_id)
 
     # Count diagrams under the root and all descendant packages
     all_package_ids = [package_id, *child_package_ids]
@@ -485,19 +481,8 @@ async def cascade_delete_package(
     deleted_group_id = str(uuid.uuid4())
     now = datetime.now(tz=UTC).isoformat()
 
-    # Collect all descendant package IDs via recursive CTE
-    cursor = await db.execute(
-        "WITH RECURSIVE descendants(id) AS ("
-        "  SELECT id FROM packages "
-        "  WHERE parent_package_id = ? AND is_deleted = 0 "
-        "  UNION ALL "
-        "  SELECT p.id FROM packages p "
-        "  JOIN descendants d ON p.parent_package_id = d.id "
-        "  WHERE p.is_deleted = 0"
-        ") SELECT id FROM descendants",
-        (package_id,),
-    )
-    child_package_ids = [row[0] for row in await cursor.fetchall()]
+    # Collect all live descendant package IDs from the closure table
+    child_package_ids = await get_live_descendant_ids(db, package_id)
 
     # All packages to delete: root + descendants
     all_package_ids = [package_id, *child_package_ids]
@@ -565,13 +550,6 @@ async def cascade_delete_package(
 
     await db.commit()
 
-    # Remove deleted diagrams from search index
-    from app.search.service import remove_diagram_index as _remove_diagram_index
-
-    for did, _ in diagram_rows:
-        await _remove_diagram_index(db, did)
-    await db.commit()
-
     return True
 
 
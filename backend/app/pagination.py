@@ -0,0 +1,63 @@
+"""Opaque keyset cursors for paginated list endpoints.
+
+A cursor encodes the sort key of the last row of a page — (updated_at, id)
+for most lists, (id) for the audit log. The next page starts strictly after
+that key with a row-value comparison, so deep pages cost the same as the
+first instead of scanning and discarding every earlier row as OFFSET does.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import math
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+INVALID_CURSOR = "Invalid cursor"
+
+
+def encode_cursor(key: Sequence[object]) -> str:
+    """Encode a row's sort key as an opaque URL-safe token."""
+    raw = json.dumps(list(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, types: Sequence[type]) -> list[object]:
+    """Decode a token from encode_cursor, checking its key has the given types.
+
+    An int is accepted where a float is expected, but not NaN or infinity.
+    Raises ValueError for tokens that are malformed or of the wrong shape.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        key = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError(INVALID_CURSOR) from exc
+    if not isinstance(key, list) or len(key) != len(types):
+        raise ValueError(INVALID_CURSOR)
+    for value, expected in zip(key, types, strict=True):
+        accepted = (int, float) if expected is float else expected
+        if isinstance(value, bool) or not isinstance(value, accepted):
+            raise ValueError(INVALID_CURSOR)  # noqa: TRY004
+        if expected is float and not math.isfinite(value):
+            raise ValueError(INVALID_CURSOR)
+    return key
+
+
+def split_page(
+    rows: Sequence[Any],
+    page_size: int,
+    key: Callable[[Any], Sequence[object]],
+) -> tuple[Sequence[Any], str | None]:
+    """Trim a page fetched with LIMIT page_size + 1 and build its next cursor.
+
+    The cursor is None when the extra row is absent, i.e. on the last page.
+    """
+    if len(rows) <= page_size:
+        return rows, None
+    page = rows[:page_size]
+    return page, encode_cursor(key(page[-1]))
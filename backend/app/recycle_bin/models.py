@@ -25,6 +25,7 @@ class DeletedItemListResponse(BaseModel):
     """Paginated list of deleted items."""
 
     items: list[DeletedItemResponse]
-    total: int
+    total: int | None = None
     page: int
     page_size: int
+    next_cursor: str | None = None
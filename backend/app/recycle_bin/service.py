@@ -7,74 +7,120 @@ from typing import TYPE_CHECKING
 from app.diagrams.service import restore_diagram
 from app.elements.service import restore_element
 from app.packages.service import restore_package
+from app.pagination import decode_cursor, split_page
 
 if TYPE_CHECKING:
     import aiosqlite
 
 
+# (table alias, SELECT ... FROM ... JOIN ...) per kind of deletable item
+_DELETED_SELECTS = (
+    (
+        "p",
+        "SELECT p.id, 'package' AS item_type, pv.name, pv.description, "
+        "p.updated_at AS deleted_at, u.username AS deleted_by_username, "
+        "p.deleted_group_id, p.set_id, s.name AS set_name, "
+        "NULL AS diagram_type, NULL AS element_type "
+        "FROM packages p "
+        "JOIN package_versions pv ON p.id = pv.package_id "
+        "AND p.current_version = pv.version "
+        "LEFT JOIN users u ON pv.created_by = u.id "
+        "LEFT JOIN sets s ON p.set_id = s.id ",
+    ),
+    (
+        "d",
+        "SELECT d.id, 'diagram' AS item_type, dv.name, dv.description, "
+        "d.updated_at AS deleted_at, u.username AS deleted_by_username, "
+        "d.deleted_group_id, d.set_id, s.name AS set_name, "
+        "d.diagram_type, NULL AS element_type "
+        "FROM diagrams d "
+        "JOIN diagram_versions dv ON d.id = dv.diagram_id "
+        "AND d.current_version = dv.version "
+        "LEFT JOIN users u ON dv.created_by = u.id "
+        "LEFT JOIN sets s ON d.set_id = s.id ",
+    ),
+    (
+        "e",
+        "SELECT e.id, 'element' AS item_type, ev.name, ev.description, "
+        "e.updated_at AS deleted_at, u.username AS deleted_by_username, "
+        "e.deleted_group_id, e.set_id, s.name AS set_name, "
+        "NULL AS diagram_type, e.element_type "
+        "FROM elements e "
+        "JOIN element_versions ev ON e.id = ev.element_id "
+        "AND e.current_version = ev.version "
+        "LEFT JOIN users u ON ev.created_by = u.id "
+        "LEFT JOIN sets s ON e.set_id = s.id ",
+    ),
+)
+
+
+def _deleted_page_sql(alias: str, select: str, *, keyset: bool) -> str:
+    """One table's newest deleted rows, read in (updated_at, id) index order.
+
+    Takes the cursor key (when keyset) and a row limit as parameters.
+    """
+    after = f"AND ({alias}.updated_at, {alias}.id) < (?, ?) " if keyset else ""
+    return (
+        f"SELECT * FROM ({select}"  # noqa: S608
+        f"WHERE {alias}.is_deleted = 1 {after}"
+        f"ORDER BY {alias}.updated_at DESC, {alias}.id DESC LIMIT ?)"
+    )
+
+
 async def list_deleted_items(
     db: aiosqlite.Connection,
     *,
     page: int = 1,
     page_size: int = 50,
-) -> tuple[list[dict[str, object]], int]:
-    """List all soft-deleted items across packages, diagrams, and elements."""
-    count_sql = (
-        "SELECT ("
-        "  SELECT COUNT(*) FROM packages WHERE is_deleted = 1"
-        ") + ("
-        "  SELECT COUNT(*) FROM diagrams WHERE is_deleted = 1"
-        ") + ("
-        "  SELECT COUNT(*) FROM elements WHERE is_deleted = 1"
-        ")"
-    )
-    cursor = await db.execute(count_sql)
-    total = (await cursor.fetchone())[0]
+    after: str | None = None,
+    include_total: bool = True,
+) -> tuple[list[dict[str, object]], int | None, str | None]:
+    """List all soft-deleted items across packages, diagrams, and elements.
 
+    ``after`` continues from an earlier page's next_cursor, ignoring
+    ``page``. Returns (items, total_count, next_cursor); total_count is None
+    unless include_total.
+    """
+    total: int | None = None
+    if include_total:
+        count_sql = (
+            "SELECT ("
+            "  SELECT COUNT(*) FROM packages WHERE is_deleted = 1"
+            ") + ("
+            "  SELECT COUNT(*) FROM diagrams WHERE is_deleted = 1"
+            ") + ("
+            "  SELECT COUNT(*) FROM elements WHERE is_deleted = 1"
+            ")"
+        )
+        cursor = await db.execute(count_sql)
+        total = (await cursor.fetchone())[0]
+
+    # Fetch page, plus one row to tell whether another follows. Each table is
+    # cut off on its own (is_deleted, updated_at, id) index before the
+    # branches are merged, instead of sorting every deleted row.
     offset = (page - 1) * page_size
+    key: list[object] = []
+    if after is not None:
+        key = decode_cursor(after, (str, str))
+        offset = 0
+    branch_params = [*key, offset + page_size + 1]
+
     query = (
-        "SELECT id, item_type, name, description, deleted_at, "
+        "SELECT id, item_type, name, description, deleted_at, "  # noqa: S608
         "deleted_by_username, deleted_group_id, set_id, set_name, "
-        "diagram_type, element_type "
-        "FROM ("
-        "  SELECT p.id, 'package' AS item_type, pv.name, pv.description, "
-        "         p.updated_at AS deleted_at, u.username AS deleted_by_username, "
-        "         p.deleted_group_id, p.set_id, s.name AS set_name, "
-        "         NULL AS diagram_type, NULL AS element_type "
-        "  FROM packages p "
-        "  JOIN package_versions pv ON p.id = pv.package_id "
-        "       AND p.current_version = pv.version "
-        "  LEFT JOIN users u ON pv.created_by = u.id "
-        "  LEFT JOIN sets s ON p.set_id = s.id "
-        "  WHERE p.is_deleted = 1 "
-        "  UNION ALL "
-        "  SELECT d.id, 'diagram' AS item_type, dv.name, dv.description, "
-        "         d.updated_at AS deleted_at, u.username AS deleted_by_username, "
-        "         d.deleted_group_id, d.set_id, s.name AS set_name, "
-        "         d.diagram_type, NULL AS element_type "
-        "  FROM diagrams d "
-        "  JOIN diagram_versions dv ON d.id = dv.diagram_id "
-        "       AND d.current_version = dv.version "
-        "  LEFT JOIN users u ON dv.created_by = u.id "
-        "  LEFT JOIN sets s ON d.set_id = s.id "
-        "  WHERE d.is_deleted = 1 "
-        "  UNION ALL "
-        "  SELECT e.id, 'element' AS item_type, ev.name, ev.description, "
-        "         e.updated_at AS deleted_at, u.username AS deleted_by_username, "
-        "         e.deleted_group_id, e.set_id, s.name AS set_name, "
-        "         NULL AS diagram_type, e.element_type "
-        "  FROM elements e "
-        "  JOIN element_versions ev ON e.id = ev.element_id "
-        "       AND e.current_version = ev.version "
-        "  LEFT JOIN users u ON ev.created_by = u.id "
-        "  LEFT JOIN sets s ON e.set_id = s.id "
-        "  WHERE e.is_deleted = 1 "
-        ") t "
-        "ORDER BY deleted_at DESC "
-        "LIMIT ? OFFSET ?"
+        "diagram_type, element_type FROM ("
+        + " UNION ALL ".join(
+            _deleted_page_sql(alias, select, keyset=bool(key))
+            for alias, select in _DELETED_SELECTS
+        )
+        + ") ORDER BY deleted_at DESC, id DESC LIMIT ? OFFSET ?"
+    )
+    cursor = await db.execute(
+        query, [*branch_params * len(_DELETED_SELECTS), page_size + 1, offset],
+    )
+    rows, next_cursor = split_page(
+        await cursor.fetchall(), page_size, key=lambda r: (r[4], r[0]),
     )
-    cursor = await db.execute(query, (page_size, offset))
-    rows = await cursor.fetchall()
 
     items = [
         {
@@ -92,7 +138,7 @@ async def list_deleted_items(
         }
         for r in rows
     ]
-    return items, total
+    return items, total, next_cursor
 
 
 async def cascade_restore_by_group(
@@ -182,7 +228,7 @@ async def _hard_delete_single(
         await db.execute("DELETE FROM comments WHERE target_type = 'diagram' AND target_id = ?", (item_id,))
         await db.execute("DELETE FROM diagram_tags WHERE diagram_id = ?", (item_id,))
         await db.execute("DELETE FROM diagram_thumbnails WHERE diagram_id = ?", (item_id,))
-        await db.execute("DELETE FROM diagrams_fts WHERE diagram_id = ?", (item_id,))
+        await db.execute("DELETE FROM diagram_element_refs WHERE diagram_id = ?", (item_id,))
         await db.execute("DELETE FROM bookmarks WHERE diagram_id = ?", (item_id,))
         await db.execute("DELETE FROM diagram_versions WHERE diagram_id = ?", (item_id,))
         await db.execute("DELETE FROM diagrams WHERE id = ?", (item_id,))
@@ -198,7 +244,7 @@ async def _hard_delete_single(
             await db.execute("DELETE FROM relationships WHERE id = ?", (rid,))
         await db.execute("DELETE FROM comments WHERE target_type = 'element' AND target_id = ?", (item_id,))
         await db.execute("DELETE FROM element_tags WHERE element_id = ?", (item_id,))
-        await db.execute("DELETE FROM elements_fts WHERE element_id = ?", (item_id,))
+        await db.execute("DELETE FROM diagram_element_refs WHERE element_id = ?", (item_id,))
         await db.execute("DELETE FROM element_versions WHERE element_id = ?", (item_id,))
         await db.execute("DELETE FROM elements WHERE id = ?", (item_id,))
     elif item_type == "package":
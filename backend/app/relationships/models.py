@@ -63,6 +63,7 @@ class RelationshipListResponse(BaseModel):
     """Paginated list of relationships."""
 
     items: list[RelationshipResponse]
-    total: int
+    total: int | None = None
     page: int
     page_size: int
+    next_cursor: str | None = None
@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
 from app.auth.dependencies import get_current_user
+from app.database import get_read_db, get_write_db
 from app.relationships.models import (
     RelationshipCreate,
     RelationshipListResponse,
@@ -21,17 +22,19 @@ from app.relationships.service import (
     update_relationship,
 )
 
+if TYPE_CHECKING:
+    import aiosqlite
+
 router = APIRouter(prefix="/api/relationships", tags=["relationships"])
 
 
 @router.post("", response_model=RelationshipResponse, status_code=201)
 async def create(
     body: RelationshipCreate,
-    request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> RelationshipResponse:
     """Create a new relationship between elements."""
-    db = request.app.state.db_manager.main_db
     result = await create_relationship(
         db,
         source_element_id=body.source_element_id,
@@ -47,33 +50,41 @@ async def create(
 
 @router.get("", response_model=RelationshipListResponse)
 async def list_all(
-    request: Request,
+    *,
     element_id: str | None = None,
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=50, ge=1, le=100),
+    cursor: str | None = Query(
+        default=None, description="next_cursor of the previous page; replaces page.",
+    ),
+    include_total: bool = Query(default=True, description="Count all matching relationships."),
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> RelationshipListResponse:
     """List relationships, optionally filtered by element."""
-    db = request.app.state.db_manager.main_db
-    items, total = await list_relationships(
-        db, element_id=element_id, page=page, page_size=page_size,
-    )
+    try:
+        items, total, next_cursor = await list_relationships(
+            db, element_id=element_id, page=page, page_size=page_size,
+            after=cursor, include_total=include_total,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     return RelationshipListResponse(
         items=[RelationshipResponse(**item) for item in items],
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
     )
 
 
 @router.get("/{rel_id}", response_model=RelationshipResponse)
 async def get_one(
     rel_id: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> RelationshipResponse:
     """Get a single relationship by ID."""
-    db = request.app.state.db_manager.main_db
     result = await get_relationship(db, rel_id)
     if result is None:
         raise HTTPException(status_code=404, detail="Relationship not found")
@@ -86,6 +97,7 @@ async def update(
     body: RelationshipUpdate,
     request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> RelationshipResponse:
     """Update a relationship with optimistic concurrency."""
     if_match = request.headers.get("If-Match")
@@ -100,7 +112,6 @@ async def update(
             status_code=400, detail="If-Match must be an integer version"
         )
 
-    db = request.app.state.db_manager.main_db
     result = await update_relationship(
         db, rel_id,
         label=body.label,
@@ -122,6 +133,7 @@ async def delete(
     rel_id: str,
     request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> None:
     """Soft-delete a relationship."""
     if_match = request.headers.get("If-Match")
@@ -136,7 +148,6 @@ async def delete(
             status_code=400, detail="If-Match must be an integer version"
         )
 
-    db = request.app.state.db_manager.main_db
     deleted = await soft_delete_relationship(
         db, rel_id,
         deleted_by=current_user["id"],
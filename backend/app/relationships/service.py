@@ -10,6 +10,8 @@ import uuid
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
+from app.pagination import decode_cursor, split_page
+
 if TYPE_CHECKING:
     import aiosqlite
 
@@ -116,8 +118,15 @@ async def list_relationships(
     element_id: str | None = None,
     page: int = 1,
     page_size: int = 50,
-) -> tuple[list[dict[str, object]], int]:
-    """List relationships, optionally filtered by element involvement."""
+    after: str | None = None,
+    include_total: bool = True,
+) -> tuple[list[dict[str, object]], int | None, str | None]:
+    """List relationships, optionally filtered by element involvement.
+
+    ``after`` continues from an earlier page's next_cursor, ignoring
+    ``page``. Returns (items, total_count, next_cursor); total_count is None
+    unless include_total.
+    """
     where_clauses = ["r.is_deleted = 0"]
     params: list[object] = []
 
@@ -129,14 +138,21 @@ async def list_relationships(
 
     where_sql = " AND ".join(where_clauses)
 
-    cursor = await db.execute(
-        f"SELECT COUNT(*) FROM relationships r WHERE {where_sql}",  # noqa: S608
-        params,
-    )
-    count_row = await cursor.fetchone()
-    total: int = count_row[0]  # type: ignore[index]
+    total: int | None = None
+    if include_total:
+        cursor = await db.execute(
+            f"SELECT COUNT(*) FROM relationships r WHERE {where_sql}",  # noqa: S608
+            params,
+        )
+        count_row = await cursor.fetchone()
+        total = count_row[0]  # type: ignore[index]
 
+    # Fetch page, plus one row to tell whether another follows
     offset = (page - 1) * page_size
+    if after is not None:
+        where_sql += " AND (r.updated_at, r.id) < (?, ?)"
+        params.extend(decode_cursor(after, (str, str)))
+        offset = 0
     cursor = await db.execute(
         f"SELECT r.id, r.source_element_id, r.target_element_id, "  # noqa: S608
         "r.relationship_type, r.current_version, "
@@ -155,10 +171,12 @@ async def list_relationships(
         "LEFT JOIN element_versions tev ON te.id = tev.element_id "
         "AND te.current_version = tev.version "
         f"WHERE {where_sql} "
-        "ORDER BY r.updated_at DESC LIMIT ? OFFSET ?",
-        [*params, page_size, offset],
+        "ORDER BY r.updated_at DESC, r.id DESC LIMIT ? OFFSET ?",
+        [*params, page_size + 1, offset],
+    )
+    rows, next_cursor = split_page(
+        await cursor.fetchall(), page_size, key=lambda r: (r[10], r[0]),
     )
-    rows = await cursor.fetchall()
 
     items = [
         {
@@ -179,7 +197,7 @@ async def list_relationships(
         }
         for r in rows
     ]
-    return items, total
+    return items, total, next_cursor
 
 
 async def update_relationship(
@@ -13,7 +13,8 @@ class SearchResult(BaseModel):
     name: str
     description: str | None = None
     type_detail: str  # element_type or diagram_type
-    rank: float = 0.0
+    rank: float = 0.0  # bm25, lower is better; comparable within a result type
+    snippet: str | None = None  # HTML-escaped, matches wrapped in <mark>
     deep_link: str
 
 
@@ -22,4 +23,13 @@ class SearchResponse(BaseModel):
 
     query: str
     results: list[SearchResult]
-    total: int
+    total: int  # matches of the requested result type(s), across all pages
+    facets: dict[str, int]  # matches per result type, ignoring result_type
+    next_cursor: str | None = None
+
+
+class SearchRebuildResponse(BaseModel):
+    """Rows indexed by a search index rebuild."""
+
+    elements: int
+    diagrams: int
@@ -2,30 +2,62 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.auth.dependencies import get_current_user
-from app.search.models import SearchResponse, SearchResult
-from app.search.service import search
+from app.database import get_read_db, get_write_db
+from app.search.models import SearchRebuildResponse, SearchResponse, SearchResult
+from app.search.service import rebuild_search_index, search_page
+
+if TYPE_CHECKING:
+    import aiosqlite
 
 router = APIRouter(tags=["search"])
 
 
+def _require_admin(current_user: dict[str, Any]) -> None:
+    """Raise 403 if not admin."""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+
 @router.get("/api/search", response_model=SearchResponse)
 async def search_endpoint(
-    request: Request,
+    *,
     q: str = Query(min_length=1, max_length=200),
     limit: int = Query(default=50, ge=1, le=200),
     set_id: str | None = Query(default=None),
+    result_type: str | None = Query(default=None, pattern="^(element|diagram)$"),
+    cursor: str | None = Query(
+        default=None, description="next_cursor of the previous page.",
+    ),
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> SearchResponse:
-    """Search elements and diagrams by text query."""
-    db = request.app.state.db_manager.main_db
-    results = await search(db, q, limit=limit, set_id=set_id)
+    """Search elements and diagrams by text query, best matches first."""
+    try:
+        results, facets, next_cursor = await search_page(
+            db, q, limit=limit, set_id=set_id, result_type=result_type, after=cursor,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     return SearchResponse(
         query=q,
         results=[SearchResult(**r) for r in results],
-        total=len(results),
+        total=facets[result_type] if result_type else sum(facets.values()),
+        facets=facets,
+        next_cursor=next_cursor,
     )
+
+
+@router.post("/api/admin/search/rebuild", response_model=SearchRebuildResponse)
+async def rebuild_search_endpoint(
+    current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
+) -> SearchRebuildResponse:
+    """Rebuild the search index from current data. Requires admin role."""
+    _require_admin(current_user)
+    counts = await rebuild_search_index(db)
+    return SearchRebuildResponse(**counts)
@@ -2,191 +2,193 @@
 
 from __future__ import annotations
 
+import html
 from typing import TYPE_CHECKING
 
+from app.pagination import decode_cursor, split_page
+
 if TYPE_CHECKING:
     import aiosqlite
 
-
-async def rebuild_search_index(db: aiosqlite.Connection) -> None:
-    """Rebuild FTS indices from current element and diagram data."""
-    # Clear existing FTS data
-    await db.execute("DELETE FROM elements_fts")
-    await db.execute("DELETE FROM diagrams_fts")
-
-    # Re-index all non-deleted elements
-    cursor = await db.execute(
-        "SELECT e.id, e.element_type, ev.name, ev.description "
-        "FROM elements e "
-        "JOIN element_versions ev ON e.id = ev.element_id AND e.current_version = ev.version "
-        "WHERE e.is_deleted = 0"
-    )
-    for row in await cursor.fetchall():
+RESULT_TYPES = ("element", "diagram")
+
+# (object table, versions table, version foreign key, FTS table, type column)
+_INDEXED_TABLES = (
+    ("elements", "element_versions", "element_id", "elements_fts", "element_type"),
+    ("diagrams", "diagram_versions", "diagram_id", "diagrams_fts", "diagram_type"),
+)
+
+# bm25 weights per FTS column (ID, name, type, description, set_id); a name
+# match outranks a description match, unindexed columns never match
+_BM25_WEIGHTS = "0, 10.0, 0, 1.0, 0"
+_SNIPPET_TOKENS = 12
+# Private-use characters around snippet matches; they survive html.escape
+# and are then replaced with <mark> tags
+_MARK_OPEN = "\ue000"
+_MARK_CLOSE = "\ue001"
+
+_SNIPPET_SQL = (
+    "(SELECT snippet({fts}, -1, :mark_open, :mark_close, '...', :tokens) "
+    "FROM {fts} WHERE {fts} MATCH :query AND rowid = p.fts_rowid)"
+)
+
+# bm25 is computed from each FTS table's own statistics (row count, average
+# column length, how many rows hold a term), so element and diagram scores
+# are not on a strictly comparable scale. Merging them by raw score is a
+# deliberate approximation: both use the same column weights, and the order
+# within each result type is exact.
+#
+# One statement ranks the matches of both tables together. hits is used
+# twice, so SQLite materialises it and runs each MATCH once; facets count
+# every hit, page applies the type filter and keyset cursor, and snippets
+# are built for the page's rows only. The LEFT JOIN returns the facets even
+# when the page is empty.
+_SEARCH_SQL = (
+    "WITH hits AS ("  # noqa: S608
+    "  SELECT 'element' AS result_type, element_id AS id, name, "
+    "  element_type AS type_detail, description, "
+    f"  bm25(elements_fts, {_BM25_WEIGHTS}) AS rank, rowid AS fts_rowid "
+    "  FROM elements_fts WHERE elements_fts MATCH :query "
+    "  AND (:set_id IS NULL OR set_id = :set_id) "
+    "  UNION ALL "
+    "  SELECT 'diagram', diagram_id, name, diagram_type, description, "
+    f"  bm25(diagrams_fts, {_BM25_WEIGHTS}), rowid "
+    "  FROM diagrams_fts WHERE diagrams_fts MATCH :query "
+    "  AND (:set_id IS NULL OR set_id = :set_id)"
+    "), facets AS ("
+    "  SELECT SUM(result_type = 'element') AS elements, "
+    "  SUM(result_type = 'diagram') AS diagrams FROM hits"
+    "), page AS ("
+    "  SELECT * FROM hits "
+    "  WHERE (:result_type IS NULL OR result_type = :result_type) "
+    "  AND (:after_rank IS NULL "
+    "  OR (rank, result_type, id) > (:after_rank, :after_type, :after_id)) "
+    "  ORDER BY rank, result_type, id LIMIT :limit"
+    ") "
+    "SELECT f.elements, f.diagrams, p.result_type, p.id, p.name, p.type_detail, "
+    "p.description, p.rank, CASE p.result_type "
+    f"WHEN 'element' THEN {_SNIPPET_SQL.format(fts='elements_fts')} "
+    f"ELSE {_SNIPPET_SQL.format(fts='diagrams_fts')} END "
+    "FROM facets f LEFT JOIN page p ON true "
+    "ORDER BY p.rank, p.result_type, p.id"
+)
+
+
+async def rebuild_search_index(db: aiosqlite.Connection) -> dict[str, int]:
+    """Rebuild the FTS tables from current element and diagram versions.
+
+    The m034/m035 triggers keep them in step as objects are written, so this is
+    only needed to repair an index; each table is refilled with one
+    INSERT ... SELECT, keyed by search_keys. Returns the number of rows
+    indexed per table.
+    """
+    counts: dict[str, int] = {}
+    for table, versions, fk, fts, type_column in _INDEXED_TABLES:
         await db.execute(
-            "INSERT INTO elements_fts (element_id, name, element_type, description) "
-            "VALUES (?, ?, ?, ?)",
-            (row[0], row[2], row[1], row[3] or ""),
+            f"INSERT OR IGNORE INTO search_keys (object_id) SELECT id FROM {table}"  # noqa: S608
         )
-
-    # Re-index all non-deleted diagrams
-    cursor = await db.execute(
-        "SELECT m.id, m.diagram_type, mv.name, mv.description "
-        "FROM diagrams m "
-        "JOIN diagram_versions mv ON m.id = mv.diagram_id AND m.current_version = mv.version "
-        "WHERE m.is_deleted = 0"
-    )
-    for row in await cursor.fetchall():
-        await db.execute(
-            "INSERT INTO diagrams_fts (diagram_id, name, diagram_type, description) "
-            "VALUES (?, ?, ?, ?)",
-            (row[0], row[2], row[1], row[3] or ""),
+        await db.execute(f"DELETE FROM {fts}")  # noqa: S608
+        cursor = await db.execute(
+            f"INSERT INTO {fts} "  # noqa: S608
+            f"(rowid, {fk}, name, {type_column}, description, set_id) "
+            f"SELECT k.id, t.id, v.name, t.{type_column}, "
+            "COALESCE(v.description, ''), t.set_id "
+            f"FROM {table} t "
+            f"JOIN {versions} v ON t.id = v.{fk} AND t.current_version = v.version "
+            "JOIN search_keys k ON k.object_id = t.id "
+            "WHERE t.is_deleted = 0"
         )
+        counts[table] = cursor.rowcount
 
     await db.commit()
+    return counts
 
 
-async def index_element(
-    db: aiosqlite.Connection,
-    *,
-    element_id: str,
-    name: str,
-    element_type: str,
-    description: str | None,
-) -> None:
-    """Index or re-index an element in the FTS table."""
-    # Delete existing entry then insert fresh
-    await db.execute(
-        "DELETE FROM elements_fts WHERE element_id = ?", (element_id,),
-    )
-    await db.execute(
-        "INSERT INTO elements_fts (element_id, name, element_type, description) "
-        "VALUES (?, ?, ?, ?)",
-        (element_id, name, element_type, description or ""),
-    )
-
-
-async def index_diagram(
+async def search(
     db: aiosqlite.Connection,
+    query: str,
     *,
-    diagram_id: str,
-    name: str,
-    diagram_type: str,
-    description: str | None,
-) -> None:
-    """Index or re-index a diagram in the FTS table."""
-    await db.execute(
-        "DELETE FROM diagrams_fts WHERE diagram_id = ?", (diagram_id,),
-    )
-    await db.execute(
-        "INSERT INTO diagrams_fts (diagram_id, name, diagram_type, description) "
-        "VALUES (?, ?, ?, ?)",
-        (diagram_id, name, diagram_type, description or ""),
-    )
-
-
-async def remove_element_index(
-    db: aiosqlite.Connection, element_id: str,
-) -> None:
-    """Remove an element from the FTS index."""
-    await db.execute(
-        "DELETE FROM elements_fts WHERE element_id = ?", (element_id,),
-    )
-
-
-async def remove_diagram_index(
-    db: aiosqlite.Connection, diagram_id: str,
-) -> None:
-    """Remove a diagram from the FTS index."""
-    await db.execute(
-        "DELETE FROM diagrams_fts WHERE diagram_id = ?", (diagram_id,),
-    )
+    limit: int = 50,
+    set_id: str | None = None,
+) -> list[dict[str, object]]:
+    """Search elements and diagrams; the first page of search_page's results."""
+    results, _, _ = await search_page(db, query, limit=limit, set_id=set_id)
+    return results
 
 
-async def search(
+async def search_page(
     db: aiosqlite.Connection,
     query: str,
     *,
     limit: int = 50,
     set_id: str | None = None,
-) -> list[dict[str, object]]:
-    """Search elements and diagrams using FTS5.
-
-    Returns combined results sorted by relevance rank.
-    When set_id is provided, only results belonging to that set are returned.
+    result_type: str | None = None,
+    after: str | None = None,
+) -> tuple[list[dict[str, object]], dict[str, int], str | None]:
+    """Search elements and diagrams using FTS5 in one statement.
+
+    Matches of both tables are ranked together by weighted bm25 (lower is
+    better); scores from the two tables are only roughly comparable, see
+    above. Returns (results, facets, next_cursor): facets counts matches
+    per result type, whatever result_type filters the page to. ``after`` is
+    a next_cursor from an earlier page; raises ValueError if it is invalid.
     """
-    results: list[dict[str, object]] = []
-
-    # Escape FTS5 special characters for safe matching
+    facets = dict.fromkeys(RESULT_TYPES, 0)
     safe_query = _escape_fts_query(query)
     if not safe_query:
-        return results
+        return [], facets, None
 
-    # Search elements
-    if set_id:
-        cursor = await db.execute(
-            "SELECT f.element_id, f.name, f.element_type, f.description, f.rank "
-            "FROM elements_fts f "
-            "JOIN elements e ON e.id = f.element_id "
-            "WHERE elements_fts MATCH ? AND e.set_id = ? "
-            "ORDER BY f.rank LIMIT ?",
-            (safe_query, set_id, limit),
-        )
-    else:
-        cursor = await db.execute(
-            "SELECT element_id, name, element_type, description, rank "
-            "FROM elements_fts WHERE elements_fts MATCH ? "
-            "ORDER BY rank LIMIT ?",
-            (safe_query, limit),
-        )
-    element_rows = await cursor.fetchall()
-    results.extend(
+    after_key: list[object] = [None, None, None]
+    if after is not None:
+        after_key = decode_cursor(after, (float, str, str))
+    cursor = await db.execute(
+        _SEARCH_SQL,
         {
-            "id": row[0],
-            "result_type": "element",
-            "name": row[1],
-            "type_detail": row[2],
-            "description": row[3] or None,
-            "rank": float(row[4]),
-            "deep_link": f"/elements/{row[0]}",
-        }
-        for row in element_rows
+            "query": safe_query,
+            "set_id": set_id,
+            "result_type": result_type,
+            "after_rank": after_key[0],
+            "after_type": after_key[1],
+            "after_id": after_key[2],
+            "limit": limit + 1,
+            "mark_open": _MARK_OPEN,
+            "mark_close": _MARK_CLOSE,
+            "tokens": _SNIPPET_TOKENS,
+        },
     )
-
-    # Search diagrams
-    if set_id:
-        cursor = await db.execute(
-            "SELECT f.diagram_id, f.name, f.diagram_type, f.description, f.rank "
-            "FROM diagrams_fts f "
-            "JOIN diagrams m ON m.id = f.diagram_id "
-            "WHERE diagrams_fts MATCH ? AND m.set_id = ? "
-            "ORDER BY f.rank LIMIT ?",
-            (safe_query, set_id, limit),
-        )
-    else:
-        cursor = await db.execute(
-            "SELECT diagram_id, name, diagram_type, description, rank "
-            "FROM diagrams_fts WHERE diagrams_fts MATCH ? "
-            "ORDER BY rank LIMIT ?",
-            (safe_query, limit),
-        )
-    diagram_rows = await cursor.fetchall()
-    results.extend(
+    rows = await cursor.fetchall()
+    facets["element"] = rows[0][0] or 0
+    facets["diagram"] = rows[0][1] or 0
+    page, next_cursor = split_page(
+        [row for row in rows if row[2] is not None], limit,
+        key=lambda r: (r[7], r[2], r[3]),
+    )
+    results = [
         {
-            "id": row[0],
-            "result_type": "diagram",
-            "name": row[1],
-            "type_detail": row[2],
-            "description": row[3] or None,
-            "rank": float(row[4]),
-            "deep_link": f"/diagrams/{row[0]}",
+            "id": row[3],
+            "result_type": row[2],
+            "name": row[4],
+            "type_detail": row[5],
+            "description": row[6] or None,
+            "rank": float(row[7]),
+            "snippet": _highlight(row[8]),
+            "deep_link": f"/{row[2]}s/{row[3]}",
         }
-        for row in diagram_rows
+        for row in page
+    ]
+    return results, facets, next_cursor
+
+
+def _highlight(snippet: str | None) -> str | None:
+    """HTML-escape a snippet and turn its match markers into <mark> tags."""
+    if not snippet:
+        return None
+    return (
+        html.escape(snippet)
+        .replace(_MARK_OPEN, "<mark>")
+        .replace(_MARK_CLOSE, "</mark>")
     )
 
-    # Sort combined results by rank (FTS5 rank is negative, closer to 0 = better)
-    results.sort(key=lambda r: r["rank"])
-    return results[:limit]
-
 
 def _escape_fts_query(query: str) -> str:
     """Escape a user query for safe FTS5 matching.
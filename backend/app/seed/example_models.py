@@ -27,6 +27,9 @@ import uuid
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
+from app.diagrams.element_refs import sync_diagram_element_refs
+from app.diagrams.summary import update_diagram_summary
+
 if TYPE_CHECKING:
     import aiosqlite
 
@@ -1357,6 +1360,7 @@ async def _clear_old_seed_data(db: aiosqlite.Connection) -> None:
         await db.execute("DELETE FROM diagram_tags WHERE diagram_id = ?", (did,))
         await db.execute("DELETE FROM diagram_versions WHERE diagram_id = ?", (did,))
         await db.execute("DELETE FROM diagram_thumbnails WHERE diagram_id = ?", (did,))
+        await db.execute("DELETE FROM diagram_element_refs WHERE diagram_id = ?", (did,))
         await db.execute("DELETE FROM bookmarks WHERE diagram_id = ?", (did,))
         await db.execute("DELETE FROM comments WHERE target_id = ?", (did,))
         await db.execute(
@@ -1364,7 +1368,6 @@ async def _clear_old_seed_data(db: aiosqlite.Connection) -> None:
             "WHERE thumbnail_diagram_id = ?", (did,),
         )
         await db.execute("DELETE FROM diagrams WHERE id = ?", (did,))
-        await db.execute("DELETE FROM diagrams_fts WHERE diagram_id = ?", (did,))
 
     for rid in rel_ids:
         await db.execute("DELETE FROM relationship_versions WHERE relationship_id = ?", (rid,))
@@ -1372,8 +1375,8 @@ async def _clear_old_seed_data(db: aiosqlite.Connection) -> None:
 
     for eid in element_ids:
         await db.execute("DELETE FROM element_tags WHERE element_id = ?", (eid,))
+        await db.execute("DELETE FROM diagram_element_refs WHERE element_id = ?", (eid,))
         await db.execute("DELETE FROM element_versions WHERE element_id = ?", (eid,))
-        await db.execute("DELETE FROM elements_fts WHERE element_id = ?", (eid,))
         await db.execute("DELETE FROM elements WHERE id = ?", (eid,))
 
     # Delete packages (children first — all children have parent = pkg-0)
@@ -1525,6 +1528,8 @@ async def seed_example_models(db: aiosqlite.Connection) -> None:
             (diagram_id, model_def["name"], model_def["description"],
              diagram_data_json, now, _SYSTEM_USER_ID),
         )
+        await sync_diagram_element_refs(db, diagram_id, diagram_data_json)
+        await update_diagram_summary(db, diagram_id, diagram_data_json)
 
         for tag in model_def["tags"]:
             await db.execute(
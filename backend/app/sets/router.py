@@ -2,12 +2,13 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile
 from fastapi.responses import Response as FastAPIResponse
 
 from app.auth.dependencies import get_current_user
+from app.database import get_read_db, get_write_db
 from app.sets.models import (
     SetCreate,
     SetForceDeleteResponse,
@@ -27,6 +28,9 @@ from app.sets.service import (
     update_set,
 )
 
+if TYPE_CHECKING:
+    import aiosqlite
+
 router = APIRouter(prefix="/api/sets", tags=["sets"])
 
 _MAX_THUMBNAIL_SIZE = 2 * 1024 * 1024  # 2 MB
@@ -36,11 +40,10 @@ _ALLOWED_CONTENT_TYPES = {"image/png", "image/jpeg"}
 @router.post("", response_model=SetResponse, status_code=201)
 async def create(
     body: SetCreate,
-    request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> SetResponse:
     """Create a new set."""
-    db = request.app.state.db_manager.main_db
     try:
         result = await create_set(
             db,
@@ -57,11 +60,10 @@ async def create(
 
 @router.get("", response_model=SetListResponse)
 async def list_all(
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> SetListResponse:
     """List all sets with model/entity counts."""
-    db = request.app.state.db_manager.main_db
     items = await list_sets(db)
     return SetListResponse(items=[SetResponse(**item) for item in items])
 
@@ -69,11 +71,10 @@ async def list_all(
 @router.get("/{set_id}", response_model=SetResponse)
 async def get_one(
     set_id: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> SetResponse:
     """Get a single set by ID."""
-    db = request.app.state.db_manager.main_db
     result = await get_set(db, set_id)
     if result is None:
         raise HTTPException(status_code=404, detail="Set not found")
@@ -84,11 +85,10 @@ async def get_one(
 async def update(
     set_id: str,
     body: SetUpdate,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> SetResponse:
     """Update a set's name, description, and thumbnail settings."""
-    db = request.app.state.db_manager.main_db
     try:
         result = await update_set(
             db, set_id,
@@ -111,12 +111,11 @@ async def update(
 @router.delete("/{set_id}", response_model=None)
 async def delete(
     set_id: str,
-    request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
     force: bool = Query(default=False),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> FastAPIResponse | SetForceDeleteResponse:
     """Soft-delete a set. With force=true, also deletes all contents."""
-    db = request.app.state.db_manager.main_db
 
     if force:
         result = await force_delete_set(db, set_id, deleted_by=current_user["id"])
@@ -149,11 +148,10 @@ async def delete(
 async def upload_thumbnail(
     set_id: str,
     file: UploadFile,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> SetResponse:
     """Upload a thumbnail image for a set."""
-    db = request.app.state.db_manager.main_db
 
     if file.content_type not in _ALLOWED_CONTENT_TYPES:
         raise HTTPException(
@@ -177,11 +175,10 @@ async def upload_thumbnail(
 @router.get("/{set_id}/thumbnail")
 async def get_thumbnail(
     set_id: str,
-    request: Request,
     theme: str = Query(default="dark"),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> FastAPIResponse:
     """Get the thumbnail image for a set."""
-    db = request.app.state.db_manager.main_db
     image_bytes = await get_set_thumbnail(db, set_id, theme=theme)
     if image_bytes is None:
         raise HTTPException(status_code=404, detail="Thumbnail not found")
@@ -203,11 +200,10 @@ async def get_thumbnail(
 @router.get("/{set_id}/tags")
 async def get_tags(
     set_id: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> list[str]:
     """Get all unique tags within a set."""
-    db = request.app.state.db_manager.main_db
     # Verify set exists
     s = await get_set(db, set_id)
     if s is None:
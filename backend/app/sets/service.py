@@ -312,13 +312,6 @@ async def force_delete_set(
         (now, set_id, set_id),
     )
 
-    # Remove search indexes for deleted elements
-    await db.execute(
-        "DELETE FROM elements_fts WHERE element_id IN "
-        "(SELECT id FROM elements WHERE set_id = ? AND is_deleted = 1)",
-        (set_id,),
-    )
-
     # Count and soft-delete diagrams in this set
     mc = await db.execute(
         "SELECT COUNT(*) FROM diagrams WHERE set_id = ? AND is_deleted = 0",
@@ -330,13 +323,6 @@ async def force_delete_set(
         (now, set_id),
     )
 
-    # Remove search indexes for deleted diagrams
-    await db.execute(
-        "DELETE FROM diagrams_fts WHERE diagram_id IN "
-        "(SELECT id FROM diagrams WHERE set_id = ? AND is_deleted = 1)",
-        (set_id,),
-    )
-
     # Soft-delete the set itself
     await db.execute(
         "UPDATE sets SET is_deleted = 1, updated_at = ? WHERE id = ?",
@@ -5,7 +5,8 @@ from __future__ import annotations
 import os
 from typing import TYPE_CHECKING
 
-from app.audit.service import verify_audit_chain
+from app.audit.service import verify_audit_chain_checkpointed
+from app.coordination import startup_lock
 from app.migrations.m001_roles_users import up as m001_up
 from app.migrations.m002_entities_relationships_models import up as m002_up
 from app.migrations.m003_audit_log import up as m003_up
@@ -30,9 +31,18 @@ from app.migrations.m021_edit_locks import up as m021_up
 from app.migrations.m022_element_notation import up as m022_up
 from app.migrations.m023_new_diagram_types import up as m023_up
 from app.migrations.m024_themes import up as m024_up
+from app.migrations.m025_audit_checkpoints import up as m025_up
+from app.migrations.m026_thumbnail_svg_hash import up as m026_up
+from app.migrations.m027_thumbnail_diagram_version import up as m027_up
+from app.migrations.m028_diagram_element_refs import up as m028_up
+from app.migrations.m029_diagram_summary_columns import up as m029_up
+from app.migrations.m030_package_closure import up as m030_up
+from app.migrations.m031_keyset_indexes import up as m031_up
+from app.migrations.m032_ea_guid_indexes import up as m032_up
+from app.migrations.m033_sparx_sync import up as m033_up
+from app.migrations.m034_fts_triggers import up as m034_up
+from app.migrations.m035_fts_set_id import up as m035_up
 from app.migrations.seed import seed_roles_and_permissions
-from app.diagrams.thumbnail import regenerate_all_thumbnails
-from app.search.service import rebuild_search_index
 from app.seed.example_models import seed_example_models
 from app.settings.service import seed_defaults
 
@@ -49,6 +59,16 @@ async def initialize_databases(db_manager: DatabaseManager) -> None:
     data_dir = os.path.dirname(db_manager.config.main_db_path)
     os.makedirs(data_dir, exist_ok=True)
 
+    if db_manager.config.multi_worker:
+        # Workers start together; let one migrate and seed at a time
+        async with startup_lock(db_manager.config.coord_db_path):
+            await _initialize(db_manager)
+    else:
+        await _initialize(db_manager)
+
+
+async def _initialize(db_manager: DatabaseManager) -> None:
+    """Connect, migrate, seed and verify; see initialize_databases."""
     # 2. Connect to both databases
     await db_manager.connect()
 
@@ -76,6 +96,16 @@ async def initialize_databases(db_manager: DatabaseManager) -> None:
     await m022_up(db_manager.main_db)
     await m023_up(db_manager.main_db)
     await m024_up(db_manager.main_db)
+    await m026_up(db_manager.main_db)
+    await m027_up(db_manager.main_db)
+    await m028_up(db_manager.main_db)
+    await m029_up(db_manager.main_db)
+    await m030_up(db_manager.main_db)
+    await m031_up(db_manager.main_db)
+    await m032_up(db_manager.main_db)
+    await m033_up(db_manager.main_db)
+    await m034_up(db_manager.main_db)
+    await m035_up(db_manager.main_db)
 
     # Seed default views
     from app.views.service import seed_default_views
@@ -85,12 +115,6 @@ async def initialize_databases(db_manager: DatabaseManager) -> None:
     from app.themes.service import seed_default_themes
     await seed_default_themes(db_manager.main_db)
 
-    # 3b. Rebuild FTS search index from existing data
-    await rebuild_search_index(db_manager.main_db)
-
-    # 3c. Regenerate PNG thumbnails for all models
-    await regenerate_all_thumbnails(db_manager.main_db)
-
     # 4. Seed roles and permissions
     await seed_roles_and_permissions(db_manager.main_db)
 
@@ -100,11 +124,15 @@ async def initialize_databases(db_manager: DatabaseManager) -> None:
     # 4c. Seed example models (Iris architecture demo)
     await seed_example_models(db_manager.main_db)
 
-    # 5. Run audit database migration
+    # 5. Run audit database migrations
     await m003_up(db_manager.audit_db)
+    await m025_up(db_manager.audit_db)
 
-    # 6. Verify audit chain integrity
-    is_valid, entries_checked = await verify_audit_chain(db_manager.audit_db)
+    # 6. Verify audit chain integrity from the last signed checkpoint
+    is_valid, entries_checked, _mode = await verify_audit_chain_checkpointed(
+        db_manager.audit_db, db_manager.config.audit_checkpoint_key,
+        writer=db_manager.audit_writer,
+    )
     if not is_valid:
         msg = (
             f"Audit chain verification failed at entry {entries_checked}. "
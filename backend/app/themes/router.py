@@ -2,25 +2,28 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException
 
 from app.auth.dependencies import get_current_user
+from app.database import get_read_db, get_write_db
 from app.themes.models import ThemeCreate, ThemeResponse, ThemeUpdate
 from app.themes.service import create_theme, delete_theme, get_theme, list_themes, update_theme
 
+if TYPE_CHECKING:
+    import aiosqlite
+
 router = APIRouter(prefix="/api/themes", tags=["themes"])
 
 
 @router.get("", response_model=list[ThemeResponse])
 async def list_all(
-    request: Request,
     notation: str | None = None,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> list[ThemeResponse]:
     """List all themes, optionally filtered by notation."""
-    db = request.app.state.db_manager.main_db
     items = await list_themes(db, notation=notation)
     return [ThemeResponse(**item) for item in items]
 
@@ -28,11 +31,10 @@ async def list_all(
 @router.post("", response_model=ThemeResponse, status_code=201)
 async def create(
     body: ThemeCreate,
-    request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> ThemeResponse:
     """Create a new theme."""
-    db = request.app.state.db_manager.main_db
     result = await create_theme(
         db,
         name=body.name,
@@ -47,11 +49,10 @@ async def create(
 @router.get("/{theme_id}", response_model=ThemeResponse)
 async def get_one(
     theme_id: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> ThemeResponse:
     """Get a single theme by ID."""
-    db = request.app.state.db_manager.main_db
     result = await get_theme(db, theme_id)
     if result is None:
         raise HTTPException(status_code=404, detail="Theme not found")
@@ -62,11 +63,10 @@ async def get_one(
 async def update(
     theme_id: str,
     body: ThemeUpdate,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> ThemeResponse:
     """Update a theme."""
-    db = request.app.state.db_manager.main_db
     result = await update_theme(
         db, theme_id,
         name=body.name,
@@ -82,11 +82,10 @@ async def update(
 @router.delete("/{theme_id}", status_code=204)
 async def delete(
     theme_id: str,
-    request: Request,
     _current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> None:
     """Delete a theme (non-default only)."""
-    db = request.app.state.db_manager.main_db
     deleted = await delete_theme(db, theme_id)
     if not deleted:
         raise HTTPException(status_code=403, detail="Cannot delete default themes")
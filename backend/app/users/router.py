@@ -4,14 +4,18 @@ from __future__ import annotations
 
 import uuid
 from datetime import UTC, datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 
 from app.auth.dependencies import get_current_user
 from app.auth.service import create_password_hasher, validate_password
+from app.database import get_read_db, get_write_db
 from app.users.models import UserCreateRequest, UserResponse, UserUpdateRequest
 
+if TYPE_CHECKING:
+    import aiosqlite
+
 router = APIRouter(prefix="/api/users", tags=["users"])
 
 
@@ -23,12 +27,11 @@ def _require_admin(current_user: dict[str, Any]) -> None:
 
 @router.get("", response_model=list[UserResponse])
 async def list_users(
-    request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_read_db),  # noqa: B008
 ) -> list[UserResponse]:
     """List all users (admin only)."""
     _require_admin(current_user)
-    db = request.app.state.db_manager.main_db
     cursor = await db.execute(
         "SELECT id, username, role, is_active, created_at, last_login_at "
         "FROM users ORDER BY created_at"
@@ -48,11 +51,11 @@ async def create_user(
     body: UserCreateRequest,
     request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> UserResponse:
     """Create a new user (admin only)."""
     _require_admin(current_user)
     config = request.app.state.config
-    db = request.app.state.db_manager.main_db
 
     # Validate password
     errors = validate_password(body.password, config.auth)
@@ -90,10 +93,10 @@ async def update_user(
     body: UserUpdateRequest,
     request: Request,
     current_user: dict[str, Any] = Depends(get_current_user),  # noqa: B008
+    db: aiosqlite.Connection = Depends(get_write_db),  # noqa: B008
 ) -> UserResponse:
     """Update a user's role or active status (admin only)."""
     _require_admin(current_user)
-    db = request.app.state.db_manager.main_db
 
     cursor = await db.execute(
         "SELECT id, username, role, is_active, created_at, last_login_at "
@@ -112,6 +115,8 @@ async def update_user(
         (new_role, new_active, datetime.now(tz=UTC).isoformat(), user_id),
     )
     await db.commit()
+    # Role and deactivation changes must apply to the user's next request
+    request.app.state.identity_cache.invalidate_user(user_id)
 
     return UserResponse(
         id=row[0], username=row[1], role=new_role,
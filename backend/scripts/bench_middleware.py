@@ -0,0 +1,156 @@
+"""Benchmark per-request middleware overhead on GET /health.
+
+Compares the pure-ASGI middleware stack used by create_app with the
+BaseHTTPMiddleware stack it replaced, reproduced here with the same
+rate-limit, audit and security-header logic. Requests are driven straight
+through the ASGI interface, so the figures exclude server and client cost.
+
+Run from backend/:  python -m scripts.bench_middleware [--requests N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import TYPE_CHECKING
+
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from app.middleware.audit import AuditMiddleware
+from app.middleware.rate_limit import (
+    RateLimitMiddleware,
+    SlidingWindowRateLimiter,
+    _get_rate_category,
+)
+from app.middleware.security_headers import SECURITY_HEADERS, SecurityHeadersMiddleware
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from fastapi import Request, Response
+    from starlette.types import ASGIApp, Message
+
+_LIMIT = 10**9
+
+
+class LegacyAuditMiddleware(BaseHTTPMiddleware):
+    """BaseHTTPMiddleware audit layer; GET requests are never audited."""
+
+    async def dispatch(
+        self, request: Request, call_next: Callable[..., Response]
+    ) -> Response:
+        # GET returns here; mutating methods would append an audit entry
+        return await call_next(request)  # type: ignore[misc]
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """BaseHTTPMiddleware rate-limit layer."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        super().__init__(app)
+        self.limiter = SlidingWindowRateLimiter()
+
+    async def dispatch(
+        self, request: Request, call_next: Callable[..., Response]
+    ) -> Response:
+        client_ip = request.client.host if request.client else "unknown"
+        key = f"{client_ip}:{_get_rate_category(request.url.path)}"
+        if not self.limiter.is_allowed(key, _LIMIT):
+            return JSONResponse(status_code=429, content={"detail": "Too many requests"})
+        return await call_next(request)  # type: ignore[misc]
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    """BaseHTTPMiddleware equivalent of the former @app.middleware("http")."""
+
+    async def dispatch(
+        self, request: Request, call_next: Callable[..., Response]
+    ) -> Response:
+        response: Response = await call_next(request)  # type: ignore[misc]
+        for name, value in SECURITY_HEADERS.items():
+            response.headers[name] = value
+        return response
+
+
+def _build_app(*, legacy: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health_check() -> dict[str, str]:
+        return {"status": "healthy"}
+
+    if legacy:
+        app.add_middleware(LegacyAuditMiddleware)
+        app.add_middleware(LegacyRateLimitMiddleware)
+        app.add_middleware(LegacySecurityHeadersMiddleware)
+    else:
+        app.add_middleware(AuditMiddleware)
+        app.add_middleware(RateLimitMiddleware, general=_LIMIT)
+        app.add_middleware(SecurityHeadersMiddleware)
+    return app
+
+
+def _build_bare_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health_check() -> dict[str, str]:
+        return {"status": "healthy"}
+
+    return app
+
+
+async def _time_requests(app: ASGIApp, count: int) -> float:
+    """Mean seconds per GET /health over count requests."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/health",
+        "raw_path": b"/health",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(_message: Message) -> None:
+        return None
+
+    for _ in range(min(count, 200)):
+        await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(count):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / count
+
+
+async def _main(count: int) -> None:
+    bare = await _time_requests(_build_bare_app(), count)
+    results = {
+        "BaseHTTPMiddleware": await _time_requests(_build_app(legacy=True), count),
+        "pure ASGI": await _time_requests(_build_app(legacy=False), count),
+    }
+    print(f"no middleware        {bare * 1e6:8.1f} us/request")  # noqa: T201
+    for name, mean in results.items():
+        overhead = (mean - bare) * 1e6
+        print(  # noqa: T201
+            f"{name:<20} {mean * 1e6:8.1f} us/request "
+            f"({overhead:+.1f} us middleware overhead)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(_main(args.requests))
@@ -117,3 +117,26 @@ class TestSecurityHeaders:
         assert "max-age=31536000" in response.headers.get(
             "strict-transport-security", ""
         )
+
+    async def test_headers_on_error_and_rate_limited_responses(
+        self, tmp_path: Path
+    ) -> None:
+        config = AppConfig(
+            database=DatabaseConfig(data_dir=str(tmp_path / "data")),
+            auth=AuthConfig(
+                jwt_secret="test-key-at-least-32-bytes-long-for-testing",
+            ),
+            rate_limit_general=1,
+        )
+        application = create_app(config)
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            not_found = await client.get("/no-such-route")
+            limited = await client.get("/health")
+        assert not_found.status_code == 404
+        assert limited.status_code == 429
+        for response in (not_found, limited):
+            assert response.headers["x-frame-options"] == "DENY"
+            assert response.headers["x-content-type-options"] == "nosniff"
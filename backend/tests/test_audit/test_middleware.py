@@ -11,12 +11,15 @@ from app.audit.service import verify_audit_chain
 from app.config import AppConfig, AuthConfig, DatabaseConfig
 from app.database import DatabaseManager
 from app.main import create_app
+from app.middleware import audit as audit_middleware
 from app.startup import initialize_databases
 
 if TYPE_CHECKING:
     from collections.abc import AsyncIterator
     from pathlib import Path
 
+    from fastapi import Request
+
 
 @pytest.fixture
 def app_config(tmp_path: Path) -> AppConfig:
@@ -117,6 +120,19 @@ class TestAuditMiddleware:
         row = await cursor.fetchone()
         assert row[0] is not None
 
+    async def test_audit_entry_records_response_status(
+        self, client_and_db: tuple[httpx.AsyncClient, DatabaseManager]
+    ) -> None:
+        client, db_manager = client_and_db
+        await client.post("/api/elements", json={"name": "No auth"})
+
+        cursor = await db_manager.audit_db.execute(
+            "SELECT detail FROM audit_log WHERE action = 'POST /api/elements'"
+        )
+        row = await cursor.fetchone()
+        assert row is not None
+        assert '"status_code": 401' in row[0]
+
     async def test_audit_chain_integrity(
         self, client_and_db: tuple[httpx.AsyncClient, DatabaseManager]
     ) -> None:
@@ -149,6 +165,42 @@ class TestAuditUsernameResolution:
         assert row is not None
         assert row[0] == "admin"
 
+    async def test_authenticated_request_reuses_resolved_identity(
+        self,
+        client_and_db: tuple[httpx.AsyncClient, DatabaseManager],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        client, db_manager = client_and_db
+        tokens = await _setup_and_login(client)
+
+        decoded: list[str] = []
+        original = audit_middleware._decode_token
+
+        def counting_decode(request: Request) -> dict[str, str] | None:
+            decoded.append(request.url.path)
+            return original(request)
+
+        monkeypatch.setattr(audit_middleware, "_decode_token", counting_decode)
+        await client.post(
+            "/api/elements",
+            json={"element_type": "service", "name": "Audit Test", "data": {}},
+            headers={"Authorization": f"Bearer {tokens['access_token']}"},
+        )
+        # Login is unauthenticated, so only that path falls back to decoding
+        await client.post(
+            "/api/auth/login",
+            json={"username": "admin", "password": "AdminPass123!"},
+        )
+
+        assert decoded == ["/api/auth/login"]
+        cursor = await db_manager.audit_db.execute(
+            "SELECT user_id, username FROM audit_log "
+            "WHERE action = 'POST /api/elements'"
+        )
+        row = await cursor.fetchone()
+        assert row[0] != "anonymous"
+        assert row[1] == "admin"
+
     async def test_audit_username_for_anonymous_request(
         self, client_and_db: tuple[httpx.AsyncClient, DatabaseManager]
     ) -> None:
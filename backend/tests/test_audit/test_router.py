@@ -10,6 +10,7 @@ import pytest
 from app.config import AppConfig, AuthConfig, DatabaseConfig
 from app.database import DatabaseManager
 from app.main import create_app
+from app.pagination import encode_cursor
 from app.startup import initialize_databases
 
 if TYPE_CHECKING:
@@ -144,6 +145,49 @@ class TestAuditListEndpoint:
         assert data["page_size"] == 1
         assert len(data["items"]) <= 1
 
+    async def test_cursor_walks_every_entry(
+        self, client_and_db: tuple[httpx.AsyncClient, DatabaseManager]
+    ) -> None:
+        client, _ = client_and_db
+        tokens = await _setup_and_login(client)
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        resp = await client.get("/api/audit?page_size=100", headers=headers)
+        expected = [item["id"] for item in resp.json()["items"]]
+
+        seen: list[int] = []
+        url = "/api/audit?page_size=1&include_total=false"
+        resp = await client.get(url, headers=headers)
+        while True:
+            data = resp.json()
+            assert data["total"] is None
+            seen.extend(item["id"] for item in data["items"])
+            if data["next_cursor"] is None:
+                break
+            resp = await client.get(f"{url}&cursor={data['next_cursor']}", headers=headers)
+        assert seen[: len(expected)] == expected
+
+    async def test_invalid_cursor_returns_400(
+        self, client_and_db: tuple[httpx.AsyncClient, DatabaseManager]
+    ) -> None:
+        client, _ = client_and_db
+        tokens = await _setup_and_login(client)
+        resp = await client.get(
+            "/api/audit?cursor=not-a-cursor",
+            headers={"Authorization": f"Bearer {tokens['access_token']}"},
+        )
+        assert resp.status_code == 400
+
+    async def test_string_id_cursor_returns_400(
+        self, client_and_db: tuple[httpx.AsyncClient, DatabaseManager]
+    ) -> None:
+        client, _ = client_and_db
+        tokens = await _setup_and_login(client)
+        resp = await client.get(
+            f"/api/audit?cursor={encode_cursor(['10'])}",
+            headers={"Authorization": f"Bearer {tokens['access_token']}"},
+        )
+        assert resp.status_code == 400
+
     async def test_non_admin_gets_403(
         self, client_and_db: tuple[httpx.AsyncClient, DatabaseManager]
     ) -> None:
@@ -175,6 +219,20 @@ class TestAuditVerifyEndpoint:
         assert data["entries_checked"] > 0
         assert "verified_at" in data
 
+    async def test_full_reverify_after_checkpoint(
+        self, client_and_db: tuple[httpx.AsyncClient, DatabaseManager]
+    ) -> None:
+        client, _ = client_and_db
+        tokens = await _setup_and_login(client)
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        first = (await client.get("/api/audit/verify", headers=headers)).json()
+        resp = await client.get("/api/audit/verify?full=true", headers=headers)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["valid"] is True
+        assert data["mode"] == "full"
+        assert data["entries_checked"] >= first["entries_checked"]
+
     async def test_non_admin_gets_403(
         self, client_and_db: tuple[httpx.AsyncClient, DatabaseManager]
     ) -> None:
@@ -9,9 +9,11 @@ from app.audit.service import (
     GENESIS_HASH,
     compute_entry_hash,
     verify_audit_chain,
+    verify_audit_chain_checkpointed,
     write_audit_entry,
 )
 from app.migrations.m003_audit_log import up as m003_up
+from app.migrations.m025_audit_checkpoints import up as m025_up
 
 if TYPE_CHECKING:
     import aiosqlite
@@ -234,3 +236,90 @@ class TestVerifyAuditChain:
         valid, failed_at = await verify_audit_chain(audit_db)
         assert valid is False
         assert failed_at == 2
+
+
+_KEY = "test-checkpoint-key-that-is-at-least-32-bytes"
+
+
+async def _write_entries(db: aiosqlite.Connection, count: int) -> None:
+    for i in range(count):
+        await write_audit_entry(
+            db, user_id="u1", username="admin",
+            action=f"entity.update.{i}", target_type="entity",
+        )
+
+
+class TestCheckpointedVerification:
+    """Verify incremental verification from signed checkpoints."""
+
+    async def test_first_run_is_full_and_records_checkpoint(
+        self, audit_db: aiosqlite.Connection
+    ) -> None:
+        await m003_up(audit_db)
+        await m025_up(audit_db)
+        await _write_entries(audit_db, 3)
+        valid, count, mode = await verify_audit_chain_checkpointed(audit_db, _KEY)
+        assert (valid, count, mode) == (True, 3, "full")
+        cursor = await audit_db.execute("SELECT last_entry_id FROM audit_checkpoints")
+        assert (await cursor.fetchone())[0] == 3
+
+    async def test_second_run_checks_only_new_entries(
+        self, audit_db: aiosqlite.Connection
+    ) -> None:
+        await m003_up(audit_db)
+        await m025_up(audit_db)
+        await _write_entries(audit_db, 3)
+        await verify_audit_chain_checkpointed(audit_db, _KEY)
+        await _write_entries(audit_db, 2)
+        valid, count, mode = await verify_audit_chain_checkpointed(audit_db, _KEY)
+        assert (valid, count, mode) == (True, 2, "incremental")
+
+    async def test_full_mode_rechecks_everything(
+        self, audit_db: aiosqlite.Connection
+    ) -> None:
+        await m003_up(audit_db)
+        await m025_up(audit_db)
+        await _write_entries(audit_db, 4)
+        await verify_audit_chain_checkpointed(audit_db, _KEY)
+        valid, count, mode = await verify_audit_chain_checkpointed(
+            audit_db, _KEY, full=True,
+        )
+        assert (valid, count, mode) == (True, 4, "full")
+
+    async def test_forged_checkpoint_signature_falls_back_to_full(
+        self, audit_db: aiosqlite.Connection
+    ) -> None:
+        await m003_up(audit_db)
+        await m025_up(audit_db)
+        await _write_entries(audit_db, 3)
+        await verify_audit_chain_checkpointed(audit_db, _KEY)
+        valid, count, mode = await verify_audit_chain_checkpointed(
+            audit_db, "a-different-key-that-is-also-32-bytes-long",
+        )
+        assert (valid, count, mode) == (True, 3, "full")
+
+    async def test_tampered_checkpointed_entry_detected(
+        self, audit_db: aiosqlite.Connection
+    ) -> None:
+        await m003_up(audit_db)
+        await m025_up(audit_db)
+        await _write_entries(audit_db, 3)
+        await verify_audit_chain_checkpointed(audit_db, _KEY)
+        await audit_db.execute("UPDATE audit_log SET entry_hash='tampered' WHERE id=3")
+        await audit_db.commit()
+        valid, failed_at, mode = await verify_audit_chain_checkpointed(audit_db, _KEY)
+        assert valid is False
+        assert failed_at == 3
+        assert mode == "full"
+
+    async def test_missing_key_never_signs_a_checkpoint(
+        self, audit_db: aiosqlite.Connection
+    ) -> None:
+        await m003_up(audit_db)
+        await m025_up(audit_db)
+        await _write_entries(audit_db, 3)
+        await verify_audit_chain_checkpointed(audit_db, "")
+        valid, count, mode = await verify_audit_chain_checkpointed(audit_db, "")
+        assert (valid, count, mode) == (True, 3, "full")
+        cursor = await audit_db.execute("SELECT COUNT(*) FROM audit_checkpoints")
+        assert (await cursor.fetchone())[0] == 0
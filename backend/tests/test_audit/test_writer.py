@@ -0,0 +1,154 @@
+"""Tests for the batched audit writer — in-memory chain head and group commits."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+
+from app.audit.service import (
+    GENESIS_HASH,
+    INSERT_AUDIT_ENTRY_SQL,
+    build_audit_row,
+    verify_audit_chain,
+    verify_audit_chain_checkpointed,
+    write_audit_entry,
+)
+from app.audit.writer import AuditWriter
+from app.migrations.m003_audit_log import up as m003_up
+from app.migrations.m025_audit_checkpoints import up as m025_up
+
+if TYPE_CHECKING:
+    import aiosqlite
+
+
+async def _count(db: aiosqlite.Connection) -> int:
+    cursor = await db.execute("SELECT COUNT(*) FROM audit_log")
+    row = await cursor.fetchone()
+    return int(row[0])
+
+
+class TestAuditWriter:
+    """Verify the writer keeps a valid chain while batching commits."""
+
+    async def test_sync_mode_commits_before_returning(
+        self, audit_db: aiosqlite.Connection
+    ) -> None:
+        await m003_up(audit_db)
+        writer = AuditWriter(audit_db)
+        await writer.submit(
+            user_id="u1", username="admin", action="POST /x", target_type="http",
+        )
+        assert await _count(audit_db) == 1
+        cursor = await audit_db.execute("SELECT previous_hash FROM audit_log WHERE id=1")
+        assert (await cursor.fetchone())[0] == GENESIS_HASH
+        await writer.close()
+
+    async def test_concurrent_submits_form_valid_chain(
+        self, audit_db: aiosqlite.Connection
+    ) -> None:
+        await m003_up(audit_db)
+        writer = AuditWriter(audit_db)
+        await asyncio.gather(*(
+            writer.submit(
+                user_id="u1", username="admin", action=f"POST /{i}", target_type="http",
+            )
+            for i in range(50)
+        ))
+        await writer.close()
+        assert await _count(audit_db) == 50
+        valid, checked = await verify_audit_chain(audit_db)
+        assert valid
+        assert checked == 50
+
+    async def test_async_mode_flushes_on_close(
+        self, audit_db: aiosqlite.Connection
+    ) -> None:
+        await m003_up(audit_db)
+        writer = AuditWriter(audit_db, durability="async", flush_interval=60)
+        for i in range(5):
+            await writer.submit(
+                user_id="u1", username="admin", action=f"PUT /{i}", target_type="http",
+            )
+        assert writer.pending_count == 5
+        await writer.close()
+        assert writer.pending_count == 0
+        assert await _count(audit_db) == 5
+        valid, _ = await verify_audit_chain(audit_db)
+        assert valid
+
+    async def test_continues_existing_chain(
+        self, audit_db: aiosqlite.Connection
+    ) -> None:
+        await m003_up(audit_db)
+        await write_audit_entry(
+            audit_db, user_id="u1", username="admin", action="seed", target_type="system",
+        )
+        writer = AuditWriter(audit_db)
+        await writer.submit(
+            user_id="u1", username="admin", action="POST /x", target_type="http",
+        )
+        await writer.close()
+        valid, checked = await verify_audit_chain(audit_db)
+        assert valid
+        assert checked == 2
+
+    async def test_submit_after_close_raises(
+        self, audit_db: aiosqlite.Connection
+    ) -> None:
+        await m003_up(audit_db)
+        writer = AuditWriter(audit_db)
+        await writer.close()
+        with pytest.raises(RuntimeError, match="closed"):
+            await writer.submit(
+                user_id="u1", username="admin", action="POST /x", target_type="http",
+            )
+
+    async def test_checkpoint_waits_for_in_flight_batch(
+        self, audit_db: aiosqlite.Connection, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        await m003_up(audit_db)
+        await m025_up(audit_db)
+        writer = AuditWriter(audit_db)
+        await writer.submit(
+            user_id="u1", username="admin", action="POST /x", target_type="http",
+        )
+        cursor = await audit_db.execute("SELECT entry_hash FROM audit_log WHERE id = 1")
+        head_hash = (await cursor.fetchone())[0]
+        inserted, release = asyncio.Event(), asyncio.Event()
+
+        async def stalled_append(entries: list[dict[str, object]]) -> None:
+            await audit_db.executemany(
+                INSERT_AUDIT_ENTRY_SQL, [build_audit_row(2, head_hash, **entries[0])],
+            )
+            inserted.set()
+            await release.wait()
+            msg = "disk full"
+            raise RuntimeError(msg)
+
+        monkeypatch.setattr(writer, "_append", stalled_append)
+        submit = asyncio.create_task(writer.submit(
+            user_id="u1", username="admin", action="POST /y", target_type="http",
+        ))
+        await inserted.wait()
+        verify = asyncio.create_task(verify_audit_chain_checkpointed(
+            audit_db, "test-checkpoint-key-that-is-at-least-32-bytes", writer=writer,
+        ))
+        await asyncio.sleep(0.05)
+        assert not verify.done()
+        release.set()
+        with pytest.raises(RuntimeError, match="disk full"):
+            await submit
+        await verify
+        monkeypatch.undo()
+        await writer.close()
+
+        # The checkpoint neither committed the failed batch nor points into it
+        assert await _count(audit_db) == 1
+        cursor = await audit_db.execute("SELECT last_entry_id FROM audit_checkpoints")
+        assert await cursor.fetchall() == []
+
+    def test_rejects_unknown_durability_mode(self) -> None:
+        with pytest.raises(ValueError, match="durability"):
+            AuditWriter(None, durability="eventually")  # type: ignore[arg-type]
@@ -0,0 +1,40 @@
+"""Unit tests for the process-local identity and permission cache."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+from app.auth.cache import CachedUser, IdentityCache
+
+if TYPE_CHECKING:
+    import pytest
+
+USER = CachedUser("u1", "alice", "viewer", is_active=True)
+
+
+class TestIdentityCache:
+    """Verify TTL expiry, disabling and explicit invalidation."""
+
+    def test_user_round_trip_and_invalidate(self) -> None:
+        cache = IdentityCache(ttl=60)
+        cache.put_user(USER)
+        assert cache.get_user("u1") == USER
+        cache.invalidate_user("u1")
+        assert cache.get_user("u1") is None
+
+    def test_entries_expire(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        cache = IdentityCache(ttl=1)
+        cache.put_user(USER)
+        cache.put_permissions("viewer", frozenset({"diagram:read"}))
+        later = time.monotonic() + 2
+        monkeypatch.setattr(time, "monotonic", lambda: later)
+        assert cache.get_user("u1") is None
+        assert cache.get_permissions("viewer") is None
+
+    def test_zero_ttl_disables_caching(self) -> None:
+        cache = IdentityCache(ttl=0)
+        cache.put_user(USER)
+        cache.put_permissions("viewer", frozenset())
+        assert cache.get_user("u1") is None
+        assert cache.get_permissions("viewer") is None
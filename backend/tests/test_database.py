@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+import sqlite3
 from typing import TYPE_CHECKING
 
 import pytest
@@ -94,3 +96,113 @@ class TestDatabaseManager:
             assert row is None, "Main DB table should not appear in audit DB"
         finally:
             await manager.close()
+
+
+class TestReadPool:
+    """Verify pooled read-only connections and the queued writer."""
+
+    async def test_read_connection_sees_committed_writes(self, tmp_data_dir: Path) -> None:
+        manager = DatabaseManager(DatabaseConfig(data_dir=str(tmp_data_dir)))
+        await manager.connect()
+        try:
+            async with manager.write_connection() as db:
+                await db.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+                await db.execute("INSERT INTO t (id) VALUES (1)")
+                await db.commit()
+            async with manager.read_connection() as db:
+                cursor = await db.execute("SELECT COUNT(*) FROM t")
+                row = await cursor.fetchone()
+                assert row[0] == 1
+        finally:
+            await manager.close()
+
+    async def test_read_connection_rejects_writes(self, tmp_data_dir: Path) -> None:
+        manager = DatabaseManager(DatabaseConfig(data_dir=str(tmp_data_dir)))
+        await manager.connect()
+        try:
+            async with manager.read_connection() as db:
+                assert db is not manager.main_db
+                with pytest.raises(sqlite3.OperationalError):
+                    await db.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+        finally:
+            await manager.close()
+
+    async def test_pool_size_limits_concurrent_readers(self, tmp_data_dir: Path) -> None:
+        manager = DatabaseManager(
+            DatabaseConfig(data_dir=str(tmp_data_dir), read_pool_size=2)
+        )
+        await manager.connect()
+        acquired = asyncio.Event()
+
+        async def third_reader() -> None:
+            async with manager.read_connection():
+                acquired.set()
+
+        try:
+            async with manager.read_connection() as a, manager.read_connection() as b:
+                assert a is not b
+                task = asyncio.create_task(third_reader())
+                await asyncio.sleep(0.01)
+                assert not acquired.is_set()
+            await asyncio.wait_for(task, timeout=1)
+            assert acquired.is_set()
+        finally:
+            await manager.close()
+
+    async def test_zero_pool_size_falls_back_to_writer(self, tmp_data_dir: Path) -> None:
+        manager = DatabaseManager(
+            DatabaseConfig(data_dir=str(tmp_data_dir), read_pool_size=0)
+        )
+        await manager.connect()
+        try:
+            async with manager.read_connection() as db:
+                assert db is manager.main_db
+        finally:
+            await manager.close()
+
+    async def test_write_connection_is_exclusive(self, tmp_data_dir: Path) -> None:
+        manager = DatabaseManager(DatabaseConfig(data_dir=str(tmp_data_dir)))
+        await manager.connect()
+        order: list[str] = []
+
+        async def writer(name: str) -> None:
+            async with manager.write_connection():
+                order.append(f"{name}:start")
+                await asyncio.sleep(0.01)
+                order.append(f"{name}:end")
+
+        try:
+            await asyncio.gather(writer("a"), writer("b"))
+            assert order == ["a:start", "a:end", "b:start", "b:end"]
+        finally:
+            await manager.close()
+
+    async def test_write_connection_rolls_back_abandoned_writes(
+        self, tmp_data_dir: Path,
+    ) -> None:
+        manager = DatabaseManager(DatabaseConfig(data_dir=str(tmp_data_dir)))
+        await manager.connect()
+        try:
+            async with manager.write_connection() as db:
+                await db.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+                await db.commit()
+
+            async def failing_handler() -> None:
+                async with manager.write_connection() as db:
+                    await db.execute("INSERT INTO t (id) VALUES (1)")
+                    msg = "validation failed"
+                    raise ValueError(msg)
+
+            with pytest.raises(ValueError, match="validation failed"):
+                await failing_handler()
+
+            async with manager.write_connection() as db:
+                assert not db.in_transaction
+                await db.execute("BEGIN IMMEDIATE")
+                await db.execute("INSERT INTO t (id) VALUES (2)")
+                await db.commit()
+            async with manager.read_connection() as db:
+                cursor = await db.execute("SELECT id FROM t")
+                assert [row[0] for row in await cursor.fetchall()] == [2]
+        finally:
+            await manager.close()
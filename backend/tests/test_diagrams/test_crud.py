@@ -9,6 +9,7 @@ import pytest
 
 from app.config import AppConfig, AuthConfig, DatabaseConfig
 from app.database import DatabaseManager
+from app.diagrams.service import get_diagram_etag
 from app.main import create_app
 from app.startup import initialize_databases
 
@@ -16,6 +17,8 @@ if TYPE_CHECKING:
     from collections.abc import AsyncIterator
     from pathlib import Path
 
+    import aiosqlite
+
 
 @pytest.fixture
 def app_config(tmp_path: Path) -> AppConfig:
@@ -139,6 +142,33 @@ class TestListDiagrams:
         )
         assert resp.json()["total"] == 1
 
+    async def test_list_returns_summaries(self, client: httpx.AsyncClient) -> None:
+        headers = await _auth_headers(client)
+        created = await _create_diagram(client, headers)
+        canvas = {
+            "nodes": [{"id": "n1"}, {"id": "n2"}],
+            "edges": [{"id": "e1", "source": "n1", "target": "n2"}],
+        }
+        await client.put(
+            f"/api/diagrams/{created['id']}",
+            json={"name": "Test Diagram", "data": canvas},
+            headers={**headers, "If-Match": "1"},
+        )
+        resp = await client.get("/api/diagrams", headers=headers)
+        item = resp.json()["items"][0]
+        assert item["data"] is None
+        assert item["node_count"] == 2
+        assert item["edge_count"] == 1
+        assert item["has_content"] is True
+
+    async def test_include_data_returns_canvas(self, client: httpx.AsyncClient) -> None:
+        headers = await _auth_headers(client)
+        await _create_diagram(client, headers)
+        resp = await client.get("/api/diagrams?include_data=true", headers=headers)
+        item = resp.json()["items"][0]
+        assert item["data"] == {"placements": []}
+        assert item["has_content"] is False
+
 
 class TestUpdateDiagram:
     """Verify diagram update."""
@@ -234,3 +264,159 @@ class TestDiagramUsernameResolution:
         for v in versions:
             assert "created_by_username" in v
             assert v["created_by_username"] == "admin"
+
+
+class TestConditionalGet:
+    """Verify ETag / If-None-Match handling for diagrams and thumbnails."""
+
+    async def test_get_returns_etag_and_304_when_unchanged(
+        self, client: httpx.AsyncClient
+    ) -> None:
+        headers = await _auth_headers(client)
+        created = await _create_diagram(client, headers)
+        resp = await client.get(f"/api/diagrams/{created['id']}", headers=headers)
+        etag = resp.headers["ETag"]
+        assert etag.startswith('"')
+
+        resp = await client.get(
+            f"/api/diagrams/{created['id']}",
+            headers={**headers, "If-None-Match": etag},
+        )
+        assert resp.status_code == 304
+        assert resp.headers["ETag"] == etag
+        assert resp.content == b""
+
+    async def test_update_changes_etag(self, client: httpx.AsyncClient) -> None:
+        headers = await _auth_headers(client)
+        created = await _create_diagram(client, headers)
+        resp = await client.get(f"/api/diagrams/{created['id']}", headers=headers)
+        etag = resp.headers["ETag"]
+        await client.put(
+            f"/api/diagrams/{created['id']}",
+            json={"name": "Updated", "data": {"placements": [{"id": "1"}]}},
+            headers={**headers, "If-Match": "1"},
+        )
+        resp = await client.get(
+            f"/api/diagrams/{created['id']}",
+            headers={**headers, "If-None-Match": etag},
+        )
+        assert resp.status_code == 200
+        assert resp.headers["ETag"] != etag
+        assert resp.json()["name"] == "Updated"
+
+    async def test_tag_change_changes_etag(self, client: httpx.AsyncClient) -> None:
+        headers = await _auth_headers(client)
+        created = await _create_diagram(client, headers)
+        resp = await client.get(f"/api/diagrams/{created['id']}", headers=headers)
+        etag = resp.headers["ETag"]
+        await client.post(
+            f"/api/diagrams/{created['id']}/tags",
+            json={"tag": "reviewed"},
+            headers=headers,
+        )
+        resp = await client.get(
+            f"/api/diagrams/{created['id']}",
+            headers={**headers, "If-None-Match": etag},
+        )
+        assert resp.status_code == 200
+        assert resp.json()["tags"] == ["reviewed"]
+
+    async def test_etag_matches_body_when_write_lands_mid_request(
+        self, client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        headers = await _auth_headers(client)
+        created = await _create_diagram(client, headers)
+        url = f"/api/diagrams/{created['id']}"
+
+        async def etag_then_tag(db: aiosqlite.Connection, diagram_id: str) -> str | None:
+            etag = await get_diagram_etag(db, diagram_id)
+            await client.post(f"{url}/tags", json={"tag": "reviewed"}, headers=headers)
+            return etag
+
+        monkeypatch.setattr("app.diagrams.router.get_diagram_etag", etag_then_tag)
+        resp = await client.get(url, headers=headers)
+        assert resp.status_code == 200
+        assert resp.json()["tags"] == ["reviewed"]
+        monkeypatch.undo()
+
+        resp = await client.get(
+            url, headers={**headers, "If-None-Match": resp.headers["ETag"]}
+        )
+        assert resp.status_code == 304
+
+    async def test_diagram_etag_matches_with_tags_and_set(
+        self, client: httpx.AsyncClient
+    ) -> None:
+        headers = await _auth_headers(client)
+        created = await _create_diagram(client, headers)
+        url = f"/api/diagrams/{created['id']}"
+        for tag in ("b", "a"):
+            await client.post(f"{url}/tags", json={"tag": tag}, headers=headers)
+        resp = await client.get(url, headers=headers)
+        assert resp.json()["tags"] == ["a", "b"]
+
+        resp = await client.get(
+            url, headers={**headers, "If-None-Match": resp.headers["ETag"]}
+        )
+        assert resp.status_code == 304
+
+    async def test_etag_covers_updated_at_and_creator(
+        self, app_config: AppConfig
+    ) -> None:
+        db_manager = DatabaseManager(app_config.database)
+        await initialize_databases(db_manager)
+        db = db_manager.main_db
+        await db.execute(
+            "INSERT INTO users (id, username, password_hash, role) "
+            "VALUES ('etag-user', 'before', 'not-a-real-hash', 'viewer')"
+        )
+        await db.execute(
+            "INSERT INTO diagrams (id, diagram_type, current_version, created_at, "
+            "created_by, updated_at) "
+            "VALUES ('etag-diagram', 'component', 1, '2026-01-01', 'etag-user', '2026-01-01')"
+        )
+        etag = await get_diagram_etag(db, "etag-diagram")
+
+        await db.execute(
+            "UPDATE diagrams SET updated_at = '2099-01-01' WHERE id = 'etag-diagram'"
+        )
+        touched = await get_diagram_etag(db, "etag-diagram")
+        assert touched != etag
+
+        await db.execute("UPDATE users SET username = 'after' WHERE id = 'etag-user'")
+        assert await get_diagram_etag(db, "etag-diagram") != touched
+        await db_manager.close()
+
+    async def test_thumbnail_etag_tracks_version_and_theme(
+        self, client: httpx.AsyncClient
+    ) -> None:
+        headers = await _auth_headers(client)
+        created = await _create_diagram(client, headers)
+        url = f"/api/diagrams/{created['id']}/thumbnail"
+
+        resp = await client.get(url, headers={"If-None-Match": "*"})
+        assert resp.status_code == 304
+        etag = resp.headers["ETag"]
+        resp = await client.get(url, headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+
+        resp = await client.get(
+            f"{url}?theme=light", headers={"If-None-Match": "*"},
+        )
+        assert resp.headers["ETag"] != etag
+
+        await client.put(
+            f"/api/diagrams/{created['id']}",
+            json={"name": "Updated", "data": {"placements": [{"id": "1"}]}},
+            headers={**headers, "If-Match": "1"},
+        )
+        resp = await client.get(url, headers={"If-None-Match": etag})
+        assert resp.status_code != 304
+
+    async def test_thumbnail_of_missing_diagram_is_404(
+        self, client: httpx.AsyncClient
+    ) -> None:
+        resp = await client.get(
+            "/api/diagrams/missing/thumbnail", headers={"If-None-Match": "*"},
+        )
+        assert resp.status_code == 404
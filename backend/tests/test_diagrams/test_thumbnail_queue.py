@@ -0,0 +1,257 @@
+"""Tests for the background thumbnail queue — debounce, dedup and status."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+import pytest
+
+from app.config import DatabaseConfig
+from app.database import DatabaseManager
+from app.diagrams.thumbnail import (
+    PNG_MAGIC,
+    VALID_THEMES,
+    generate_svg_from_diagram_data,
+    is_thumbnail_current,
+    thumbnail_svg_hash,
+)
+from app.diagrams.thumbnail_queue import ThumbnailQueue
+from app.startup import initialize_databases
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from pathlib import Path
+
+DATA = {"nodes": [{"id": "n1", "position": {"x": 0, "y": 0}}], "edges": []}
+
+
+@pytest.fixture
+async def db_manager(tmp_path: Path) -> AsyncIterator[DatabaseManager]:
+    manager = DatabaseManager(
+        DatabaseConfig(data_dir=str(tmp_path / "data"), thumbnail_workers=0),
+    )
+    await initialize_databases(manager)
+    now = datetime.now(tz=UTC).isoformat()
+    await manager.main_db.execute(
+        "INSERT INTO diagrams (id, diagram_type, current_version, created_at, "
+        "created_by, updated_at) VALUES ('d1', 'simple-view', 1, ?, 'system', ?)",
+        (now, now),
+    )
+    await manager.main_db.commit()
+    yield manager
+    await manager.close()
+
+
+async def _store_current(manager: DatabaseManager, marker: bytes) -> None:
+    """Store PNG-looking thumbnails whose hashes match DATA for every theme."""
+    now = datetime.now(tz=UTC).isoformat()
+    for theme in VALID_THEMES:
+        svg = generate_svg_from_diagram_data(DATA, "simple-view", theme=theme)
+        await manager.main_db.execute(
+            "INSERT OR REPLACE INTO diagram_thumbnails "
+            "(diagram_id, theme, thumbnail, svg_hash, updated_at) "
+            "VALUES ('d1', ?, ?, ?, ?)",
+            (theme, PNG_MAGIC + marker, thumbnail_svg_hash(svg), now),
+        )
+    await manager.main_db.commit()
+
+
+class TestThumbnailQueue:
+    """Verify saves enqueue renders that are debounced and deduplicated."""
+
+    async def test_enqueue_is_pending_until_debounce(
+        self, db_manager: DatabaseManager
+    ) -> None:
+        queue = ThumbnailQueue(db_manager, workers=0, debounce=60)
+        queue.enqueue("d1", DATA, "simple-view")
+        assert queue.status("d1") == "pending"
+        await queue.close()
+
+    async def test_unchanged_svg_is_not_rerendered(
+        self, db_manager: DatabaseManager
+    ) -> None:
+        await _store_current(db_manager, b"original")
+        queue = ThumbnailQueue(db_manager, workers=0, debounce=60)
+        queue.enqueue("d1", DATA, "simple-view")
+        assert await queue.wait_for("d1") == "ready"
+        cursor = await db_manager.main_db.execute(
+            "SELECT thumbnail FROM diagram_thumbnails WHERE diagram_id = 'd1'"
+        )
+        rows = await cursor.fetchall()
+        assert len(rows) == len(VALID_THEMES)
+        assert all(bytes(row[0]) == PNG_MAGIC + b"original" for row in rows)
+        await queue.close()
+
+    async def test_burst_of_saves_keeps_only_latest(
+        self, db_manager: DatabaseManager
+    ) -> None:
+        queue = ThumbnailQueue(db_manager, workers=0, debounce=60)
+        queue.enqueue("d1", {"nodes": [], "edges": []}, "simple-view")
+        queue.enqueue("d1", DATA, "simple-view")
+        assert queue._pending["d1"][0] is DATA
+        await queue.close()
+        assert queue.status("d1") in {"ready", "failed"}
+
+    async def test_enqueue_after_close_raises(
+        self, db_manager: DatabaseManager
+    ) -> None:
+        queue = ThumbnailQueue(db_manager, workers=0)
+        await queue.close()
+        with pytest.raises(RuntimeError, match="closed"):
+            queue.enqueue("d1", DATA, "simple-view")
+
+    async def test_svg_thumbnail_is_not_current(
+        self, db_manager: DatabaseManager
+    ) -> None:
+        svg = generate_svg_from_diagram_data(DATA, "simple-view", theme="dark")
+        svg_hash = thumbnail_svg_hash(svg)
+        await db_manager.main_db.execute(
+            "INSERT INTO diagram_thumbnails "
+            "(diagram_id, theme, thumbnail, svg_hash, updated_at) "
+            "VALUES ('d1', 'dark', ?, ?, '2026-01-01')",
+            (svg.encode(), svg_hash),
+        )
+        await db_manager.main_db.commit()
+        assert not await is_thumbnail_current(db_manager.main_db, "d1", "dark", svg_hash)
+
+
+class TestLazyFetch:
+    """Verify fetch() serves stamped thumbnails and regeneration jobs report progress."""
+
+    async def test_fetch_serves_thumbnail_stamped_with_current_version(
+        self, db_manager: DatabaseManager
+    ) -> None:
+        await _store_current(db_manager, b"cached")
+        await db_manager.main_db.execute(
+            "UPDATE diagram_thumbnails SET diagram_version = 1 WHERE diagram_id = 'd1'"
+        )
+        await db_manager.main_db.commit()
+        queue = ThumbnailQueue(db_manager, workers=0)
+        assert await queue.fetch("d1", theme="light") == PNG_MAGIC + b"cached"
+        assert queue.status("d1") is None
+        await queue.close()
+
+    async def test_fetch_unknown_diagram_returns_none(
+        self, db_manager: DatabaseManager
+    ) -> None:
+        queue = ThumbnailQueue(db_manager, workers=0)
+        assert await queue.fetch("missing") is None
+        await queue.close()
+
+    async def test_regeneration_job_processes_every_diagram(
+        self, db_manager: DatabaseManager
+    ) -> None:
+        await db_manager.main_db.execute(
+            "INSERT INTO diagram_versions (diagram_id, version, name, data, "
+            "change_type, created_at, created_by) "
+            "VALUES ('d1', 1, 'D1', '{}', 'create', '2026-01-01', 'system')"
+        )
+        await db_manager.main_db.commit()
+        queue = ThumbnailQueue(db_manager, workers=0)
+        job = queue.start_regeneration()
+        assert queue.start_regeneration() is job
+        while job.status == "running":
+            await asyncio.sleep(0.01)
+        assert job.status == "completed"
+        assert job.total >= 1
+        assert job.processed == job.total
+        assert queue.get_job(job.id) is job
+        await queue.close()
+
+    async def test_regeneration_pages_through_diagrams_in_batches(
+        self, db_manager: DatabaseManager
+    ) -> None:
+        for diagram_id in ("d2", "d3"):
+            await db_manager.main_db.execute(
+                "INSERT INTO diagrams (id, diagram_type, current_version, created_at, "
+                "created_by, updated_at) "
+                "VALUES (?, 'simple-view', 1, '2026-01-01', 'system', '2026-01-01')",
+                (diagram_id,),
+            )
+        for diagram_id in ("d1", "d2", "d3"):
+            await db_manager.main_db.execute(
+                "INSERT INTO diagram_versions (diagram_id, version, name, data, "
+                "change_type, created_at, created_by) "
+                "VALUES (?, 1, 'D', '{}', 'create', '2026-01-01', 'system')",
+                (diagram_id,),
+            )
+        await db_manager.main_db.commit()
+        queue = ThumbnailQueue(db_manager, workers=0, sweep_batch_size=1)
+        job = queue.start_regeneration()
+        while job.status == "running":
+            await asyncio.sleep(0.01)
+        assert job.status == "completed"
+        assert job.total == 3
+        assert job.processed == 3
+        await queue.close()
+
+    async def test_sweep_renders_missing_and_outdated_thumbnails(
+        self, db_manager: DatabaseManager, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        for diagram_id in ("d2", "d3"):
+            await db_manager.main_db.execute(
+                "INSERT INTO diagrams (id, diagram_type, current_version, created_at, "
+                "created_by, updated_at) "
+                "VALUES (?, 'simple-view', 1, '2026-01-01', 'system', '2026-01-01')",
+                (diagram_id,),
+            )
+        for diagram_id, version in (("d1", 1), ("d1", 2), ("d2", 1), ("d3", 1)):
+            await db_manager.main_db.execute(
+                "INSERT INTO diagram_versions (diagram_id, version, name, data, "
+                "change_type, created_at, created_by) "
+                "VALUES (?, ?, 'D', '{}', 'create', '2026-01-01', 'system')",
+                (diagram_id, version),
+            )
+        # d1 is a version behind, d2 has no thumbnails, d3 is current
+        await db_manager.main_db.executemany(
+            "INSERT INTO diagram_thumbnails "
+            "(diagram_id, theme, thumbnail, diagram_version, updated_at) "
+            "VALUES (?, ?, ?, 1, '2026-01-01')",
+            [(d, theme, PNG_MAGIC) for d in ("d1", "d3") for theme in VALID_THEMES],
+        )
+        await db_manager.main_db.execute(
+            "UPDATE diagrams SET current_version = 2 WHERE id = 'd1'"
+        )
+        await db_manager.main_db.commit()
+        queue = ThumbnailQueue(db_manager, workers=0, sweep_batch_size=1)
+        rendered: list[tuple[str, int | None]] = []
+
+        async def _record(
+            diagram_id: str, _data: object, _type: str, version: int | None,
+        ) -> None:
+            rendered.append((diagram_id, version))
+
+        monkeypatch.setattr(queue, "_render", _record)
+        await queue.start_sweep()
+        assert rendered == [("d1", 2), ("d2", 1)]
+        await queue.close()
+
+    async def test_failed_render_serves_earlier_version(
+        self, db_manager: DatabaseManager, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        for version in (1, 2):
+            await db_manager.main_db.execute(
+                "INSERT INTO diagram_versions (diagram_id, version, name, data, "
+                "change_type, created_at, created_by) "
+                "VALUES ('d1', ?, 'D1', '{}', 'create', '2026-01-01', 'system')",
+                (version,),
+            )
+        await _store_current(db_manager, b"v1")
+        await db_manager.main_db.execute(
+            "UPDATE diagram_thumbnails SET diagram_version = 1 WHERE diagram_id = 'd1'"
+        )
+        await db_manager.main_db.execute(
+            "UPDATE diagrams SET current_version = 2 WHERE id = 'd1'"
+        )
+        await db_manager.main_db.commit()
+        queue = ThumbnailQueue(db_manager, workers=0, debounce=0)
+
+        async def _fail(*_args: object) -> None:
+            msg = "render failed"
+            raise RuntimeError(msg)
+
+        monkeypatch.setattr(queue, "_render", _fail)
+        assert await queue.fetch_with_version("d1") == (PNG_MAGIC + b"v1", 1)
+        await queue.close()
@@ -1,7 +1,9 @@
-"""Tests for PNG thumbnail generation and startup regeneration (ADR-032)."""
+"""Tests for PNG thumbnail generation and lazy on-demand rendering (ADR-032)."""
 
 from __future__ import annotations
 
+import asyncio
+import dataclasses
 import json
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
@@ -324,13 +326,13 @@ class TestRegenerateAllThumbnails:
         await db_manager.close()
 
 
-class TestStartupThumbnailRegeneration:
-    """Verify thumbnails are regenerated on startup."""
+class TestLazyThumbnails:
+    """Verify thumbnails are rendered on demand rather than at startup."""
 
-    async def test_startup_creates_thumbnails(
+    async def test_startup_does_not_render_thumbnails(
         self, app_config: AppConfig,
     ) -> None:
-        """After restart, all diagrams have PNG thumbnails."""
+        """Restarting leaves missing thumbnails missing until requested."""
         db_manager = DatabaseManager(app_config.database)
         await initialize_databases(db_manager)
         db = db_manager.main_db
@@ -354,10 +356,117 @@ class TestStartupThumbnailRegeneration:
         await initialize_databases(db_manager2)
 
         thumb = await get_thumbnail(db_manager2.main_db, diagram_id)
+        assert thumb is None
+
+        await db_manager2.close()
+
+    async def test_first_request_renders_missing_thumbnail(
+        self, app_config: AppConfig,
+    ) -> None:
+        """A thumbnail miss is rendered and stamped with the diagram version."""
+        db_manager = DatabaseManager(app_config.database)
+        await initialize_databases(db_manager)
+        db = db_manager.main_db
+
+        user_id = await _insert_test_user(db)
+        diagram_id = "lazy-test-diagram"
+        now = datetime.now(tz=UTC).isoformat()
+
+        await db.execute(
+            _DIAGRAMS_INSERT, (diagram_id, now, user_id, now),
+        )
+        await db.execute(
+            _VERSIONS_INSERT,
+            (diagram_id, "Lazy", _node_data("Z"), now, user_id),
+        )
+        await db.commit()
+
+        thumb = await db_manager.thumbnail_queue.fetch(diagram_id)
         assert thumb is not None
         assert thumb[:8] == PNG_MAGIC
 
-        await db_manager2.close()
+        cursor = await db.execute(
+            "SELECT DISTINCT diagram_version FROM diagram_thumbnails "
+            "WHERE diagram_id = ?",
+            (diagram_id,),
+        )
+        assert [row[0] for row in await cursor.fetchall()] == [1]
+
+        await db_manager.close()
+
+    async def test_anonymous_request_queues_missing_thumbnail(
+        self, app_config: AppConfig, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """An anonymous GET queues the render without waiting, then gets the PNG."""
+        monkeypatch.setattr(
+            "app.diagrams.thumbnail_queue.render_thumbnail_png",
+            lambda svg: PNG_MAGIC + svg.encode()[:16],
+        )
+        config = dataclasses.replace(
+            app_config,
+            database=dataclasses.replace(app_config.database, thumbnail_workers=0),
+        )
+        application = create_app(config)
+        db_manager = DatabaseManager(config.database)
+        await initialize_databases(db_manager)
+        application.state.db_manager = db_manager
+        db = db_manager.main_db
+
+        user_id = await _insert_test_user(db)
+        diagram_id = "anonymous-test-diagram"
+        now = datetime.now(tz=UTC).isoformat()
+        await db.execute(_DIAGRAMS_INSERT, (diagram_id, now, user_id, now))
+        await db.execute(
+            _VERSIONS_INSERT,
+            (diagram_id, "Anonymous", _node_data("A"), now, user_id),
+        )
+        await db.commit()
+
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            url = f"/api/diagrams/{diagram_id}/thumbnail"
+            assert (await c.get(url)).status_code == 404
+            assert db_manager.thumbnail_queue.status(diagram_id) == "pending"
+
+            await db_manager.thumbnail_queue.flush()
+            resp = await c.get(url)
+            assert resp.status_code == 200
+            assert resp.content[:8] == PNG_MAGIC
+
+        await db_manager.close()
+
+    async def test_sweep_upgrades_svg_thumbnails(
+        self, app_config: AppConfig,
+    ) -> None:
+        """The background sweep replaces legacy SVG-byte thumbnails with PNG."""
+        db_manager = DatabaseManager(app_config.database)
+        await initialize_databases(db_manager)
+        db = db_manager.main_db
+
+        user_id = await _insert_test_user(db)
+        diagram_id = "sweep-test-diagram"
+        now = datetime.now(tz=UTC).isoformat()
+
+        await db.execute(
+            _DIAGRAMS_INSERT, (diagram_id, now, user_id, now),
+        )
+        await db.execute(
+            _VERSIONS_INSERT,
+            (diagram_id, "Sweep", _node_data("W"), now, user_id),
+        )
+        await db.execute(
+            _THUMBS_INSERT,
+            (diagram_id, "dark", b"<svg>stale</svg>", now),
+        )
+        await db.commit()
+
+        await db_manager.thumbnail_queue.start_sweep()
+
+        thumb = await get_thumbnail(db, diagram_id)
+        assert thumb is not None
+        assert thumb[:8] == PNG_MAGIC
+
+        await db_manager.close()
 
 
 class TestThemeThumbnails:
@@ -481,10 +590,10 @@ class TestThemeThumbnails:
 class TestAdminThumbnailRegeneration:
     """Verify admin thumbnail regeneration endpoint (WP-9)."""
 
-    async def test_regeneration_endpoint_returns_200_and_count(
+    async def test_regeneration_job_reports_progress(
         self, client: httpx.AsyncClient,
     ) -> None:
-        """Admin can trigger regeneration and gets back a count."""
+        """Admin can start regeneration as a job and poll it to completion."""
         headers = await _auth_headers(client)
         # Create a diagram so there is something to regenerate
         await client.post(
@@ -501,10 +610,35 @@ class TestAdminThumbnailRegeneration:
             "/api/admin/thumbnails/regenerate",
             headers=headers,
         )
-        assert resp.status_code == 200
-        body = resp.json()
-        assert "count" in body
-        assert body["count"] >= 1
+        assert resp.status_code == 202
+        job = resp.json()
+        assert job["status"] == "running"
+
+        for _ in range(200):
+            resp = await client.get(
+                f"/api/admin/thumbnails/regenerate/{job['id']}",
+                headers=headers,
+            )
+            assert resp.status_code == 200
+            job = resp.json()
+            if job["status"] != "running":
+                break
+            await asyncio.sleep(0.05)
+
+        assert job["status"] == "completed"
+        assert job["total"] >= 1
+        assert job["processed"] == job["total"]
+
+    async def test_unknown_job_returns_404(
+        self, client: httpx.AsyncClient,
+    ) -> None:
+        """Polling a job ID that was never started returns 404."""
+        headers = await _auth_headers(client)
+        resp = await client.get(
+            "/api/admin/thumbnails/regenerate/no-such-job",
+            headers=headers,
+        )
+        assert resp.status_code == 404
 
     async def test_non_admin_gets_403(
         self, client: httpx.AsyncClient,
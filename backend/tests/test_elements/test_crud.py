@@ -10,6 +10,7 @@ import pytest
 from app.config import AppConfig, AuthConfig, DatabaseConfig
 from app.database import DatabaseManager
 from app.main import create_app
+from app.pagination import encode_cursor
 from app.startup import initialize_databases
 
 if TYPE_CHECKING:
@@ -164,6 +165,80 @@ class TestListElements:
         )
         assert resp.json()["total"] == 1
 
+    async def test_list_enriches_every_item(self, client: httpx.AsyncClient) -> None:
+        headers = await _auth_headers(client)
+        a = await _create_element(client, headers, name="A")
+        b = await _create_element(client, headers, name="B")
+        await client.post(f"/api/elements/{a['id']}/tags", json={"tag": "core"}, headers=headers)
+        for source, target in ((a, b), (a, a)):
+            resp = await client.post(
+                "/api/relationships",
+                json={
+                    "source_element_id": source["id"],
+                    "target_element_id": target["id"],
+                    "relationship_type": "uses",
+                },
+                headers=headers,
+            )
+            assert resp.status_code == 201
+        resp = await client.get("/api/elements", headers=headers)
+        items = {item["name"]: item for item in resp.json()["items"]}
+        assert items["A"]["tags"] == ["core"]
+        assert items["A"]["relationship_count"] == 2
+        assert items["B"]["tags"] == []
+        assert items["B"]["relationship_count"] == 1
+        assert items["B"]["diagram_usage_count"] == 0
+
+    async def test_include_limits_enrichment(self, client: httpx.AsyncClient) -> None:
+        headers = await _auth_headers(client)
+        a = await _create_element(client, headers, name="A")
+        await client.post(f"/api/elements/{a['id']}/tags", json={"tag": "core"}, headers=headers)
+        resp = await client.get("/api/elements?include=", headers=headers)
+        item = resp.json()["items"][0]
+        assert item["tags"] is None
+        assert item["relationship_count"] is None
+        resp = await client.get("/api/elements?include=tags", headers=headers)
+        item = resp.json()["items"][0]
+        assert item["tags"] == ["core"]
+        assert item["diagram_usage_count"] is None
+
+    async def test_cursor_pages_through_all_elements(
+        self, client: httpx.AsyncClient,
+    ) -> None:
+        headers = await _auth_headers(client)
+        for name in ("A", "B", "C", "D", "E"):
+            await _create_element(client, headers, name=name)
+        names: list[str] = []
+        resp = await client.get("/api/elements?page_size=2", headers=headers)
+        assert resp.json()["total"] == 5
+        while True:
+            data = resp.json()
+            names.extend(item["name"] for item in data["items"])
+            if data["next_cursor"] is None:
+                break
+            resp = await client.get(
+                f"/api/elements?page_size=2&include_total=false&cursor={data['next_cursor']}",
+                headers=headers,
+            )
+            assert resp.json()["total"] is None
+        assert sorted(names) == ["A", "B", "C", "D", "E"]
+
+    async def test_invalid_cursor_rejected(self, client: httpx.AsyncClient) -> None:
+        headers = await _auth_headers(client)
+        resp = await client.get("/api/elements?cursor=bm9wZQ", headers=headers)
+        assert resp.status_code == 400
+
+    async def test_wrongly_typed_cursor_rejected(self, client: httpx.AsyncClient) -> None:
+        headers = await _auth_headers(client)
+        token = encode_cursor([{"a": 1}, "x"])
+        resp = await client.get(f"/api/elements?cursor={token}", headers=headers)
+        assert resp.status_code == 400
+
+    async def test_unknown_include_rejected(self, client: httpx.AsyncClient) -> None:
+        headers = await _auth_headers(client)
+        resp = await client.get("/api/elements?include=bogus", headers=headers)
+        assert resp.status_code == 400
+
 
 class TestUpdateElement:
     """Verify element update with OCC."""
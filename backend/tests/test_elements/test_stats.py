@@ -215,3 +215,85 @@ class TestElementStatsEndpoint:
             headers={"Authorization": f"Bearer {token}"},
         )
         assert resp.status_code == 404
+
+
+class TestDiagramElementRefs:
+    """Tests for the diagram_element_refs index behind usage lookups."""
+
+    async def test_update_removing_element_drops_usage(
+        self, client_and_db: tuple[httpx.AsyncClient, DatabaseManager]
+    ) -> None:
+        client, _ = client_and_db
+        token = await _setup_and_get_token(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        element = await _create_element(client, token, "TestElement")
+
+        created = await client.post(
+            "/api/diagrams",
+            json={
+                "name": "Diagram A",
+                "diagram_type": "component_diagram",
+                "data": {"nodes": [{"id": "n1", "data": {"entityId": element["id"]}}]},
+            },
+            headers=headers,
+        )
+        await client.put(
+            f"/api/diagrams/{created.json()['id']}",
+            json={"name": "Diagram A", "data": {"nodes": []}},
+            headers={**headers, "If-Match": "1"},
+        )
+
+        resp = await client.get(f"/api/elements/{element['id']}/stats", headers=headers)
+        assert resp.json()["diagram_usage_count"] == 0
+        resp = await client.get(f"/api/elements/{element['id']}/diagrams", headers=headers)
+        assert resp.json() == []
+
+    async def test_refs_match_exact_ids_not_substrings(
+        self, client_and_db: tuple[httpx.AsyncClient, DatabaseManager]
+    ) -> None:
+        client, _ = client_and_db
+        token = await _setup_and_get_token(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        element = await _create_element(client, token, "TestElement")
+
+        await client.post(
+            "/api/diagrams",
+            json={
+                "name": "Mentions only",
+                "diagram_type": "component_diagram",
+                "data": {"notes": f"see {element['id']} for details"},
+            },
+            headers=headers,
+        )
+        resp = await client.get(f"/api/elements/{element['id']}/stats", headers=headers)
+        assert resp.json()["diagram_usage_count"] == 0
+
+    async def test_migration_backfills_existing_diagrams(
+        self, client_and_db: tuple[httpx.AsyncClient, DatabaseManager]
+    ) -> None:
+        from app.migrations.m028_diagram_element_refs import up as m028_up
+
+        client, db_manager = client_and_db
+        token = await _setup_and_get_token(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        element = await _create_element(client, token, "TestElement")
+        await client.post(
+            "/api/diagrams",
+            json={
+                "name": "Diagram A",
+                "diagram_type": "component_diagram",
+                "data": {"nodes": [{"id": element["id"]}]},
+            },
+            headers=headers,
+        )
+
+        db = db_manager.main_db
+        await db.execute("DROP TABLE diagram_element_refs")
+        await db.commit()
+        await m028_up(db)
+
+        cursor = await db.execute(
+            "SELECT COUNT(*) FROM diagram_element_refs WHERE element_id = ?",
+            (element["id"],),
+        )
+        assert (await cursor.fetchone())[0] == 1
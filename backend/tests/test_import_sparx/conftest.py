@@ -0,0 +1,131 @@
+"""Fixtures for SparxEA import tests — a small synthetic .qea repository."""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+_SCHEMA = (
+    "CREATE TABLE t_package (Package_ID INTEGER PRIMARY KEY, Name TEXT, "
+    "Parent_ID INTEGER, ea_guid TEXT, Notes TEXT)",
+    "CREATE TABLE t_object (Object_ID INTEGER PRIMARY KEY, Object_Type TEXT, "
+    "Name TEXT, Package_ID INTEGER, Note TEXT, ea_guid TEXT, Status TEXT, "
+    "Stereotype TEXT, Version TEXT, Scope TEXT, Abstract TEXT, Persistence TEXT, "
+    "Author TEXT, Complexity TEXT, Phase TEXT, CreatedDate TEXT, ModifiedDate TEXT, "
+    "GenType TEXT, Backcolor INTEGER, Fontcolor INTEGER, Bordercolor INTEGER, "
+    "BorderWidth INTEGER)",
+    "CREATE TABLE t_connector (Connector_ID INTEGER PRIMARY KEY, "
+    "Connector_Type TEXT, Name TEXT, Start_Object_ID INTEGER, End_Object_ID INTEGER, "
+    "ea_guid TEXT, Notes TEXT, Direction TEXT, SourceCard TEXT, DestCard TEXT, "
+    "SourceRole TEXT, DestRole TEXT, Stereotype TEXT, RouteStyle INTEGER, "
+    "SourceIsNavigable INTEGER, DestIsNavigable INTEGER, LineColor INTEGER, "
+    "IsBold INTEGER, LineStyle INTEGER)",
+    "CREATE TABLE t_diagram (Diagram_ID INTEGER PRIMARY KEY, Name TEXT, "
+    "Diagram_Type TEXT, Package_ID INTEGER, ea_guid TEXT, Notes TEXT)",
+    "CREATE TABLE t_diagramobjects (Diagram_ID INTEGER, Object_ID INTEGER, "
+    "RectTop INTEGER, RectBottom INTEGER, RectLeft INTEGER, RectRight INTEGER, "
+    "ObjectStyle TEXT)",
+    'CREATE TABLE t_attribute (Object_ID INTEGER, Name TEXT, Type TEXT, Notes TEXT, '
+    '"Default" TEXT, LowerBound TEXT, UpperBound TEXT, Stereotype TEXT, '
+    "Scope TEXT, Pos INTEGER)",
+    "CREATE TABLE t_objectproperties (Object_ID INTEGER, Property TEXT, Value TEXT)",
+)
+
+# First Object_ID used for generated extra classes
+EXTRA_CLASS_BASE_ID = 1000
+
+
+def write_qea(path: str, extra_classes: int = 0) -> None:
+    """Write a .qea with a fixed model plus ``extra_classes`` generated classes.
+
+    Model: Root > (Aerodrome, Navigation) packages; classes Airport and
+    Runway with an Association; an unnamed Note; a Text object (skipped);
+    a Package->Package Dependency; an unknown and a dangling connector;
+    one Logical diagram showing Airport, Runway and the Note.
+    """
+    conn = sqlite3.connect(path)
+    for statement in _SCHEMA:
+        conn.execute(statement)
+    conn.executemany(
+        "INSERT INTO t_package VALUES (?, ?, ?, ?, ?)",
+        [
+            (1, "Root", 0, "{PKG-ROOT}", None),
+            (2, "Aerodrome", 1, "{PKG-AD}", "Aerodrome features"),
+            (3, "Navigation", 1, "{PKG-NAV}", None),
+        ],
+    )
+    objects = [
+        (10, "Package", "Aerodrome", 2, None, "{OBJ-PKG-AD}", "Approved", "domain"),
+        (11, "Package", "Navigation", 3, None, "{OBJ-PKG-NAV}", None, None),
+        (20, "Class", "Airport", 2, "An aerodrome", "{OBJ-AIRPORT}", "Proposed", "feature"),
+        (21, "Class", "Runway", 2, None, "{OBJ-RUNWAY}", None, None),
+        (22, "Note", None, 2, "<p>Runway notes</p><p>More</p>", "{OBJ-NOTE}", None, None),
+        (23, "Text", "Caption", 2, None, "{OBJ-TEXT}", None, None),
+    ]
+    objects.extend(
+        (EXTRA_CLASS_BASE_ID + i, "Class", f"Generated {i}", 3, None,
+         f"{{OBJ-GEN-{i}}}", None, None)
+        for i in range(extra_classes)
+    )
+    conn.executemany(
+        "INSERT INTO t_object (Object_ID, Object_Type, Name, Package_ID, Note, "
+        "ea_guid, Status, Stereotype) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        objects,
+    )
+    conn.execute(
+        "INSERT INTO t_attribute VALUES "
+        "(20, 'designator', 'CodeType', NULL, NULL, '1', '1', NULL, 'Public', 0)"
+    )
+    conn.execute("INSERT INTO t_objectproperties VALUES (20, 'uom', 'M')")
+    conn.executemany(
+        "INSERT INTO t_connector (Connector_ID, Connector_Type, Name, "
+        "Start_Object_ID, End_Object_ID, ea_guid, SourceCard, DestCard, RouteStyle) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (1, "Association", "has", 20, 21, "{CON-HAS}", "1", "0..*", 3),
+            (2, "Dependency", None, 10, 11, "{CON-PKG}", None, None, None),
+            (3, "Bogus", None, 20, 21, "{CON-BOGUS}", None, None, None),
+            (4, "Association", None, 20, 999, "{CON-DANGLING}", None, None, None),
+        ],
+    )
+    conn.execute(
+        "INSERT INTO t_diagram VALUES "
+        "(1, 'Aerodrome Overview', 'Logical', 2, '{DIA-AD}', 'Main view')"
+    )
+    conn.executemany(
+        "INSERT INTO t_diagramobjects VALUES (1, ?, ?, ?, ?, ?, NULL)",
+        [
+            (20, -10, -70, 10, 110),
+            (21, -10, -70, 210, 310),
+            (22, -100, -140, 10, 160),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def qea_factory(tmp_path: Path) -> Callable[..., str]:
+    """Build synthetic .qea files under tmp_path; returns their paths."""
+    counter = 0
+
+    def factory(extra_classes: int = 0) -> str:
+        nonlocal counter
+        counter += 1
+        path = str(tmp_path / f"model_{counter}.qea")
+        write_qea(path, extra_classes=extra_classes)
+        return path
+
+    return factory
+
+
+@pytest.fixture
+def synthetic_qea(qea_factory: Callable[..., str]) -> str:
+    """Path to a synthetic .qea holding the fixed model only."""
+    return qea_factory()
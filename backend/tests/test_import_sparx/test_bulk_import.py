@@ -0,0 +1,255 @@
+"""Tests for the batched SparxEA import path against a synthetic .qea."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+
+from app.config import AppConfig, AuthConfig, DatabaseConfig
+from app.database import DatabaseManager
+from app.import_sparx.service import (
+    _GUID_LOOKUP_SQL,
+    _GUID_TABLES,
+    IMPORT_CHUNK_SIZE,
+    _build_guid_index,
+    import_sparx_file,
+)
+from app.main import create_app
+from app.migrations.m012_sets import DEFAULT_SET_ID
+from app.startup import initialize_databases
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Callable
+    from pathlib import Path
+
+    import aiosqlite
+
+
+@pytest.fixture
+def app_config(tmp_path: Path) -> AppConfig:
+    return AppConfig(
+        debug=True,
+        cors_origins=["http://localhost:5173"],
+        database=DatabaseConfig(data_dir=str(tmp_path / "data")),
+        auth=AuthConfig(
+            jwt_secret="test-secret-key-that-is-at-least-32-bytes-long-for-hs256",
+            argon2_time_cost=1,
+            argon2_memory_cost=8192,
+            argon2_parallelism=1,
+        ),
+    )
+
+
+@pytest.fixture
+async def client(app_config: AppConfig) -> AsyncIterator[httpx.AsyncClient]:
+    application = create_app(app_config)
+    db_manager = DatabaseManager(app_config.database)
+    await initialize_databases(db_manager)
+    application.state.db_manager = db_manager
+    transport = httpx.ASGITransport(app=application)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as c:
+        yield c
+    await db_manager.close()
+
+
+async def _auth_headers(client: httpx.AsyncClient) -> dict[str, str]:
+    await client.post(
+        "/api/auth/setup",
+        json={"username": "admin", "password": "AdminPass123!"},
+    )
+    resp = await client.post(
+        "/api/auth/login",
+        json={"username": "admin", "password": "AdminPass123!"},
+    )
+    tokens = resp.json()
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+async def _setup(client: httpx.AsyncClient) -> tuple[aiosqlite.Connection, str]:
+    await _auth_headers(client)
+    db = client._transport.app.state.db_manager.main_db  # type: ignore[union-attr]
+    cursor = await db.execute("SELECT id FROM users WHERE username = 'admin'")
+    return db, (await cursor.fetchone())[0]
+
+
+async def _count(db: aiosqlite.Connection, table: str) -> int:
+    cursor = await db.execute(f"SELECT COUNT(*) FROM {table}")  # noqa: S608
+    return (await cursor.fetchone())[0]
+
+
+class TestBulkImport:
+    """Verify the batched import writes the same rows as per-object creation."""
+
+    async def test_summary_counts(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        db, user_id = await _setup(client)
+        summary = await import_sparx_file(db, synthetic_qea, imported_by=user_id)
+        assert summary.packages_created == 3
+        assert summary.elements_created == 3
+        assert summary.elements_skipped == 1
+        assert summary.relationships_created == 1
+        assert summary.package_relationships_created == 1
+        assert summary.connectors_skipped == 2
+        assert summary.diagrams_created == 1
+
+    async def test_versions_search_and_closure(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        db, user_id = await _setup(client)
+        await import_sparx_file(db, synthetic_qea, imported_by=user_id)
+
+        cursor = await db.execute(
+            "SELECT ev.name, ev.change_summary, ev.metadata, ev.data FROM elements e "
+            "JOIN element_versions ev ON ev.element_id = e.id "
+            "AND ev.version = e.current_version WHERE ev.name = 'Airport'"
+        )
+        row = await cursor.fetchone()
+        assert row[1] == "Imported from SparxEA (Class)"
+        metadata = json.loads(row[2])
+        assert metadata["status"] == "Proposed"
+        assert metadata["tagged_values"] == [{"property": "uom", "value": "M"}]
+        assert json.loads(row[3])["attributes"][0]["name"] == "designator"
+
+        cursor = await db.execute(
+            "SELECT name FROM elements_fts WHERE elements_fts MATCH 'Airport'"
+        )
+        assert [r[0] for r in await cursor.fetchall()] == ["Airport"]
+        cursor = await db.execute(
+            "SELECT ev.name FROM element_versions ev "
+            "JOIN elements e ON e.id = ev.element_id WHERE e.element_type = 'note'"
+        )
+        assert (await cursor.fetchone())[0] == "Runway notes"
+
+        # Closure triggers saw parents before children
+        cursor = await db.execute(
+            "SELECT COUNT(*) FROM package_closure c "
+            "JOIN package_versions a ON a.package_id = c.ancestor "
+            "JOIN package_versions d ON d.package_id = c.descendant "
+            "WHERE a.name = 'Root' AND d.name = 'Aerodrome' AND c.depth = 1"
+        )
+        assert (await cursor.fetchone())[0] == 1
+
+    async def test_diagram_refs_summary_and_search(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        db, user_id = await _setup(client)
+        await import_sparx_file(db, synthetic_qea, imported_by=user_id)
+
+        cursor = await db.execute(
+            "SELECT id, node_count, edge_count, has_content, notation FROM diagrams"
+        )
+        diagram_id, node_count, edge_count, has_content, notation = await cursor.fetchone()
+        assert (node_count, edge_count, has_content) == (3, 2, 1)
+        assert notation == "uml"
+        assert await _count(db, "diagram_element_refs") == 3
+        cursor = await db.execute(
+            "SELECT diagram_id FROM diagrams_fts WHERE diagrams_fts MATCH 'Aerodrome'"
+        )
+        assert (await cursor.fetchone())[0] == diagram_id
+
+    async def test_reimport_skips_existing_objects(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        db, user_id = await _setup(client)
+        await import_sparx_file(
+            db, synthetic_qea, imported_by=user_id, set_id=DEFAULT_SET_ID,
+        )
+        summary = await import_sparx_file(
+            db, synthetic_qea, imported_by=user_id, set_id=DEFAULT_SET_ID,
+        )
+        assert summary.packages_skipped == 3
+        assert summary.packages_created == 0
+        assert summary.elements_created == 0
+        assert summary.relationships_created == 1
+        assert summary.diagrams_skipped == 1
+        assert await _count(db, "elements") == 3
+        assert await _count(db, "elements_fts") == 3
+        # Package dependency already exists; the duplicate is ignored
+        assert await _count(db, "package_relationships") == 1
+
+    async def test_placements_are_matched_to_their_diagram(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        conn = sqlite3.connect(synthetic_qea)
+        conn.execute(
+            "INSERT INTO t_diagram VALUES (5, 'Runways', 'Logical', 2, '{DIA-RWY}', NULL)"
+        )
+        # A placement on a missing diagram sorts before both real diagrams
+        conn.executemany(
+            "INSERT INTO t_diagramobjects VALUES (?, ?, 0, -50, 0, 100, NULL)",
+            [(0, 20), (5, 21)],
+        )
+        conn.commit()
+        conn.close()
+        db, user_id = await _setup(client)
+
+        summary = await import_sparx_file(db, synthetic_qea, imported_by=user_id)
+        assert summary.diagrams_created == 2
+        cursor = await db.execute(
+            "SELECT dv.name, d.node_count FROM diagrams d "
+            "JOIN diagram_versions dv ON dv.diagram_id = d.id ORDER BY dv.name"
+        )
+        rows = [tuple(row) for row in await cursor.fetchall()]
+        assert rows == [("Aerodrome Overview", 3), ("Runways", 1)]
+
+    async def test_guid_lookup_fetches_only_requested_guids(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        db, user_id = await _setup(client)
+        await import_sparx_file(
+            db, synthetic_qea, imported_by=user_id, set_id=DEFAULT_SET_ID,
+        )
+        index = await _build_guid_index(
+            db, DEFAULT_SET_ID, {"{PKG-AD}", "{OBJ-AIRPORT}", "{DIA-AD}", "{NEW}"},
+        )
+        assert set(index) == {"{PKG-AD}", "{OBJ-AIRPORT}", "{DIA-AD}"}
+        cursor = await db.execute(
+            "SELECT id FROM elements WHERE id = ?", (index["{OBJ-AIRPORT}"],),
+        )
+        assert await cursor.fetchone() is not None
+        assert await _build_guid_index(db, "other-set", {"{PKG-AD}"}) == {}
+
+    async def test_guid_lookup_uses_expression_index(
+        self, client: httpx.AsyncClient,
+    ) -> None:
+        db, _ = await _setup(client)
+        for sql, (_, versions, _) in zip(_GUID_LOOKUP_SQL, _GUID_TABLES, strict=True):
+            cursor = await db.execute(
+                f"EXPLAIN QUERY PLAN {sql}", ('["{OBJ-AIRPORT}"]', DEFAULT_SET_ID),
+            )
+            plan = [row[3] for row in await cursor.fetchall()]
+            assert plan[0].startswith(f"SEARCH {versions} USING INDEX idx_{versions}_ea_guid")
+
+    async def test_import_spans_several_chunks(
+        self, client: httpx.AsyncClient, qea_factory: Callable[..., str],
+    ) -> None:
+        db, user_id = await _setup(client)
+        extra = IMPORT_CHUNK_SIZE + 5
+        summary = await import_sparx_file(
+            db, qea_factory(extra_classes=extra), imported_by=user_id,
+        )
+        assert summary.elements_created == extra + 3
+        assert await _count(db, "element_versions") == extra + 3
+        assert await _count(db, "elements_fts") == extra + 3
+
+    async def test_new_diagrams_queue_thumbnails(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        db, user_id = await _setup(client)
+        db_manager = client._transport.app.state.db_manager  # type: ignore[union-attr]
+        summary = await import_sparx_file(
+            db, synthetic_qea, imported_by=user_id,
+            thumbnails=db_manager.thumbnail_queue,
+        )
+        assert summary.diagrams_created == 1
+
+        cursor = await db.execute("SELECT id FROM diagrams")
+        diagram_id = (await cursor.fetchone())[0]
+        assert db_manager.thumbnail_queue.status(diagram_id) is not None
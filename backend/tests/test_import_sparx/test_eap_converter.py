@@ -11,6 +11,7 @@ import pytest
 
 from app.import_sparx.eap_converter import (
     REQUIRED_TABLES,
+    InsertStatementParser,
     convert_eap_to_sqlite,
     is_jet4_file,
 )
@@ -81,6 +82,62 @@ class TestIsJet4File:
 # ---------- convert_eap_to_sqlite Tests ----------
 
 
+# Shaped like ``mdb-export -I sqlite`` output
+EXPORT_SAMPLE = (
+    'INSERT INTO "t_object" ("Object_ID", "Name", "Note", "Alias") '
+    'VALUES (1,"Air""port","line one\nline two",NULL);\n'
+    'INSERT INTO "t_object" ("Object_ID", "Name", "Note", "Alias") '
+    "VALUES (2,'It''s',\"a, (b); c\",1.5),(3,\"\",\"\",-7);\n"
+)
+EXPECTED_ROWS = [
+    [1, 'Air"port', "line one\nline two", None],
+    [2, "It's", "a, (b); c", 1.5],
+    [3, "", "", -7],
+]
+
+
+class TestInsertStatementParser:
+    """Verify mdb-export INSERT output is parsed incrementally into rows."""
+
+    def test_parses_whole_output(self) -> None:
+        parser = InsertStatementParser()
+        rows = parser.feed(EXPORT_SAMPLE)
+        rows.extend(parser.close())
+        assert rows == EXPECTED_ROWS
+        assert parser.columns == ["Object_ID", "Name", "Note", "Alias"]
+
+    def test_parses_one_character_at_a_time(self) -> None:
+        parser = InsertStatementParser()
+        rows: list[list[object]] = []
+        for char in EXPORT_SAMPLE:
+            rows.extend(parser.feed(char))
+        rows.extend(parser.close())
+        assert rows == EXPECTED_ROWS
+
+    def test_returns_rows_as_statements_complete(self) -> None:
+        parser = InsertStatementParser()
+        first_end = EXPORT_SAMPLE.index(";") + 1
+        assert parser.feed(EXPORT_SAMPLE[:first_end - 1]) == []
+        assert parser.feed(EXPORT_SAMPLE[first_end - 1:first_end]) == [EXPECTED_ROWS[0]]
+
+    def test_empty_output(self) -> None:
+        parser = InsertStatementParser()
+        assert parser.feed("") == []
+        assert parser.close() == []
+        assert parser.columns is None
+
+    def test_truncated_output_raises(self) -> None:
+        parser = InsertStatementParser()
+        parser.feed(EXPORT_SAMPLE[:-10])
+        with pytest.raises(ValueError, match="Truncated"):
+            parser.close()
+
+    def test_unexpected_statement_raises(self) -> None:
+        parser = InsertStatementParser()
+        with pytest.raises(ValueError, match="Unexpected statement"):
+            parser.feed("DROP TABLE t_object;")
+
+
 class TestConvertEapToSqlite:
     """Verify MDB→SQLite conversion."""
 
@@ -0,0 +1,248 @@
+"""Tests for background SparxEA import jobs — progress, cancellation and summaries."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+
+from app.config import AppConfig, AuthConfig, DatabaseConfig
+from app.database import DatabaseManager
+from app.import_sparx.service import IMPORT_CHUNK_SIZE, import_sparx_file
+from app.main import create_app
+from app.startup import initialize_databases
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Callable
+
+
+@pytest.fixture
+def app_config(tmp_path: Path) -> AppConfig:
+    return AppConfig(
+        debug=True,
+        cors_origins=["http://localhost:5173"],
+        database=DatabaseConfig(data_dir=str(tmp_path / "data")),
+        auth=AuthConfig(
+            jwt_secret="test-secret-key-that-is-at-least-32-bytes-long-for-hs256",
+            argon2_time_cost=1,
+            argon2_memory_cost=8192,
+            argon2_parallelism=1,
+        ),
+    )
+
+
+@pytest.fixture
+async def client(app_config: AppConfig) -> AsyncIterator[httpx.AsyncClient]:
+    application = create_app(app_config)
+    db_manager = DatabaseManager(app_config.database)
+    await initialize_databases(db_manager)
+    application.state.db_manager = db_manager
+    transport = httpx.ASGITransport(app=application)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as c:
+        yield c
+    await db_manager.close()
+
+
+async def _auth_headers(client: httpx.AsyncClient) -> dict[str, str]:
+    await client.post(
+        "/api/auth/setup",
+        json={"username": "admin", "password": "AdminPass123!"},
+    )
+    resp = await client.post(
+        "/api/auth/login",
+        json={"username": "admin", "password": "AdminPass123!"},
+    )
+    tokens = resp.json()
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+def _db_manager(client: httpx.AsyncClient) -> DatabaseManager:
+    return client._transport.app.state.db_manager  # type: ignore[union-attr,no-any-return]
+
+
+async def _start_import(
+    client: httpx.AsyncClient, headers: dict[str, str], path: str, filename: str = "model.qea",
+) -> str:
+    resp = await client.post(
+        "/api/import/sparx",
+        files={"file": (filename, Path(path).read_bytes())},
+        headers=headers,
+    )
+    assert resp.status_code == 202
+    return resp.json()["id"]  # type: ignore[no-any-return]
+
+
+class TestImportJobs:
+    """Verify imports run as background jobs with retrievable results."""
+
+    async def test_job_completes_with_summary_and_progress(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        headers = await _auth_headers(client)
+        job_id = await _start_import(client, headers, synthetic_qea)
+        await _db_manager(client).import_jobs.wait_for(job_id)
+
+        resp = await client.get(f"/api/import/sparx/{job_id}", headers=headers)
+        assert resp.status_code == 200
+        job = resp.json()
+        assert job["status"] == "completed"
+        assert job["filename"] == "model.qea"
+        assert job["finished_at"] is not None
+        assert job["summary"]["elements_created"] == 3
+        assert job["summary"]["package_relationships_created"] == 1
+        assert job["progress"]["elements"] == {"total": 3, "processed": 3}
+        assert job["progress"]["connectors"] == {"total": 2, "processed": 2}
+        assert job["progress"]["diagrams"] == {"total": 1, "processed": 1}
+
+    async def test_progress_is_reported_per_chunk(
+        self, client: httpx.AsyncClient, qea_factory: Callable[..., str],
+    ) -> None:
+        await _auth_headers(client)
+        db = _db_manager(client).main_db
+        cursor = await db.execute("SELECT id FROM users WHERE username = 'admin'")
+        user_id = (await cursor.fetchone())[0]
+        calls: list[tuple[str, int, int]] = []
+
+        await import_sparx_file(
+            db, qea_factory(extra_classes=IMPORT_CHUNK_SIZE), imported_by=user_id,
+            on_progress=lambda phase, done, total: calls.append((phase, done, total)),
+        )
+        total = IMPORT_CHUNK_SIZE + 3
+        assert [c for c in calls if c[0] == "elements"] == [
+            ("elements", 0, total),
+            ("elements", IMPORT_CHUNK_SIZE, total),
+            ("elements", total, total),
+        ]
+        assert [c[0] for c in calls if c[1] == 0] == [
+            "packages", "elements", "connectors", "diagrams",
+        ]
+
+    async def test_cancel_queued_job(
+        self, client: httpx.AsyncClient, qea_factory: Callable[..., str],
+    ) -> None:
+        await _auth_headers(client)
+        db_manager = _db_manager(client)
+        cursor = await db_manager.main_db.execute(
+            "SELECT id FROM users WHERE username = 'admin'"
+        )
+        user_id = (await cursor.fetchone())[0]
+        jobs = db_manager.import_jobs
+        first_path, second_path = qea_factory(), qea_factory()
+        first = jobs.submit(first_path, filename="first.qea", created_by=user_id)
+        second = jobs.submit(second_path, filename="second.qea", created_by=user_id)
+        assert second.status == "queued"
+
+        assert jobs.cancel(second.id)
+        await jobs.wait_for(first.id)
+        await jobs.wait_for(second.id)
+        assert second.status == "cancelled"
+        assert first.status == "completed"
+        # The job removes its upload whether it ran or not
+        assert not os.path.exists(first_path)
+        assert not os.path.exists(second_path)
+        assert not jobs.cancel(second.id)
+
+    async def test_cancel_after_merge_commits_keeps_job_completed(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        await _auth_headers(client)
+        db_manager = _db_manager(client)
+        cursor = await db_manager.main_db.execute(
+            "SELECT id FROM users WHERE username = 'admin'"
+        )
+        user_id = (await cursor.fetchone())[0]
+        jobs = db_manager.import_jobs
+        job = jobs.submit(synthetic_qea, filename="model.qea", created_by=user_id)
+        cancel_results: list[bool] = []
+
+        def cancel_during_enqueue(*_args: object) -> None:
+            # Thumbnails are enqueued after the commit, before the DETACH
+            cancel_results.append(jobs.cancel(job.id))
+            jobs._tasks[job.id].cancel()
+
+        monkeypatch.setattr(db_manager.thumbnail_queue, "enqueue", cancel_during_enqueue)
+        await jobs.wait_for(job.id)
+
+        assert cancel_results == [False]
+        assert job.status == "completed"
+        assert job.summary is not None
+        assert job.summary["elements_created"] == 3
+        cursor = await db_manager.main_db.execute("SELECT COUNT(*) FROM elements")
+        assert (await cursor.fetchone())[0] == 3
+
+    async def test_merge_waits_for_queued_writer(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        await _auth_headers(client)
+        db_manager = _db_manager(client)
+        cursor = await db_manager.main_db.execute(
+            "SELECT id FROM users WHERE username = 'admin'"
+        )
+        user_id = (await cursor.fetchone())[0]
+        jobs = db_manager.import_jobs
+
+        async with db_manager.write_connection() as db:
+            job = jobs.submit(synthetic_qea, filename="model.qea", created_by=user_id)
+            for _ in range(400):
+                if job.phase == "merging":
+                    break
+                await asyncio.sleep(0.05)
+            assert job.phase == "merging"
+            await asyncio.sleep(0.1)
+            cursor = await db.execute("SELECT COUNT(*) FROM elements")
+            assert (await cursor.fetchone())[0] == 0
+
+        await jobs.wait_for(job.id)
+        assert job.status == "completed"
+        cursor = await db_manager.main_db.execute("SELECT COUNT(*) FROM elements")
+        assert (await cursor.fetchone())[0] == 3
+
+    async def test_cancel_finished_job_conflicts(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        headers = await _auth_headers(client)
+        job_id = await _start_import(client, headers, synthetic_qea)
+        await _db_manager(client).import_jobs.wait_for(job_id)
+
+        resp = await client.post(f"/api/import/sparx/{job_id}/cancel", headers=headers)
+        assert resp.status_code == 409
+
+    async def test_unreadable_file_fails_job(
+        self, client: httpx.AsyncClient, tmp_path: Path,
+    ) -> None:
+        headers = await _auth_headers(client)
+        bad = tmp_path / "bad.qea"
+        bad.write_bytes(b"not a sqlite database" * 100)
+        job_id = await _start_import(client, headers, str(bad))
+        job = await _db_manager(client).import_jobs.wait_for(job_id)
+        assert job is not None
+        assert job.status == "failed"
+        assert job.error
+
+    async def test_job_hidden_from_other_users(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        headers = await _auth_headers(client)
+        job_id = await _start_import(client, headers, synthetic_qea)
+        await client.post(
+            "/api/users",
+            json={"username": "viewer_user", "password": "ViewerPass123!", "role": "viewer"},
+            headers=headers,
+        )
+        login_resp = await client.post(
+            "/api/auth/login",
+            json={"username": "viewer_user", "password": "ViewerPass123!"},
+        )
+        viewer_headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+        resp = await client.get(f"/api/import/sparx/{job_id}", headers=viewer_headers)
+        assert resp.status_code == 404
+        resp = await client.get("/api/import/sparx/no-such-job", headers=headers)
+        assert resp.status_code == 404
@@ -0,0 +1,68 @@
+"""Tests for the streaming SparxEA .qea reader."""
+
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from app.import_sparx.reader import QeaReader, read_attributes, read_diagram_objects
+
+
+class TestQeaReader:
+    """Verify QeaReader streams slotted records grouped by SQL ordering."""
+
+    async def test_streams_records_over_one_connection(self, synthetic_qea: str) -> None:
+        async with QeaReader(synthetic_qea) as reader:
+            packages = [pkg async for pkg in reader.packages()]
+            elements = [elem async for elem in reader.elements()]
+            connectors = [conn async for conn in reader.connectors()]
+            diagrams = [diag async for diag in reader.diagrams()]
+        assert [p.Name for p in packages] == ["Root", "Aerodrome", "Navigation"]
+        assert len(elements) == 6
+        assert len(connectors) == 4
+        assert [d.Diagram_ID for d in diagrams] == [1]
+
+    async def test_records_are_slotted(self, synthetic_qea: str) -> None:
+        async with QeaReader(synthetic_qea) as reader:
+            elem = await anext(reader.elements())
+        assert not hasattr(elem, "__dict__")
+
+    async def test_groups_placements_by_diagram(self, synthetic_qea: str) -> None:
+        conn = sqlite3.connect(synthetic_qea)
+        conn.executemany(
+            "INSERT INTO t_diagramobjects VALUES (?, ?, 0, 0, 0, 0, NULL)",
+            [(5, 21), (0, 20), (5, 20)],
+        )
+        conn.commit()
+        conn.close()
+
+        async with QeaReader(synthetic_qea) as reader:
+            groups = [
+                (diagram_id, [d.Object_ID for d in dobjs])
+                async for diagram_id, dobjs in reader.diagram_objects_by_diagram()
+            ]
+        # Grouped by Diagram_ID, table order kept within each diagram
+        assert groups == [(0, [20]), (1, [20, 21, 22]), (5, [21, 20])]
+
+    async def test_groups_attributes_and_tags_by_object(self, synthetic_qea: str) -> None:
+        async with QeaReader(synthetic_qea) as reader:
+            attrs = [
+                (object_id, [a.Name for a in group])
+                async for object_id, group in reader.attributes_by_object()
+            ]
+            tags = [
+                (object_id, [(t.Property, t.Value) for t in group])
+                async for object_id, group in reader.tagged_values_by_object()
+            ]
+        assert attrs == [(20, ["designator"])]
+        assert tags == [(20, [("uom", "M")])]
+
+    async def test_list_readers(self, synthetic_qea: str) -> None:
+        assert len(await read_diagram_objects(synthetic_qea)) == 3
+        assert [a.Name for a in await read_attributes(synthetic_qea)] == ["designator"]
+
+    async def test_requires_open_reader(self, synthetic_qea: str) -> None:
+        reader = QeaReader(synthetic_qea)
+        with pytest.raises(RuntimeError, match="not open"):
+            await anext(reader.packages())
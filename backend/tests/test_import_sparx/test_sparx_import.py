@@ -434,8 +434,12 @@ class TestImportRouter:
             files={"file": ("AIXM_5.1.1_EA16.qea", content, "application/octet-stream")},
             headers=headers,
         )
-        assert resp.status_code == 200
-        data = resp.json()
+        assert resp.status_code == 202
+        jobs = client._transport.app.state.db_manager.import_jobs  # type: ignore[union-attr]
+        await jobs.wait_for(resp.json()["id"])
+        resp = await client.get(f"/api/import/sparx/{resp.json()['id']}", headers=headers)
+        assert resp.json()["status"] == "completed"
+        data = resp.json()["summary"]
         assert data["packages_created"] == 68
         assert data["elements_created"] > 0
         assert data["diagrams_created"] == 107
@@ -0,0 +1,197 @@
+"""Tests for staged SparxEA imports — staging database build and ATTACH merge."""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+
+from app.config import AppConfig, AuthConfig, DatabaseConfig
+from app.database import DatabaseManager
+from app.import_sparx.service import import_sparx_file
+from app.import_sparx.staging import merge_staging, stage_sparx_import
+from app.main import create_app
+from app.migrations.m012_sets import DEFAULT_SET_ID
+from app.startup import initialize_databases
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from pathlib import Path
+
+    import aiosqlite
+
+
+@pytest.fixture
+def app_config(tmp_path: Path) -> AppConfig:
+    return AppConfig(
+        debug=True,
+        cors_origins=["http://localhost:5173"],
+        database=DatabaseConfig(data_dir=str(tmp_path / "data")),
+        auth=AuthConfig(
+            jwt_secret="test-secret-key-that-is-at-least-32-bytes-long-for-hs256",
+            argon2_time_cost=1,
+            argon2_memory_cost=8192,
+            argon2_parallelism=1,
+        ),
+    )
+
+
+@pytest.fixture
+async def client(app_config: AppConfig) -> AsyncIterator[httpx.AsyncClient]:
+    application = create_app(app_config)
+    db_manager = DatabaseManager(app_config.database)
+    await initialize_databases(db_manager)
+    application.state.db_manager = db_manager
+    transport = httpx.ASGITransport(app=application)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as c:
+        yield c
+    await db_manager.close()
+
+
+async def _setup(client: httpx.AsyncClient) -> tuple[aiosqlite.Connection, str, str]:
+    """Admin user; returns the writer connection, iris.db path and user ID."""
+    await client.post(
+        "/api/auth/setup",
+        json={"username": "admin", "password": "AdminPass123!"},
+    )
+    db_manager = client._transport.app.state.db_manager  # type: ignore[union-attr]
+    db = db_manager.main_db
+    cursor = await db.execute("SELECT id FROM users WHERE username = 'admin'")
+    return db, db_manager.config.main_db_path, (await cursor.fetchone())[0]
+
+
+async def _count(db: aiosqlite.Connection, table: str) -> int:
+    cursor = await db.execute(f"SELECT COUNT(*) FROM {table}")  # noqa: S608
+    return (await cursor.fetchone())[0]
+
+
+def _edit_qea(path: str, *statements: str) -> None:
+    conn = sqlite3.connect(path)
+    for statement in statements:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+
+
+class TestStagedImport:
+    """Verify a staged import merges the same rows a direct import writes."""
+
+    async def test_staging_leaves_live_database_untouched(
+        self, client: httpx.AsyncClient, synthetic_qea: str, tmp_path: Path,
+    ) -> None:
+        db, live_path, user_id = await _setup(client)
+        staging = str(tmp_path / "staging.db")
+        summary = await stage_sparx_import(
+            live_path, staging, synthetic_qea, imported_by=user_id,
+        )
+        assert summary.elements_created == 3
+        assert await _count(db, "elements") == 0
+
+        await merge_staging(db, staging)
+        assert await _count(db, "packages") == 3
+        assert await _count(db, "elements") == 3
+        assert await _count(db, "relationships") == 1
+        assert await _count(db, "package_relationships") == 1
+        assert await _count(db, "diagram_element_refs") == 3
+        assert await _count(db, "sparx_sync_objects") == 5
+        cursor = await db.execute(
+            "SELECT element_id FROM elements_fts WHERE elements_fts MATCH 'Airport'"
+        )
+        assert len(await cursor.fetchall()) == 1
+        # Closure triggers fired on merge: 3 self rows plus Root above each child
+        assert await _count(db, "package_closure") == 5
+
+    async def test_refs_resolve_elements_already_in_iris(
+        self, client: httpx.AsyncClient, synthetic_qea: str, tmp_path: Path,
+    ) -> None:
+        db, live_path, user_id = await _setup(client)
+        await import_sparx_file(
+            db, synthetic_qea, imported_by=user_id, set_id=DEFAULT_SET_ID,
+        )
+        _edit_qea(
+            synthetic_qea,
+            "INSERT INTO t_diagram VALUES (2, 'Airports', 'Logical', 2, '{DIA-AP}', NULL)",
+            "INSERT INTO t_diagramobjects VALUES (2, 20, -10, -70, 10, 110, NULL)",
+        )
+
+        staging = str(tmp_path / "staging.db")
+        summary = await stage_sparx_import(
+            live_path, staging, synthetic_qea, imported_by=user_id, set_id=DEFAULT_SET_ID,
+        )
+        assert summary.elements_created == 0
+        assert summary.diagrams_created == 1
+        await merge_staging(db, staging)
+
+        cursor = await db.execute(
+            "SELECT ev.name FROM diagram_element_refs r "
+            "JOIN diagram_versions dv ON dv.diagram_id = r.diagram_id "
+            "JOIN element_versions ev ON ev.element_id = r.element_id "
+            "WHERE dv.name = 'Airports'"
+        )
+        assert [r[0] for r in await cursor.fetchall()] == ["Airport"]
+
+    async def test_staged_sync_merges_changes_only(
+        self, client: httpx.AsyncClient, synthetic_qea: str, tmp_path: Path,
+    ) -> None:
+        db, live_path, user_id = await _setup(client)
+        await import_sparx_file(db, synthetic_qea, imported_by=user_id)
+        _edit_qea(
+            synthetic_qea,
+            "UPDATE t_object SET Name = 'Heliport' WHERE Object_ID = 20",
+            "DELETE FROM t_object WHERE Object_ID = 21",
+        )
+
+        staging = str(tmp_path / "staging.db")
+        summary = await stage_sparx_import(
+            live_path, staging, synthetic_qea, imported_by=user_id,
+            set_id=DEFAULT_SET_ID, sync=True,
+        )
+        assert summary.elements_updated == 1
+        assert summary.elements_removed == 1
+        await merge_staging(db, staging, set_id=DEFAULT_SET_ID)
+
+        cursor = await db.execute(
+            "SELECT ev.name, e.current_version, e.is_deleted, ev.change_type "
+            "FROM elements e JOIN element_versions ev "
+            "ON ev.element_id = e.id AND ev.version = e.current_version "
+            "ORDER BY ev.name"
+        )
+        assert [tuple(r) for r in await cursor.fetchall()] == [
+            ("Heliport", 2, 0, "update"),
+            ("Runway", 2, 1, "delete"),
+            ("Runway notes", 1, 0, "create"),
+        ]
+        assert await _count(db, "element_versions") == 5
+        cursor = await db.execute("SELECT name FROM elements_fts ORDER BY name")
+        assert [r[0] for r in await cursor.fetchall()] == ["Heliport", "Runway notes"]
+        cursor = await db.execute(
+            "SELECT COUNT(*) FROM sparx_sync_objects WHERE ea_guid = '{OBJ-RUNWAY}'"
+        )
+        assert (await cursor.fetchone())[0] == 0
+
+    async def test_merge_rejects_objects_changed_since_staging(
+        self, client: httpx.AsyncClient, synthetic_qea: str, tmp_path: Path,
+    ) -> None:
+        db, live_path, user_id = await _setup(client)
+        await import_sparx_file(db, synthetic_qea, imported_by=user_id)
+        _edit_qea(synthetic_qea, "UPDATE t_object SET Name = 'Heliport' WHERE Object_ID = 20")
+        staging = str(tmp_path / "staging.db")
+        await stage_sparx_import(
+            live_path, staging, synthetic_qea, imported_by=user_id,
+            set_id=DEFAULT_SET_ID, sync=True,
+        )
+        # An edit in Iris lands between staging and merge
+        await db.execute(
+            "UPDATE elements SET current_version = 2 WHERE id IN ("
+            "SELECT element_id FROM element_versions WHERE name = 'Airport')"
+        )
+        await db.commit()
+
+        with pytest.raises(ValueError, match="run the sync again"):
+            await merge_staging(db, staging, set_id=DEFAULT_SET_ID)
+        assert await _count(db, "element_versions") == 3
+        assert await _count(db, "diagram_versions") == 1
@@ -0,0 +1,322 @@
+"""Tests for incremental SparxEA sync — content hashes, updates and removals."""
+
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+
+from app.config import AppConfig, AuthConfig, DatabaseConfig
+from app.database import DatabaseManager
+from app.import_sparx.service import import_sparx_file
+from app.main import create_app
+from app.migrations.m012_sets import DEFAULT_SET_ID
+from app.startup import initialize_databases
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    import aiosqlite
+
+
+@pytest.fixture
+def app_config(tmp_path: Path) -> AppConfig:
+    return AppConfig(
+        debug=True,
+        cors_origins=["http://localhost:5173"],
+        database=DatabaseConfig(data_dir=str(tmp_path / "data")),
+        auth=AuthConfig(
+            jwt_secret="test-secret-key-that-is-at-least-32-bytes-long-for-hs256",
+            argon2_time_cost=1,
+            argon2_memory_cost=8192,
+            argon2_parallelism=1,
+        ),
+    )
+
+
+@pytest.fixture
+async def client(app_config: AppConfig) -> AsyncIterator[httpx.AsyncClient]:
+    application = create_app(app_config)
+    db_manager = DatabaseManager(app_config.database)
+    await initialize_databases(db_manager)
+    application.state.db_manager = db_manager
+    transport = httpx.ASGITransport(app=application)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as c:
+        yield c
+    await db_manager.close()
+
+
+async def _auth_headers(client: httpx.AsyncClient) -> dict[str, str]:
+    await client.post(
+        "/api/auth/setup",
+        json={"username": "admin", "password": "AdminPass123!"},
+    )
+    resp = await client.post(
+        "/api/auth/login",
+        json={"username": "admin", "password": "AdminPass123!"},
+    )
+    tokens = resp.json()
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+async def _setup(client: httpx.AsyncClient) -> tuple[aiosqlite.Connection, str]:
+    await _auth_headers(client)
+    db = client._transport.app.state.db_manager.main_db  # type: ignore[union-attr]
+    cursor = await db.execute("SELECT id FROM users WHERE username = 'admin'")
+    return db, (await cursor.fetchone())[0]
+
+
+def _edit_qea(path: str, *statements: str) -> None:
+    conn = sqlite3.connect(path)
+    for statement in statements:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+
+
+async def _element(db: aiosqlite.Connection, name: str) -> tuple[str, int, int]:
+    """(id, current_version, is_deleted) of the element whose first version is name."""
+    cursor = await db.execute(
+        "SELECT e.id, e.current_version, e.is_deleted FROM elements e "
+        "JOIN element_versions ev ON ev.element_id = e.id AND ev.version = 1 "
+        "WHERE ev.name = ?",
+        (name,),
+    )
+    row = await cursor.fetchone()
+    assert row is not None
+    return tuple(row)  # type: ignore[return-value]
+
+
+class TestSparxSync:
+    """Verify sync-mode imports touch only what changed in the SparxEA file."""
+
+    async def test_import_records_hashes_and_state(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        db, user_id = await _setup(client)
+        await import_sparx_file(db, synthetic_qea, imported_by=user_id)
+
+        cursor = await db.execute(
+            "SELECT object_type, COUNT(*) FROM sparx_sync_objects "
+            "WHERE set_id = ? GROUP BY object_type ORDER BY object_type",
+            (DEFAULT_SET_ID,),
+        )
+        assert [tuple(r) for r in await cursor.fetchall()] == [
+            ("diagram", 1), ("element", 3), ("relationship", 1),
+        ]
+        cursor = await db.execute(
+            "SELECT synced_by FROM sparx_sync_state WHERE set_id = ?", (DEFAULT_SET_ID,),
+        )
+        assert (await cursor.fetchone())[0] == user_id
+
+    async def test_unchanged_sync_writes_nothing(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        db, user_id = await _setup(client)
+        await import_sparx_file(db, synthetic_qea, imported_by=user_id)
+        summary = await import_sparx_file(
+            db, synthetic_qea, imported_by=user_id, set_id=DEFAULT_SET_ID, sync=True,
+        )
+        assert summary.elements_created == summary.elements_updated == 0
+        assert summary.relationships_created == summary.relationships_updated == 0
+        assert summary.diagrams_created == summary.diagrams_updated == 0
+        assert summary.elements_removed == summary.diagrams_removed == 0
+        assert summary.diagrams_skipped == 1
+        cursor = await db.execute("SELECT MAX(current_version) FROM elements")
+        assert (await cursor.fetchone())[0] == 1
+
+    async def test_changed_element_gets_new_version(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        db, user_id = await _setup(client)
+        await import_sparx_file(db, synthetic_qea, imported_by=user_id)
+        _edit_qea(synthetic_qea, "UPDATE t_object SET Name = 'Heliport' WHERE Object_ID = 20")
+
+        summary = await import_sparx_file(
+            db, synthetic_qea, imported_by=user_id, set_id=DEFAULT_SET_ID, sync=True,
+        )
+        assert summary.elements_updated == 1
+        # The diagram shows the element, so its canvas is rebuilt too
+        assert summary.diagrams_updated == 1
+        assert summary.relationships_updated == 0
+
+        element_id, version, _ = await _element(db, "Airport")
+        assert version == 2
+        cursor = await db.execute(
+            "SELECT name, change_type FROM element_versions "
+            "WHERE element_id = ? AND version = 2",
+            (element_id,),
+        )
+        assert tuple(await cursor.fetchone()) == ("Heliport", "update")
+        cursor = await db.execute(
+            "SELECT element_id FROM elements_fts WHERE elements_fts MATCH 'Heliport OR Airport'"
+        )
+        assert [r[0] for r in await cursor.fetchall()] == [element_id]
+        cursor = await db.execute(
+            "SELECT COUNT(*) FROM diagram_element_refs r "
+            "JOIN diagrams d ON d.id = r.diagram_id WHERE d.current_version = 2"
+        )
+        assert (await cursor.fetchone())[0] == 3
+
+    async def test_removed_objects_are_soft_deleted(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        db, user_id = await _setup(client)
+        await import_sparx_file(db, synthetic_qea, imported_by=user_id)
+        _edit_qea(
+            synthetic_qea,
+            "DELETE FROM t_object WHERE Object_ID = 21",
+            "DELETE FROM t_connector WHERE Connector_ID = 1",
+            "DELETE FROM t_diagramobjects WHERE Object_ID = 21",
+        )
+
+        summary = await import_sparx_file(
+            db, synthetic_qea, imported_by=user_id, set_id=DEFAULT_SET_ID, sync=True,
+        )
+        assert summary.elements_removed == 1
+        assert summary.relationships_removed == 1
+        assert summary.diagrams_updated == 1
+
+        element_id, version, is_deleted = await _element(db, "Runway")
+        assert (version, is_deleted) == (2, 1)
+        cursor = await db.execute(
+            "SELECT change_type FROM element_versions WHERE element_id = ? AND version = 2",
+            (element_id,),
+        )
+        assert (await cursor.fetchone())[0] == "delete"
+        cursor = await db.execute(
+            "SELECT COUNT(*) FROM relationships WHERE is_deleted = 0"
+        )
+        assert (await cursor.fetchone())[0] == 0
+        cursor = await db.execute(
+            "SELECT COUNT(*) FROM sparx_sync_objects WHERE ea_guid IN (?, ?)",
+            ("{OBJ-RUNWAY}", "{CON-HAS}"),
+        )
+        assert (await cursor.fetchone())[0] == 0
+
+    async def test_new_element_is_added(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        db, user_id = await _setup(client)
+        await import_sparx_file(db, synthetic_qea, imported_by=user_id)
+        _edit_qea(
+            synthetic_qea,
+            "INSERT INTO t_object (Object_ID, Object_Type, Name, Package_ID, ea_guid) "
+            "VALUES (30, 'Class', 'Taxiway', 2, '{OBJ-TAXIWAY}')",
+        )
+
+        summary = await import_sparx_file(
+            db, synthetic_qea, imported_by=user_id, set_id=DEFAULT_SET_ID, sync=True,
+        )
+        assert summary.elements_created == 1
+        assert summary.elements_updated == 0
+        assert summary.diagrams_updated == 0
+        assert (await _element(db, "Taxiway"))[1] == 1
+
+    async def test_plain_reimport_leaves_changes_alone(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        db, user_id = await _setup(client)
+        await import_sparx_file(db, synthetic_qea, imported_by=user_id)
+        _edit_qea(synthetic_qea, "UPDATE t_object SET Name = 'Heliport' WHERE Object_ID = 20")
+
+        summary = await import_sparx_file(db, synthetic_qea, imported_by=user_id)
+        assert summary.elements_updated == 0
+        assert (await _element(db, "Airport"))[1] == 1
+
+    async def test_sync_adopts_objects_without_records(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        db, user_id = await _setup(client)
+        await import_sparx_file(db, synthetic_qea, imported_by=user_id)
+        # As left by an import that predates sync records
+        await db.execute("DELETE FROM sparx_sync_objects")
+        await db.commit()
+
+        summary = await import_sparx_file(
+            db, synthetic_qea, imported_by=user_id, set_id=DEFAULT_SET_ID, sync=True,
+        )
+        assert summary.elements_created == summary.elements_updated == 0
+        assert summary.relationships_created == summary.relationships_updated == 0
+        assert summary.diagrams_created == summary.diagrams_updated == 0
+        cursor = await db.execute("SELECT COUNT(*) FROM sparx_sync_objects")
+        assert (await cursor.fetchone())[0] == 5
+
+    async def test_watermark_is_latest_modified_date(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        db, user_id = await _setup(client)
+        _edit_qea(
+            synthetic_qea,
+            "UPDATE t_object SET ModifiedDate = '2024-05-01 10:00:00' WHERE Object_ID = 20",
+            "UPDATE t_object SET ModifiedDate = '03/02/24 09:30:00' WHERE Object_ID = 21",
+        )
+        first = await import_sparx_file(db, synthetic_qea, imported_by=user_id)
+        assert first.previous_watermark is None
+        assert first.watermark == "2024-05-01T10:00:00"
+
+        second = await import_sparx_file(
+            db, synthetic_qea, imported_by=user_id, set_id=DEFAULT_SET_ID, sync=True,
+        )
+        assert second.previous_watermark == "2024-05-01T10:00:00"
+
+
+class TestSparxSyncEndpoint:
+    """Verify the import endpoint validates sync requests."""
+
+    async def test_rejects_unknown_mode(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        headers = await _auth_headers(client)
+        resp = await client.post(
+            "/api/import/sparx",
+            files={"file": ("model.qea", Path(synthetic_qea).read_bytes())},
+            data={"mode": "merge"},
+            headers=headers,
+        )
+        assert resp.status_code == 400
+
+    async def test_sync_requires_set(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        headers = await _auth_headers(client)
+        resp = await client.post(
+            "/api/import/sparx",
+            files={"file": ("model.qea", Path(synthetic_qea).read_bytes())},
+            data={"mode": "sync"},
+            headers=headers,
+        )
+        assert resp.status_code == 400
+        assert resp.json()["detail"] == "Sync requires set_id"
+
+    async def test_sync_job_reports_changes(
+        self, client: httpx.AsyncClient, synthetic_qea: str,
+    ) -> None:
+        headers = await _auth_headers(client)
+        db_manager = client._transport.app.state.db_manager  # type: ignore[union-attr]
+        jobs = db_manager.import_jobs
+        payload = Path(synthetic_qea).read_bytes()
+        resp = await client.post(
+            "/api/import/sparx", files={"file": ("model.qea", payload)}, headers=headers,
+        )
+        await jobs.wait_for(resp.json()["id"])
+        _edit_qea(synthetic_qea, "UPDATE t_object SET Note = 'Changed' WHERE Object_ID = 21")
+
+        resp = await client.post(
+            "/api/import/sparx",
+            files={"file": ("model.qea", Path(synthetic_qea).read_bytes())},
+            data={"mode": "sync", "set_id": DEFAULT_SET_ID},
+            headers=headers,
+        )
+        assert resp.status_code == 202
+        assert resp.json()["mode"] == "sync"
+        job = await jobs.wait_for(resp.json()["id"])
+        assert job is not None
+        assert job.status == "completed"
+        assert job.summary["elements_updated"] == 1
+        assert job.summary["elements_created"] == 0
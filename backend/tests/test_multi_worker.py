@@ -0,0 +1,105 @@
+"""Tests for multi-worker mode — several processes sharing one data directory."""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from typing import TYPE_CHECKING
+
+import aiosqlite
+
+from app.audit.service import verify_audit_chain
+from app.config import DatabaseConfig
+from app.database import DatabaseManager
+from app.locks.service import acquire_lock
+from app.middleware.rate_limit import SharedRateLimiter
+from app.startup import initialize_databases
+
+if TYPE_CHECKING:
+    from multiprocessing.queues import Queue
+    from multiprocessing.synchronize import Barrier
+    from pathlib import Path
+
+WORKERS = 4
+AUDIT_ENTRIES_PER_WORKER = 25
+RATE_LIMIT = 20
+RATE_ATTEMPTS_PER_WORKER = 10
+
+
+async def _run_worker(
+    data_dir: str, worker_no: int, barrier: Barrier,
+) -> tuple[bool, int]:
+    config = DatabaseConfig(data_dir=data_dir, read_pool_size=1, multi_worker=True)
+    db_manager = DatabaseManager(config)
+    await initialize_databases(db_manager)
+    limiter = SharedRateLimiter(config.coord_db_path)
+    try:
+        # Start the contended work in every process at the same moment
+        await asyncio.to_thread(barrier.wait, 60)
+        for i in range(AUDIT_ENTRIES_PER_WORKER):
+            await db_manager.audit_writer.submit(
+                user_id=f"user-{worker_no}", username=f"worker{worker_no}",
+                action=f"POST /{i}", target_type="http",
+            )
+        async with db_manager.write_connection() as db:
+            result = await acquire_lock(
+                db, target_type="diagram", target_id="contested",
+                user_id=f"user-{worker_no}", username=f"worker{worker_no}",
+            )
+        allowed = 0
+        for _ in range(RATE_ATTEMPTS_PER_WORKER):
+            allowed += await limiter.allow("10.0.0.1:general", RATE_LIMIT)
+    finally:
+        await limiter.close()
+        await db_manager.close()
+    return not result.get("conflict"), allowed
+
+
+def _worker(
+    data_dir: str, worker_no: int, barrier: Barrier, results: Queue[tuple[bool, int]],
+) -> None:
+    results.put(asyncio.run(_run_worker(data_dir, worker_no, barrier)))
+
+
+class TestMultiWorker:
+    """Verify audit, edit locks and rate limits stay consistent across processes."""
+
+    async def test_concurrent_workers_share_coordination_state(
+        self, tmp_path: Path,
+    ) -> None:
+        data_dir = str(tmp_path / "data")
+        ctx = multiprocessing.get_context("spawn")
+        barrier = ctx.Barrier(WORKERS)
+        results = ctx.Queue()
+        processes = [
+            ctx.Process(
+                target=_worker, args=(data_dir, n, barrier, results), daemon=True,
+            )
+            for n in range(WORKERS)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            outcomes = [
+                await asyncio.to_thread(results.get, timeout=120) for _ in processes
+            ]
+            for process in processes:
+                await asyncio.to_thread(process.join, 30)
+                assert process.exitcode == 0
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        # Exactly one worker wins the contested lock
+        assert sum(won for won, _ in outcomes) == 1
+        # The workers together admit exactly the shared limit
+        assert sum(allowed for _, allowed in outcomes) == RATE_LIMIT
+
+        config = DatabaseConfig(data_dir=data_dir)
+        async with aiosqlite.connect(config.audit_db_path) as audit_db:
+            cursor = await audit_db.execute("SELECT COUNT(*) FROM audit_log")
+            assert (await cursor.fetchone())[0] == WORKERS * AUDIT_ENTRIES_PER_WORKER
+            is_valid, checked = await verify_audit_chain(audit_db)
+        assert is_valid
+        assert checked == WORKERS * AUDIT_ENTRIES_PER_WORKER
@@ -0,0 +1,150 @@
+"""Integration tests for the package closure table (ancestors, subtrees, cycles)."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+
+from app.config import AppConfig, AuthConfig, DatabaseConfig
+from app.database import DatabaseManager
+from app.main import create_app
+from app.startup import initialize_databases
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from pathlib import Path
+
+
+@pytest.fixture
+def app_config(tmp_path: Path) -> AppConfig:
+    return AppConfig(
+        debug=True,
+        cors_origins=["http://localhost:5173"],
+        database=DatabaseConfig(data_dir=str(tmp_path / "data")),
+        auth=AuthConfig(
+            jwt_secret="test-secret-key-that-is-at-least-32-bytes-long-for-hs256",
+            argon2_time_cost=1,
+            argon2_memory_cost=8192,
+            argon2_parallelism=1,
+        ),
+    )
+
+
+@pytest.fixture
+async def client(app_config: AppConfig) -> AsyncIterator[httpx.AsyncClient]:
+    application = create_app(app_config)
+    db_manager = DatabaseManager(app_config.database)
+    await initialize_databases(db_manager)
+    application.state.db_manager = db_manager
+    transport = httpx.ASGITransport(app=application)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as c:
+        yield c
+    await db_manager.close()
+
+
+async def _admin_headers(client: httpx.AsyncClient) -> dict[str, str]:
+    await client.post(
+        "/api/auth/setup",
+        json={"username": "admin", "password": "AdminPass123!"},
+    )
+    resp = await client.post(
+        "/api/auth/login",
+        json={"username": "admin", "password": "AdminPass123!"},
+    )
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+async def _create_package(
+    client: httpx.AsyncClient,
+    headers: dict[str, str],
+    name: str = "Test Package",
+    parent_package_id: str | None = None,
+) -> dict:
+    body: dict = {"name": name}
+    if parent_package_id:
+        body["parent_package_id"] = parent_package_id
+    resp = await client.post("/api/packages", json=body, headers=headers)
+    assert resp.status_code == 201
+    return resp.json()
+
+
+def _names(tree: list[dict]) -> list[str]:
+    names: list[str] = []
+    for node in tree:
+        names.append(node["name"])
+        names.extend(_names(node["children"]))
+    return names
+
+
+class TestPackageClosure:
+    """Verify closure-backed ancestors, subtree fetches and cycle checks."""
+
+    async def test_ancestors_follow_moves(self, client: httpx.AsyncClient) -> None:
+        headers = await _admin_headers(client)
+        a = await _create_package(client, headers, "A")
+        b = await _create_package(client, headers, "B", a["id"])
+        c = await _create_package(client, headers, "C", b["id"])
+        d = await _create_package(client, headers, "D")
+
+        resp = await client.get(f"/api/packages/{c['id']}/ancestors", headers=headers)
+        assert [p["name"] for p in resp.json()] == ["A", "B"]
+
+        resp = await client.put(
+            f"/api/packages/{b['id']}/parent",
+            json={"parent_package_id": d["id"]},
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        resp = await client.get(f"/api/packages/{c['id']}/ancestors", headers=headers)
+        assert [p["name"] for p in resp.json()] == ["D", "B"]
+
+    async def test_move_under_descendant_is_cycle(
+        self, client: httpx.AsyncClient,
+    ) -> None:
+        headers = await _admin_headers(client)
+        a = await _create_package(client, headers, "A")
+        b = await _create_package(client, headers, "B", a["id"])
+        c = await _create_package(client, headers, "C", b["id"])
+        resp = await client.put(
+            f"/api/packages/{a['id']}/parent",
+            json={"parent_package_id": c["id"]},
+            headers=headers,
+        )
+        assert resp.status_code == 400
+
+    async def test_subtree_depth_limit(self, client: httpx.AsyncClient) -> None:
+        headers = await _admin_headers(client)
+        a = await _create_package(client, headers, "A")
+        b = await _create_package(client, headers, "B", a["id"])
+        await _create_package(client, headers, "C", b["id"])
+        await _create_package(client, headers, "Other")
+
+        resp = await client.get(
+            f"/api/packages/hierarchy?root_id={a['id']}", headers=headers,
+        )
+        assert _names(resp.json()) == ["A", "B", "C"]
+        resp = await client.get(
+            f"/api/diagrams/hierarchy?root_id={a['id']}&depth=1", headers=headers,
+        )
+        assert _names(resp.json()) == ["A", "B"]
+
+    async def test_descendant_count_uses_moved_subtree(
+        self, client: httpx.AsyncClient,
+    ) -> None:
+        headers = await _admin_headers(client)
+        a = await _create_package(client, headers, "A")
+        b = await _create_package(client, headers, "B")
+        await _create_package(client, headers, "C", b["id"])
+        await client.put(
+            f"/api/packages/{b['id']}/parent",
+            json={"parent_package_id": a["id"]},
+            headers=headers,
+        )
+        resp = await client.get(
+            f"/api/packages/{a['id']}/descendants/count", headers=headers,
+        )
+        assert resp.json()["child_packages"] == 2
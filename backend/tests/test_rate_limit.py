@@ -10,6 +10,7 @@ import pytest
 from app.config import AppConfig, AuthConfig, DatabaseConfig
 from app.database import DatabaseManager
 from app.main import create_app
+from app.middleware.rate_limit import SlidingWindowRateLimiter
 from app.startup import initialize_databases
 
 if TYPE_CHECKING:
@@ -136,3 +137,51 @@ class TestRateLimitIsolation:
         # Health should still work
         resp = await client.get("/health")
         assert resp.status_code == 200
+
+
+class _Clock:
+    """Manually advanced stand-in for time.monotonic."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestSlidingWindowRateLimiter:
+    """Verify the O(1) sliding window counter and idle key eviction."""
+
+    def test_blocks_at_limit_within_window(self) -> None:
+        limiter = SlidingWindowRateLimiter(clock=_Clock())
+        assert all(limiter.is_allowed("k", 5) for _ in range(5))
+        assert not limiter.is_allowed("k", 5)
+
+    def test_previous_window_is_weighted_by_overlap(self) -> None:
+        clock = _Clock()
+        limiter = SlidingWindowRateLimiter(clock=clock)
+        for _ in range(10):
+            limiter.is_allowed("k", 10)
+        # Halfway into the next window, half of the previous count still applies
+        clock.now += 90
+        assert all(limiter.is_allowed("k", 10) for _ in range(5))
+        assert not limiter.is_allowed("k", 10)
+
+    def test_window_resets_after_idle_period(self) -> None:
+        clock = _Clock()
+        limiter = SlidingWindowRateLimiter(clock=clock)
+        for _ in range(3):
+            limiter.is_allowed("k", 3)
+        clock.now += 150
+        assert all(limiter.is_allowed("k", 3) for _ in range(3))
+
+    def test_idle_keys_are_evicted(self) -> None:
+        clock = _Clock()
+        limiter = SlidingWindowRateLimiter(sweep_interval=60, clock=clock)
+        for i in range(100):
+            limiter.is_allowed(f"10.0.0.{i}:general", 10)
+        assert limiter.stats() == {"tracked_keys": 100, "evicted_keys": 0}
+
+        clock.now += 121
+        limiter.is_allowed("10.0.1.1:general", 10)
+        assert limiter.stats() == {"tracked_keys": 1, "evicted_keys": 100}
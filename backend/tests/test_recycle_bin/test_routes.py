@@ -129,6 +129,43 @@ class TestListDeletedItems:
         assert "diagram" in item_types
         assert "element" in item_types
 
+    async def test_cursor_pages_across_item_types(
+        self, client: httpx.AsyncClient,
+    ) -> None:
+        headers = await _admin_headers(client)
+        await _create_and_delete_package(client, headers, "Deleted Pkg")
+        await _create_and_delete_diagram(client, headers, "Deleted Diag")
+        await _create_and_delete_element(client, headers, "Deleted Elem")
+
+        ids: list[str] = []
+        resp = await client.get("/api/recycle-bin?page_size=1", headers=headers)
+        while True:
+            data = resp.json()
+            ids.extend(item["id"] for item in data["items"])
+            if data["next_cursor"] is None:
+                break
+            resp = await client.get(
+                f"/api/recycle-bin?page_size=1&cursor={data['next_cursor']}",
+                headers=headers,
+            )
+        assert len(ids) == len(set(ids)) == data["total"]
+
+    async def test_page_numbers_match_cursor_order(
+        self, client: httpx.AsyncClient,
+    ) -> None:
+        headers = await _admin_headers(client)
+        await _create_and_delete_package(client, headers, "Deleted Pkg")
+        await _create_and_delete_diagram(client, headers, "Deleted Diag")
+        await _create_and_delete_element(client, headers, "Deleted Elem")
+
+        resp = await client.get("/api/recycle-bin?page_size=10", headers=headers)
+        ordered = [item["id"] for item in resp.json()["items"]]
+        for page in range(1, len(ordered) + 1):
+            resp = await client.get(
+                f"/api/recycle-bin?page_size=1&page={page}", headers=headers,
+            )
+            assert [item["id"] for item in resp.json()["items"]] == [ordered[page - 1]]
+
     async def test_list_excludes_active_items(
         self, client: httpx.AsyncClient,
     ) -> None:
@@ -34,6 +34,8 @@ from app.migrations.m014_sets_partial_unique import up as m014_up
 from app.migrations.m015_model_relationships import up as m015_up
 from app.migrations.m016_naming_rename import up as m016_up
 from app.migrations.m022_element_notation import up as m022_up
+from app.migrations.m034_fts_triggers import up as m034_up
+from app.migrations.m035_fts_set_id import up as m035_up
 from app.migrations.seed import seed_roles_and_permissions
 from app.search.service import search
 
@@ -58,6 +60,8 @@ async def _run_migrations(db: aiosqlite.Connection) -> None:
     await m015_up(db)
     await m016_up(db)
     await m022_up(db)
+    await m034_up(db)
+    await m035_up(db)
     await seed_roles_and_permissions(db)
 
 
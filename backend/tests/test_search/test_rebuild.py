@@ -1,8 +1,8 @@
-"""Tests for FTS search index rebuild and rollback re-indexing.
+"""Tests for FTS search index rebuild, indexing triggers and rollback re-indexing.
 
-Verifies SPEC-016-A: rebuild_search_index() populates FTS tables from
-existing data, is idempotent, excludes deleted records, and rollback
-operations update the FTS index.
+Verifies SPEC-016-A: rebuild_search_index() repopulates FTS tables from
+existing data, is idempotent, excludes deleted records, and the m034
+triggers keep the index in step with direct writes and rollbacks.
 """
 
 from __future__ import annotations
@@ -29,6 +29,8 @@ from app.migrations.m014_sets_partial_unique import up as m014_up
 from app.migrations.m015_model_relationships import up as m015_up
 from app.migrations.m016_naming_rename import up as m016_up
 from app.migrations.m022_element_notation import up as m022_up
+from app.migrations.m034_fts_triggers import up as m034_up
+from app.migrations.m035_fts_set_id import up as m035_up
 from app.migrations.seed import seed_roles_and_permissions
 from app.search.service import rebuild_search_index, search
 
@@ -53,6 +55,8 @@ async def _run_migrations(db: aiosqlite.Connection) -> None:
     await m015_up(db)
     await m016_up(db)
     await m022_up(db)
+    await m034_up(db)
+    await m035_up(db)
     await seed_roles_and_permissions(db)
 
 
@@ -137,11 +141,12 @@ class TestRebuildSearchIndex:
             name="Payment Gateway", element_type="application",
             description="Processes payments",
         )
+        await main_db.execute("DELETE FROM elements_fts")
 
         results = await search(main_db, "Payment")
         assert len(results) == 0
 
-        await rebuild_search_index(main_db)
+        assert await rebuild_search_index(main_db) == {"elements": 1, "diagrams": 0}
         results = await search(main_db, "Payment")
         assert len(results) == 1
         assert results[0]["name"] == "Payment Gateway"
@@ -158,11 +163,12 @@ class TestRebuildSearchIndex:
             name="Network Topology", diagram_type="simple",
             description="Core network layout",
         )
+        await main_db.execute("DELETE FROM diagrams_fts")
 
         results = await search(main_db, "Network")
         assert len(results) == 0
 
-        await rebuild_search_index(main_db)
+        assert await rebuild_search_index(main_db) == {"elements": 0, "diagrams": 1}
         results = await search(main_db, "Network")
         assert len(results) == 1
         assert results[0]["name"] == "Network Topology"
@@ -215,6 +221,26 @@ class TestRebuildSearchIndex:
         live_results = await search(main_db, "Live Service")
         assert len(live_results) == 1
 
+    async def test_rebuild_keeps_triggers_in_step(
+        self, main_db: aiosqlite.Connection,
+    ) -> None:
+        """Rows rebuilt by rowid are found again by the update triggers."""
+        await _run_migrations(main_db)
+        user_id = await _create_test_user(main_db)
+        element_id = await _insert_element_directly(
+            main_db, user_id=user_id, name="Ledger Service",
+        )
+
+        await rebuild_search_index(main_db)
+        await main_db.execute(
+            "UPDATE elements SET is_deleted = 1 WHERE id = ?", (element_id,),
+        )
+        await main_db.commit()
+
+        assert await search(main_db, "Ledger") == []
+        cursor = await main_db.execute("SELECT COUNT(*) FROM elements_fts")
+        assert (await cursor.fetchone())[0] == 0
+
     async def test_rollback_updates_fts_index(
         self, main_db: aiosqlite.Connection,
     ) -> None:
@@ -264,3 +290,130 @@ class TestRebuildSearchIndex:
 
         updated_results = await search(main_db, "Updated Name")
         assert len(updated_results) == 0
+
+
+class TestSearchIndexTriggers:
+    """Verify the m034 triggers index writes that bypass the service layer."""
+
+    async def test_direct_inserts_are_searchable(
+        self, main_db: aiosqlite.Connection,
+    ) -> None:
+        await _run_migrations(main_db)
+        user_id = await _create_test_user(main_db)
+
+        await _insert_element_directly(
+            main_db, user_id=user_id, name="Billing Engine", description="Invoices",
+        )
+        await _insert_diagram_directly(main_db, user_id=user_id, name="Billing Flow")
+        await _insert_element_directly(
+            main_db, user_id=user_id, name="Billing Archive", is_deleted=1,
+        )
+
+        results = await search(main_db, "Billing")
+        assert sorted(r["name"] for r in results) == ["Billing Engine", "Billing Flow"]
+
+    async def test_new_version_replaces_indexed_row(
+        self, main_db: aiosqlite.Connection,
+    ) -> None:
+        await _run_migrations(main_db)
+        user_id = await _create_test_user(main_db)
+        diagram_id = await _insert_diagram_directly(
+            main_db, user_id=user_id, name="Old Landscape",
+        )
+
+        # Version first, then the pointer: indexed once the pointer moves
+        await main_db.execute(
+            "INSERT INTO diagram_versions (diagram_id, version, name, data, "
+            "change_type, created_at, created_by) "
+            "VALUES (?, 2, 'New Landscape', '{}', 'update', '', ?)",
+            (diagram_id, user_id),
+        )
+        assert len(await search(main_db, "Old Landscape")) == 1
+        await main_db.execute(
+            "UPDATE diagrams SET current_version = 2 WHERE id = ?", (diagram_id,),
+        )
+        await main_db.commit()
+
+        assert await search(main_db, "Old Landscape") == []
+        results = await search(main_db, "New Landscape")
+        assert [r["id"] for r in results] == [diagram_id]
+        cursor = await main_db.execute("SELECT COUNT(*) FROM diagrams_fts")
+        assert (await cursor.fetchone())[0] == 1
+
+    async def test_hard_delete_removes_indexed_row(
+        self, main_db: aiosqlite.Connection,
+    ) -> None:
+        await _run_migrations(main_db)
+        user_id = await _create_test_user(main_db)
+        element_id = await _insert_element_directly(
+            main_db, user_id=user_id, name="Purged Service",
+        )
+        kept_id = await _insert_element_directly(
+            main_db, user_id=user_id, name="Kept Service",
+        )
+
+        await main_db.execute(
+            "DELETE FROM element_versions WHERE element_id = ?", (element_id,),
+        )
+        await main_db.execute("DELETE FROM elements WHERE id = ?", (element_id,))
+        await main_db.commit()
+
+        results = await search(main_db, "Service")
+        assert [r["id"] for r in results] == [kept_id]
+
+    async def test_index_survives_renumbered_rowids(
+        self, main_db: aiosqlite.Connection,
+    ) -> None:
+        await _run_migrations(main_db)
+        user_id = await _create_test_user(main_db)
+        element_id = await _insert_element_directly(
+            main_db, user_id=user_id, name="Old Gateway",
+        )
+        other_id = await _insert_element_directly(
+            main_db, user_id=user_id, name="Other Gateway",
+        )
+        # VACUUM may renumber the implicit rowids of TEXT-keyed tables
+        await main_db.execute(
+            "UPDATE elements SET rowid = rowid + 100 WHERE id = ?", (element_id,),
+        )
+        await main_db.execute(
+            "UPDATE elements SET rowid = 1 WHERE id = ?", (other_id,),
+        )
+
+        await main_db.execute(
+            "INSERT INTO element_versions (element_id, version, name, data, "
+            "change_type, created_at, created_by) "
+            "VALUES (?, 2, 'New Gateway', '{}', 'update', '', ?)",
+            (element_id, user_id),
+        )
+        await main_db.execute(
+            "UPDATE elements SET current_version = 2 WHERE id = ?", (element_id,),
+        )
+        await main_db.commit()
+
+        results = await search(main_db, "Gateway")
+        assert sorted(r["name"] for r in results) == ["New Gateway", "Other Gateway"]
+
+    async def test_set_move_updates_indexed_set(
+        self, main_db: aiosqlite.Connection,
+    ) -> None:
+        await _run_migrations(main_db)
+        user_id = await _create_test_user(main_db)
+        element_id = await _insert_element_directly(
+            main_db, user_id=user_id, name="Roaming Service",
+        )
+        set_id = str(uuid.uuid4())
+        await main_db.execute(
+            "INSERT INTO sets (id, name, created_at, created_by, updated_at) "
+            "VALUES (?, 'Other', '', ?, '')",
+            (set_id, user_id),
+        )
+        assert await search(main_db, "Roaming", set_id=set_id) == []
+
+        await main_db.execute(
+            "UPDATE elements SET set_id = ? WHERE id = ?", (set_id, element_id),
+        )
+        await main_db.commit()
+
+        results = await search(main_db, "Roaming", set_id=set_id)
+        assert [r["id"] for r in results] == [element_id]
@@ -10,6 +10,7 @@ import pytest
 from app.config import AppConfig, AuthConfig, DatabaseConfig
 from app.database import DatabaseManager
 from app.main import create_app
+from app.pagination import encode_cursor
 from app.startup import initialize_databases
 
 if TYPE_CHECKING:
@@ -194,7 +195,11 @@ class TestSearchEndpoint:
             "/api/search?q=widget&limit=2", headers=headers,
         )
         assert resp.status_code == 200
-        assert resp.json()["total"] <= 2
+        data = resp.json()
+        assert len(data["results"]) == 2
+        # total counts every match, not just the page
+        assert data["total"] == 5
+        assert data["next_cursor"] is not None
 
     async def test_search_excludes_deleted_elements(
         self, client: httpx.AsyncClient,
@@ -334,3 +339,146 @@ class TestSearchEndpoint:
         data = resp.json()
         assert data["total"] == 1
         assert data["results"][0]["name"] == "Scoped Architecture"
+
+
+class TestSearchRebuildEndpoint:
+    """Verify the admin search index rebuild."""
+
+    async def test_rebuild_requires_auth(
+        self, client: httpx.AsyncClient,
+    ) -> None:
+        resp = await client.post("/api/admin/search/rebuild")
+        assert resp.status_code == 401
+
+    async def test_rebuild_restores_cleared_index(
+        self, client: httpx.AsyncClient,
+    ) -> None:
+        headers = await _admin_headers(client)
+        await client.post(
+            "/api/elements",
+            json={"element_type": "application", "name": "Payment Gateway"},
+            headers=headers,
+        )
+        db = client._transport.app.state.db_manager.main_db  # type: ignore[union-attr]
+        await db.execute("DELETE FROM elements_fts")
+        await db.commit()
+        resp = await client.get("/api/search?q=payment", headers=headers)
+        assert resp.json()["total"] == 0
+
+        resp = await client.post("/api/admin/search/rebuild", headers=headers)
+        assert resp.status_code == 200
+        cursor = await db.execute("SELECT COUNT(*) FROM elements WHERE is_deleted = 0")
+        assert resp.json()["elements"] == (await cursor.fetchone())[0]
+        resp = await client.get("/api/search?q=payment", headers=headers)
+        assert resp.json()["total"] == 1
+
+
+class TestSearchRanking:
+    """Verify ranking, pagination, facets and snippets of one search statement."""
+
+    async def _create(
+        self, client: httpx.AsyncClient, headers: dict[str, str], path: str, body: dict,
+    ) -> str:
+        resp = await client.post(path, json=body, headers=headers)
+        return resp.json()["id"]
+
+    async def test_name_match_outranks_description_match(
+        self, client: httpx.AsyncClient,
+    ) -> None:
+        headers = await _admin_headers(client)
+        await self._create(client, headers, "/api/elements", {
+            "element_type": "application", "name": "Billing Service",
+            "description": "Handles customer invoices",
+        })
+        await self._create(client, headers, "/api/diagrams", {
+            "diagram_type": "simple", "name": "Invoice Flow", "data": {},
+        })
+
+        resp = await client.get("/api/search?q=invoice", headers=headers)
+        data = resp.json()
+        # The diagram's name match ranks above the element's description match
+        assert [r["name"] for r in data["results"]] == ["Invoice Flow", "Billing Service"]
+        assert data["facets"] == {"element": 1, "diagram": 1}
+        assert data["results"][1]["snippet"] == "Handles customer <mark>invoices</mark>"
+
+    async def test_keyset_pages_cover_all_matches_across_types(
+        self, client: httpx.AsyncClient,
+    ) -> None:
+        headers = await _admin_headers(client)
+        for i in range(3):
+            await self._create(client, headers, "/api/elements", {
+                "element_type": "application", "name": f"Gizmo Service {i}",
+            })
+            await self._create(client, headers, "/api/diagrams", {
+                "diagram_type": "simple", "name": f"Gizmo View {i}", "data": {},
+            })
+
+        seen: list[str] = []
+        cursor = None
+        while True:
+            url = "/api/search?q=gizmo&limit=4"
+            if cursor:
+                url += f"&cursor={cursor}"
+            data = (await client.get(url, headers=headers)).json()
+            assert data["total"] == 6
+            assert data["facets"] == {"element": 3, "diagram": 3}
+            seen.extend(r["id"] for r in data["results"])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        assert len(seen) == 6
+        assert len(set(seen)) == 6
+
+    async def test_result_type_filters_page_not_facets(
+        self, client: httpx.AsyncClient,
+    ) -> None:
+        headers = await _admin_headers(client)
+        await self._create(client, headers, "/api/elements", {
+            "element_type": "application", "name": "Sprocket Service",
+        })
+        await self._create(client, headers, "/api/diagrams", {
+            "diagram_type": "simple", "name": "Sprocket View", "data": {},
+        })
+
+        resp = await client.get(
+            "/api/search?q=sprocket&result_type=diagram", headers=headers,
+        )
+        data = resp.json()
+        assert [r["result_type"] for r in data["results"]] == ["diagram"]
+        assert data["total"] == 1
+        assert data["facets"] == {"element": 1, "diagram": 1}
+
+    async def test_snippet_escapes_html(
+        self, client: httpx.AsyncClient,
+    ) -> None:
+        headers = await _admin_headers(client)
+        await self._create(client, headers, "/api/elements", {
+            "element_type": "application", "name": "<b>Cog</b> Service",
+        })
+
+        resp = await client.get("/api/search?q=cog", headers=headers)
+        snippet = resp.json()["results"][0]["snippet"]
+        assert snippet == "&lt;b&gt;<mark>Cog</mark>&lt;/b&gt; Service"
+
+    async def test_invalid_cursor_returns_400(
+        self, client: httpx.AsyncClient,
+    ) -> None:
+        headers = await _admin_headers(client)
+        resp = await client.get("/api/search?q=x&cursor=bogus", headers=headers)
+        assert resp.status_code == 400
+
+    async def test_malformed_cursor_key_returns_400(
+        self, client: httpx.AsyncClient,
+    ) -> None:
+        headers = await _admin_headers(client)
+        for key in (
+            [{"a": 1}, "element", "x"],
+            [1.5, 2, "x"],
+            [1.5, "element"],
+            [float("nan"), "element", "x"],
+        ):
+            resp = await client.get(
+                "/api/search", params={"q": "x", "cursor": encode_cursor(key)},
+                headers=headers,
+            )
+            assert resp.status_code == 400, key
@@ -52,6 +52,9 @@ async def _run_migrations(db: aiosqlite.Connection) -> None:
     from app.migrations.m019_recycle_bin import up as m019
     from app.migrations.m020_diagram_type_notation_registry import up as m020
     from app.migrations.m022_element_notation import up as m022
+    from app.migrations.m028_diagram_element_refs import up as m028
+    from app.migrations.m029_diagram_summary_columns import up as m029
+    from app.migrations.m030_package_closure import up as m030
     from app.migrations.seed import seed_roles_and_permissions
 
     await m001(db)
@@ -74,6 +77,9 @@ async def _run_migrations(db: aiosqlite.Connection) -> None:
     await m019(db)
     await m020(db)
     await m022(db)
+    await m028(db)
+    await m029(db)
+    await m030(db)
     await seed_roles_and_permissions(db)
 
 
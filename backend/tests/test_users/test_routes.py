@@ -173,6 +173,28 @@ class TestUpdateUser:
         assert resp.status_code == 200
         assert resp.json()["is_active"] is False
 
+    async def test_deactivation_applies_to_next_request(
+        self, client: httpx.AsyncClient,
+    ) -> None:
+        headers = await _admin_headers(client)
+        create_resp = await client.post(
+            "/api/users",
+            json={"username": "cached", "password": "SecurePass123!", "role": "admin"},
+            headers=headers,
+        )
+        user_id = create_resp.json()["id"]
+        login = await client.post(
+            "/api/auth/login",
+            json={"username": "cached", "password": "SecurePass123!"},
+        )
+        user_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        # Warm the identity cache, then demote and deactivate
+        assert (await client.get("/api/users", headers=user_headers)).status_code == 200
+        await client.put(f"/api/users/{user_id}", json={"role": "viewer"}, headers=headers)
+        assert (await client.get("/api/users", headers=user_headers)).status_code == 403
+        await client.put(f"/api/users/{user_id}", json={"is_active": False}, headers=headers)
+        assert (await client.get("/api/users", headers=user_headers)).status_code == 401
+
     async def test_update_nonexistent_returns_404(
         self, client: httpx.AsyncClient,
     ) -> None:
@@ -53,6 +53,9 @@ export interface Diagram {
 	notation?: string;
 	detected_notations?: string[];
 	metadata?: Record<string, unknown> | null;
+	node_count?: number;
+	edge_count?: number;
+	has_content?: boolean;
 }
 
 export interface Package {
@@ -133,6 +136,7 @@ export interface SearchResult {
 	description: string | null;
 	type_detail: string;
 	rank: number;
+	snippet: string | null;
 	deep_link: string;
 }
 
@@ -140,6 +144,8 @@ export interface SearchResponse {
 	query: string;
 	results: SearchResult[];
 	total: number;
+	facets: Record<'element' | 'diagram', number>;
+	next_cursor: string | null;
 }
 
 export interface Comment {
@@ -163,6 +169,7 @@ export interface PaginatedResponse<T> {
 	total: number;
 	page: number;
 	page_size: number;
+	next_cursor?: string | null;
 }
 
 export interface ElementVersion {
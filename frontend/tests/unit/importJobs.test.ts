@@ -0,0 +1,50 @@
+import { describe, it, expect } from 'vitest';
+import { readFileSync } from 'fs';
+import { resolve } from 'path';
+
+/**
+ * Background import job tests.
+ * Verifies the import page polls the job for phase progress, supports
+ * cancellation, and shows the summary from the finished job.
+ */
+
+describe('Import page job tracking', () => {
+	const pageSrc = readFileSync(
+		resolve(__dirname, '../../src/routes/import/+page.svelte'),
+		'utf-8',
+	);
+
+	it('polls the import job until it finishes', () => {
+		expect(pageSrc).toContain('/api/import/sparx/${job.id}');
+		expect(pageSrc).toContain("job.status === 'queued' || job.status === 'running'");
+	});
+
+	it('derives progress from the import phases', () => {
+		expect(pageSrc).toContain("['packages', 'elements', 'connectors', 'diagrams']");
+		expect(pageSrc).toContain('job.progress[job.phase as string]');
+	});
+
+	it('cancels a running import', () => {
+		expect(pageSrc).toContain('/api/import/sparx/${jobId}/cancel');
+	});
+
+	it('shows the summary of a completed job', () => {
+		expect(pageSrc).toContain('summary = job.summary');
+	});
+});
+
+describe('Import job backend', () => {
+	const routerSrc = readFileSync(
+		resolve(__dirname, '../../../backend/app/import_sparx/router.py'),
+		'utf-8',
+	);
+
+	it('streams the upload to disk in chunks', () => {
+		expect(routerSrc).toContain('await file.read(UPLOAD_CHUNK_SIZE)');
+		expect(routerSrc).not.toContain('await file.read()');
+	});
+
+	it('returns 202 with the job', () => {
+		expect(routerSrc).toContain('status_code=202');
+	});
+});
@@ -0,0 +1,38 @@
+import { describe, it, expect } from 'vitest';
+import { readFileSync } from 'fs';
+import { resolve } from 'path';
+
+/**
+ * Incremental SparxEA sync tests.
+ * Verifies the import page can request a sync into a set and shows the
+ * changed and removed counts the sync reports.
+ */
+
+describe('Import page sync mode', () => {
+	const pageSrc = readFileSync(
+		resolve(__dirname, '../../src/routes/import/+page.svelte'),
+		'utf-8',
+	);
+
+	it('sends sync mode only with a target set', () => {
+		expect(pageSrc).toContain("if (syncMode && importSetId) formData.append('mode', 'sync')");
+		expect(pageSrc).toContain('bind:checked={syncMode}');
+	});
+
+	it('shows changed and removed counts', () => {
+		expect(pageSrc).toContain('summary.elements_updated');
+		expect(pageSrc).toContain('summary.elements_removed');
+		expect(pageSrc).toContain('summary.diagrams_removed');
+	});
+});
+
+describe('Import sync backend', () => {
+	const routerSrc = readFileSync(
+		resolve(__dirname, '../../../backend/app/import_sparx/router.py'),
+		'utf-8',
+	);
+
+	it('requires a set for sync mode', () => {
+		expect(routerSrc).toContain('Sync requires set_id');
+	});
+});
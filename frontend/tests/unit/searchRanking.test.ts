@@ -0,0 +1,47 @@
+import { describe, it, expect } from 'vitest';
+import { readFileSync } from 'fs';
+import { resolve } from 'path';
+
+/**
+ * Ranked search tests.
+ * Verifies the dashboard pages through search results with the cursor,
+ * shows per-type counts and snippets, and that the backend ranks both
+ * result types in one statement.
+ */
+
+describe('Dashboard search', () => {
+	const pageSrc = readFileSync(resolve(__dirname, '../../src/routes/+page.svelte'), 'utf-8');
+
+	it('loads further pages with next_cursor', () => {
+		expect(pageSrc).toContain('&cursor=${encodeURIComponent(cursor)}');
+		expect(pageSrc).toContain('searchCursor = data.next_cursor');
+		expect(pageSrc).toContain('onclick={loadMoreResults}');
+	});
+
+	it('shows total and per-type counts', () => {
+		expect(pageSrc).toContain('searchTotal = data.total');
+		expect(pageSrc).toContain('searchFacets.element');
+		expect(pageSrc).toContain('searchFacets.diagram');
+	});
+
+	it('renders snippet highlights', () => {
+		expect(pageSrc).toContain('{@html result.snippet}');
+	});
+});
+
+describe('Search backend', () => {
+	const serviceSrc = readFileSync(
+		resolve(__dirname, '../../../backend/app/search/service.py'),
+		'utf-8',
+	);
+
+	it('ranks elements and diagrams in one UNION ALL statement', () => {
+		expect(serviceSrc).toContain('UNION ALL');
+		expect(serviceSrc).toContain('bm25(elements_fts, {_BM25_WEIGHTS})');
+		expect(serviceSrc).not.toContain('results.sort(');
+	});
+
+	it('escapes snippets before adding <mark> tags', () => {
+		expect(serviceSrc).toContain('html.escape(snippet)');
+	});
+});